@@ -5,9 +5,11 @@ from .state import (
     DynamicApplicationStateValue,
     DynamicAccountStateValue,
     ApplicationStateValue,
+    PackedStateValue,
     AccountStateValue,
     AccountStateBlob,
     ApplicationStateBlob,
+    BoxStateBlob,
 )
 from .decorators import (
     Authorize,
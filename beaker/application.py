@@ -2,6 +2,7 @@ import base64
 from inspect import getattr_static
 from typing import Final, Any, cast, Optional
 from algosdk.abi import Method
+from algosdk.source_map import SourceMap
 from pyteal import (
     SubroutineFnWrapper,
     TealInputError,
@@ -30,6 +31,7 @@ from beaker.state import (
     AccountStateBlob,
     ApplicationStateBlob,
     ApplicationState,
+    BoxStateBlob,
     DynamicAccountStateValue,
     AccountStateValue,
     ApplicationStateValue,
@@ -80,6 +82,7 @@ class Application:
         # be set after init if len(precompiles)>0
         self.approval_program = None
         self.clear_program = None
+        self._clear_compiled()
 
         self.on_create = None
         self.on_update = None
@@ -92,6 +95,7 @@ class Application:
         self.bare_externals: dict[str, OnCompleteAction] = {}
         self.methods: dict[str, tuple[ABIReturnSubroutine, Optional[MethodConfig]]] = {}
         self.precompiles: dict[str, Precompile] = {}
+        self.box_blobs: dict[str, BoxStateBlob] = {}
 
         acct_vals: dict[
             str, AccountStateValue | DynamicAccountStateValue | AccountStateBlob
@@ -123,11 +127,15 @@ class Application:
                 case DynamicApplicationStateValue():
                     app_vals[name] = bound_attr
 
+                # Boxes need funding so they aren't part of the app state
+                case BoxStateBlob():
+                    self.box_blobs[name] = bound_attr
+
                 case Precompile():
                     self.precompiles[name] = bound_attr
 
             # Already dealt with these, move on
-            if name in app_vals or name in acct_vals:
+            if name in app_vals or name in acct_vals or name in self.box_blobs:
                 continue
 
             # Check for externals and internal methods
@@ -246,6 +254,32 @@ class Application:
             optimize=OptimizeOptions(scratch_slots=True),
         )
 
+        # Any binaries or source maps were for the old programs
+        self._clear_compiled()
+
+    def _clear_compiled(self):
+        self.approval_binary: Optional[bytes] = None
+        self.approval_src_map: Optional[SourceMap] = None
+        self.clear_binary: Optional[bytes] = None
+        self.clear_src_map: Optional[SourceMap] = None
+
+    def _set_compiled(
+        self,
+        approval_binary: bytes,
+        approval_map: SourceMap,
+        clear_binary: bytes,
+        clear_map: SourceMap,
+    ):
+        """
+        Called by application_client to set the binaries and source maps
+        for the approval and clear programs, so later clients and errors
+        don't need to compile them again.
+        """
+        self.approval_binary = approval_binary
+        self.approval_src_map = approval_map
+        self.clear_binary = clear_binary
+        self.clear_src_map = clear_map
+
     def application_spec(self) -> dict[str, Any]:
         """returns a dictionary, helpful to provide to callers with information about the application specification"""
 
@@ -310,6 +344,16 @@ class Application:
                 raise Exception("Clear program empty")
             f.write(self.clear_program)
 
+        # Source maps are only known once compiled by algod
+        for name, src_map in [
+            ("approval", self.approval_src_map),
+            ("clear", self.clear_src_map),
+        ]:
+            if src_map is None:
+                continue
+            with open(os.path.join(directory, f"{name}.teal.map"), "w") as f:
+                f.write(json.dumps(dictify_source_map(src_map)))
+
         with open(os.path.join(directory, "contract.json"), "w") as f:
             if self.contract is None:
                 raise Exception("Contract empty")
@@ -317,3 +361,40 @@ class Application:
 
         with open(os.path.join(directory, f"{self.__class__.__name__}.json"), "w") as f:
             f.write(json.dumps(self.application_spec()))
+
+    def load_source_maps(self, directory: str = "."):
+        """
+        Loads the source maps written by `dump` so errors can be traced back
+        to TEAL source lines without compiling the programs again.
+
+        A source map is only loaded if the program dumped alongside it matches
+        the program this application compiled to.
+        """
+        import json
+        import os
+
+        for name, program in [
+            ("approval", self.approval_program),
+            ("clear", self.clear_program),
+        ]:
+            map_path = os.path.join(directory, f"{name}.teal.map")
+            teal_path = os.path.join(directory, f"{name}.teal")
+            if not os.path.exists(map_path) or not os.path.exists(teal_path):
+                continue
+
+            with open(teal_path, "r") as f:
+                if f.read() != program:
+                    continue
+
+            with open(map_path, "r") as f:
+                setattr(self, f"{name}_src_map", SourceMap(json.loads(f.read())))
+
+
+def dictify_source_map(src_map: SourceMap) -> dict[str, Any]:
+    """returns the json form of a source map, as returned by algod"""
+    return {
+        "version": src_map.version,
+        "sources": src_map.sources,
+        "names": [],
+        "mappings": src_map.mappings,
+    }
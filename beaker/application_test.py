@@ -621,3 +621,35 @@ def test_abi_method_details():
 
     with pytest.raises(Exception):
         get_method_selector(meth2)
+
+
+def test_dump_source_maps(tmp_path):
+    from algosdk.source_map import SourceMap
+
+    src_map = SourceMap(
+        {"version": 3, "sources": [], "names": [], "mappings": "AAAA;AACA"}
+    )
+
+    app = Application()
+    app._set_compiled(b"\x07", src_map, b"\x07", src_map)
+    app.dump(str(tmp_path))
+    assert (tmp_path / "approval.teal.map").exists()
+
+    # Loads into a fresh instance of the same app
+    loaded = Application()
+    assert loaded.approval_src_map is None
+    loaded.load_source_maps(str(tmp_path))
+    assert loaded.approval_src_map is not None
+    assert loaded.approval_src_map.pc_to_line == src_map.pc_to_line
+    assert loaded.clear_src_map is not None
+
+    # Recompiling drops the maps, they were for the old program
+    loaded.compile()
+    assert loaded.approval_src_map is None
+
+    # Maps dumped for a different program are not loaded
+    (tmp_path / "approval.teal").write_text("#pragma version 7\nint 0")
+    other = Application()
+    other.load_source_maps(str(tmp_path))
+    assert other.approval_src_map is None
+    assert other.clear_src_map is not None
@@ -1,8 +1,13 @@
-from base64 import b64decode
+import asyncio
+from base64 import b64decode, b64encode
+from concurrent.futures import Executor, ThreadPoolExecutor
 import copy
+import os
+import threading
 from math import ceil
-from typing import Any, cast
+from typing import Any, AsyncIterator, Iterator, cast
 
+import msgpack  # type: ignore
 from algosdk.account import address_from_private_key
 from algosdk.atomic_transaction_composer import (
     TransactionSigner,
@@ -10,16 +15,26 @@ from algosdk.atomic_transaction_composer import (
     MultisigTransactionSigner,
     LogicSigTransactionSigner,
     AtomicTransactionComposer,
+    AtomicTransactionComposerStatus,
+    AtomicTransactionResponse,
     ABIResult,
     ABI_RETURN_HASH,
     TransactionWithSigner,
     abi,
 )
+from algosdk.error import (
+    AlgodHTTPError,
+    AtomicTransactionComposerError,
+    TransactionRejectedError,
+)
 from algosdk.future import transaction
 from algosdk.logic import get_application_address
 from algosdk.source_map import SourceMap
 from algosdk.v2client.algod import AlgodClient
-from algosdk.constants import APP_PAGE_MAX_SIZE
+from algosdk.v2client.indexer import IndexerClient
+from algosdk.constants import APP_PAGE_MAX_SIZE, MIN_TXN_FEE
+from algosdk.encoding import checksum
+from pyteal import CallConfig
 
 from beaker.application import Application, get_method_spec
 from beaker.decorators import (
@@ -28,8 +43,48 @@ from beaker.decorators import (
     DefaultArgument,
     DefaultArgumentClass,
 )
+from beaker.state import (
+    AccountStateBlob,
+    ApplicationStateBlob,
+    BoxStateBlob,
+    PackedStateValue,
+)
+from beaker.client.avm import AVMSnapshot, UnsupportedEvaluation, evaluator
+from beaker.client.bitmap_reader import BitmapReader
+from beaker.client.blob_reader import BlobReader
 from beaker.client.state_decode import decode_state
+from beaker.client.state_stream import StateDiff, block_state_diff
+from beaker.client.deploy import (
+    DeployAction,
+    DeployResult,
+    onchain_program_hashes,
+    program_hash,
+)
 from beaker.client.logic_error import LogicException
+from beaker.client.method_plan import MethodPlan
+from beaker.client.metrics import ClientMetrics, instrumented
+from beaker.client.parallel_signing import sign_parallel
+from beaker.client.references import (
+    SHARED_REFERENCES_VERSION,
+    References,
+    pack_references,
+)
+from beaker.client.return_decoder import return_decoder
+from beaker.client.submission import (
+    TXN_CONFIRMED,
+    TXN_PENDING,
+    TXN_REJECTED,
+    SubmissionPolicy,
+    deterministic_lease,
+    txn_status,
+)
+from beaker.client.state_view import StateView
+from beaker.lib.datastructures.bitmap import Bitmap
+from beaker.lib.datastructures.map import HashMap
+
+
+# Guards compiling apps, shared by every client since they may share an app
+_build_lock = threading.RLock()
 
 
 class ApplicationClient:
@@ -41,6 +96,8 @@ class ApplicationClient:
         signer: TransactionSigner = None,
         sender: str = None,
         suggested_params: transaction.SuggestedParams = None,
+        submission_policy: SubmissionPolicy = None,
+        metrics: ClientMetrics = None,
     ):
         self.client = client
         self.app = app
@@ -59,6 +116,26 @@ class ApplicationClient:
         self.clear_src_map = None
 
         self.suggested_params = suggested_params
+        self.submission_policy = submission_policy
+
+        #: records client operations if set, defaults to the metrics of an InstrumentedAlgodClient
+        self.metrics: ClientMetrics | None = (
+            metrics if metrics is not None else getattr(client, "metrics", None)
+        )
+
+        #: no argument ABI method used for padding calls if the app has no bare NoOp
+        self.padding_method: abi.Method | HandlerFunc | None = None
+
+        self.state_view = StateView(client)
+
+        #: evaluate read-only calls in process when the state they read is cached and fresh, off by default
+        self.evaluate_locally = False
+
+        # app id => hashes of the approval and clear programs last seen on chain or deployed
+        self._deployed_programs: dict[int, tuple[bytes, bytes]] = {}
+
+        # Shared with prepared copies, plans only depend on the app
+        self._method_plans: dict[str | HandlerFunc, MethodPlan] = {}
 
     def compile(
         self, teal: str, source_map: bool = False
@@ -70,6 +147,19 @@ class ApplicationClient:
         return (b64decode(result["result"]), result["hash"], src_map)
 
     def build(self):
+        """compiles the app and any precompiles, only the first call does any work
+
+        Safe to call from many threads, concurrent callers wait on the first.
+        """
+        if self.approval_binary is not None and self.clear_binary is not None:
+            return
+
+        with _build_lock:
+            self._build()
+
+    def _build(self):
+        if self.approval_binary is not None and self.clear_binary is not None:
+            return
 
         for _, v in self.app.precompiles.items():
             if v.binary is None:
@@ -79,6 +169,15 @@ class ApplicationClient:
         if self.app.approval_program is None or self.app.clear_program is None:
             self.app.compile()
 
+        # Reuse what another client already compiled for this app
+        if self.approval_binary is None and self.app.approval_binary is not None:
+            self.approval_binary = self.app.approval_binary
+            self.approval_src_map = self.app.approval_src_map
+
+        if self.clear_binary is None and self.app.clear_binary is not None:
+            self.clear_binary = self.app.clear_binary
+            self.clear_src_map = self.app.clear_src_map
+
         if self.approval_binary is None:
             approval, _, approval_map = self.compile(self.app.approval_program, True)
             self.approval_binary = approval
@@ -89,6 +188,15 @@ class ApplicationClient:
             self.clear_binary = clear
             self.clear_src_map = clear_map
 
+        # Keep the source maps with the app so errors never need a compile
+        self.app._set_compiled(
+            self.approval_binary,
+            self.approval_src_map,
+            self.clear_binary,
+            self.clear_src_map,
+        )
+
+    @instrumented("create")
     def create(
         self,
         sender: str = None,
@@ -102,27 +210,168 @@ class ApplicationClient:
         """Submits a signed ApplicationCallTransaction with application id == 0 and the schema and source from the Application passed"""
 
         self.build()
-        assert self.clear_binary is not None and self.approval_binary is not None
 
         if extra_pages is None:
-            extra_pages = ceil(
-                (
-                    (len(self.approval_binary) + len(self.clear_binary))
-                    - APP_PAGE_MAX_SIZE
-                )
-                / APP_PAGE_MAX_SIZE
-            )
+            extra_pages = self._extra_pages()
 
         sp = self.get_suggested_params(suggested_params)
         signer = self.get_signer(signer)
         sender = self.get_sender(sender, signer)
 
         atc = AtomicTransactionComposer()
+        self._add_create(
+            atc, sender, signer, sp, args, on_complete, extra_pages, **kwargs
+        )
+
+        create_result = self._execute(atc)
+
+        create_txid = create_result.tx_ids[0]
+
+        result = self.client.pending_transaction_info(create_txid)
+        app_id = result["application-index"]
+        app_addr = get_application_address(app_id)
+
+        self.app_id = app_id
+        self.app_addr = app_addr
+
+        return app_id, app_addr, create_txid
+
+    @instrumented("create_many")
+    def create_many(
+        self,
+        instances: list[dict[str, Any]],
+        sender: str = None,
+        signer: TransactionSigner = None,
+        suggested_params: transaction.SuggestedParams = None,
+        group_size: int = AtomicTransactionComposer.MAX_GROUP_SIZE,
+        executor: Executor = None,
+        max_workers: int = None,
+    ) -> list[int]:
+        """Creates an instance of the Application for each set of arguments passed, grouping the creates
+
+        The programs are compiled and suggested params fetched once for all instances. Creates are
+        grouped up to ``group_size`` transactions per atomic group, the first create in each group
+        pays the fees for every create in it, and all groups are submitted before waiting on any.
+        Each create gets a unique lease unless one is passed so creates with the same arguments
+        don't collide. The client's app id is left as is.
+
+        Args:
+            instances: The keyword arguments ``create`` would take for each instance, like ``args``,
+                ``on_complete`` or the arguments of the on create method
+            group_size: Max transactions per group
+            executor: An executor to sign with, see ``execute_batch``
+            max_workers: Workers for the pool created if no executor is passed
+
+        Returns:
+            The app id created for each instance, in the order passed
+        """
+        if not instances:
+            return []
+        if not 1 <= group_size <= AtomicTransactionComposer.MAX_GROUP_SIZE:
+            raise ValueError(
+                f"group_size must be between 1 and {AtomicTransactionComposer.MAX_GROUP_SIZE}"
+            )
+
+        self.build()
+        extra_pages = self._extra_pages()
+
+        sp = self.get_suggested_params(suggested_params)
+        signer = self.get_signer(signer)
+        sender = self.get_sender(sender, signer)
+
+        # Creates go to app id 0 regardless of the app this client points at
+        creator = copy.copy(self)
+        creator.app_id = 0
+        creator.app_addr = None
+
+        txns_per_create = 1
+        if self.app.on_create is not None:
+            txns_per_create = self.method_plan(self.app.on_create).txn_calls
+        creates_per_group = max(group_size // txns_per_create, 1)
+
+        nonce = os.urandom(16)
+        atcs: list[AtomicTransactionComposer] = []
+        for start in range(0, len(instances), creates_per_group):
+            batch = instances[start : start + creates_per_group]
+            atc = AtomicTransactionComposer()
+            for idx, kwargs in enumerate(batch, start=start):
+                kwargs = dict(kwargs)
+                if "lease" not in kwargs:
+                    kwargs["lease"] = checksum(nonce + idx.to_bytes(8, "big"))
+
+                # Pool the fees of the group on its first create
+                create_sp = copy.copy(sp)
+                create_sp.flat_fee = True
+                create_sp.fee = (
+                    max(sp.fee, sp.min_fee or MIN_TXN_FEE) * len(batch)
+                    if idx == start
+                    else 0
+                )
+
+                creator._add_create(
+                    atc,
+                    sender,
+                    signer,
+                    create_sp,
+                    kwargs.pop("args", None),
+                    kwargs.pop("on_complete", transaction.OnComplete.NoOpOC),
+                    kwargs.pop("extra_pages", extra_pages),
+                    **kwargs,
+                )
+            atcs.append(atc)
+
+        results = self.execute_batch(atcs, executor=executor, max_workers=max_workers)
+
+        # Confirmations already fetched for method calls, the rest are fetched concurrently
+        infos: dict[str, dict[str, Any]] = {
+            r.tx_id: r.tx_info for result in results for r in result.abi_results
+        }
+        create_txids = [
+            atc.tx_ids[idx]
+            for atc in atcs
+            for idx, tws in enumerate(atc.txn_list)
+            if isinstance(tws.txn, transaction.ApplicationCallTxn)
+            and tws.txn.index == 0
+        ]
+        missing = [
+            txid
+            for txid in create_txids
+            if "application-index" not in infos.get(txid, {})
+        ]
+        if missing:
+            with ThreadPoolExecutor(max_workers) as pool:
+                for txid, info in zip(
+                    missing, pool.map(self.client.pending_transaction_info, missing)
+                ):
+                    infos[txid] = info
+
+        return [infos[txid]["application-index"] for txid in create_txids]
+
+    def _extra_pages(self) -> int:
+        assert self.clear_binary is not None and self.approval_binary is not None
+        return ceil(
+            ((len(self.approval_binary) + len(self.clear_binary)) - APP_PAGE_MAX_SIZE)
+            / APP_PAGE_MAX_SIZE
+        )
+
+    def _add_create(
+        self,
+        atc: AtomicTransactionComposer,
+        sender: str,
+        signer: TransactionSigner,
+        sp: transaction.SuggestedParams,
+        args: list[Any] | None,
+        on_complete: transaction.OnComplete,
+        extra_pages: int,
+        **kwargs,
+    ):
+        """adds a create of the app to the atc, through the on create method if the app has one"""
         if self.app.on_create is not None:
             self.add_method_call(
                 atc,
                 self.app.on_create,
                 sender=sender,
+                signer=signer,
                 suggested_params=sp,
                 on_complete=on_complete,
                 approval_program=self.approval_binary,
@@ -152,25 +401,62 @@ class ApplicationClient:
                 )
             )
 
-        try:
-            create_result = atc.execute(self.client, 4)
-        except Exception as e:
-            if "logic" in str(e):
-                raise self.wrap_approval_exception(e)
-            else:
-                raise e
+    @instrumented("deploy")
+    def deploy(
+        self,
+        sender: str = None,
+        signer: TransactionSigner = None,
+        args: list[Any] = None,
+        suggested_params: transaction.SuggestedParams = None,
+        refresh: bool = False,
+        **kwargs,
+    ) -> DeployResult:
+        """Creates the app if it doesn't exist, updates it if the programs on chain differ from the compiled ones, otherwise does nothing
 
-        create_txid = create_result.tx_ids[0]
+        The on chain programs are fetched once per app id and the hashes of what is deployed are cached
+        on the client (and copies made with `prepare`), so deploying again with unchanged programs makes no requests.
 
-        result = self.client.pending_transaction_info(create_txid)
-        app_id = result["application-index"]
-        app_addr = get_application_address(app_id)
+        Args:
+            refresh: If true, the programs on chain are fetched again rather than using the cached hashes
+        """
+        self.build()
+        assert self.approval_binary is not None and self.clear_binary is not None
+
+        local = (program_hash(self.approval_binary), program_hash(self.clear_binary))
+
+        onchain: tuple[bytes, bytes] | None = None
+        if self.app_id != 0:
+            onchain = self._deployed_programs.get(self.app_id)
+            if onchain is None or refresh:
+                try:
+                    app_info = self.client.application_info(self.app_id)
+                    onchain = onchain_program_hashes(app_info)
+                except AlgodHTTPError as e:
+                    # Deleted or never existed on this network
+                    if e.code != 404:
+                        raise e
+                    onchain = None
+
+        if onchain is None:
+            app_id, app_addr, txid = self.create(
+                sender, signer, args, suggested_params, **kwargs
+            )
+            self._deployed_programs[app_id] = local
+            return DeployResult(DeployAction.Create, app_id, app_addr, txid)
 
-        self.app_id = app_id
-        self.app_addr = app_addr
+        if onchain == local:
+            self._deployed_programs[self.app_id] = local
+            return DeployResult(
+                DeployAction.Skip, self.app_id, cast(str, self.app_addr)
+            )
 
-        return app_id, app_addr, create_txid
+        txid = self.update(sender, signer, args, suggested_params, **kwargs)
+        self._deployed_programs[self.app_id] = local
+        return DeployResult(
+            DeployAction.Update, self.app_id, cast(str, self.app_addr), txid
+        )
 
+    @instrumented("update")
     def update(
         self,
         sender: str = None,
@@ -217,16 +503,11 @@ class ApplicationClient:
                 )
             )
 
-        try:
-            update_result = atc.execute(self.client, 4)
-        except Exception as e:
-            if "logic" in str(e):
-                raise self.wrap_approval_exception(e)
-            else:
-                raise e
+        update_result = self._execute(atc)
 
         return update_result.tx_ids[0]
 
+    @instrumented("opt_in")
     def opt_in(
         self,
         sender: str = None,
@@ -268,16 +549,11 @@ class ApplicationClient:
                 )
             )
 
-        try:
-            opt_in_result = atc.execute(self.client, 4)
-        except Exception as e:
-            if "logic" in str(e):
-                raise self.wrap_approval_exception(e)
-            else:
-                raise e
+        opt_in_result = self._execute(atc)
 
         return opt_in_result.tx_ids[0]
 
+    @instrumented("close_out")
     def close_out(
         self,
         sender: str = None,
@@ -319,16 +595,11 @@ class ApplicationClient:
                 )
             )
 
-        try:
-            close_out_result = atc.execute(self.client, 4)
-        except Exception as e:
-            if "logic" in str(e):
-                raise self.wrap_approval_exception(e)
-            else:
-                raise e
+        close_out_result = self._execute(atc)
 
         return close_out_result.tx_ids[0]
 
+    @instrumented("clear_state")
     def clear_state(
         self,
         sender: str = None,
@@ -371,10 +642,11 @@ class ApplicationClient:
                 )
             )
 
-        clear_state_result = atc.execute(self.client, 4)
+        clear_state_result = self._execute(atc, wrap_logic_errors=False)
 
         return clear_state_result.tx_ids[0]
 
+    @instrumented("delete")
     def delete(
         self,
         sender: str = None,
@@ -415,13 +687,7 @@ class ApplicationClient:
                 )
             )
 
-        try:
-            delete_result = atc.execute(self.client, 4)
-        except Exception as e:
-            if "logic" in str(e):
-                raise self.wrap_approval_exception(e)
-            else:
-                raise e
+        delete_result = self._execute(atc)
 
         return delete_result.tx_ids[0]
 
@@ -437,6 +703,7 @@ class ApplicationClient:
         ac.__dict__.update(**kwargs)
         return ac
 
+    @instrumented("call")
     def call(
         self,
         method: abi.Method | HandlerFunc,
@@ -452,6 +719,7 @@ class ApplicationClient:
         accounts: list[str] = None,
         foreign_apps: list[int] = None,
         foreign_assets: list[int] = None,
+        boxes: list[tuple[int, bytes | str]] = None,
         note: bytes = None,
         lease: bytes = None,
         rekey_to: str = None,
@@ -460,10 +728,9 @@ class ApplicationClient:
 
         """Handles calling the application"""
 
-        if not isinstance(method, abi.Method):
-            method = get_method_spec(method)
-
-        hints = self.method_hints(method.name)
+        plan = self.method_plan(method)
+        method = plan.method
+        hints = plan.hints
 
         atc = self.add_method_call(
             AtomicTransactionComposer(),
@@ -480,14 +747,19 @@ class ApplicationClient:
             accounts=accounts,
             foreign_apps=foreign_apps,
             foreign_assets=foreign_assets,
+            boxes=boxes,
             note=note,
             lease=lease,
             rekey_to=rekey_to,
             **kwargs,
         )
 
-        # If its a read-only method, use dryrun (TODO: swap with simulate later?)
+        # If its a read-only method, evaluate it against cached state if we can,
+        # otherwise use dryrun (TODO: swap with simulate later?)
         if hints.read_only:
+            if (local_result := self._evaluate_locally(atc)) is not None:
+                return local_result
+
             dr_req = transaction.create_dryrun(self.client, atc.gather_signatures())
             dr_result = self.client.dryrun(dr_req)
             method_results = self._parse_result(
@@ -495,16 +767,70 @@ class ApplicationClient:
             )
             return method_results.pop()
 
-        try:
-            result = atc.execute(self.client, 4)
-        except Exception as e:
-            if "logic" in str(e):
-                raise self.wrap_approval_exception(e)
-            else:
-                raise e
+        result = self._execute(atc)
 
         return result.abi_results.pop()
 
+    def _evaluate_locally(self, atc: AtomicTransactionComposer) -> ABIResult | None:
+        """evaluates the last method call in the atc against the cached state of the app
+
+        Returns None if the app's global state, or the local state of an account the call
+        references, isn't cached and fresh, or if the program does something the evaluator
+        doesn't support, the caller should dryrun instead.
+        """
+        if (
+            not self.evaluate_locally
+            or self.app_id == 0
+            or self.app.approval_program is None
+        ):
+            return None
+
+        global_state = self.state_view.cached_global_state(self.app_id)
+        if global_state is None:
+            return None
+
+        group = [tws.txn for tws in atc.build_group()]
+
+        local_state: dict[str, dict[bytes, bytes | int]] = {}
+        for txn in group:
+            if not isinstance(txn, transaction.ApplicationCallTxn):
+                continue
+            for addr in [txn.sender] + (txn.accounts or []):
+                entry = self.state_view.cached_local_state(self.app_id, addr)
+                if entry is not None:
+                    local_state[addr] = entry.state
+
+        snapshot = AVMSnapshot(
+            app_id=self.app_id,
+            round=self.state_view.round,
+            global_state=global_state.state,
+            local_state=local_state,
+        )
+
+        try:
+            results = evaluator(self.app.approval_program).evaluate_group(
+                group, snapshot
+            )
+        except UnsupportedEvaluation:
+            return None
+
+        # Shaped like the dryrun response so results are parsed the same way
+        txns = [
+            {}
+            if r is None
+            else {
+                "logs": [b64encode(log).decode("utf-8") for log in r.logs],
+                "app-call-messages": [
+                    "ApprovalProgram",
+                    "PASS" if r.approved else "REJECT",
+                ]
+                + ([] if r.error is None else [str(r.error)]),
+                "cost": r.cost,
+            }
+            for r in results
+        ]
+        return self._parse_result(atc.method_dict, txns, atc.tx_ids).pop()
+
     # TEMPORARY, use SDK one when available
     def _parse_result(
         self,
@@ -550,7 +876,8 @@ class ApplicationClient:
                     raise Exception("no logs")
 
                 raw_value = result_bytes[4:]
-                return_value = methods[i].returns.type.decode(raw_value)
+                decode = return_decoder(cast(abi.ABIType, methods[i].returns.type))
+                return_value = decode(memoryview(result_bytes)[4:])
             except Exception as e:
                 decode_error = e
 
@@ -583,74 +910,204 @@ class ApplicationClient:
         accounts: list[str] = None,
         foreign_apps: list[int] = None,
         foreign_assets: list[int] = None,
+        boxes: list[tuple[int, bytes | str]] = None,
         note: bytes = None,
         lease: bytes = None,
         rekey_to: str = None,
         **kwargs,
     ):
 
-        """Adds a transaction to the AtomicTransactionComposer passed"""
+        """Adds a transaction to the AtomicTransactionComposer passed
+
+        ``boxes`` are (app id, box name) pairs, app id 0 meaning this app
+        """
 
         sp = self.get_suggested_params(suggested_params)
         signer = self.get_signer(signer)
         sender = self.get_sender(sender, signer)
 
-        if not isinstance(method, abi.Method):
-            method = get_method_spec(method)
+        plan = self.method_plan(method)
+        args = plan.arguments(kwargs, self.resolve)
 
-        hints = self.method_hints(method.name)
-
-        args = []
-        for method_arg in method.args:
-            name = method_arg.name
+        if (
+            self.app_id == 0
+            or on_complete == transaction.OnComplete.UpdateApplicationOC
+            or approval_program
+            or clear_program
+            or local_schema
+            or global_schema
+            or extra_pages
+        ):
+            # Creates and updates are rare, let the sdk validate them
+            atc.add_method_call(
+                self.app_id,
+                plan.method,
+                sender,
+                sp,
+                signer,
+                method_args=args,
+                on_complete=on_complete,
+                local_schema=local_schema,
+                global_schema=global_schema,
+                approval_program=approval_program,
+                clear_program=clear_program,
+                extra_pages=extra_pages,
+                accounts=accounts,
+                foreign_apps=foreign_apps,
+                foreign_assets=foreign_assets,
+                boxes=boxes,
+                note=note,
+                lease=lease,
+                rekey_to=rekey_to,
+            )
+            return atc
 
-            if name in kwargs:
-                argument = kwargs[name]
+        _check_can_add(atc, plan.txn_calls)
 
-                if type(argument) is dict:
-                    if hints.structs is None or name not in hints.structs:
-                        raise Exception(f"Name {name} name in struct hints")
+        refs = References(
+            accounts=accounts[:] if accounts else [],
+            foreign_assets=foreign_assets[:] if foreign_assets else [],
+            foreign_apps=foreign_apps[:] if foreign_apps else [],
+        )
+        app_args, txns = plan.encode(
+            self.app_id,
+            sender,
+            args,
+            refs.accounts,
+            refs.foreign_apps,
+            refs.foreign_assets,
+        )
 
-                    elems: list[tuple[str, str]] = cast(
-                        list[tuple[str, str]], hints.structs[name]["elements"]
-                    )
+        padding: list[References] = []
+        if not refs.fits() and self.app.teal_version >= SHARED_REFERENCES_VERSION:
+            # Too many for one call, keep the references the args point to in this
+            # call and spread the rest over as few padding calls as possible. Below
+            # version 9 a call can't use another's references, so they're left as passed
+            refs = References()
+            app_args, txns = plan.encode(
+                self.app_id,
+                sender,
+                args,
+                refs.accounts,
+                refs.foreign_apps,
+                refs.foreign_assets,
+            )
+            padding = pack_references(
+                References(
+                    accounts=accounts or [],
+                    foreign_assets=foreign_assets or [],
+                    foreign_apps=foreign_apps or [],
+                ),
+                into=[refs],
+                sender=sender,
+                app_id=self.app_id,
+            )[1:]
 
-                    argument = [
-                        argument[field_name] for field_name, field_type in elems
-                    ]
+            _check_can_add(atc, len(padding) + plan.txn_calls)
 
-                args.append(argument)
+        # Padding goes first, transaction args must immediately precede the call
+        for pad_refs in padding:
+            self.add_padding_call(atc, pad_refs, sender, signer, sp)
 
-            elif (
-                hints.default_arguments is not None and name in hints.default_arguments
-            ):
-                default_arg = hints.default_arguments[name]
-                if default_arg is not None:
-                    args.append(self.resolve(default_arg))
-            else:
-                raise Exception(f"Unspecified argument: {name}")
+        accounts = refs.accounts
+        foreign_apps = refs.foreign_apps
+        foreign_assets = refs.foreign_assets
 
-        atc.add_method_call(
-            self.app_id,
-            method,
-            sender,
-            sp,
-            signer,
-            method_args=args,
+        app_txn = transaction.ApplicationCallTxn(
+            sender=sender,
+            sp=sp,
+            index=self.app_id,
             on_complete=on_complete,
-            local_schema=local_schema,
-            global_schema=global_schema,
-            approval_program=approval_program,
-            clear_program=clear_program,
-            extra_pages=extra_pages,
+            app_args=app_args,
             accounts=accounts,
             foreign_apps=foreign_apps,
             foreign_assets=foreign_assets,
+            boxes=boxes,
             note=note,
             lease=lease,
             rekey_to=rekey_to,
         )
 
+        if (
+            lease is None
+            and self.submission_policy is not None
+            and self.submission_policy.lease
+        ):
+            app_txn.lease = deterministic_lease(app_txn)
+
+        _add_encoded_call(
+            atc, txns, TransactionWithSigner(app_txn, signer), plan.method
+        )
+
+        return atc
+
+    def method_plan(self, method: abi.Method | HandlerFunc) -> MethodPlan:
+        """returns the encoding plan for the method, building it the first time the method is seen"""
+        key = method.get_signature() if isinstance(method, abi.Method) else method
+        plan = self._method_plans.get(key)
+        if plan is None:
+            spec = method if isinstance(method, abi.Method) else get_method_spec(method)
+            plan = MethodPlan(spec, self.method_hints(spec.name))
+            # Another thread may have beaten us to it, either plan is fine but keep one
+            plan = self._method_plans.setdefault(key, plan)
+        return plan
+
+    def add_padding_call(
+        self,
+        atc: AtomicTransactionComposer,
+        refs: References,
+        sender: str = None,
+        signer: TransactionSigner = None,
+        suggested_params: transaction.SuggestedParams = None,
+    ) -> AtomicTransactionComposer:
+        """adds an app call that does nothing but carry the references passed, for apps that share resources across the group
+
+        The app must handle a bare NoOp call or have ``padding_method`` set on the client
+        to an ABI method that takes no arguments. Sharing resources across the group needs
+        program version 9 or later.
+        """
+        if self.app.teal_version < SHARED_REFERENCES_VERSION:
+            raise Exception(
+                f"Padding calls need program version {SHARED_REFERENCES_VERSION} or later "
+                f"to share references, the app is version {self.app.teal_version}"
+            )
+
+        sp = self.get_suggested_params(suggested_params)
+        signer = self.get_signer(signer)
+        sender = self.get_sender(sender, signer)
+
+        if self.padding_method is not None:
+            return self.add_method_call(
+                atc,
+                self.padding_method,
+                sender,
+                signer,
+                suggested_params=sp,
+                accounts=refs.accounts,
+                foreign_assets=refs.foreign_assets,
+                foreign_apps=refs.foreign_apps,
+            )
+
+        bare_no_op = self.app.bare_externals.get("no_op")
+        if bare_no_op is None or not (bare_no_op.call_config & CallConfig.CALL):
+            raise Exception(
+                "Padding calls need a bare NoOp handler or padding_method set on the client"
+            )
+
+        atc.add_transaction(
+            TransactionWithSigner(
+                txn=transaction.ApplicationCallTxn(
+                    sender=sender,
+                    sp=sp,
+                    index=self.app_id,
+                    on_complete=transaction.OnComplete.NoOpOC,
+                    accounts=refs.accounts,
+                    foreign_assets=refs.foreign_assets,
+                    foreign_apps=refs.foreign_apps,
+                ),
+                signer=signer,
+            )
+        )
         return atc
 
     def add_transaction(
@@ -659,6 +1116,7 @@ class ApplicationClient:
         atc.add_transaction(TransactionWithSigner(txn=txn, signer=self.signer))
         return atc
 
+    @instrumented("fund")
     def fund(self, amt: int, addr: str = None) -> str:
         """convenience method to pay the address passed, defaults to paying the app address for this client from the current signer"""
         sender = self.get_sender()
@@ -678,22 +1136,50 @@ class ApplicationClient:
         atc.execute(self.client, 4)
         return atc.tx_ids.pop()
 
-    def get_application_state(self, raw=False) -> dict[bytes | str, bytes | str | int]:
-        """gets the global state info for the app id set"""
+    @instrumented("get_application_state")
+    def get_application_state(
+        self, raw=False, cached: bool = False
+    ) -> dict[bytes | str, bytes | str | int]:
+        """gets the global state info for the app id set
+
+        If cached is true, the state is served from the ``state_view`` when it is fresh
+        """
+        if cached:
+            return self.state_view.global_state(self.app_id, raw=raw)
+
         app_state = self.client.application_info(self.app_id)
         if "params" not in app_state or "global-state" not in app_state["params"]:
             return {}
         return decode_state(app_state["params"]["global-state"], raw=raw)
 
+    def get_packed_state(
+        self, packed: PackedStateValue, cached: bool = False
+    ) -> dict[str, Any]:
+        """gets the fields of the PackedStateValue passed for the app id set, by name
+
+        A value that isn't set yet reads as every field zero. If cached is true, the state is
+        served from the ``state_view`` when it is fresh
+        """
+        state = self.get_application_state(raw=True, cached=cached)
+        value = state.get(packed.str_key().encode(), bytes(packed.size))
+        return packed.decode(cast(bytes, value))
+
+    @instrumented("get_account_state")
     def get_account_state(
-        self, account: str = None, raw: bool = False
+        self, account: str = None, raw: bool = False, cached: bool = False
     ) -> dict[str | bytes, bytes | str | int]:
 
-        """gets the local state info for the app id set and the account specified"""
+        """gets the local state info for the app id set and the account specified
+
+        If cached is true, the state is served from the ``state_view`` when it is fresh
+        """
 
         if account is None:
             account = self.get_sender()
 
+        if cached:
+            return self.state_view.local_state(self.app_id, account, raw=raw)
+
         acct_state = self.client.account_application_info(account, self.app_id)
         if (
             "app-local-state" not in acct_state
@@ -703,6 +1189,232 @@ class ApplicationClient:
 
         return decode_state(acct_state["app-local-state"]["key-value"], raw=raw)
 
+    @instrumented("get_account_states")
+    def get_account_states(
+        self, accounts: list[str], raw: bool = False, max_workers: int = 8
+    ) -> dict[str, dict[str | bytes, bytes | str | int]]:
+
+        """gets the local state info for the app id set for each of the accounts specified
+
+        Requests are made concurrently with at most `max_workers` in flight at a time
+        """
+
+        def _fetch(account: str) -> dict[str | bytes, bytes | str | int]:
+            return self.get_account_state(account, raw=raw)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(accounts, pool.map(_fetch, accounts)))
+
+    def iter_account_states(
+        self, indexer: IndexerClient, raw: bool = False, page_size: int = 1000
+    ) -> Iterator[tuple[str, dict[str | bytes, bytes | str | int]]]:
+
+        """yields (address, local state) for every account opted into the app id set
+
+        Accounts are paged through the indexer, so the full set is never held in memory
+        """
+
+        next_page = None
+        while True:
+            page = indexer.accounts(
+                application_id=self.app_id,
+                limit=page_size,
+                next_page=next_page,
+                exclude="assets,created-assets,created-apps",
+            )
+
+            for acct in page.get("accounts", []):
+                for local_state in acct.get("apps-local-state", []):
+                    if local_state["id"] != self.app_id or local_state.get("deleted"):
+                        continue
+
+                    yield acct["address"], decode_state(
+                        local_state.get("key-value", []), raw=raw
+                    )
+
+            next_page = page.get("next-token")
+            if not next_page or len(page.get("accounts", [])) == 0:
+                return
+
+    def get_application_blob(self, blob: ApplicationStateBlob) -> BlobReader:
+        """gets a reader over the ApplicationStateBlob passed for the app id set"""
+        app_state = self.client.application_info(self.app_id)
+        return BlobReader(
+            app_state.get("params", {}).get("global-state", []), blob.blob.byte_keys
+        )
+
+    def get_account_blob(
+        self, blob: AccountStateBlob, account: str = None
+    ) -> BlobReader:
+        """gets a reader over the AccountStateBlob passed for the app id set and the account specified"""
+        if account is None:
+            account = self.get_sender()
+
+        acct_state = self.client.account_application_info(account, self.app_id)
+        return BlobReader(
+            acct_state.get("app-local-state", {}).get("key-value", []),
+            blob.blob.byte_keys,
+        )
+
+    def get_bitmap(self, bitmap: Bitmap, account: str = None) -> BitmapReader:
+        """
+        gets a reader over the bits of the Bitmap passed for the app id set
+
+        A bitmap over an AccountStateBlob is read from ``account``, the sender if not passed.
+        """
+        match bitmap.storage:
+            case ApplicationStateBlob():
+                data = self.get_application_blob(bitmap.storage).to_bytes()
+            case AccountStateBlob():
+                data = self.get_account_blob(bitmap.storage, account).to_bytes()
+            case BoxStateBlob():
+                data = self.get_box_contents(bitmap.storage.name)
+            case _:
+                raise ValueError(f"Unsupported storage {bitmap.storage}")
+        return BitmapReader(data)
+
+    @instrumented("get_box_names")
+    def get_box_names(self) -> list[bytes]:
+        """gets the names of every box held by the app id set"""
+        boxes = self.client.application_boxes(self.app_id)
+        return [b64decode(box["name"]) for box in boxes.get("boxes", [])]
+
+    @instrumented("get_box_contents")
+    def get_box_contents(self, name: bytes | str) -> bytes:
+        """gets the contents of a box held by the app id set"""
+        if isinstance(name, str):
+            name = name.encode("utf-8")
+        box = self.client.application_box_by_name(self.app_id, name)
+        return b64decode(box["value"])
+
+    @instrumented("get_map")
+    def get_map(
+        self, hash_map: HashMap, keys: list[Any] = None, max_workers: int = 8
+    ) -> dict[Any, Any]:
+        """gets the entries of the HashMap passed for the app id set, key => value
+
+        With ``keys`` only the entries for those keys are fetched, keys without an entry are
+        left out. Without, the app's boxes are listed and every entry of the map is fetched,
+        which needs a map with a prefix and keys that aren't hashed. Entries are fetched concurrently with at most
+        `max_workers` in flight at a time. Keys decoded to lists are returned as tuples.
+        """
+        if keys is not None:
+            names = {hash_map.name_for(key): key for key in keys}
+        elif hash_map.hash_keys:
+            raise ValueError("Hashed keys can't be listed, pass the keys to fetch")
+        elif not hash_map.prefix:
+            raise ValueError(
+                "Keys of a map without a prefix can't be listed, pass the keys to fetch"
+            )
+        else:
+            names = {}
+            for name in self.get_box_names():
+                if (key := hash_map.key_for(name)) is not None:
+                    names[name] = key
+
+        def _fetch(name: bytes) -> bytes | None:
+            try:
+                box = self.client.application_box_by_name(self.app_id, name)
+            except AlgodHTTPError as e:
+                if e.code == 404:
+                    return None
+                raise
+            return b64decode(box["value"])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            values = dict(zip(names, pool.map(_fetch, names)))
+
+        return {
+            _hashable(names[name]): hash_map.decode_value(value)
+            for name, value in values.items()
+            if value is not None
+        }
+
+    def watch_state(
+        self,
+        start_round: int = None,
+        stop_round: int = None,
+        raw: bool = False,
+        include_empty: bool = False,
+    ) -> Iterator[StateDiff]:
+
+        """yields the changes made to the global and local state of the app id set, round by round
+
+        Each new round is waited on with `wait-for-block-after` and its block is inspected for
+        app calls (including inner transactions) to this app. Changes to declared state values are
+        decoded with the app's schema under the name they're declared with. To resume a stream,
+        pass the round of the last diff handled + 1 as `start_round`.
+
+        Args:
+            start_round: The first round to inspect, defaults to the round after the current one
+            stop_round: If set, the last round to inspect before the stream ends
+            raw: If true, keys and values are returned as bytes, without the schema
+            include_empty: If true, rounds with no changes for this app are yielded too
+        """
+
+        if start_round is None:
+            start_round = self.client.status()["last-round"] + 1
+
+        rnd = start_round
+        while stop_round is None or rnd <= stop_round:
+            # Returns as soon as round `rnd` is committed
+            self.client.status_after_block(rnd - 1)
+
+            diff = self._round_state_diff(rnd, raw)
+            if include_empty or not diff.empty():
+                yield diff
+
+            rnd += 1
+
+    async def watch_state_async(
+        self,
+        start_round: int = None,
+        stop_round: int = None,
+        raw: bool = False,
+        include_empty: bool = False,
+    ) -> AsyncIterator[StateDiff]:
+        """the stream of ``watch_state`` as an async iterator
+
+        Requests to algod are made in a worker thread, so waiting on a round doesn't block the
+        event loop::
+
+            async for diff in app_client.watch_state_async():
+                ...
+        """
+
+        if start_round is None:
+            status = await asyncio.to_thread(self.client.status)
+            start_round = status["last-round"] + 1
+
+        rnd = start_round
+        while stop_round is None or rnd <= stop_round:
+            await asyncio.to_thread(self.client.status_after_block, rnd - 1)
+
+            diff = await asyncio.to_thread(self._round_state_diff, rnd, raw)
+            if include_empty or not diff.empty():
+                yield diff
+
+            rnd += 1
+
+    def _round_state_diff(self, rnd: int, raw: bool) -> StateDiff:
+        block = msgpack.unpackb(
+            self.client.block_info(round_num=rnd, response_format="msgpack"),
+            raw=True,
+            strict_map_key=False,
+        )
+
+        diff = block_state_diff(
+            block,
+            self.app_id,
+            raw=raw,
+            app_state=self.app.app_state,
+            acct_state=self.app.acct_state,
+        )
+        diff.round = rnd
+
+        self.state_view.observe_round(rnd)
+        return diff
+
     def get_application_account_info(self) -> dict[str, Any]:
         """gets the account info for the application account"""
         app_state = self.client.account_info(self.app_addr)
@@ -743,13 +1455,123 @@ class ApplicationClient:
 
         return self.client.suggested_params()
 
+    @instrumented("execute_batch")
+    def execute_batch(
+        self,
+        atcs: list[AtomicTransactionComposer],
+        executor: Executor = None,
+        max_workers: int = None,
+    ) -> list[AtomicTransactionResponse]:
+        """signs a batch of atcs in a process pool, submits all of them then waits for each to confirm
+
+        Signing is the bottleneck when sending many app calls from one process, see ``sign_parallel``.
+
+        Args:
+            atcs: The composers to execute, in the order they should be submitted
+            executor: An executor to sign with, by default a process pool is created for the call
+            max_workers: Workers for the pool created if no executor is passed
+
+        Returns:
+            The response for each atc, in order
+        """
+        sign_parallel(atcs, executor=executor, max_workers=max_workers)
+
+        try:
+            for atc in atcs:
+                atc.submit(self.client)
+        except Exception as e:
+            self.state_view.invalidate(self.app_id)
+            if "logic" in str(e):
+                raise self.wrap_approval_exception(e)
+            raise e
+
+        return [self._execute(atc) for atc in atcs]
+
+    def _execute(
+        self, atc: AtomicTransactionComposer, wrap_logic_errors: bool = True
+    ) -> AtomicTransactionResponse:
+        """submits the app call(s) in the atc and waits for them to be confirmed, invalidating any cached state for this app
+
+        The group is executed with ``atc.execute``. With a submission policy it's sent, and
+        retried, by the policy first, and ``atc.execute`` only waits on it and reads the results.
+        """
+        try:
+            client: Any = self.client
+            if self.submission_policy is not None:
+                self._submit_with_policy(atc, self.submission_policy)
+                client = _SubmittedClient(self.client)
+                wait_rounds = self.submission_policy.wait_rounds
+            else:
+                if atc.status == AtomicTransactionComposerStatus.SUBMITTED:
+                    client = _SubmittedClient(self.client)
+                wait_rounds = 4
+
+            result = atc.execute(client, wait_rounds)
+        except Exception as e:
+            if wrap_logic_errors and "logic" in str(e):
+                raise self.wrap_approval_exception(e)
+            else:
+                raise e
+        finally:
+            # Whether or not it succeeded, we can't trust what we've cached
+            self.state_view.invalidate(self.app_id)
+
+        self.state_view.observe_round(result.confirmed_round)
+        return result
+
+    def _submit_with_policy(
+        self, atc: AtomicTransactionComposer, policy: SubmissionPolicy
+    ) -> dict[str, Any]:
+        """submits the atc and waits for it to be confirmed, retrying transient errors
+
+        Before sending again, the first txn is looked up by txid so a group that landed
+        or is still pending is waited on rather than resubmitted.
+        """
+        signed = atc.gather_signatures()
+        txid = atc.tx_ids[0]
+
+        attempt = 0
+        while True:
+            try:
+                if atc.status < AtomicTransactionComposerStatus.SUBMITTED:
+                    self.client.send_transactions(signed)
+                    atc.status = AtomicTransactionComposerStatus.SUBMITTED
+                return transaction.wait_for_confirmation(
+                    self.client, txid, policy.wait_rounds
+                )
+            except Exception as e:
+                if attempt >= policy.retries or not policy.is_transient(e):
+                    raise e
+
+            attempt += 1
+            policy.sleep(policy.delay(attempt))
+
+            status, info = txn_status(self.client, txid)
+            if status == TXN_CONFIRMED:
+                return info
+            elif status == TXN_PENDING:
+                # Still in the pool, keep waiting on it
+                atc.status = AtomicTransactionComposerStatus.SUBMITTED
+            elif status == TXN_REJECTED:
+                raise TransactionRejectedError(
+                    "Transaction rejected: " + info["pool-error"]
+                )
+            else:
+                # Never made it, safe to send again
+                atc.status = AtomicTransactionComposerStatus.SIGNED
+
     def wrap_approval_exception(self, e: Exception) -> Exception:
+        if self.app.approval_program is None:
+            return e
+
+        # Prefer the map kept with the app, algod is likely struggling if we're handling
+        # errors at a high rate, and only compile for one if nothing built it yet
         if self.approval_src_map is None:
-            if self.app.approval_program is None:
-                return e
+            self.approval_src_map = self.app.approval_src_map
 
-            _, _, map = self.compile(self.app.approval_program, True)
-            self.approval_src_map = map
+        if self.approval_src_map is None:
+            _, _, src_map = self.compile(self.app.approval_program, True)
+            self.approval_src_map = src_map
 
         return LogicException(e, self.app.approval_program, self.approval_src_map)
 
@@ -780,3 +1602,54 @@ class ApplicationClient:
                 return signer.lsig.address()
 
         raise Exception("No sender provided")
+
+
+class _SubmittedClient:
+    """passed to ``atc.execute`` for a group already sent, so it only waits and reads results"""
+
+    def __init__(self, client: AlgodClient):
+        self.client = client
+
+    def send_transactions(self, txns: list, **kwargs) -> str:
+        return txns[0].get_txid()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+def _hashable(value: Any) -> Any:
+    # Decoded tuples and arrays come back as lists, which can't be dict keys
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _check_can_add(atc: AtomicTransactionComposer, count: int):
+    # The checks atc.add_method_call makes before adding a call and its transaction args
+    if atc.status != AtomicTransactionComposerStatus.BUILDING:
+        raise AtomicTransactionComposerError(
+            "AtomicTransactionComposer must be in BUILDING state for a transaction to be added"
+        )
+    if len(atc.txn_list) + count > atc.MAX_GROUP_SIZE:
+        raise AtomicTransactionComposerError(
+            "AtomicTransactionComposer cannot exceed MAX_GROUP_SIZE transactions"
+        )
+
+
+def _add_encoded_call(
+    atc: AtomicTransactionComposer,
+    txns: list[TransactionWithSigner],
+    call: TransactionWithSigner,
+    method: abi.Method,
+):
+    """adds an app call already encoded for ``method`` and the transaction args preceding it
+
+    The sdk has no way to register the method for the return value other than
+    ``add_method_call``, which would encode the call again, so ``method_dict`` is written
+    here and only once the call is known to fit in a group that's still being built
+    """
+    _check_can_add(atc, len(txns) + 1)
+    for txn in txns:
+        atc.add_transaction(txn)
+    atc.add_transaction(call)
+    atc.method_dict[len(atc.txn_list) - 1] = method
@@ -0,0 +1,1646 @@
+import base64
+import hashlib
+import math
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, cast
+
+from algosdk import abi
+from algosdk.encoding import decode_address, encode_address
+from algosdk.future import transaction
+from algosdk.logic import get_application_address
+from Cryptodome.Hash import SHA512, keccak
+
+#: Value held on the stack, in scratch or in state
+Value = int | bytes
+
+MAX_UINT64 = 2**64 - 1
+#: Max length of a byte value
+MAX_BYTES_LENGTH = 4096
+MAX_STACK_DEPTH = 1000
+MAX_CALLSTACK_DEPTH = 2048
+MAX_SCRATCH_SLOTS = 256
+#: Opcode budget added by each app call in a group
+APP_CALL_BUDGET = 700
+MAX_LOG_CALLS = 32
+MAX_LOG_SIZE = 1024
+MAX_KEY_LENGTH = 64
+MAX_KEY_VALUE_LENGTH = 128
+MAX_BOX_SIZE = 32768
+# Operands of the byte math opcodes are limited to 512 bits
+MAX_BYTE_MATH_LENGTH = 64
+
+ZERO_ADDRESS = bytes(32)
+
+_TXN_TYPES = {"pay": 1, "keyreg": 2, "acfg": 3, "axfer": 4, "afrz": 5, "appl": 6}
+
+# Names the assembler accepts in place of an int
+_NAMED_INTS = {
+    "NoOp": 0,
+    "OptIn": 1,
+    "CloseOut": 2,
+    "ClearState": 3,
+    "UpdateApplication": 4,
+    "DeleteApplication": 5,
+    "unknown": 0,
+    **_TXN_TYPES,
+}
+
+# The program version each opcode was added in, opcodes that aren't listed were there from
+# version 1 or are newer than the evaluator knows about. Opcodes listed here may still not
+# be implemented, frame_dig or itxn_begin say, those raise UnsupportedOpcode when reached
+_VERSIONS = {
+    name: version
+    for version, names in {
+        2: "addw txna gtxna bz b return dup2 concat substring substring3 balance "
+        "app_opted_in app_local_get app_local_get_ex app_global_get app_global_get_ex "
+        "app_local_put app_global_put app_local_del app_global_del asset_holding_get "
+        "asset_params_get",
+        3: "assert gtxns gtxnsa swap select dig getbit setbit getbyte setbyte pushbytes "
+        "pushint min_balance",
+        4: "gload gloads gaid gaids callsub retsub shl shr sqrt bitlen exp expw divmodw "
+        "b+ b- b/ b* b< b> b<= b>= b== b!= b% b| b& b^ b~ bzero",
+        5: "ecdsa_verify ecdsa_pk_decompress ecdsa_pk_recover loads stores cover uncover "
+        "extract extract3 extract_uint16 extract_uint32 extract_uint64 app_params_get "
+        "log itxn_begin itxn_field itxn_submit itxn itxna txnas gtxnas gtxnsas args",
+        6: "divw bsqrt gloadss acct_params_get itxn_next gitxn gitxna gitxnas itxnas",
+        7: "ed25519verify_bare sha3_256 replace2 replace3 base64_decode json_ref "
+        "vrf_verify block",
+        8: "bury popn dupn pushbytess pushints frame_dig frame_bury switch match proto "
+        "box_create box_extract box_replace box_del box_len box_get box_put",
+    }.items()
+    for name in names.split()
+}
+
+# Opcode costs in AVM 7 that aren't 1
+_COSTS = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+    "sha3_256": 130,
+    "divmodw": 20,
+    "sqrt": 4,
+    "expw": 10,
+    "b+": 10,
+    "b-": 10,
+    "b/": 20,
+    "b*": 20,
+    "b%": 20,
+    "b|": 6,
+    "b&": 6,
+    "b^": 6,
+    "b~": 4,
+    "bsqrt": 40,
+}
+
+
+class AVMError(Exception):
+    """AVMError is raised when the program being evaluated fails, the AVM would reject the call"""
+
+    def __init__(self, msg: str, line: int = None):
+        self.msg = msg
+        self.line = line
+        super().__init__(msg if line is None else f"line {line}: {msg}")
+
+
+class UnsupportedEvaluation(Exception):
+    """UnsupportedEvaluation is raised when a program can't be evaluated faithfully in process"""
+
+
+class UnsupportedOpcode(UnsupportedEvaluation):
+    """UnsupportedOpcode is raised for opcodes, fields and immediates the evaluator doesn't implement"""
+
+
+class MissingState(UnsupportedEvaluation):
+    """MissingState is raised when the program reads state that isn't in the snapshot"""
+
+
+@dataclass
+class AVMSnapshot:
+    """
+    AVMSnapshot holds the ledger state a program is evaluated against
+
+    Everything the program reads must be present, reading anything that isn't raises
+    ``MissingState``. Local state and asset holdings that are absent are taken to be unknown
+    rather than empty, since a missing entry can't tell an account that isn't opted in from
+    one that wasn't fetched.
+    """
+
+    #: id of the app the program belongs to
+    app_id: int
+    #: round reported by ``global Round``
+    round: int = 0
+    #: raw key => raw value global state of the app
+    global_state: dict[bytes, Value] = field(default_factory=dict)
+    #: address => raw key => raw value local state of each account opted into the app
+    local_state: dict[str, dict[bytes, Value]] = field(default_factory=dict)
+    #: address => balance in microalgos
+    balances: dict[str, int] = field(default_factory=dict)
+    #: address => minimum balance in microalgos
+    min_balances: dict[str, int] = field(default_factory=dict)
+    #: (address, asset id) => (amount, frozen) for holdings of opted in accounts
+    assets: dict[tuple[str, int], tuple[int, bool]] = field(default_factory=dict)
+    #: box name => contents, None if boxes weren't captured
+    boxes: dict[bytes, bytes] | None = None
+    #: address of the creator of the app
+    creator: str | None = None
+    #: timestamp of the latest block
+    latest_timestamp: int | None = None
+
+    def apply(self, result: "EvalResult") -> "AVMSnapshot":
+        """returns a snapshot with the writes of the result applied, this one is left as is"""
+        global_state = dict(self.global_state)
+        _apply_delta(global_state, result.global_delta)
+
+        local_state = dict(self.local_state)
+        for addr, delta in result.local_deltas.items():
+            local_state[addr] = dict(local_state[addr])
+            _apply_delta(local_state[addr], delta)
+
+        boxes = self.boxes
+        if result.box_delta:
+            boxes = dict(cast(dict, boxes))
+            _apply_delta(boxes, result.box_delta)
+
+        return replace(
+            self, global_state=global_state, local_state=local_state, boxes=boxes
+        )
+
+
+@dataclass
+class EvalResult:
+    """EvalResult is the outcome of evaluating a single app call"""
+
+    #: whether the program approved the call
+    approved: bool
+    #: values logged, in order
+    logs: list[bytes]
+    #: opcode budget used
+    cost: int
+    #: global state keys written, None for keys deleted
+    global_delta: dict[bytes, Value | None] = field(default_factory=dict)
+    #: address => local state keys written, None for keys deleted
+    local_deltas: dict[str, dict[bytes, Value | None]] = field(default_factory=dict)
+    #: box name => contents after the call, None for boxes deleted
+    box_delta: dict[bytes, bytes | None] = field(default_factory=dict)
+    #: why the call was rejected
+    error: AVMError | None = None
+
+
+class _Op:
+    __slots__ = ("name", "fn", "imm", "cost", "line")
+
+    def __init__(self, name: str, fn: Callable, imm: Any, cost: int, line: int):
+        self.name = name
+        self.fn = fn
+        self.imm = imm
+        self.cost = cost
+        self.line = line
+
+
+class _Return(Exception):
+    def __init__(self, value: int):
+        self.value = value
+
+
+class Evaluator:
+    """
+    Evaluator runs a TEAL approval program in process against an ``AVMSnapshot``
+
+    The program is parsed once, labels and immediates are resolved up front so evaluating
+    is a loop over prebuilt ops. The common opcodes of AVM 7 are implemented along with the
+    AVM 8 box opcodes, anything else, like inner transactions, signature checks or the AVM 8
+    frame opcodes, raises ``UnsupportedOpcode`` when reached so the caller can fall back to
+    a node. Opcodes newer than the ``#pragma version`` of the program raise ``AVMError``
+    when it is parsed, as the assembler would reject them.
+    """
+
+    def __init__(self, program: str):
+        self.version = 1
+        self.labels: dict[str, int] = {}
+        self.ops: list[_Op] = []
+        self._parse(program)
+
+    def evaluate(
+        self,
+        group: list[transaction.Transaction],
+        index: int,
+        snapshot: AVMSnapshot,
+        budget: int = None,
+    ) -> EvalResult:
+        """
+        evaluate runs the program for the app call at ``index`` in the group
+
+        Args:
+            group: The transactions of the group, with the group id set if there are more than one
+            index: The index of the app call to evaluate
+            snapshot: The ledger state to read from, it is not modified
+            budget: The opcode budget, by default 700 for each app call in the group
+
+        Returns:
+            The result of the call, a program that fails is reported as a rejection
+        """
+        if budget is None:
+            budget = APP_CALL_BUDGET * sum(
+                1 for t in group if isinstance(t, transaction.ApplicationCallTxn)
+            )
+        return _Eval(self, group, index, snapshot, budget).run()
+
+    def evaluate_group(
+        self, group: list[transaction.Transaction], snapshot: AVMSnapshot
+    ) -> list[EvalResult | None]:
+        """
+        evaluate_group runs the program for every app call in the group, in order
+
+        State written by one call is visible to the calls after it and the opcode budget is pooled.
+        Evaluation stops at the first rejection, as the group would fail there.
+
+        Returns:
+            The result for each transaction in the group, None for those that aren't app calls
+        """
+        budget = APP_CALL_BUDGET * sum(
+            1 for t in group if isinstance(t, transaction.ApplicationCallTxn)
+        )
+
+        results: list[EvalResult | None] = [None] * len(group)
+        for idx, txn in enumerate(group):
+            if not isinstance(txn, transaction.ApplicationCallTxn):
+                continue
+            if txn.index != snapshot.app_id:
+                raise MissingState(f"no program for app {txn.index}")
+
+            result = _Eval(self, group, idx, snapshot, budget).run()
+            results[idx] = result
+            if not result.approved:
+                break
+
+            budget -= result.cost
+            snapshot = snapshot.apply(result)
+
+        return results
+
+    def _parse(self, program: str):
+        pending: list[tuple[str, list[str], int]] = []
+        for line_no, line in enumerate(program.splitlines()):
+            tokens = _tokenize(line)
+            if not tokens:
+                continue
+
+            if tokens[0] == "#pragma":
+                if len(tokens) == 3 and tokens[1] == "version":
+                    self.version = int(tokens[2])
+                continue
+
+            while tokens and tokens[0].endswith(":"):
+                self.labels[tokens[0][:-1]] = len(pending)
+                tokens = tokens[1:]
+            if tokens:
+                pending.append((tokens[0], tokens[1:], line_no))
+
+        intc: list[int] = []
+        bytec: list[bytes] = []
+        for name, args, line_no in pending:
+            # Rejected like the assembler would, a node wouldn't accept the program
+            if (added := _VERSIONS.get(name, 1)) > self.version:
+                raise AVMError(
+                    f"{name} needs program version {added}, the program is version {self.version}",
+                    line_no,
+                )
+            fn, imm = self._assemble(name, args, line_no, intc, bytec)
+            self.ops.append(_Op(name, fn, imm, _COSTS.get(name, 1), line_no))
+
+    def _assemble(
+        self,
+        name: str,
+        args: list[str],
+        line: int,
+        intc: list[int],
+        bytec: list[bytes],
+    ) -> tuple[Callable, Any]:
+        # Constant blocks and their references are resolved to plain pushes
+        match name:
+            case "intcblock":
+                intc[:] = [_parse_int(a) for a in args]
+                return _op_nop, None
+            case "bytecblock":
+                bytec[:] = [_parse_bytes([a]) for a in args]
+                return _op_nop, None
+            case "intc_0" | "intc_1" | "intc_2" | "intc_3":
+                return _op_push, intc[int(name[-1])]
+            case "intc":
+                return _op_push, intc[int(args[0])]
+            case "bytec_0" | "bytec_1" | "bytec_2" | "bytec_3":
+                return _op_push, bytec[int(name[-1])]
+            case "bytec":
+                return _op_push, bytec[int(args[0])]
+            case "int" | "pushint":
+                return _op_push, _parse_int(args[0])
+            case "byte" | "pushbytes":
+                return _op_push, _parse_bytes(args)
+            case "addr":
+                return _op_push, decode_address(args[0])
+            case "method":
+                return (
+                    _op_push,
+                    abi.Method.from_signature(
+                        _parse_bytes(args).decode("utf-8")
+                    ).get_selector(),
+                )
+            case "b" | "bz" | "bnz" | "callsub":
+                if args[0] not in self.labels:
+                    raise AVMError(f"reference to undefined label {args[0]}", line)
+                return _OPS[name], self.labels[args[0]]
+            case "txn" if len(args) == 2:
+                return _op_txna, (args[0], int(args[1]))
+            case "gtxn" if len(args) == 3:
+                return _op_gtxna, (int(args[0]), args[1], int(args[2]))
+
+        if name not in _OPS:
+            return _unsupported(name), None
+
+        match len(args):
+            case 0:
+                return _OPS[name], None
+            case 1:
+                return _OPS[name], _immediate(args[0])
+            case _:
+                return _OPS[name], tuple(_immediate(a) for a in args)
+
+
+def _apply_delta(state: dict, delta: dict):
+    for k, v in delta.items():
+        if v is None:
+            state.pop(k, None)
+        else:
+            state[k] = v
+
+
+# Evaluators by program source, parsing is the expensive part
+_evaluators: dict[str, Evaluator] = {}
+
+
+def evaluator(program: str) -> Evaluator:
+    """returns an Evaluator for the TEAL source passed, parsed once per program"""
+    if (ev := _evaluators.get(program)) is None:
+        ev = Evaluator(program)
+        _evaluators[program] = ev
+    return ev
+
+
+class _Eval:
+    """state of a single evaluation"""
+
+    def __init__(
+        self,
+        program: Evaluator,
+        group: list[transaction.Transaction],
+        index: int,
+        snapshot: AVMSnapshot,
+        budget: int,
+    ):
+        self.program = program
+        self.group = group
+        self.index = index
+        self.txn = cast(transaction.ApplicationCallTxn, group[index])
+        self.snapshot = snapshot
+        self.budget = budget
+
+        self.app_id = snapshot.app_id
+        self.stack: list[Value] = []
+        self.scratch: list[Value] = [0] * MAX_SCRATCH_SLOTS
+        self.callstack: list[int] = []
+        self.pc = 0
+        self.cost = 0
+        self.logs: list[bytes] = []
+        self.log_size = 0
+
+        self.global_delta: dict[bytes, Value | None] = {}
+        self.local_deltas: dict[str, dict[bytes, Value | None]] = {}
+        self.box_delta: dict[bytes, bytes | None] = {}
+
+    def run(self) -> EvalResult:
+        ops = self.program.ops
+        op: _Op | None = None
+        approved = False
+        error = None
+        try:
+            try:
+                while self.pc < len(ops):
+                    op = ops[self.pc]
+                    self.pc += 1
+                    self.cost += op.cost
+                    if self.cost > self.budget:
+                        raise AVMError(
+                            f"dynamic cost budget exceeded, executing {op.name}: "
+                            f"local program cost was {self.cost}"
+                        )
+                    op.fn(self, op.imm)
+                    if len(self.stack) > MAX_STACK_DEPTH:
+                        raise AVMError("stack overflow")
+                    if len(self.callstack) > MAX_CALLSTACK_DEPTH:
+                        raise AVMError("call stack overflow")
+
+                # Falling off the end approves if a single non zero uint is left
+                if len(self.stack) != 1:
+                    raise AVMError(
+                        f"stack len is {len(self.stack)} instead of 1", _line(op)
+                    )
+                approved = _uint(self.stack[0]) != 0
+            except _Return as r:
+                approved = r.value != 0
+        except AVMError as e:
+            if e.line is None:
+                e = AVMError(e.msg, _line(op))
+            error = e
+        except UnsupportedEvaluation as e:
+            raise type(e)(f"line {_line(op)}: {e}") from e
+
+        if not approved and error is None:
+            error = AVMError("program returned false", _line(op))
+
+        return EvalResult(
+            approved=approved,
+            logs=self.logs,
+            cost=self.cost,
+            global_delta=self.global_delta if approved else {},
+            local_deltas=self.local_deltas if approved else {},
+            box_delta=self.box_delta if approved else {},
+            error=error,
+        )
+
+    def pop(self) -> Value:
+        if not self.stack:
+            raise AVMError("stack underflow")
+        return self.stack.pop()
+
+    def pop_uint(self) -> int:
+        return _uint(self.pop())
+
+    def pop_bytes(self) -> bytes:
+        return _bytes(self.pop())
+
+    def push(self, v: Value):
+        if type(v) is bytes and len(v) > MAX_BYTES_LENGTH:
+            raise AVMError(f"byte value too long: {len(v)}")
+        self.stack.append(v)
+
+    # Transaction and global fields
+
+    def txn_field(self, gi: int, name: str) -> Value:
+        if gi < 0 or gi >= len(self.group):
+            raise AVMError(
+                f"txn index {gi} out of range for group of {len(self.group)}"
+            )
+        if name not in _TXN_FIELDS:
+            raise UnsupportedOpcode(f"txn field {name}")
+        return _TXN_FIELDS[name](self.group[gi], gi)
+
+    def txn_array(self, gi: int, name: str, idx: int) -> Value:
+        if gi < 0 or gi >= len(self.group):
+            raise AVMError(
+                f"txn index {gi} out of range for group of {len(self.group)}"
+            )
+        if name not in _TXN_ARRAYS:
+            raise UnsupportedOpcode(f"txn array field {name}")
+        arr = _TXN_ARRAYS[name](self.group[gi])
+        if idx < 0 or idx >= len(arr):
+            raise AVMError(f"invalid {name} index {idx}")
+        return arr[idx]
+
+    def global_field(self, name: str) -> Value:
+        match name:
+            case "MinTxnFee":
+                return 1000
+            case "MinBalance":
+                return 100000
+            case "MaxTxnLife":
+                return 1000
+            case "ZeroAddress":
+                return ZERO_ADDRESS
+            case "GroupSize":
+                return len(self.group)
+            case "LogicSigVersion":
+                return 7
+            case "Round":
+                return self.snapshot.round
+            case "LatestTimestamp":
+                if self.snapshot.latest_timestamp is None:
+                    raise MissingState("latest timestamp")
+                return self.snapshot.latest_timestamp
+            case "CurrentApplicationID":
+                return self.app_id
+            case "CurrentApplicationAddress":
+                return decode_address(get_application_address(self.app_id))
+            case "CreatorAddress":
+                if self.snapshot.creator is None:
+                    raise MissingState("creator address")
+                return decode_address(self.snapshot.creator)
+            case "GroupID":
+                return self.txn.group or ZERO_ADDRESS
+            case "OpcodeBudget":
+                return self.budget - self.cost
+            case "CallerApplicationID":
+                return 0
+            case "CallerApplicationAddress":
+                return ZERO_ADDRESS
+        raise UnsupportedOpcode(f"global field {name}")
+
+    # Reference resolution, following the rules for AVM 4 and later
+
+    def account(self, v: Value) -> str:
+        accounts = [self.txn.sender] + (self.txn.accounts or [])
+        if type(v) is int:
+            if v >= len(accounts):
+                raise AVMError(f"invalid Accounts index {v}")
+            return accounts[v]
+
+        addr = _address(_bytes(v))
+        apps = [self.app_id] + (self.txn.foreign_apps or [])
+        if addr not in accounts and addr not in [
+            get_application_address(a) for a in apps
+        ]:
+            raise AVMError(f"unavailable Account {addr}")
+        return addr
+
+    def application(self, v: int) -> int:
+        apps = [self.app_id] + (self.txn.foreign_apps or [])
+        if v < len(apps):
+            return apps[v]
+        if v not in apps:
+            raise AVMError(f"unavailable App {v}")
+        return v
+
+    def asset(self, v: int) -> int:
+        assets = self.txn.foreign_assets or []
+        if v < len(assets):
+            return assets[v]
+        if v not in assets:
+            raise AVMError(f"unavailable Asset {v}")
+        return v
+
+    # State, reads go through the writes made so far
+
+    def global_get(self, key: bytes) -> Value | None:
+        if key in self.global_delta:
+            return self.global_delta[key]
+        return self.snapshot.global_state.get(key)
+
+    def local_get(self, addr: str, key: bytes) -> Value | None:
+        delta = self.local_deltas.get(addr, {})
+        if key in delta:
+            return delta[key]
+        return self.opted_in_state(addr).get(key)
+
+    def opted_in_state(self, addr: str) -> dict[bytes, Value]:
+        if addr not in self.snapshot.local_state:
+            raise MissingState(f"local state of {addr}")
+        return self.snapshot.local_state[addr]
+
+    def box_get(self, name: bytes) -> bytes | None:
+        if name in self.box_delta:
+            return self.box_delta[name]
+        if self.snapshot.boxes is None:
+            raise MissingState(f"box {name!r}")
+        return self.snapshot.boxes.get(name)
+
+    def box_set(self, name: bytes, value: bytes | None):
+        if self.snapshot.boxes is None:
+            raise MissingState(f"box {name!r}")
+        self.box_delta[name] = value
+
+
+def _line(op: _Op | None) -> int | None:
+    return op.line if op is not None else None
+
+
+def _uint(v: Value) -> int:
+    if type(v) is not int:
+        raise AVMError(f"expected uint64, got bytes {cast(bytes, v).hex()}")
+    return v
+
+
+def _bytes(v: Value) -> bytes:
+    if type(v) is not bytes:
+        raise AVMError(f"expected bytes, got uint64 {v!r}")
+    return v
+
+
+def _address(b: bytes) -> str:
+    if len(b) != 32:
+        raise AVMError(f"address must be 32 bytes, got {len(b)}")
+    return encode_address(b)
+
+
+def _addr_bytes(addr: str | None) -> bytes:
+    return decode_address(addr) if addr else ZERO_ADDRESS
+
+
+# Assembler
+
+
+def _tokenize(line: str) -> list[str]:
+    tokens: list[str] = []
+    i, n = 0, len(line)
+    while i < n:
+        if line[i].isspace():
+            i += 1
+            continue
+        # Comments start a token, a // inside base64 is part of the value
+        if line.startswith("//", i):
+            break
+        j = i
+        if line[i] == '"':
+            j += 1
+            while j < n and line[j] != '"':
+                j += 2 if line[j] == "\\" else 1
+            j += 1
+        else:
+            while j < n and not line[j].isspace():
+                j += 1
+        tokens.append(line[i:j])
+        i = j
+    return tokens
+
+
+def _parse_int(s: str) -> int:
+    if s in _NAMED_INTS:
+        return _NAMED_INTS[s]
+    if s.startswith("0x"):
+        return int(s[2:], 16)
+    if s.startswith("0") and len(s) > 1:
+        return int(s[1:], 8)
+    return int(s)
+
+
+def _parse_bytes(args: list[str]) -> bytes:
+    match args:
+        case [s] if s.startswith("0x"):
+            return bytes.fromhex(s[2:])
+        case [s] if s.startswith('"'):
+            return _parse_string(s[1:-1])
+        case ["base64" | "b64", s]:
+            return base64.b64decode(s)
+        case ["base32" | "b32", s]:
+            return base64.b32decode(s + "=" * (-len(s) % 8))
+        case [s] if s.startswith(("base64(", "b64(")):
+            return base64.b64decode(s[s.index("(") + 1 : -1])
+        case [s] if s.startswith(("base32(", "b32(")):
+            inner = s[s.index("(") + 1 : -1]
+            return base64.b32decode(inner + "=" * (-len(inner) % 8))
+    raise UnsupportedOpcode(f"byte literal {' '.join(args)}")
+
+
+def _parse_string(s: str) -> bytes:
+    out = bytearray()
+    i = 0
+    while i < len(s):
+        c = s[i]
+        if c != "\\":
+            out += c.encode("utf-8")
+            i += 1
+            continue
+        esc = s[i + 1]
+        if esc == "x":
+            out.append(int(s[i + 2 : i + 4], 16))
+            i += 4
+            continue
+        out += {"n": b"\n", "r": b"\r", "t": b"\t", "\\": b"\\", '"': b'"'}[esc]
+        i += 2
+    return bytes(out)
+
+
+def _immediate(s: str) -> Any:
+    # Numeric immediates are ints, field names are left as strings
+    if s[0].isdigit():
+        return _parse_int(s)
+    return s
+
+
+# Opcodes
+
+
+def _unsupported(name: str) -> Callable:
+    def _op(e: _Eval, imm: Any):
+        raise UnsupportedOpcode(f"opcode {name}")
+
+    return _op
+
+
+def _op_nop(e: _Eval, imm: Any):
+    pass
+
+
+def _op_push(e: _Eval, imm: Value):
+    e.stack.append(imm)
+
+
+def _op_err(e: _Eval, imm: Any):
+    raise AVMError("err opcode executed")
+
+
+def _op_return(e: _Eval, imm: Any):
+    raise _Return(e.pop_uint())
+
+
+def _op_assert(e: _Eval, imm: Any):
+    if e.pop_uint() == 0:
+        raise AVMError("assert failed")
+
+
+def _op_b(e: _Eval, target: int):
+    e.pc = target
+
+
+def _op_bz(e: _Eval, target: int):
+    if e.pop_uint() == 0:
+        e.pc = target
+
+
+def _op_bnz(e: _Eval, target: int):
+    if e.pop_uint() != 0:
+        e.pc = target
+
+
+def _op_callsub(e: _Eval, target: int):
+    e.callstack.append(e.pc)
+    e.pc = target
+
+
+def _op_retsub(e: _Eval, imm: Any):
+    if not e.callstack:
+        raise AVMError("retsub with empty callstack")
+    e.pc = e.callstack.pop()
+
+
+# Stack manipulation
+
+
+def _op_pop(e: _Eval, imm: Any):
+    e.pop()
+
+
+def _op_popn(e: _Eval, n: int):
+    if n > len(e.stack):
+        raise AVMError("stack underflow")
+    if n:
+        del e.stack[-n:]
+
+
+def _op_dup(e: _Eval, imm: Any):
+    v = e.pop()
+    e.stack += [v, v]
+
+
+def _op_dup2(e: _Eval, imm: Any):
+    b, a = e.pop(), e.pop()
+    e.stack += [a, b, a, b]
+
+
+def _op_dupn(e: _Eval, n: int):
+    v = e.pop()
+    e.stack += [v] * (n + 1)
+
+
+def _op_swap(e: _Eval, imm: Any):
+    b, a = e.pop(), e.pop()
+    e.stack += [b, a]
+
+
+def _op_dig(e: _Eval, n: int):
+    if n >= len(e.stack):
+        raise AVMError("dig beyond stack")
+    e.stack.append(e.stack[-1 - n])
+
+
+def _op_bury(e: _Eval, n: int):
+    if n == 0 or n >= len(e.stack):
+        raise AVMError("bury beyond stack")
+    v = e.pop()
+    e.stack[-n] = v
+
+
+def _op_cover(e: _Eval, n: int):
+    if n >= len(e.stack):
+        raise AVMError("cover beyond stack")
+    v = e.pop()
+    e.stack.insert(len(e.stack) - n, v)
+
+
+def _op_uncover(e: _Eval, n: int):
+    if n >= len(e.stack):
+        raise AVMError("uncover beyond stack")
+    e.stack.append(e.stack.pop(-1 - n))
+
+
+def _op_select(e: _Eval, imm: Any):
+    c, b, a = e.pop_uint(), e.pop(), e.pop()
+    e.stack.append(b if c != 0 else a)
+
+
+# Scratch space
+
+
+def _op_load(e: _Eval, slot: int):
+    e.stack.append(e.scratch[slot])
+
+
+def _op_store(e: _Eval, slot: int):
+    e.scratch[slot] = e.pop()
+
+
+def _op_loads(e: _Eval, imm: Any):
+    slot = e.pop_uint()
+    if slot >= MAX_SCRATCH_SLOTS:
+        raise AVMError(f"invalid scratch slot {slot}")
+    e.stack.append(e.scratch[slot])
+
+
+def _op_stores(e: _Eval, imm: Any):
+    v, slot = e.pop(), e.pop_uint()
+    if slot >= MAX_SCRATCH_SLOTS:
+        raise AVMError(f"invalid scratch slot {slot}")
+    e.scratch[slot] = v
+
+
+# Arithmetic and logic on uint64
+
+
+def _binary_uint(fn: Callable[[int, int], int]) -> Callable:
+    def _op(e: _Eval, imm: Any):
+        b, a = e.pop_uint(), e.pop_uint()
+        e.stack.append(fn(a, b))
+
+    return _op
+
+
+def _add(a: int, b: int) -> int:
+    if a + b > MAX_UINT64:
+        raise AVMError("+ overflowed")
+    return a + b
+
+
+def _sub(a: int, b: int) -> int:
+    if b > a:
+        raise AVMError("- would result negative")
+    return a - b
+
+
+def _mul(a: int, b: int) -> int:
+    if a * b > MAX_UINT64:
+        raise AVMError("* overflowed")
+    return a * b
+
+
+def _div(a: int, b: int) -> int:
+    if b == 0:
+        raise AVMError("/ 0")
+    return a // b
+
+
+def _mod(a: int, b: int) -> int:
+    if b == 0:
+        raise AVMError("% 0")
+    return a % b
+
+
+def _exp(a: int, b: int) -> int:
+    if a == 0 and b == 0:
+        raise AVMError("0^0 is undefined")
+    if a > 1 and b >= 64:
+        raise AVMError(f"{a}^{b} overflow")
+    if a**b > MAX_UINT64:
+        raise AVMError(f"{a}^{b} overflow")
+    return a**b
+
+
+def _shl(a: int, b: int) -> int:
+    if b >= 64:
+        raise AVMError(f"shl arg too big, ({b})")
+    return (a << b) & MAX_UINT64
+
+
+def _shr(a: int, b: int) -> int:
+    if b >= 64:
+        raise AVMError(f"shr arg too big, ({b})")
+    return a >> b
+
+
+def _op_not(e: _Eval, imm: Any):
+    e.stack.append(1 if e.pop_uint() == 0 else 0)
+
+
+def _op_bitnot(e: _Eval, imm: Any):
+    e.stack.append(e.pop_uint() ^ MAX_UINT64)
+
+
+def _op_sqrt(e: _Eval, imm: Any):
+    e.stack.append(math.isqrt(e.pop_uint()))
+
+
+def _op_bitlen(e: _Eval, imm: Any):
+    v = e.pop()
+    if type(v) is bytes:
+        v = int.from_bytes(v, "big")
+    e.stack.append(cast(int, v).bit_length())
+
+
+def _op_eq(e: _Eval, imm: Any):
+    b, a = e.pop(), e.pop()
+    if type(a) is not type(b):
+        raise AVMError("cannot compare uint64 to bytes")
+    e.stack.append(1 if a == b else 0)
+
+
+def _op_neq(e: _Eval, imm: Any):
+    _op_eq(e, imm)
+    e.stack[-1] ^= 1  # type: ignore
+
+
+def _op_mulw(e: _Eval, imm: Any):
+    b, a = e.pop_uint(), e.pop_uint()
+    r = a * b
+    e.stack += [r >> 64, r & MAX_UINT64]
+
+
+def _op_addw(e: _Eval, imm: Any):
+    b, a = e.pop_uint(), e.pop_uint()
+    r = a + b
+    e.stack += [r >> 64, r & MAX_UINT64]
+
+
+def _op_divmodw(e: _Eval, imm: Any):
+    d, c, b, a = e.pop_uint(), e.pop_uint(), e.pop_uint(), e.pop_uint()
+    divisor = (c << 64) | d
+    if divisor == 0:
+        raise AVMError("/ 0")
+    q, r = divmod((a << 64) | b, divisor)
+    e.stack += [q >> 64, q & MAX_UINT64, r >> 64, r & MAX_UINT64]
+
+
+def _op_divw(e: _Eval, imm: Any):
+    c, b, a = e.pop_uint(), e.pop_uint(), e.pop_uint()
+    if c == 0:
+        raise AVMError("/ 0")
+    q = ((a << 64) | b) // c
+    if q > MAX_UINT64:
+        raise AVMError("divw overflow")
+    e.stack.append(q)
+
+
+def _op_expw(e: _Eval, imm: Any):
+    b, a = e.pop_uint(), e.pop_uint()
+    if a == 0 and b == 0:
+        raise AVMError("0^0 is undefined")
+    if a > 1 and b >= 128:
+        raise AVMError(f"{a}^{b} overflow")
+    r = a**b
+    if r > 2**128 - 1:
+        raise AVMError(f"{a}^{b} overflow")
+    e.stack += [r >> 64, r & MAX_UINT64]
+
+
+# Byte manipulation
+
+
+def _op_itob(e: _Eval, imm: Any):
+    e.stack.append(e.pop_uint().to_bytes(8, "big"))
+
+
+def _op_btoi(e: _Eval, imm: Any):
+    b = e.pop_bytes()
+    if len(b) > 8:
+        raise AVMError(f"btoi arg too long, got [{len(b)}]bytes")
+    e.stack.append(int.from_bytes(b, "big"))
+
+
+def _op_len(e: _Eval, imm: Any):
+    e.stack.append(len(e.pop_bytes()))
+
+
+def _op_concat(e: _Eval, imm: Any):
+    b, a = e.pop_bytes(), e.pop_bytes()
+    e.push(a + b)
+
+
+def _substring(b: bytes, start: int, end: int) -> bytes:
+    if end < start:
+        raise AVMError("substring end before start")
+    if end > len(b):
+        raise AVMError("substring range beyond length of string")
+    return b[start:end]
+
+
+def _extract(b: bytes, start: int, length: int) -> bytes:
+    if start > len(b) or start + length > len(b):
+        raise AVMError("extraction end exceeds bytes length")
+    return b[start : start + length]
+
+
+def _op_substring(e: _Eval, imm: tuple[int, int]):
+    e.stack.append(_substring(e.pop_bytes(), *imm))
+
+
+def _op_substring3(e: _Eval, imm: Any):
+    end, start, b = e.pop_uint(), e.pop_uint(), e.pop_bytes()
+    e.stack.append(_substring(b, start, end))
+
+
+def _op_extract(e: _Eval, imm: tuple[int, int]):
+    b = e.pop_bytes()
+    start, length = imm
+    # A length of 0 extracts to the end
+    if length == 0:
+        if start > len(b):
+            raise AVMError("extraction start beyond length of string")
+        length = len(b) - start
+    e.stack.append(_extract(b, start, length))
+
+
+def _op_extract3(e: _Eval, imm: Any):
+    length, start, b = e.pop_uint(), e.pop_uint(), e.pop_bytes()
+    e.stack.append(_extract(b, start, length))
+
+
+def _extract_uint(size: int) -> Callable:
+    def _op(e: _Eval, imm: Any):
+        start, b = e.pop_uint(), e.pop_bytes()
+        e.stack.append(int.from_bytes(_extract(b, start, size), "big"))
+
+    return _op
+
+
+def _replace(b: bytes, start: int, r: bytes) -> bytes:
+    if start + len(r) > len(b):
+        raise AVMError("replacement end exceeds bytes length")
+    return b[:start] + r + b[start + len(r) :]
+
+
+def _op_replace2(e: _Eval, start: int):
+    r, b = e.pop_bytes(), e.pop_bytes()
+    e.stack.append(_replace(b, start, r))
+
+
+def _op_replace3(e: _Eval, imm: Any):
+    r, start, b = e.pop_bytes(), e.pop_uint(), e.pop_bytes()
+    e.stack.append(_replace(b, start, r))
+
+
+def _op_getbyte(e: _Eval, imm: Any):
+    idx, b = e.pop_uint(), e.pop_bytes()
+    if idx >= len(b):
+        raise AVMError("getbyte index beyond array length")
+    e.stack.append(b[idx])
+
+
+def _op_setbyte(e: _Eval, imm: Any):
+    v, idx, b = e.pop_uint(), e.pop_uint(), e.pop_bytes()
+    if idx >= len(b):
+        raise AVMError("setbyte index beyond array length")
+    if v > 255:
+        raise AVMError("setbyte value > 255")
+    e.stack.append(b[:idx] + bytes([v]) + b[idx + 1 :])
+
+
+def _op_getbit(e: _Eval, imm: Any):
+    idx, target = e.pop_uint(), e.pop()
+    if type(target) is int:
+        if idx >= 64:
+            raise AVMError("getbit index > 63 with with Uint")
+        e.stack.append((target >> idx) & 1)
+        return
+    b = cast(bytes, target)
+    if idx >= len(b) * 8:
+        raise AVMError("getbit index beyond byteslice")
+    e.stack.append((b[idx // 8] >> (7 - idx % 8)) & 1)
+
+
+def _op_setbit(e: _Eval, imm: Any):
+    v, idx, target = e.pop_uint(), e.pop_uint(), e.pop()
+    if v > 1:
+        raise AVMError("setbit value > 1")
+    if type(target) is int:
+        if idx >= 64:
+            raise AVMError("setbit index > 63 with Uint")
+        mask = 1 << idx
+        e.stack.append(target | mask if v else target & ~mask)
+        return
+    b = bytearray(cast(bytes, target))
+    if idx >= len(b) * 8:
+        raise AVMError("setbit index beyond byteslice")
+    mask = 0x80 >> (idx % 8)
+    if v:
+        b[idx // 8] |= mask
+    else:
+        b[idx // 8] &= ~mask & 0xFF
+    e.stack.append(bytes(b))
+
+
+def _op_bzero(e: _Eval, imm: Any):
+    n = e.pop_uint()
+    if n > MAX_BYTES_LENGTH:
+        raise AVMError(f"bzero attempted to create a too large string: {n}")
+    e.stack.append(bytes(n))
+
+
+# Byte math, operands are big endian unsigned ints of up to 64 bytes
+
+
+def _byte_math_operand(e: _Eval) -> int:
+    b = e.pop_bytes()
+    if len(b) > MAX_BYTE_MATH_LENGTH:
+        raise AVMError("math attempted on large byte-array")
+    return int.from_bytes(b, "big")
+
+
+def _int_bytes(v: int) -> bytes:
+    return v.to_bytes((v.bit_length() + 7) // 8, "big")
+
+
+def _byte_math(fn: Callable[[int, int], int]) -> Callable:
+    def _op(e: _Eval, imm: Any):
+        b, a = _byte_math_operand(e), _byte_math_operand(e)
+        e.stack.append(_int_bytes(fn(a, b)))
+
+    return _op
+
+
+def _byte_compare(fn: Callable[[int, int], bool]) -> Callable:
+    def _op(e: _Eval, imm: Any):
+        b, a = _byte_math_operand(e), _byte_math_operand(e)
+        e.stack.append(1 if fn(a, b) else 0)
+
+    return _op
+
+
+def _byte_bitwise(fn: Callable[[int, int], int]) -> Callable:
+    # Shorter operands are zero padded on the left, the result is as long as the longer
+    def _op(e: _Eval, imm: Any):
+        b, a = e.pop_bytes(), e.pop_bytes()
+        size = max(len(a), len(b))
+        r = fn(int.from_bytes(a, "big"), int.from_bytes(b, "big"))
+        e.stack.append(r.to_bytes(size, "big"))
+
+    return _op
+
+
+def _op_bnot(e: _Eval, imm: Any):
+    e.stack.append(bytes(~c & 0xFF for c in e.pop_bytes()))
+
+
+def _op_bsqrt(e: _Eval, imm: Any):
+    e.stack.append(_int_bytes(math.isqrt(_byte_math_operand(e))))
+
+
+def _bsub(a: int, b: int) -> int:
+    if b > a:
+        raise AVMError("byte math would have negative result")
+    return a - b
+
+
+def _bdiv(a: int, b: int) -> int:
+    if b == 0:
+        raise AVMError("division by zero")
+    return a // b
+
+
+def _bmod(a: int, b: int) -> int:
+    if b == 0:
+        raise AVMError("modulo by zero")
+    return a % b
+
+
+# Hashing
+
+
+def _hash(fn: Callable[[bytes], bytes]) -> Callable:
+    def _op(e: _Eval, imm: Any):
+        e.stack.append(fn(e.pop_bytes()))
+
+    return _op
+
+
+def _sha512_256(b: bytes) -> bytes:
+    return SHA512.new(b, truncate="256").digest()
+
+
+def _keccak256(b: bytes) -> bytes:
+    return keccak.new(data=b, digest_bits=256).digest()
+
+
+# Transaction fields
+
+
+def _app_field(name: str, default: Any) -> Callable:
+    def _get(t: transaction.Transaction, gi: int) -> Value:
+        if t.type != "appl":
+            return default
+        return getattr(t, name)
+
+    return _get
+
+
+def _typed_field(
+    txn_type: str, name: str, default: Value, convert: Callable = None
+) -> Callable:
+    def _get(t: transaction.Transaction, gi: int) -> Value:
+        if t.type != txn_type:
+            return default
+        v = getattr(t, name)
+        return convert(v) if convert is not None else v
+
+    return _get
+
+
+def _txid(t: transaction.Transaction, gi: int) -> bytes:
+    txid = t.get_txid()
+    return base64.b32decode(txid + "=" * (-len(txid) % 8))
+
+
+_TXN_FIELDS: dict[str, Callable[[Any, int], Value]] = {
+    "Sender": lambda t, gi: decode_address(t.sender),
+    "Fee": lambda t, gi: t.fee,
+    "FirstValid": lambda t, gi: t.first_valid_round,
+    "LastValid": lambda t, gi: t.last_valid_round,
+    "Note": lambda t, gi: t.note or b"",
+    "Lease": lambda t, gi: t.lease or ZERO_ADDRESS,
+    "RekeyTo": lambda t, gi: _addr_bytes(t.rekey_to),
+    "Type": lambda t, gi: t.type.encode("utf-8"),
+    "TypeEnum": lambda t, gi: _TXN_TYPES.get(t.type, 0),
+    "GroupIndex": lambda t, gi: gi,
+    "TxID": _txid,
+    "Receiver": _typed_field("pay", "receiver", ZERO_ADDRESS, _addr_bytes),
+    "Amount": _typed_field("pay", "amt", 0),
+    "CloseRemainderTo": _typed_field(
+        "pay", "close_remainder_to", ZERO_ADDRESS, _addr_bytes
+    ),
+    "XferAsset": _typed_field("axfer", "index", 0),
+    "AssetAmount": _typed_field("axfer", "amount", 0),
+    "AssetReceiver": _typed_field("axfer", "receiver", ZERO_ADDRESS, _addr_bytes),
+    "AssetSender": _typed_field(
+        "axfer", "revocation_target", ZERO_ADDRESS, _addr_bytes
+    ),
+    "AssetCloseTo": _typed_field("axfer", "close_assets_to", ZERO_ADDRESS, _addr_bytes),
+    "ApplicationID": _app_field("index", 0),
+    "OnCompletion": lambda t, gi: int(t.on_complete) if t.type == "appl" else 0,
+    "NumAppArgs": lambda t, gi: len(_TXN_ARRAYS["ApplicationArgs"](t)),
+    "NumAccounts": lambda t, gi: len(_TXN_ARRAYS["Accounts"](t)) - 1,
+    "NumApplications": lambda t, gi: len(_TXN_ARRAYS["Applications"](t)) - 1,
+    "NumAssets": lambda t, gi: len(_TXN_ARRAYS["Assets"](t)),
+    "ExtraProgramPages": _app_field("extra_pages", 0),
+}
+
+_TXN_ARRAYS: dict[str, Callable[[Any], list[Value]]] = {
+    "ApplicationArgs": lambda t: (t.app_args or []) if t.type == "appl" else [],
+    # The sender and called app are implicitly at index 0
+    "Accounts": lambda t: [decode_address(t.sender)]
+    + ([decode_address(a) for a in t.accounts or []] if t.type == "appl" else []),
+    "Applications": lambda t: [t.index if t.type == "appl" else 0]
+    + ((t.foreign_apps or []) if t.type == "appl" else []),
+    "Assets": lambda t: (t.foreign_assets or []) if t.type == "appl" else [],
+}
+
+
+def _op_txn(e: _Eval, name: str):
+    e.push(e.txn_field(e.index, name))
+
+
+def _op_txna(e: _Eval, imm: tuple[str, int]):
+    e.push(e.txn_array(e.index, *imm))
+
+
+def _op_txnas(e: _Eval, name: str):
+    e.push(e.txn_array(e.index, name, e.pop_uint()))
+
+
+def _op_gtxn(e: _Eval, imm: tuple[int, str]):
+    e.push(e.txn_field(*imm))
+
+
+def _op_gtxna(e: _Eval, imm: tuple[int, str, int]):
+    e.push(e.txn_array(*imm))
+
+
+def _op_gtxnas(e: _Eval, imm: tuple[int, str]):
+    e.push(e.txn_array(imm[0], imm[1], e.pop_uint()))
+
+
+def _op_gtxns(e: _Eval, name: str):
+    e.push(e.txn_field(e.pop_uint(), name))
+
+
+def _op_gtxnsa(e: _Eval, imm: tuple[str, int]):
+    e.push(e.txn_array(e.pop_uint(), *imm))
+
+
+def _op_gtxnsas(e: _Eval, name: str):
+    idx, gi = e.pop_uint(), e.pop_uint()
+    e.push(e.txn_array(gi, name, idx))
+
+
+def _op_global(e: _Eval, name: str):
+    e.push(e.global_field(name))
+
+
+# State access
+
+
+def _check_key(key: bytes, value: Value = None):
+    if len(key) > MAX_KEY_LENGTH:
+        raise AVMError(f"key too long: length was {len(key)}, maximum is 64")
+    if type(value) is bytes and len(key) + len(value) > MAX_KEY_VALUE_LENGTH:
+        raise AVMError(
+            f"key/value total too long: length was {len(key) + len(value)}, maximum is 128"
+        )
+
+
+def _op_app_global_get(e: _Eval, imm: Any):
+    v = e.global_get(e.pop_bytes())
+    e.stack.append(0 if v is None else v)
+
+
+def _op_app_global_get_ex(e: _Eval, imm: Any):
+    key, app = e.pop_bytes(), e.application(e.pop_uint())
+    if app != e.app_id:
+        raise MissingState(f"global state of app {app}")
+    v = e.global_get(key)
+    e.stack += [0, 0] if v is None else [v, 1]
+
+
+def _op_app_global_put(e: _Eval, imm: Any):
+    v, key = e.pop(), e.pop_bytes()
+    _check_key(key, v)
+    e.global_delta[key] = v
+
+
+def _op_app_global_del(e: _Eval, imm: Any):
+    e.global_delta[e.pop_bytes()] = None
+
+
+def _op_app_local_get(e: _Eval, imm: Any):
+    key, addr = e.pop_bytes(), e.account(e.pop())
+    v = e.local_get(addr, key)
+    e.stack.append(0 if v is None else v)
+
+
+def _op_app_local_get_ex(e: _Eval, imm: Any):
+    key, app, addr = e.pop_bytes(), e.application(e.pop_uint()), e.account(e.pop())
+    if app != e.app_id:
+        raise MissingState(f"local state of app {app}")
+    v = e.local_get(addr, key)
+    e.stack += [0, 0] if v is None else [v, 1]
+
+
+def _op_app_local_put(e: _Eval, imm: Any):
+    v, key, addr = e.pop(), e.pop_bytes(), e.account(e.pop())
+    _check_key(key, v)
+    e.opted_in_state(addr)
+    e.local_deltas.setdefault(addr, {})[key] = v
+
+
+def _op_app_local_del(e: _Eval, imm: Any):
+    key, addr = e.pop_bytes(), e.account(e.pop())
+    e.opted_in_state(addr)
+    e.local_deltas.setdefault(addr, {})[key] = None
+
+
+def _op_app_opted_in(e: _Eval, imm: Any):
+    app, addr = e.application(e.pop_uint()), e.account(e.pop())
+    if app != e.app_id:
+        raise MissingState(f"opt in of {addr} to app {app}")
+    e.opted_in_state(addr)
+    e.stack.append(1)
+
+
+def _op_balance(e: _Eval, imm: Any):
+    addr = e.account(e.pop())
+    if addr not in e.snapshot.balances:
+        raise MissingState(f"balance of {addr}")
+    e.stack.append(e.snapshot.balances[addr])
+
+
+def _op_min_balance(e: _Eval, imm: Any):
+    addr = e.account(e.pop())
+    if addr not in e.snapshot.min_balances:
+        raise MissingState(f"min balance of {addr}")
+    e.stack.append(e.snapshot.min_balances[addr])
+
+
+def _op_asset_holding_get(e: _Eval, name: str):
+    asset, addr = e.asset(e.pop_uint()), e.account(e.pop())
+    if (addr, asset) not in e.snapshot.assets:
+        raise MissingState(f"holding of asset {asset} by {addr}")
+    amount, frozen = e.snapshot.assets[(addr, asset)]
+    match name:
+        case "AssetBalance":
+            e.stack += [amount, 1]
+        case "AssetFrozen":
+            e.stack += [int(frozen), 1]
+        case _:
+            raise UnsupportedOpcode(f"asset holding field {name}")
+
+
+def _op_log(e: _Eval, imm: Any):
+    b = e.pop_bytes()
+    if len(e.logs) == MAX_LOG_CALLS:
+        raise AVMError(
+            f"too many log calls in program. up to {MAX_LOG_CALLS} is allowed"
+        )
+    e.log_size += len(b)
+    if e.log_size > MAX_LOG_SIZE:
+        raise AVMError(
+            f"program logs too large. {e.log_size} bytes > {MAX_LOG_SIZE} bytes limit"
+        )
+    e.logs.append(b)
+
+
+# Boxes
+
+
+def _op_box_create(e: _Eval, imm: Any):
+    size, name = e.pop_uint(), e.pop_bytes()
+    if not name or len(name) > MAX_KEY_LENGTH:
+        raise AVMError(f"box names must be 1-64 bytes, got {len(name)}")
+    if size > MAX_BOX_SIZE:
+        raise AVMError(f"box size too large: {size}, max is {MAX_BOX_SIZE}")
+    existing = e.box_get(name)
+    if existing is not None:
+        if len(existing) != size:
+            raise AVMError(f"box size mismatch {len(existing)} {size}")
+        e.stack.append(0)
+        return
+    e.box_set(name, bytes(size))
+    e.stack.append(1)
+
+
+def _existing_box(e: _Eval, name: bytes) -> bytes:
+    box = e.box_get(name)
+    if box is None:
+        raise AVMError(f"no such box {name!r}")
+    return box
+
+
+def _op_box_extract(e: _Eval, imm: Any):
+    length, start, name = e.pop_uint(), e.pop_uint(), e.pop_bytes()
+    box = _existing_box(e, name)
+    if start + length > len(box):
+        raise AVMError(f"extraction end {start + length} is beyond length: {len(box)}")
+    e.push(box[start : start + length])
+
+
+def _op_box_replace(e: _Eval, imm: Any):
+    r, start, name = e.pop_bytes(), e.pop_uint(), e.pop_bytes()
+    box = _existing_box(e, name)
+    if start + len(r) > len(box):
+        raise AVMError(f"replacement end {start + len(r)} beyond length: {len(box)}")
+    e.box_set(name, box[:start] + r + box[start + len(r) :])
+
+
+def _op_box_del(e: _Eval, imm: Any):
+    name = e.pop_bytes()
+    if e.box_get(name) is None:
+        e.stack.append(0)
+        return
+    e.box_set(name, None)
+    e.stack.append(1)
+
+
+def _op_box_len(e: _Eval, imm: Any):
+    box = e.box_get(e.pop_bytes())
+    e.stack += [0, 0] if box is None else [len(box), 1]
+
+
+def _op_box_get(e: _Eval, imm: Any):
+    box = e.box_get(e.pop_bytes())
+    e.stack += [b"", 0] if box is None else [box, 1]
+
+
+def _op_box_put(e: _Eval, imm: Any):
+    value, name = e.pop_bytes(), e.pop_bytes()
+    existing = e.box_get(name)
+    if existing is not None and len(existing) != len(value):
+        raise AVMError(f"attempt to box_put wrong size {len(existing)} != {len(value)}")
+    if not name or len(name) > MAX_KEY_LENGTH:
+        raise AVMError(f"box names must be 1-64 bytes, got {len(name)}")
+    e.box_set(name, value)
+
+
+_OPS: dict[str, Callable] = {
+    "err": _op_err,
+    "return": _op_return,
+    "assert": _op_assert,
+    "b": _op_b,
+    "bz": _op_bz,
+    "bnz": _op_bnz,
+    "callsub": _op_callsub,
+    "retsub": _op_retsub,
+    "pop": _op_pop,
+    "popn": _op_popn,
+    "dup": _op_dup,
+    "dup2": _op_dup2,
+    "dupn": _op_dupn,
+    "swap": _op_swap,
+    "dig": _op_dig,
+    "bury": _op_bury,
+    "cover": _op_cover,
+    "uncover": _op_uncover,
+    "select": _op_select,
+    "load": _op_load,
+    "store": _op_store,
+    "loads": _op_loads,
+    "stores": _op_stores,
+    "+": _binary_uint(_add),
+    "-": _binary_uint(_sub),
+    "*": _binary_uint(_mul),
+    "/": _binary_uint(_div),
+    "%": _binary_uint(_mod),
+    "exp": _binary_uint(_exp),
+    "shl": _binary_uint(_shl),
+    "shr": _binary_uint(_shr),
+    "<": _binary_uint(lambda a, b: int(a < b)),
+    ">": _binary_uint(lambda a, b: int(a > b)),
+    "<=": _binary_uint(lambda a, b: int(a <= b)),
+    ">=": _binary_uint(lambda a, b: int(a >= b)),
+    "&&": _binary_uint(lambda a, b: int(a != 0 and b != 0)),
+    "||": _binary_uint(lambda a, b: int(a != 0 or b != 0)),
+    "&": _binary_uint(lambda a, b: a & b),
+    "|": _binary_uint(lambda a, b: a | b),
+    "^": _binary_uint(lambda a, b: a ^ b),
+    "!": _op_not,
+    "~": _op_bitnot,
+    "==": _op_eq,
+    "!=": _op_neq,
+    "sqrt": _op_sqrt,
+    "bitlen": _op_bitlen,
+    "mulw": _op_mulw,
+    "addw": _op_addw,
+    "divmodw": _op_divmodw,
+    "divw": _op_divw,
+    "expw": _op_expw,
+    "itob": _op_itob,
+    "btoi": _op_btoi,
+    "len": _op_len,
+    "concat": _op_concat,
+    "substring": _op_substring,
+    "substring3": _op_substring3,
+    "extract": _op_extract,
+    "extract3": _op_extract3,
+    "extract_uint16": _extract_uint(2),
+    "extract_uint32": _extract_uint(4),
+    "extract_uint64": _extract_uint(8),
+    "replace2": _op_replace2,
+    "replace3": _op_replace3,
+    "getbyte": _op_getbyte,
+    "setbyte": _op_setbyte,
+    "getbit": _op_getbit,
+    "setbit": _op_setbit,
+    "bzero": _op_bzero,
+    "b+": _byte_math(lambda a, b: a + b),
+    "b-": _byte_math(_bsub),
+    "b*": _byte_math(lambda a, b: a * b),
+    "b/": _byte_math(_bdiv),
+    "b%": _byte_math(_bmod),
+    "b<": _byte_compare(lambda a, b: a < b),
+    "b>": _byte_compare(lambda a, b: a > b),
+    "b<=": _byte_compare(lambda a, b: a <= b),
+    "b>=": _byte_compare(lambda a, b: a >= b),
+    "b==": _byte_compare(lambda a, b: a == b),
+    "b!=": _byte_compare(lambda a, b: a != b),
+    "b|": _byte_bitwise(lambda a, b: a | b),
+    "b&": _byte_bitwise(lambda a, b: a & b),
+    "b^": _byte_bitwise(lambda a, b: a ^ b),
+    "b~": _op_bnot,
+    "bsqrt": _op_bsqrt,
+    "sha256": _hash(lambda b: hashlib.sha256(b).digest()),
+    "sha512_256": _hash(_sha512_256),
+    "keccak256": _hash(_keccak256),
+    "sha3_256": _hash(lambda b: hashlib.sha3_256(b).digest()),
+    "txn": _op_txn,
+    "txna": _op_txna,
+    "txnas": _op_txnas,
+    "gtxn": _op_gtxn,
+    "gtxna": _op_gtxna,
+    "gtxnas": _op_gtxnas,
+    "gtxns": _op_gtxns,
+    "gtxnsa": _op_gtxnsa,
+    "gtxnsas": _op_gtxnsas,
+    "global": _op_global,
+    "app_global_get": _op_app_global_get,
+    "app_global_get_ex": _op_app_global_get_ex,
+    "app_global_put": _op_app_global_put,
+    "app_global_del": _op_app_global_del,
+    "app_local_get": _op_app_local_get,
+    "app_local_get_ex": _op_app_local_get_ex,
+    "app_local_put": _op_app_local_put,
+    "app_local_del": _op_app_local_del,
+    "app_opted_in": _op_app_opted_in,
+    "balance": _op_balance,
+    "min_balance": _op_min_balance,
+    "asset_holding_get": _op_asset_holding_get,
+    "log": _op_log,
+    "box_create": _op_box_create,
+    "box_extract": _op_box_extract,
+    "box_replace": _op_box_replace,
+    "box_del": _op_box_del,
+    "box_len": _op_box_len,
+    "box_get": _op_box_get,
+    "box_put": _op_box_put,
+}
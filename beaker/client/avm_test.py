@@ -0,0 +1,347 @@
+import hashlib
+from base64 import b64encode
+
+import pytest
+import pyteal as pt
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    ABI_RETURN_HASH,
+    AccountTransactionSigner,
+)
+from algosdk.future import transaction
+
+from beaker.application import Application
+from beaker.client.application_client import ApplicationClient
+from beaker.client.avm import (
+    AVMError,
+    AVMSnapshot,
+    Evaluator,
+    MissingState,
+    UnsupportedEvaluation,
+    UnsupportedOpcode,
+)
+from beaker.decorators import external
+from beaker.state import AccountStateValue, ApplicationStateValue
+
+APP_ID = 5
+
+_, SENDER = generate_account()
+SP = transaction.SuggestedParams(
+    fee=1000, first=1, last=1000, gh="a" * 44, flat_fee=True
+)
+
+
+def app_call(app_args: list = None, **kwargs) -> transaction.ApplicationCallTxn:
+    return transaction.ApplicationCallTxn(
+        SENDER, SP, APP_ID, transaction.OnComplete.NoOpOC, app_args=app_args, **kwargs
+    )
+
+
+def run(teal: str, snapshot: AVMSnapshot = None, **kwargs):
+    snapshot = snapshot if snapshot is not None else AVMSnapshot(app_id=APP_ID)
+    return Evaluator("#pragma version 7\n" + teal).evaluate(
+        [app_call(**kwargs)], 0, snapshot
+    )
+
+
+def test_arithmetic_and_flow():
+    result = run(
+        """
+intcblock 0 1 10
+bytecblock 0x6869 "a//b"
+int 3
+intc_2
+callsub double_sum
+pushint 26
+==
+assert
+bytec_0
+bytec_1 // a comment
+concat
+len
+int 6
+==
+bz fail
+intc_1
+return
+fail:
+err
+double_sum:
++
+dup
++
+retsub
+"""
+    )
+    assert result.approved, result.error
+    assert result.cost == 21
+
+
+def test_failures_reject():
+    overflow = run("int 18446744073709551615\nint 1\n+")
+    assert not overflow.approved
+    assert overflow.error is not None and "overflowed" in str(overflow.error)
+    assert overflow.error.line == 3
+
+    assert not run("int 0").approved
+    assert not run("int 1\nint 1").approved
+    assert not run("byte 0x01\nint 1\n+").approved
+
+
+def test_budget():
+    loop = run("int 0\nloop:\nint 1\n+\ndup\nint 1000\n<\nbnz loop\nreturn")
+    assert not loop.approved
+    assert loop.error is not None and "budget" in str(loop.error)
+
+    # Hashes cost more than one
+    assert run("byte 0x00\nsha256\nlen").cost == 37
+
+
+def test_bytes_ops():
+    result = run(
+        """
+byte 0x0102030405
+extract 1 2
+byte 0x0203
+==
+assert
+byte 0x00ff
+int 8
+getbit
+assert
+byte 0x0000000000000007
+int 0
+extract_uint64
+int 7
+==
+assert
+byte 0x01
+byte 0xff
+b+
+byte 0x0100
+b==
+assert
+byte 0x0f
+byte 0xf0f0
+b|
+byte 0xf0ff
+==
+assert
+int 3
+int 5
+mulw
++
+int 15
+==
+"""
+    )
+    assert result.approved, result.error
+
+
+def test_hashes():
+    result = run(
+        f"""
+byte "beaker"
+sha256
+byte 0x{hashlib.sha256(b"beaker").hexdigest()}
+==
+"""
+    )
+    assert result.approved, result.error
+
+
+def test_txn_fields():
+    result = run(
+        """
+txn NumAppArgs
+int 2
+==
+assert
+txna ApplicationArgs 1
+btoi
+int 7
+==
+assert
+txn Sender
+txna Accounts 0
+==
+assert
+txn TypeEnum
+int appl
+==
+assert
+global CurrentApplicationID
+int 5
+==
+""",
+        app_args=[b"x", 7],
+    )
+    assert result.approved, result.error
+
+
+def test_state():
+    other = generate_account()[1]
+    snapshot = AVMSnapshot(
+        app_id=APP_ID,
+        global_state={b"g": 3},
+        local_state={SENDER: {b"l": b"local"}},
+    )
+
+    result = run(
+        """
+byte "g"
+app_global_get
+int 3
+==
+assert
+byte "g"
+int 4
+app_global_put
+byte "g"
+app_global_get
+int 4
+==
+assert
+int 0
+byte "l"
+app_local_get
+byte "local"
+==
+assert
+int 0
+int 0
+byte "missing"
+app_local_get_ex
+!
+assert
+pop
+int 1
+""",
+        snapshot,
+    )
+    assert result.approved, result.error
+    assert result.global_delta == {b"g": 4}
+    assert snapshot.global_state == {b"g": 3}, "Snapshot should not be modified"
+
+    # Local state that wasn't captured can't be told apart from not being opted in
+    with pytest.raises(MissingState):
+        run('int 1\nbyte "l"\napp_local_get', snapshot, accounts=[other])
+
+    with pytest.raises(MissingState):
+        run("int 0\nbalance", snapshot)
+
+
+def test_unsupported_opcode():
+    # Parsing succeeds, only reaching the opcode fails
+    assert run("int 1\nreturn\nitxn_begin").approved
+
+    with pytest.raises(UnsupportedOpcode):
+        run("itxn_begin\nint 1")
+
+    # AVM 8 opcodes the evaluator doesn't implement
+    for teal in ["proto 0 0\nint 1", "int 1\nframe_dig 0"]:
+        with pytest.raises(UnsupportedEvaluation):
+            Evaluator("#pragma version 8\n" + teal).evaluate(
+                [app_call()], 0, AVMSnapshot(app_id=APP_ID)
+            )
+
+
+def test_program_version():
+    # Opcodes newer than the program are rejected when it is parsed
+    for teal in ["#pragma version 7\nint 1\nbury 1", "#pragma version 4\nint 0\nlog"]:
+        with pytest.raises(AVMError, match="needs program version"):
+            Evaluator(teal)
+
+    with pytest.raises(AVMError, match="box_get needs program version 8"):
+        run('byte "b"\nbox_get')
+
+    # The version defaults to 1
+    with pytest.raises(AVMError):
+        Evaluator("int 1\nreturn")
+
+    box = Evaluator('#pragma version 8\nbyte "b"\nbox_len\nreturn')
+    snapshot = AVMSnapshot(app_id=APP_ID, boxes={b"b": b"1"})
+    assert box.evaluate([app_call()], 0, snapshot).approved
+
+
+def test_group_state_carries():
+    teal = '#pragma version 7\nbyte "c"\nbyte "c"\napp_global_get\nint 1\n+\napp_global_put\nint 1'
+    calls = [app_call(note=b"1"), app_call(note=b"2")]
+    transaction.assign_group_id(calls)
+
+    results = Evaluator(teal).evaluate_group(calls, AVMSnapshot(app_id=APP_ID))
+    assert [r.global_delta for r in results if r is not None] == [
+        {b"c": 1},
+        {b"c": 2},
+    ]
+
+
+class ReadOnlyApp(Application):
+    counter = ApplicationStateValue(pt.TealType.uint64)
+    nick = AccountStateValue(pt.TealType.bytes)
+
+    @external(read_only=True)
+    def get_counter(self, *, output: pt.abi.Uint64):
+        return output.set(self.counter)
+
+    @external(read_only=True)
+    def add(self, a: pt.abi.Uint64, b: pt.abi.Uint64, *, output: pt.abi.Uint64):
+        return output.set(a.get() + b.get() + self.counter)
+
+    @external(read_only=True)
+    def get_nick(self, *, output: pt.abi.String):
+        return output.set(self.nick[pt.Txn.sender()])
+
+    @external(read_only=True)
+    def get_balance(self, *, output: pt.abi.Uint64):
+        return output.set(pt.Balance(pt.Txn.sender()))
+
+
+def test_read_only_call(stub_algod, monkeypatch):
+    sk, addr = generate_account()
+    stub_algod.global_state[APP_ID] = {b"counter": 40}
+    stub_algod.local_state[(APP_ID, addr)] = {b"nick": b"beaker"}
+
+    dryruns = []
+
+    def dryrun(req, **kwargs):
+        dryruns.append(req)
+        ret = ABI_RETURN_HASH + (7).to_bytes(8, "big")
+        return {"txns": [{"logs": [b64encode(ret).decode("utf-8")]}]}
+
+    stub_algod.dryrun = dryrun
+    # Building the request reads accounts and apps the stub doesn't serve
+    monkeypatch.setattr(transaction, "create_dryrun", lambda client, txns: txns)
+
+    app = ReadOnlyApp()
+    ac = ApplicationClient(
+        stub_algod, app, app_id=APP_ID, signer=AccountTransactionSigner(sk)
+    )
+
+    # Nothing cached, so algod dryruns the call
+    assert ac.call(ReadOnlyApp.get_counter).return_value == 7
+    assert len(dryruns) == 1
+
+    # Evaluating locally is opt in, cached state alone doesn't turn it on
+    ac.get_application_state(cached=True)
+    assert ac.call(ReadOnlyApp.get_counter).return_value == 7
+    assert len(dryruns) == 2
+
+    # Once on and the state is cached and fresh, calls are evaluated locally
+    ac.evaluate_locally = True
+    assert ac.call(ReadOnlyApp.get_counter).return_value == 40
+    assert ac.call(ReadOnlyApp.add, a=1, b=2).return_value == 43
+    assert len(dryruns) == 2
+
+    ac.get_account_state(cached=True)
+    assert ac.call(ReadOnlyApp.get_nick).return_value == "beaker"
+    assert len(dryruns) == 2
+
+    # Balances aren't cached, falls back to dryrun
+    assert ac.call(ReadOnlyApp.get_balance).return_value == 7
+    assert len(dryruns) == 3
+
+    # A newer round makes the cached state stale
+    ac.state_view.observe_round(stub_algod.round + 1)
+    assert ac.call(ReadOnlyApp.get_counter).return_value == 7
+    assert len(dryruns) == 4
@@ -0,0 +1,48 @@
+from typing import Iterator
+
+
+class BitmapReader:
+    """
+    BitmapReader decodes the bits of a ``Bitmap`` from the bytes of the blob holding it
+
+    Bits are numbered from the high bit of the first byte, the same order as on chain.
+
+    Args:
+        data: The bytes of the blob, as read by a ``BlobReader`` or from the box
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data) * 8
+
+    def __getitem__(self, bit: int) -> bool:
+        return self.get_bit(bit) == 1
+
+    def get_bit(self, bit: int) -> int:
+        """returns the bit at the index passed, 0 or 1"""
+        if not 0 <= bit < len(self):
+            raise IndexError(f"bit {bit} out of bounds for bitmap of {len(self)}")
+        return (self.data[bit // 8] >> (7 - bit % 8)) & 1
+
+    def set_bits(self, start: int = 0, stop: int = None) -> Iterator[int]:
+        """yields the index of each set bit between start and stop, skipping zero bytes"""
+        if stop is None:
+            stop = len(self)
+
+        for idx in range(start // 8, (stop + 7) // 8):
+            if not (byte := self.data[idx]):
+                continue
+            for offset in range(8):
+                bit = idx * 8 + offset
+                if start <= bit < stop and byte & (0x80 >> offset):
+                    yield bit
+
+    def count(self, start: int = 0, stop: int = None) -> int:
+        """returns the number of set bits between start and stop"""
+        return sum(1 for _ in self.set_bits(start, stop))
+
+    def to_list(self) -> list[int]:
+        """returns every bit as a list of 0 and 1"""
+        return [self.get_bit(bit) for bit in range(len(self))]
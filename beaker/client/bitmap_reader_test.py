@@ -0,0 +1,59 @@
+import pytest
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from beaker.application import Application
+from beaker.state import AccountStateBlob, ApplicationStateBlob, BoxStateBlob
+from beaker.client.application_client import ApplicationClient
+from beaker.client.bitmap_reader import BitmapReader
+from beaker.client.blob_reader_test import paged
+from beaker.lib.datastructures import Bitmap
+from beaker.lib.storage.blob import blob_page_size
+
+APP_ID = 11
+
+
+class BitmapApp(Application):
+    gblob = ApplicationStateBlob(keys=2)
+    gbits = Bitmap(gblob)
+
+    lblob = AccountStateBlob(keys=2)
+    lbits = Bitmap(lblob)
+
+    bblob = BoxStateBlob(size=16)
+    bbits = Bitmap(bblob)
+
+
+def test_bitmap_reader():
+    reader = BitmapReader(bytes([0b10000001, 0, 0b01000000]))
+
+    assert len(reader) == 24
+    assert reader.get_bit(0) == 1 and reader.get_bit(7) == 1
+    assert reader[17] and not reader[16]
+    assert list(reader.set_bits()) == [0, 7, 17]
+    assert list(reader.set_bits(1, 17)) == [7]
+    assert reader.count() == 3
+    assert reader.to_list()[:8] == [1, 0, 0, 0, 0, 0, 0, 1]
+
+    with pytest.raises(IndexError):
+        reader.get_bit(24)
+
+
+def test_app_client_get_bitmap(stub_algod):
+    sk, addr = generate_account()
+    gdata = bytearray(2 * blob_page_size)
+    gdata[blob_page_size] = 0x80
+    ldata = bytes([0x01]) + bytes(2 * blob_page_size - 1)
+
+    stub_algod.global_state[APP_ID] = paged(bytes(gdata), [0, 1])
+    stub_algod.local_state[(APP_ID, addr)] = paged(ldata, [0, 1])
+    stub_algod.boxes[APP_ID] = {b"bblob": bytes(15) + b"\x03"}
+
+    app = BitmapApp()
+    ac = ApplicationClient(
+        stub_algod, app, app_id=APP_ID, signer=AccountTransactionSigner(sk)
+    )
+
+    assert list(ac.get_bitmap(app.gbits).set_bits()) == [blob_page_size * 8]
+    assert list(ac.get_bitmap(app.lbits, addr).set_bits()) == [7]
+    assert list(ac.get_bitmap(app.bbits).set_bits()) == [126, 127]
@@ -0,0 +1,114 @@
+from base64 import b64decode, b64encode
+from typing import Any
+
+from beaker.lib.storage.blob import blob_page_size
+
+#: Max bytes of a single write call, the 2k of app args less the method selector,
+#: uint64 start index and the length prefix of the buffer
+MAX_BLOB_WRITE = 2048 - 4 - 8 - 2
+
+
+class BlobReader:
+    """
+    BlobReader reconstructs a blob stored across the pages of an application or account state
+
+    Pages are kept base64 encoded as returned by algod and only decoded when a read touches them.
+    Pages that are not present (not yet written) read as zero bytes.
+
+    Args:
+        state: The key-value list as returned by algod for global or local state
+        byte_keys: The single byte keys of the blob, in order
+    """
+
+    def __init__(self, state: list[dict[str, Any]], byte_keys: list[bytes]):
+        self.byte_keys = byte_keys
+        self.page_size = blob_page_size
+
+        by_key = {sv["key"]: sv["value"] for sv in state}
+
+        # Avoid decoding the keys, we know what they should look like encoded
+        self._encoded_pages: list[str | None] = []
+        for bk in byte_keys:
+            value = by_key.get(b64encode(bk).decode("utf-8"))
+            self._encoded_pages.append(value["bytes"] if value is not None else None)
+
+        self._pages: list[bytes | None] = [None] * len(byte_keys)
+
+    def __len__(self) -> int:
+        return len(self.byte_keys) * self.page_size
+
+    def page(self, idx: int) -> bytes:
+        """returns the decoded page at the index passed"""
+        if (page := self._pages[idx]) is not None:
+            return page
+
+        encoded = self._encoded_pages[idx]
+        page = b64decode(encoded) if encoded is not None else b""
+        # Pad in case the page was stored short or never written
+        page = page.ljust(self.page_size, b"\x00")
+
+        self._pages[idx] = page
+        return page
+
+    def read(self, start: int = 0, stop: int = None) -> bytes:
+        """reads the bytes between start and stop, only decoding the pages in that range"""
+        if stop is None:
+            stop = len(self)
+
+        if start < 0 or stop > len(self) or start > stop:
+            raise IndexError(
+                f"range {start}:{stop} out of bounds for blob of {len(self)}"
+            )
+
+        if start == stop:
+            return b""
+
+        first_page = start // self.page_size
+        last_page = (stop - 1) // self.page_size
+
+        buff = b"".join(self.page(idx) for idx in range(first_page, last_page + 1))
+
+        offset = first_page * self.page_size
+        return buff[start - offset : stop - offset]
+
+    def read_byte(self, idx: int) -> int:
+        """reads the single byte at the index passed"""
+        return self.page(idx // self.page_size)[idx % self.page_size]
+
+    def to_bytes(self) -> bytes:
+        """returns the entire blob"""
+        return self.read()
+
+    def to_memoryview(self) -> memoryview:
+        """returns a read only view over the entire blob"""
+        return memoryview(self.to_bytes())
+
+    def plan_writes(
+        self, buff: bytes, start: int = 0, max_write: int = MAX_BLOB_WRITE
+    ) -> list[tuple[int, bytes]]:
+        """
+        plan_writes returns the minimal list of (start, bytes) writes that make the
+        blob hold `buff` at `start`, skipping any bytes that already match.
+
+        Each write is at most `max_write` bytes so it fits in a single app call.
+        """
+        if max_write <= 0:
+            raise ValueError("max_write must be positive")
+
+        current = self.read(start, start + len(buff))
+
+        changed = [idx for idx in range(len(buff)) if buff[idx] != current[idx]]
+
+        writes: list[tuple[int, bytes]] = []
+
+        # Greedily cover the changed bytes with as few windows as possible,
+        # trimming each window down to the last changed byte it covers
+        pos = 0
+        while pos < len(changed):
+            first = changed[pos]
+            while pos < len(changed) and changed[pos] < first + max_write:
+                pos += 1
+            last = changed[pos - 1]
+            writes.append((start + first, buff[first : last + 1]))
+
+        return writes
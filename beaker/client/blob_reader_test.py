@@ -0,0 +1,108 @@
+import pytest
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from beaker.application import Application
+from beaker.state import AccountStateBlob, ApplicationStateBlob
+from beaker.client.application_client import ApplicationClient
+from beaker.client.blob_reader import BlobReader
+from beaker.client.conftest import encode_state
+from beaker.lib.storage.blob import blob_page_size
+
+APP_ID = 9
+
+
+class BlobApp(Application):
+    gblob = ApplicationStateBlob(keys=[2, 3, 4])
+    lblob = AccountStateBlob(keys=4)
+
+
+def paged(data: bytes, keys: list[int]) -> dict[bytes, bytes | int]:
+    return {
+        bytes([k]): data[i * blob_page_size : (i + 1) * blob_page_size]
+        for i, k in enumerate(keys)
+    }
+
+
+def test_blob_reader_read():
+    data = bytes(x % 251 for x in range(blob_page_size * 3))
+    reader = BlobReader(
+        encode_state(paged(data, [2, 3, 4])), [b"\x02", b"\x03", b"\x04"]
+    )
+
+    assert len(reader) == len(data)
+    assert reader.to_bytes() == data
+    assert bytes(reader.to_memoryview()[10:20]) == data[10:20]
+    assert reader.read_byte(200) == data[200]
+
+    for start, stop in [(0, 1), (120, 140), (126, 254), (0, 381), (300, 300)]:
+        fresh = BlobReader(
+            encode_state(paged(data, [2, 3, 4])), [b"\x02", b"\x03", b"\x04"]
+        )
+        assert fresh.read(start, stop) == data[start:stop]
+
+    with pytest.raises(IndexError):
+        reader.read(0, len(data) + 1)
+
+
+def test_blob_reader_only_decodes_needed_pages():
+    data = bytes(range(127)) * 3
+    reader = BlobReader(
+        encode_state(paged(data, [0, 1, 2])), [b"\x00", b"\x01", b"\x02"]
+    )
+    reader.read(130, 140)
+    assert reader._pages[0] is None and reader._pages[2] is None
+    assert reader._pages[1] is not None
+
+
+def test_blob_reader_missing_pages_are_zero():
+    reader = BlobReader(encode_state({b"\x00": b"\x01" * 127}), [b"\x00", b"\x01"])
+    assert reader.read(125, 130) == b"\x01\x01\x00\x00\x00"
+
+
+def test_plan_writes():
+    data = bytes(blob_page_size * 3)
+    reader = BlobReader(
+        encode_state(paged(data, [0, 1, 2])), [b"\x00", b"\x01", b"\x02"]
+    )
+
+    # Nothing changed, nothing to write
+    assert reader.plan_writes(bytes(50), start=10) == []
+
+    desired = bytearray(100)
+    desired[5] = 1
+    desired[9] = 2
+    desired[90] = 3
+    assert reader.plan_writes(bytes(desired), start=20) == [(25, bytes(desired[5:91]))]
+
+    # Small max write forces splitting, but the windows hug the changes
+    assert reader.plan_writes(bytes(desired), start=20, max_write=10) == [
+        (25, bytes(desired[5:10])),
+        (110, b"\x03"),
+    ]
+
+    # The plan applied to the current contents produces the desired contents
+    full = bytes((i * 7) % 256 for i in range(len(data)))
+    result = bytearray(data)
+    for start, buff in reader.plan_writes(full, max_write=64):
+        assert len(buff) <= 64
+        result[start : start + len(buff)] = buff
+    assert bytes(result) == full
+
+
+def test_app_client_blob_readers(stub_algod):
+    sk, addr = generate_account()
+    gdata = bytes(x % 256 for x in range(3 * blob_page_size))
+    ldata = bytes(x % 13 for x in range(4 * blob_page_size))
+
+    stub_algod.global_state[APP_ID] = {**paged(gdata, [2, 3, 4]), b"other": 1}
+    stub_algod.local_state[(APP_ID, addr)] = paged(ldata, [0, 1, 2, 3])
+
+    app = BlobApp()
+    ac = ApplicationClient(
+        stub_algod, app, app_id=APP_ID, signer=AccountTransactionSigner(sk)
+    )
+
+    assert ac.get_application_blob(app.gblob).to_bytes() == gdata
+    assert ac.get_account_blob(app.lblob).read(100, 300) == ldata[100:300]
+    assert ac.get_account_blob(app.lblob, addr).read_byte(3) == ldata[3]
@@ -0,0 +1,91 @@
+import pytest
+import pyteal as pt
+from algosdk.account import generate_account
+
+from beaker.application import Application
+from beaker.client.application_client import ApplicationClient
+from beaker.decorators import external
+from beaker.lib.datastructures import HashMap
+from beaker.testing import LocalApp
+
+APP_ID = 5
+
+Point = pt.abi.Tuple2[pt.abi.Uint64, pt.abi.Uint64]
+
+scores = HashMap(pt.abi.AddressTypeSpec(), pt.abi.Uint64TypeSpec(), prefix="s")
+points = HashMap(
+    pt.abi.type_spec_from_annotation(Point), pt.abi.StringTypeSpec(), prefix="p"
+)
+hashed = HashMap(
+    pt.abi.Uint64TypeSpec(), pt.abi.Uint64TypeSpec(), prefix="h", hash_keys=True
+)
+
+
+def test_get_map(stub_algod):
+    addrs = [generate_account()[1] for _ in range(20)]
+    stub_algod.boxes[APP_ID] = {
+        scores.name_for(addr): i.to_bytes(8, "big") for i, addr in enumerate(addrs)
+    }
+    stub_algod.boxes[APP_ID][points.name_for([1, 2])] = b"\x00\x03abc"
+    stub_algod.boxes[APP_ID][b"other"] = b"\x00"
+
+    ac = ApplicationClient(stub_algod, Application(), app_id=APP_ID)
+    assert ac.get_box_contents("other") == b"\x00"
+    assert len(ac.get_box_names()) == 22
+
+    stub_algod.calls.clear()
+    assert ac.get_map(scores) == {addr: i for i, addr in enumerate(addrs)}
+    assert stub_algod.calls == {
+        "application_boxes": 1,
+        "application_box_by_name": 20,
+    }
+
+    # Tuple keys come back as tuples so they can be dict keys
+    assert ac.get_map(points) == {(1, 2): "abc"}
+
+    # Only the keys asked for, missing ones are left out
+    assert ac.get_map(scores, keys=addrs[:2] + [generate_account()[1]]) == {
+        addrs[0]: 0,
+        addrs[1]: 1,
+    }
+
+    stub_algod.boxes[APP_ID][hashed.name_for(7)] = (70).to_bytes(8, "big")
+    assert ac.get_map(hashed, keys=[7, 8]) == {7: 70}
+    with pytest.raises(ValueError):
+        ac.get_map(hashed)
+
+    unprefixed = HashMap(pt.abi.Uint64TypeSpec(), pt.abi.Uint64TypeSpec())
+    stub_algod.boxes[APP_ID][unprefixed.name_for(3)] = (30).to_bytes(8, "big")
+    assert ac.get_map(unprefixed, keys=[3]) == {3: 30}
+    with pytest.raises(ValueError):
+        ac.get_map(unprefixed)
+
+
+class Scores(Application):
+    scores = HashMap(pt.abi.AddressTypeSpec(), pt.abi.Uint64TypeSpec(), prefix="s")
+    tags = HashMap(pt.abi.Uint64TypeSpec(), pt.abi.StringTypeSpec(), prefix="t")
+
+    @external
+    def set_score(self, addr: pt.abi.Address, score: pt.abi.Uint64):
+        return self.scores.put(addr, score)
+
+    @external
+    def set_tag(self, id: pt.abi.Uint64, tag: pt.abi.String):
+        return self.tags.put(id, tag)
+
+
+def test_get_map_from_app(stub_algod):
+    # Boxes written by the app's program read back through the client
+    app = Scores()
+    local = LocalApp(app)
+    addrs = [generate_account()[1] for _ in range(5)]
+    for i, addr in enumerate(addrs):
+        local.call(Scores.set_score, addr=addr, score=i * 10)
+    local.call(Scores.set_tag, id=3, tag="three")
+    local.call(Scores.set_tag, id=3, tag="still three")
+
+    stub_algod.boxes[APP_ID] = dict(local.snapshot.boxes)
+    ac = ApplicationClient(stub_algod, app, app_id=APP_ID)
+    assert len(ac.get_box_names()) == 6
+    assert ac.get_map(app.scores) == {addr: i * 10 for i, addr in enumerate(addrs)}
+    assert ac.get_map(app.tags) == {3: "still three"}
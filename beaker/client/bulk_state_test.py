@@ -0,0 +1,52 @@
+from algosdk.account import generate_account
+
+from beaker.client.application_client import ApplicationClient
+from beaker.client.state_view_test import ViewApp
+
+APP_ID = 7
+
+
+def opt_in_accounts(stub_algod, n: int) -> list[str]:
+    accts = []
+    for idx in range(n):
+        _, addr = generate_account()
+        stub_algod.local_state[(APP_ID, addr)] = {b"nick": f"user{idx}".encode()}
+        accts.append(addr)
+    return accts
+
+
+def test_get_account_states(stub_algod):
+    accts = opt_in_accounts(stub_algod, 40)
+    stub_algod.latency = 0.01
+
+    ac = ApplicationClient(stub_algod, ViewApp(), app_id=APP_ID)
+    states = ac.get_account_states(accts, max_workers=4)
+
+    assert list(states.keys()) == accts, "Should preserve the order passed"
+    for idx, addr in enumerate(accts):
+        assert states[addr] == {"nick": f"user{idx}"}
+
+    assert stub_algod.calls["account_application_info"] == len(accts)
+    assert 1 < stub_algod.max_in_flight <= 4, "Should be concurrent but bounded"
+
+    raw = ac.get_account_states(accts[:1], raw=True)
+    assert raw[accts[0]] == {b"nick": b"user0"}
+
+
+def test_iter_account_states(stub_algod, stub_indexer):
+    accts = opt_in_accounts(stub_algod, 25)
+    # Another app's opted in accounts should not show up
+    stub_algod.local_state[(APP_ID + 1, generate_account()[1])] = {b"x": 1}
+
+    ac = ApplicationClient(stub_algod, ViewApp(), app_id=APP_ID)
+    states = ac.iter_account_states(stub_indexer, page_size=10)
+
+    first_addr, _ = next(states)
+    assert stub_indexer.pages == 1, "Should be lazy"
+
+    rest = dict(states)
+    assert stub_indexer.pages == 3
+    assert set(rest.keys()) | {first_addr} == set(accts)
+    assert len(rest) == len(accts) - 1
+    for addr, state in rest.items():
+        assert state == {"nick": f"user{accts.index(addr)}"}
@@ -0,0 +1,222 @@
+import threading
+import time
+from base64 import b64encode
+from collections import Counter
+from typing import Any
+
+import pytest
+from algosdk.error import AlgodHTTPError
+from algosdk.future import transaction
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.indexer import IndexerClient
+
+
+def encode_state(state: dict[bytes, bytes | int]) -> list[dict[str, Any]]:
+    """encodes a raw key=>value mapping the way algod returns it"""
+    encoded = []
+    for k, v in state.items():
+        if isinstance(v, int):
+            value = {"type": 2, "uint": v, "bytes": ""}
+        else:
+            value = {"type": 1, "uint": 0, "bytes": b64encode(v).decode("utf-8")}
+        encoded.append({"key": b64encode(k).decode("utf-8"), "value": value})
+    return encoded
+
+
+class StubAlgodClient(AlgodClient):
+    """StubAlgodClient answers the algod calls the client tests need from memory and counts them"""
+
+    def __init__(self):
+        super().__init__("a" * 64, "http://stub.invalid")
+        self.round = 1
+        self.calls: Counter = Counter()
+        self.global_state: dict[int, dict[bytes, bytes | int]] = {}
+        self.local_state: dict[tuple[int, str], dict[bytes, bytes | int]] = {}
+        #: round => msgpack encoded block
+        self.blocks: dict[int, bytes] = {}
+        #: txid => pending transaction info returned once the txn is sent
+        self.pending: dict[str, dict[str, Any]] = {}
+        self.sent: list[Any] = []
+        #: app id => box name => contents
+        self.boxes: dict[int, dict[bytes, bytes]] = {}
+        #: app id => (approval, clear) programs, set by creates and updates sent
+        self.programs: dict[int, tuple[bytes, bytes]] = {}
+        self.next_app_id = 1000
+
+        #: seconds to sleep in calls where concurrency is measured
+        self.latency = 0.0
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def record(self, name: str):
+        with self.lock:
+            self.calls[name] += 1
+
+    def algod_request(self, *args, **kwargs):
+        raise Exception(f"StubAlgodClient does not handle request: {args}")
+
+    def status(self, **kwargs):
+        self.record("status")
+        return {"last-round": self.round}
+
+    def compile(self, source, source_map=False, **kwargs):
+        self.record("compile")
+        time.sleep(self.latency)
+        lines = source.count("\n") + 1
+        return {
+            "result": b64encode(source.encode("utf-8")).decode("utf-8"),
+            "hash": "A" * 58,
+            "sourcemap": {
+                "version": 3,
+                "sources": [],
+                "names": [],
+                "mappings": ";".join(["AAAA"] + ["AACA"] * (lines - 1)),
+            },
+        }
+
+    def suggested_params(self, **kwargs):
+        self.record("suggested_params")
+        return transaction.SuggestedParams(
+            fee=1000,
+            first=self.round,
+            last=self.round + 1000,
+            gh="a" * 44,
+            flat_fee=True,
+        )
+
+    def status_after_block(self, block_num, **kwargs):
+        self.record("status_after_block")
+        if block_num + 1 not in self.blocks:
+            raise Exception(f"StubAlgodClient has no block after {block_num}")
+        return {"last-round": block_num + 1}
+
+    def block_info(self, block=None, response_format="json", round_num=None, **kwargs):
+        self.record("block_info")
+        return self.blocks[round_num if round_num is not None else block]
+
+    def send_transactions(self, txns, **kwargs):
+        self.record("send_transactions")
+        self.sent.extend(txns)
+        for stxn in txns:
+            txn = stxn.transaction
+            if isinstance(txn, transaction.ApplicationCallTxn) and txn.approval_program:
+                app_id = txn.index
+                if app_id == 0:
+                    app_id = self.next_app_id
+                    self.next_app_id += 1
+                self.programs[app_id] = (txn.approval_program, txn.clear_program)
+                self.pending[stxn.get_txid()] = {
+                    "confirmed-round": self.round,
+                    "application-index": app_id,
+                }
+        return txns[0].get_txid()
+
+    def pending_transaction_info(self, transaction_id, **kwargs):
+        self.record("pending_transaction_info")
+        return self.pending.get(transaction_id, {"confirmed-round": self.round})
+
+    def application_info(self, application_id, **kwargs):
+        self.record("application_info")
+        params: dict[str, Any] = {
+            "global-state": encode_state(self.global_state.get(application_id, {}))
+        }
+        if application_id in self.programs:
+            approval, clear = self.programs[application_id]
+            params["approval-program"] = b64encode(approval).decode("utf-8")
+            params["clear-state-program"] = b64encode(clear).decode("utf-8")
+        elif application_id >= 1000:
+            # Ids handed out by creates only exist once created
+            raise AlgodHTTPError("application does not exist", 404)
+        return {"id": application_id, "params": params}
+
+    def application_boxes(self, application_id, limit=0, **kwargs):
+        self.record("application_boxes")
+        return {
+            "boxes": [
+                {"name": b64encode(name).decode("utf-8")}
+                for name in self.boxes.get(application_id, {})
+            ]
+        }
+
+    def application_box_by_name(self, application_id, box_name, **kwargs):
+        self.record("application_box_by_name")
+        boxes = self.boxes.get(application_id, {})
+        if box_name not in boxes:
+            raise AlgodHTTPError("box not found", 404)
+        return {
+            "name": b64encode(box_name).decode("utf-8"),
+            "value": b64encode(boxes[box_name]).decode("utf-8"),
+        }
+
+    def account_application_info(self, address, application_id, **kwargs):
+        self.record("account_application_info")
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+        return {
+            "round": self.round,
+            "app-local-state": {
+                "id": application_id,
+                "key-value": encode_state(
+                    self.local_state.get((application_id, address), {})
+                ),
+            },
+        }
+
+
+class StubIndexerClient(IndexerClient):
+    """StubIndexerClient pages through the local state held by a StubAlgodClient"""
+
+    def __init__(self, algod: StubAlgodClient):
+        super().__init__("a" * 64, "http://stub.invalid")
+        self.algod = algod
+        self.pages = 0
+
+    def indexer_request(self, *args, **kwargs):
+        raise Exception(f"StubIndexerClient does not handle request: {args}")
+
+    def accounts(self, application_id=None, limit=None, next_page=None, **kwargs):
+        self.pages += 1
+
+        opted_in = sorted(
+            addr
+            for (app_id, addr) in self.algod.local_state
+            if app_id == application_id
+        )
+        start = int(next_page) if next_page else 0
+        stop = start + (limit or len(opted_in))
+
+        page: dict[str, Any] = {
+            "current-round": self.algod.round,
+            "accounts": [
+                {
+                    "address": addr,
+                    "apps-local-state": [
+                        {
+                            "id": application_id,
+                            "key-value": encode_state(
+                                self.algod.local_state[(application_id, addr)]
+                            ),
+                        }
+                    ],
+                }
+                for addr in opted_in[start:stop]
+            ],
+        }
+        if stop < len(opted_in):
+            page["next-token"] = str(stop)
+        return page
+
+
+@pytest.fixture
+def stub_algod() -> StubAlgodClient:
+    return StubAlgodClient()
+
+
+@pytest.fixture
+def stub_indexer(stub_algod: StubAlgodClient) -> StubIndexerClient:
+    return StubIndexerClient(stub_algod)
@@ -0,0 +1,58 @@
+import pytest
+import pyteal as pt
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from beaker.application import Application
+from beaker.client.application_client import ApplicationClient
+from beaker.decorators import create
+from beaker.state import ApplicationStateValue
+
+
+class Market(Application):
+    pass
+
+
+class OwnedMarket(Application):
+    owner_id = ApplicationStateValue(pt.TealType.uint64)
+
+    @create
+    def create(self, owner_id: pt.abi.Uint64):
+        return self.owner_id.set(owner_id.get())
+
+
+def client(stub_algod, app: Application) -> ApplicationClient:
+    sk, _ = generate_account()
+    return ApplicationClient(stub_algod, app, signer=AccountTransactionSigner(sk))
+
+
+def test_create_many(stub_algod):
+    ac = client(stub_algod, Market())
+    ac.build()
+
+    app_ids = ac.create_many([{} for _ in range(20)])
+
+    assert app_ids == list(range(1000, 1020))
+    assert ac.app_id == 0, "Client should still point at the same app"
+    assert stub_algod.calls["suggested_params"] == 1
+    assert stub_algod.calls["send_transactions"] == 2, "Expected groups of 16 and 4"
+
+    txns = [stxn.transaction for stxn in stub_algod.sent]
+    assert [t.fee for t in txns[:16]] == [16000] + [0] * 15
+    assert [t.fee for t in txns[16:]] == [4000] + [0] * 3
+    assert len({t.lease for t in txns}) == 20, "Identical creates need unique leases"
+    assert len({t.group for t in txns}) == 2
+
+
+def test_create_many_method(stub_algod):
+    ac = client(stub_algod, OwnedMarket())
+
+    app_ids = ac.create_many([{"owner_id": i} for i in range(5)], group_size=2)
+
+    assert app_ids == list(range(1000, 1005))
+    assert stub_algod.calls["send_transactions"] == 3
+    owners = [stxn.transaction.app_args[1] for stxn in stub_algod.sent]
+    assert owners == [i.to_bytes(8, "big") for i in range(5)]
+
+    with pytest.raises(ValueError):
+        ac.create_many([{}], group_size=17)
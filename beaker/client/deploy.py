@@ -0,0 +1,42 @@
+from base64 import b64decode
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from algosdk.encoding import checksum
+
+
+class DeployAction(str, Enum):
+    """DeployAction is what a deploy did to bring the app on chain in line with the local programs"""
+
+    Create = "create"
+    Update = "update"
+    Skip = "skip"
+
+
+@dataclass
+class DeployResult:
+    """DeployResult describes the outcome of ``ApplicationClient.deploy``"""
+
+    #: what was done
+    action: DeployAction
+    #: the id of the app deployed
+    app_id: int
+    #: the address of the app deployed
+    app_addr: str
+    #: the id of the create or update transaction, None if skipped
+    txid: str | None = None
+
+
+def program_hash(program: bytes) -> bytes:
+    """returns the hash of a compiled program, the same as its logic sig address would be derived from"""
+    return checksum(b"Program" + program)
+
+
+def onchain_program_hashes(app_info: dict[str, Any]) -> tuple[bytes, bytes]:
+    """returns the hashes of the approval and clear programs from an `application_info` response"""
+    params = app_info["params"]
+    return (
+        program_hash(b64decode(params["approval-program"])),
+        program_hash(b64decode(params["clear-state-program"])),
+    )
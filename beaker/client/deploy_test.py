@@ -0,0 +1,67 @@
+import pyteal as pt
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from beaker.application import Application
+from beaker.client.application_client import ApplicationClient
+from beaker.client.deploy import DeployAction
+from beaker.decorators import external
+
+
+class DeployApp(Application):
+    @external
+    def hello(self, *, output: pt.abi.Uint64):
+        return output.set(pt.Int(1))
+
+
+class DeployAppV2(DeployApp):
+    @external
+    def goodbye(self, *, output: pt.abi.Uint64):
+        return output.set(pt.Int(2))
+
+
+def client(stub_algod, app: Application, app_id: int = 0) -> ApplicationClient:
+    sk, _ = generate_account()
+    return ApplicationClient(
+        stub_algod, app, app_id=app_id, signer=AccountTransactionSigner(sk)
+    )
+
+
+def test_deploy(stub_algod):
+    ac = client(stub_algod, DeployApp())
+
+    result = ac.deploy()
+    assert result.action == DeployAction.Create
+    assert result.app_id == ac.app_id == stub_algod.next_app_id - 1
+    assert result.txid is not None
+
+    # Nothing changed, cached from the create so algod isn't asked
+    sent = len(stub_algod.sent)
+    assert ac.deploy().action == DeployAction.Skip
+    assert stub_algod.calls["application_info"] == 0
+    assert len(stub_algod.sent) == sent
+
+    # A new client for the same app reads the programs once
+    ac2 = client(stub_algod, DeployApp(), app_id=result.app_id)
+    assert ac2.deploy().action == DeployAction.Skip
+    assert ac2.deploy().action == DeployAction.Skip
+    assert stub_algod.calls["application_info"] == 1
+
+    # Changed programs are updated in place
+    ac3 = client(stub_algod, DeployAppV2(), app_id=result.app_id)
+    updated = ac3.deploy()
+    assert updated.action == DeployAction.Update
+    assert updated.app_id == result.app_id
+    assert stub_algod.programs[result.app_id][0] == ac3.approval_binary
+    assert ac3.deploy().action == DeployAction.Skip
+
+    # Stale cache, refresh picks up the update made elsewhere
+    assert ac2.deploy().action == DeployAction.Skip
+    assert ac2.deploy(refresh=True).action == DeployAction.Update
+
+
+def test_deploy_missing_app(stub_algod):
+    ac = client(stub_algod, DeployApp(), app_id=5000)
+    result = ac.deploy()
+    assert result.action == DeployAction.Create
+    assert result.app_id != 5000
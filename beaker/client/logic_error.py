@@ -1,5 +1,5 @@
 import re
-from copy import copy
+from functools import cached_property
 from algosdk.source_map import SourceMap
 
 LOGIC_ERROR = "TransactionPool.Remember: transaction ([A-Z0-9]+): logic eval error: (.*). Details: pc=([0-9]+), opcodes=.*"
@@ -18,6 +18,13 @@ def parse_logic_error(error_str: str) -> tuple[str, str, int]:
 
 
 class LogicException(Exception):
+    """
+    LogicException wraps a logic eval error returned by algod with the TEAL source line that failed
+
+    Only the pc is parsed and mapped to a line on construction, the program is split and the
+    trace built when the exception is rendered so raising it is cheap.
+    """
+
     def __init__(
         self,
         logic_error: Exception,
@@ -29,17 +36,25 @@ class LogicException(Exception):
 
         self.program = program
         self.map = map
-        self.lines = program.split("\n")
 
         self.txid, self.msg, self.pc = parse_logic_error(self.logic_error_str)
         self.line_no = self.map.get_line_for_pc(self.pc)
 
+    @cached_property
+    def lines(self) -> list[str]:
+        return self.program.split("\n")
+
     def __str__(self):
         return f"Txn {self.txid} had error '{self.msg}' at PC {self.pc} and Source Line {self.line_no}: \n\n\t{self.trace()}"
 
     def trace(self, lines: int = 5) -> str:
-        program_lines = copy(self.lines)
-        program_lines[self.line_no] += "\t\t<-- Error"
+        if self.line_no is None:
+            return ""
+
         lines_before = max(0, self.line_no - lines)
-        lines_after = min(len(program_lines), self.line_no + lines)
-        return "\n\t".join(program_lines[lines_before:lines_after])
+        lines_after = min(len(self.lines), self.line_no + lines)
+
+        # Only copy the lines being shown
+        program_lines = self.lines[lines_before:lines_after]
+        program_lines[self.line_no - lines_before] += "\t\t<-- Error"
+        return "\n\t".join(program_lines)
@@ -0,0 +1,56 @@
+from algosdk.source_map import SourceMap
+
+from beaker.application import Application
+from beaker.client.application_client import ApplicationClient
+from beaker.client.logic_error import LogicException
+
+PROGRAM = "\n".join(["#pragma version 7", "int 1", "int 0", "assert", "return"])
+
+# One pc per line, each advancing the source line by one
+SOURCE_MAP = {
+    "version": 3,
+    "sources": [],
+    "names": [],
+    "mappings": ";".join(["AAAA"] + ["AACA"] * 4),
+}
+
+ERROR = Exception(
+    "TransactionPool.Remember: transaction ABC123: logic eval error: assert failed pc=3. Details: pc=3, opcodes=int 0; assert"
+)
+
+
+def test_logic_exception_lazy():
+    le = LogicException(ERROR, PROGRAM, SourceMap(SOURCE_MAP))
+    assert (le.txid, le.pc, le.line_no) == ("ABC123", 3, 3)
+
+    # The program isn't split until the trace is needed
+    assert "lines" not in le.__dict__
+    assert le.trace(1) == "int 0\n\tassert\t\t<-- Error"
+    assert "lines" in le.__dict__
+    assert le.lines[3] == "assert", "Trace must not modify the program lines"
+
+    assert "Source Line 3" in str(le)
+
+
+def test_logic_exception_unknown_pc():
+    err = Exception(str(ERROR).replace("pc=3", "pc=100"))
+    le = LogicException(err, PROGRAM, SourceMap(SOURCE_MAP))
+    assert le.line_no is None
+    assert le.trace() == ""
+
+
+def test_wrap_source_map(stub_algod):
+    app = Application()
+    ac = ApplicationClient(stub_algod, app)
+
+    # Nothing built yet, a source map is compiled once for the client
+    assert isinstance(ac.wrap_approval_exception(ERROR), LogicException)
+    assert isinstance(ac.wrap_approval_exception(ERROR), LogicException)
+    assert stub_algod.calls["compile"] == 1
+
+    stub_algod.calls.clear()
+    app._set_compiled(b"", SourceMap(SOURCE_MAP), b"", SourceMap(SOURCE_MAP))
+    le = ApplicationClient(stub_algod, app).wrap_approval_exception(ERROR)
+    assert isinstance(le, LogicException)
+    assert le.map is app.approval_src_map
+    assert stub_algod.calls["compile"] == 0
@@ -0,0 +1,189 @@
+from operator import itemgetter
+from typing import Any, Callable, cast
+
+from algosdk import abi
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    TransactionWithSigner,
+)
+from algosdk.encoding import encode_address
+from algosdk.error import AtomicTransactionComposerError
+
+from beaker.decorators import DefaultArgument, DefaultArgumentClass, MethodHints
+
+#: How each argument is encoded
+ARG_VALUE = 0
+ARG_TXN = 1
+ARG_ACCOUNT = 2
+ARG_ASSET = 3
+ARG_APPLICATION = 4
+
+_REFERENCE_KINDS = {
+    abi.ABIReferenceType.ACCOUNT: ARG_ACCOUNT,
+    abi.ABIReferenceType.ASSET: ARG_ASSET,
+    abi.ABIReferenceType.APPLICATION: ARG_APPLICATION,
+}
+
+# Reference args are encoded as the uint8 index into the foreign array
+_REFERENCE_CODEC = abi.UintType(8)
+
+#: Max app args less the selector, past this the remaining args are packed into a tuple
+MAX_ENCODED_ARGS = AtomicTransactionComposer.MAX_APP_ARG_LIMIT - 1
+
+
+class ArgPlan:
+    """ArgPlan holds everything needed to turn one keyword argument into its encoded form"""
+
+    def __init__(self, method_arg: abi.Argument, hints: MethodHints):
+        self.name = method_arg.name
+        self.type = method_arg.type
+
+        self.codec: abi.ABIType | None = None
+        if abi.is_abi_transaction_type(method_arg.type):
+            self.kind = ARG_TXN
+        elif abi.is_abi_reference_type(method_arg.type):
+            self.kind = _REFERENCE_KINDS[cast(str, method_arg.type)]
+            self.codec = _REFERENCE_CODEC
+        else:
+            self.kind = ARG_VALUE
+            self.codec = cast(abi.ABIType, method_arg.type)
+
+        #: pulls the struct fields out of a dict argument, in tuple order
+        self.struct_getter: Callable[[dict], list] | None = None
+        if hints.structs is not None and self.name in hints.structs:
+            elems = cast(list[tuple[str, str]], hints.structs[self.name]["elements"])
+            self.struct_getter = _struct_getter([name for name, _ in elems])
+
+        #: a constant default resolved once, or the DefaultArgument to resolve per call
+        self.default: Any = None
+        self.has_default = False
+        if hints.default_arguments is not None and self.name in hints.default_arguments:
+            self.has_default = True
+            default_arg = hints.default_arguments[self.name]
+            if (
+                default_arg is not None
+                and default_arg.resolvable_class == DefaultArgumentClass.Constant
+            ):
+                self.default = default_arg.resolve_hint()
+            else:
+                self.default = default_arg
+
+    def argument(self, kwargs: dict[str, Any], resolve: Callable) -> Any:
+        """returns the value to pass for this argument, flattening structs and resolving defaults"""
+        if self.name in kwargs:
+            argument = kwargs[self.name]
+            if type(argument) is dict:
+                if self.struct_getter is None:
+                    raise Exception(f"Name {self.name} name in struct hints")
+                return self.struct_getter(argument)
+            return argument
+
+        if not self.has_default:
+            raise Exception(f"Unspecified argument: {self.name}")
+
+        if isinstance(self.default, DefaultArgument):
+            return resolve(self.default)
+        return self.default
+
+
+class MethodPlan:
+    """
+    MethodPlan is built once per method an ApplicationClient calls and holds the
+    selector, argument order, struct field order, defaults and ABI codecs so that
+    building a call doesn't need to look any of them up again.
+    """
+
+    def __init__(self, method: abi.Method, hints: MethodHints):
+        self.method = method
+        self.hints = hints
+        self.selector = method.get_selector()
+        self.txn_calls = method.get_txn_calls()
+        self.args = [ArgPlan(arg, hints) for arg in method.args]
+
+        # Non-transaction args end up in app args, more than fit are packed into a tuple
+        encoded = [a for a in self.args if a.kind != ARG_TXN]
+        self.packed_types: abi.TupleType | None = None
+        if len(encoded) > MAX_ENCODED_ARGS:
+            self.packed_types = abi.TupleType(
+                [cast(abi.ABIType, a.codec) for a in encoded[MAX_ENCODED_ARGS - 1 :]]
+            )
+
+    def arguments(self, kwargs: dict[str, Any], resolve: Callable) -> list[Any]:
+        """returns the method args in order from the keyword args passed"""
+        return [arg.argument(kwargs, resolve) for arg in self.args]
+
+    def encode(
+        self,
+        app_id: int,
+        sender: str,
+        method_args: list[Any],
+        accounts: list[str],
+        foreign_apps: list[int],
+        foreign_assets: list[int],
+    ) -> tuple[list[bytes], list[TransactionWithSigner]]:
+        """
+        encode produces the app args for a call to this method, matching what
+        ``AtomicTransactionComposer.add_method_call`` would produce.
+
+        Reference arguments are added to the foreign arrays passed, which are modified.
+
+        Returns:
+            The app args and any transaction arguments, in order
+        """
+        app_args = [self.selector]
+        txns: list[TransactionWithSigner] = []
+        packed: list[Any] = []
+
+        for arg, value in zip(self.args, method_args):
+            kind = arg.kind
+            if kind == ARG_VALUE:
+                encoded: Any = value
+            elif kind == ARG_TXN:
+                if not isinstance(
+                    value, TransactionWithSigner
+                ) or not abi.check_abi_transaction_type(arg.type, value.txn):
+                    raise AtomicTransactionComposerError(
+                        "expected TransactionWithSigner as method argument, but received: {}".format(
+                            value
+                        )
+                    )
+                txns.append(value)
+                continue
+            elif kind == ARG_ACCOUNT:
+                if isinstance(value, bytes):
+                    value = encode_address(value)
+                encoded = _foreign_index(value, accounts, sender)
+            elif kind == ARG_ASSET:
+                encoded = _foreign_index(int(value), foreign_assets)
+            else:
+                encoded = _foreign_index(int(value), foreign_apps, app_id)
+
+            if self.packed_types is not None and len(app_args) == MAX_ENCODED_ARGS:
+                packed.append(encoded)
+            else:
+                app_args.append(cast(abi.ABIType, arg.codec).encode(encoded))
+
+        if self.packed_types is not None:
+            app_args.append(self.packed_types.encode(packed))
+
+        return app_args, txns
+
+
+def _struct_getter(fields: list[str]) -> Callable[[dict], list]:
+    getter = itemgetter(*fields)
+    if len(fields) == 1:
+        return lambda d: [getter(d)]
+    return lambda d: list(getter(d))
+
+
+def _foreign_index(value: Any, foreign_array: list, zero_value: Any = None) -> int:
+    # Same rules as populate_foreign_array in the sdk
+    if zero_value and value == zero_value:
+        return 0
+
+    offset = 0 if not zero_value else 1
+    if value in foreign_array:
+        return foreign_array.index(value) + offset
+
+    foreign_array.append(value)
+    return len(foreign_array) - 1 + offset
@@ -0,0 +1,186 @@
+import pyteal as pt
+import pytest
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    TransactionWithSigner,
+)
+from algosdk.error import AtomicTransactionComposerError
+from algosdk.encoding import msgpack_encode
+from algosdk.future import transaction
+
+from beaker.application import Application, get_method_spec
+from beaker.client.application_client import ApplicationClient
+from beaker.contracts.arcs.arc18 import ARC18
+from beaker.decorators import external
+
+APP_ID = 10
+SP = transaction.SuggestedParams(
+    fee=1000, first=1, last=1000, gh="a" * 44, flat_fee=True
+)
+
+
+class ManyArgs(Application):
+    @external
+    def many(
+        self,
+        a: pt.abi.Uint64,
+        b: pt.abi.Uint64,
+        c: pt.abi.Uint64,
+        d: pt.abi.Uint64,
+        e: pt.abi.Uint64,
+        f: pt.abi.Uint64,
+        g: pt.abi.Uint64,
+        h: pt.abi.Uint64,
+        i: pt.abi.Uint64,
+        j: pt.abi.Uint64,
+        k: pt.abi.Uint64,
+        l: pt.abi.Uint64,  # noqa: E741
+        m: pt.abi.Uint64,
+        n: pt.abi.Uint64,
+        o: pt.abi.String,
+        p: pt.abi.Account,
+        q: pt.abi.Uint64 = 7,  # type: ignore[assignment]
+    ):
+        return pt.Approve()
+
+
+def encoded(atc: AtomicTransactionComposer) -> list[str]:
+    return [msgpack_encode(t.txn) for t in atc.txn_list]
+
+
+def sdk_call(client: ApplicationClient, method, args: list, **kwargs):
+    atc = AtomicTransactionComposer()
+    atc.add_method_call(
+        APP_ID,
+        get_method_spec(method),
+        client.get_sender(),
+        SP,
+        client.signer,
+        method_args=args,
+        **kwargs,
+    )
+    return atc
+
+
+def arc18_client():
+    sk, addr = generate_account()
+    return (
+        ApplicationClient(
+            None,  # type: ignore
+            ARC18(),
+            app_id=APP_ID,
+            signer=AccountTransactionSigner(sk),
+            suggested_params=SP,
+        ),
+        addr,
+    )
+
+
+def transfer_args(addr: str, signer) -> dict:
+    _, owner = generate_account()
+    pay = transaction.PaymentTxn(addr, SP, owner, 1000)
+    return {
+        "royalty_asset": 123,
+        "royalty_asset_amount": 1,
+        "owner": owner,
+        "buyer": addr,
+        "royalty_receiver": owner,
+        "payment_txn": TransactionWithSigner(pay, signer),
+        "offered_amt": 1,
+    }
+
+
+def offer_args() -> dict:
+    _, auth = generate_account()
+    return {
+        "royalty_asset": 5,
+        "offer": {"amount": 10, "auth_address": auth},
+        "previous_offer": {"amount": 0, "auth_address": auth},
+    }
+
+
+def test_matches_sdk_encoding():
+    ac, addr = arc18_client()
+    kwargs = transfer_args(addr, ac.signer)
+
+    atc = ac.add_method_call(
+        AtomicTransactionComposer(),
+        ARC18.transfer_algo_payment,
+        accounts=[kwargs["owner"]],
+        **kwargs,
+    )
+    expected = sdk_call(
+        ac,
+        ARC18.transfer_algo_payment,
+        list(kwargs.values()),
+        accounts=[kwargs["owner"]],
+    )
+    assert encoded(atc) == encoded(expected)
+    assert atc.method_dict == expected.method_dict
+
+    # Structs are flattened in field order
+    _, auth = generate_account()
+    atc = ac.add_method_call(
+        AtomicTransactionComposer(),
+        ARC18.offer,
+        royalty_asset=5,
+        offer={"amount": 10, "auth_address": auth},
+        previous_offer={"amount": 0, "auth_address": auth},
+    )
+    expected = sdk_call(ac, ARC18.offer, [5, [auth, 10], [auth, 0]])
+    assert encoded(atc) == encoded(expected)
+
+
+def test_rejects_calls_the_sdk_would():
+    ac, addr = arc18_client()
+
+    # No room for the payment and the call
+    atc = AtomicTransactionComposer()
+    for _ in range(AtomicTransactionComposer.MAX_GROUP_SIZE - 1):
+        atc.add_transaction(
+            TransactionWithSigner(transaction.PaymentTxn(addr, SP, addr, 0), ac.signer)
+        )
+    with pytest.raises(AtomicTransactionComposerError, match="MAX_GROUP_SIZE"):
+        ac.add_method_call(
+            atc, ARC18.transfer_algo_payment, **transfer_args(addr, ac.signer)
+        )
+    assert len(atc.txn_list) == AtomicTransactionComposer.MAX_GROUP_SIZE - 1
+    assert atc.method_dict == {}
+
+    # Already built
+    atc = ac.add_method_call(AtomicTransactionComposer(), ARC18.offer, **offer_args())
+    atc.build_group()
+    with pytest.raises(AtomicTransactionComposerError, match="BUILDING"):
+        ac.add_method_call(atc, ARC18.offer, **offer_args())
+    assert len(atc.txn_list) == 1
+    assert list(atc.method_dict.keys()) == [0]
+
+
+def test_packs_args_past_fifteen():
+    sk, addr = generate_account()
+    _, other = generate_account()
+    ac = ApplicationClient(
+        None,  # type: ignore
+        ManyArgs(),
+        app_id=APP_ID,
+        signer=AccountTransactionSigner(sk),
+        suggested_params=SP,
+    )
+
+    kwargs = {name: idx for idx, name in enumerate("abcdefghijklmn")}
+    kwargs |= {"o": "beaker", "p": other}
+
+    atc = ac.add_method_call(AtomicTransactionComposer(), ManyArgs.many, **kwargs)
+    expected = sdk_call(ac, ManyArgs.many, list(kwargs.values()) + [7])
+    assert encoded(atc) == encoded(expected)
+    assert len(atc.txn_list[0].txn.app_args) == 16
+
+
+def test_plan_cached():
+    ac, _ = arc18_client()
+    plan = ac.method_plan(ARC18.transfer_algo_payment)
+    assert ac.method_plan(ARC18.transfer_algo_payment) is plan
+    assert ac.method_plan(get_method_spec(ARC18.transfer_algo_payment)) is not None
+    assert ac.prepare().method_plan(ARC18.transfer_algo_payment) is plan
@@ -0,0 +1,301 @@
+import bisect
+import json
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Iterator, TypeVar, cast
+from urllib.error import URLError
+
+from algosdk import error
+from algosdk.v2client.algod import AlgodClient
+
+from beaker.client.logic_error import LogicException
+
+#: Upper bounds in seconds of the latency histogram buckets, the last catches everything slower
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    float("inf"),
+)
+
+# Path segments that identify a resource, replaced so requests group by endpoint
+_ID_SEGMENT = re.compile(r"^([0-9]+|[A-Z2-7]{52}|[A-Z2-7]{58})$")
+
+
+def error_category(e: Exception) -> str:
+    """returns a short name for the kind of error, used to count errors by category"""
+    if isinstance(e, error.AlgodHTTPError):
+        return "http_4xx" if e.code is not None and e.code < 500 else "http_5xx"
+    if isinstance(e, error.ConfirmationTimeoutError):
+        return "timeout"
+    if isinstance(e, (URLError, ConnectionError, TimeoutError)):
+        return "network"
+    if isinstance(e, error.AlgodResponseError):
+        return "response"
+    if isinstance(e, LogicException):
+        return "logic"
+    return "other"
+
+
+def request_name(method: str, requrl: str) -> str:
+    """returns the name a request is recorded under, the method and path with ids replaced"""
+    path = requrl.split("?", 1)[0]
+    segments = [":id" if _ID_SEGMENT.match(s) else s for s in path.split("/")]
+    return f"{method} {'/'.join(segments)}"
+
+
+@dataclass
+class OperationStats:
+    """OperationStats aggregates every observation of one operation"""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    count: int = 0
+    #: total seconds spent in the operation
+    total_seconds: float = 0.0
+    #: count of observations in each bucket, in the order of ``buckets``
+    histogram: list[int] = field(default_factory=list)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    #: error category => count
+    errors: Counter = field(default_factory=Counter)
+    #: algod request name => count, for client operations
+    requests: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        if not self.histogram:
+            self.histogram = [0] * len(self.buckets)
+
+    def observe(
+        self,
+        seconds: float,
+        sent: int = 0,
+        received: int = 0,
+        err: Exception = None,
+    ):
+        self.count += 1
+        self.total_seconds += seconds
+        self.histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+        if err is not None:
+            self.errors[error_category(err)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """returns the upper bound of the bucket the ``q`` quantile of observations falls in"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.histogram):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def round_trips(self) -> float:
+        """returns the average number of algod requests made per observation"""
+        return sum(self.requests.values()) / self.count if self.count else 0.0
+
+
+class ClientMetrics:
+    """
+    ClientMetrics records counts, latency histograms, bytes sent and received and errors
+    for the algod requests and client operations made while it is attached
+
+    Attach it to an ``InstrumentedAlgodClient`` to record each algod request and to an
+    ``ApplicationClient`` to record its operations (``call``, ``create``, ...). Requests made
+    during an operation on the same thread are also counted against that operation, so
+    ``operations["call"].round_trips()`` is the average number of requests a call makes.
+
+    Subclass and override ``observe_request`` or ``observe_operation`` to forward observations
+    elsewhere. Safe to share across threads.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        #: algod request name => stats
+        self.requests: dict[str, OperationStats] = {}
+        #: client operation name => stats
+        self.operations: dict[str, OperationStats] = {}
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stats(self, table: dict[str, OperationStats], name: str) -> OperationStats:
+        if (stats := table.get(name)) is None:
+            stats = table.setdefault(name, OperationStats(buckets=self.buckets))
+        return stats
+
+    def _active(self) -> list["_ActiveOperation"]:
+        # Operations running on this thread, outermost first
+        if not hasattr(self._local, "active"):
+            self._local.active = []
+        return self._local.active
+
+    def observe_request(
+        self,
+        name: str,
+        seconds: float,
+        sent: int = 0,
+        received: int = 0,
+        err: Exception = None,
+    ):
+        """records one algod request"""
+        with self._lock:
+            self._stats(self.requests, name).observe(seconds, sent, received, err)
+        for op in self._active():
+            op.requests[name] += 1
+            op.sent += sent
+            op.received += received
+
+    def observe_operation(
+        self,
+        name: str,
+        seconds: float,
+        requests: Counter,
+        sent: int = 0,
+        received: int = 0,
+        err: Exception = None,
+    ):
+        """records one client operation along with the algod requests made during it"""
+        with self._lock:
+            stats = self._stats(self.operations, name)
+            stats.observe(seconds, sent, received, err)
+            stats.requests.update(requests)
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """records the time spent in the block and the algod requests made on this thread during it"""
+        active = self._active()
+        op = _ActiveOperation()
+        active.append(op)
+        start = time.perf_counter()
+        err = None
+        try:
+            yield
+        except Exception as e:
+            err = e
+            raise
+        finally:
+            active.pop()
+            self.observe_operation(
+                name,
+                time.perf_counter() - start,
+                op.requests,
+                op.sent,
+                op.received,
+                err,
+            )
+
+    def reset(self):
+        """drops everything recorded so far"""
+        with self._lock:
+            self.requests.clear()
+            self.operations.clear()
+
+
+class _ActiveOperation:
+    __slots__ = ("requests", "sent", "received")
+
+    def __init__(self):
+        self.requests: Counter = Counter()
+        self.sent = 0
+        self.received = 0
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def instrumented(name: str) -> Callable[[F], F]:
+    """records calls to the decorated method as the operation ``name`` if ``self.metrics`` is set"""
+
+    def _decorator(fn: F) -> F:
+        @wraps(fn)
+        def _wrapped(self, *args, **kwargs):
+            if self.metrics is None:
+                return fn(self, *args, **kwargs)
+            with self.metrics.operation(name):
+                return fn(self, *args, **kwargs)
+
+        return cast(F, _wrapped)
+
+    return _decorator
+
+
+class InstrumentedAlgodClient(AlgodClient):
+    """
+    InstrumentedAlgodClient is an AlgodClient that records every request it makes to ``metrics``
+
+    With ``metrics`` set to None it behaves exactly as an ``AlgodClient``.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: dict[str, str] = None,
+        metrics: ClientMetrics | None = None,
+    ):
+        super().__init__(algod_token, algod_address, headers)
+        self.metrics = metrics
+
+    def algod_request(
+        self,
+        method,
+        requrl,
+        params=None,
+        data=None,
+        headers=None,
+        response_format="json",
+    ):
+        if self.metrics is None:
+            return super().algod_request(
+                method, requrl, params, data, headers, response_format
+            )
+
+        sent = len(data) if data is not None else 0
+        received = 0
+        err = None
+        start = time.perf_counter()
+        try:
+            # Read the body as bytes so its size is known, then parse it as the sdk would
+            raw = super().algod_request(method, requrl, params, data, headers, "raw")
+            received = len(raw)
+            if response_format != "json":
+                return raw
+            try:
+                return json.loads(raw)
+            except Exception as e:
+                raise error.AlgodResponseError(
+                    "Failed to parse JSON response from algod"
+                ) from e
+        except Exception as e:
+            err = e
+            raise
+        finally:
+            self.metrics.observe_request(
+                request_name(method, requrl),
+                time.perf_counter() - start,
+                sent,
+                received,
+                err,
+            )
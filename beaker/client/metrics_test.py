@@ -0,0 +1,109 @@
+import io
+import json
+import urllib.error
+
+import pytest
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client import algod
+
+from beaker.application import Application
+from beaker.client.application_client import ApplicationClient
+from beaker.client.metrics import (
+    ClientMetrics,
+    InstrumentedAlgodClient,
+    OperationStats,
+    error_category,
+    request_name,
+)
+
+APP_ID = 5
+
+
+class FakeNode:
+    """answers urlopen with canned json bodies by path"""
+
+    def __init__(self):
+        self.responses: dict[str, dict] = {}
+
+    def __call__(self, req):
+        path = req.full_url.split("stub.invalid", 1)[1].split("?", 1)[0]
+        if path not in self.responses:
+            raise urllib.error.HTTPError(
+                req.full_url, 404, "not found", {}, io.BytesIO(b'{"message": "nope"}')
+            )
+        return io.BytesIO(json.dumps(self.responses[path]).encode("utf-8"))
+
+
+@pytest.fixture
+def node(monkeypatch) -> FakeNode:
+    fake = FakeNode()
+    monkeypatch.setattr(algod, "urlopen", fake)
+    return fake
+
+
+def test_request_name():
+    assert request_name("GET", "/applications/123") == "GET /applications/:id"
+    assert (
+        request_name("GET", "/transactions/pending/" + "A" * 52 + "?format=json")
+        == "GET /transactions/pending/:id"
+    )
+    assert request_name("GET", "/status") == "GET /status"
+
+
+def test_operation_stats():
+    stats = OperationStats()
+    for seconds in [0.0005, 0.002, 0.003, 0.2]:
+        stats.observe(seconds)
+    stats.observe(0.01, err=AlgodHTTPError("busy", 503))
+
+    assert stats.count == 5
+    assert stats.quantile(0.5) == 0.005
+    assert stats.quantile(1) == 0.25
+    assert stats.errors == {"http_5xx": 1}
+    assert error_category(AlgodHTTPError("missing", 404)) == "http_4xx"
+
+
+def test_instrumented_requests(node):
+    node.responses["/v2/status"] = {"last-round": 10}
+    metrics = ClientMetrics()
+    client = InstrumentedAlgodClient("a" * 64, "http://stub.invalid", metrics=metrics)
+
+    assert client.status() == {"last-round": 10}
+    with pytest.raises(AlgodHTTPError):
+        client.application_info(APP_ID)
+
+    status = metrics.requests["GET /status"]
+    assert status.count == 1
+    assert status.bytes_received == len(json.dumps({"last-round": 10}))
+
+    missing = metrics.requests["GET /applications/:id"]
+    assert missing.errors == {"http_4xx": 1}
+
+    # Without metrics nothing is recorded and responses are unchanged
+    client.metrics = None
+    assert client.status() == {"last-round": 10}
+    assert metrics.requests["GET /status"].count == 1
+
+
+def test_client_operations(node):
+    node.responses[f"/v2/applications/{APP_ID}"] = {"id": APP_ID, "params": {}}
+    metrics = ClientMetrics()
+    client = InstrumentedAlgodClient("a" * 64, "http://stub.invalid", metrics=metrics)
+
+    ac = ApplicationClient(client, Application(), app_id=APP_ID)
+    assert ac.metrics is metrics
+
+    ac.get_application_state()
+    ac.get_application_state()
+
+    op = metrics.operations["get_application_state"]
+    assert op.count == 2
+    assert op.round_trips() == 1
+    assert op.requests == {"GET /applications/:id": 2}
+    assert op.bytes_received == 2 * len(json.dumps({"id": APP_ID, "params": {}}))
+
+    with pytest.raises(AlgodHTTPError):
+        ApplicationClient(
+            client, Application(), app_id=APP_ID + 1
+        ).get_application_state()
+    assert metrics.operations["get_application_state"].errors == {"http_4xx": 1}
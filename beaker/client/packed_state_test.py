@@ -0,0 +1,30 @@
+from beaker.client.application_client import ApplicationClient
+from beaker.state_test import Packed
+
+APP_ID = 7
+
+
+def test_get_packed_state(stub_algod):
+    app = Packed()
+    ac = ApplicationClient(stub_algod, app, app_id=APP_ID)
+
+    # Not set yet, every field is zero
+    assert ac.get_packed_state(app.config) == {
+        "paused": False,
+        "fee_bps": 0,
+        "open": False,
+        "frozen": False,
+        "level": 0,
+        "cap": 0,
+        "round": 0,
+        "tag": [0, 0, 0, 0],
+    }
+
+    value = bytes([0x80]) + (30).to_bytes(2, "big") + bytes([0x40, 3])
+    value += (7).to_bytes(4, "big") + (9).to_bytes(8, "big") + b"abcd"
+    stub_algod.global_state[APP_ID] = {b"config": value}
+
+    fields = ac.get_packed_state(app.config)
+    assert fields["paused"] and not fields["open"] and fields["frozen"]
+    assert (fields["fee_bps"], fields["level"], fields["cap"]) == (30, 3, 7)
+    assert bytes(fields["tag"]) == b"abcd"
@@ -0,0 +1,145 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    AtomicTransactionComposerStatus,
+    LogicSigTransactionSigner,
+    MultisigTransactionSigner,
+    TransactionSigner,
+)
+from algosdk.error import AtomicTransactionComposerError
+from algosdk.future import transaction
+
+#: Signers that only hold keys or programs and can be shipped to worker processes
+POOLABLE_SIGNERS = (
+    AccountTransactionSigner,
+    MultisigTransactionSigner,
+    LogicSigTransactionSigner,
+)
+
+#: Signers that sign each transaction on its own, so their transactions can be split into
+#: chunks. The sdk's multisig signer shares one ``Multisig`` between the transactions of a
+#: call, what it returns depends on the whole call so it isn't chunked
+CHUNKABLE_SIGNERS = (AccountTransactionSigner, LogicSigTransactionSigner)
+
+#: Number of transactions handed to a worker at once, large enough that
+#: pickling the signer and txns is cheap relative to signing them
+DEFAULT_CHUNK_SIZE = 64
+
+#: Below this many transactions the pool costs more than it saves
+DEFAULT_SERIAL_THRESHOLD = 128
+
+
+def _sign_chunk(
+    signer: TransactionSigner, txns: list[transaction.Transaction], indexes: list[int]
+) -> list[Any]:
+    return signer.sign_transactions(txns, indexes)
+
+
+def sign_parallel(
+    atcs: list[AtomicTransactionComposer],
+    executor: Executor = None,
+    max_workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    serial_threshold: int = DEFAULT_SERIAL_THRESHOLD,
+) -> list[list[Any]]:
+    """
+    sign_parallel signs the transactions of every atc passed using a process pool
+
+    The result is the same as calling ``gather_signatures`` on each atc, which is left in the
+    ``SIGNED`` state with its signed transactions cached so a later ``execute`` or ``submit`` skips
+    signing. Account, multisig and logic signature signers are signed in the pool, any other signer
+    (which may hold a connection, like a kmd wallet) signs in this process. Only account and logic
+    signature signers are split into chunks, the rest are passed the whole group with the indexes
+    of their transactions, as ``gather_signatures`` does.
+
+    Args:
+        atcs: The composers to sign, each is grouped as ``gather_signatures`` would
+        executor: An executor to sign with, if not passed a ``ProcessPoolExecutor`` is created for the call
+        max_workers: Workers for the pool created if no executor is passed
+        chunk_size: Max transactions sent to a worker at once
+        serial_threshold: If fewer transactions than this need signing, sign in this process
+
+    Returns:
+        The signed transactions for each atc, in order
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    # (atc idx, txn indexes, signer, txns, indexes into txns) for each chunk to sign
+    pooled: list[tuple[int, list[int], TransactionSigner, list, list[int]]] = []
+    local: list[tuple[int, list[int], TransactionSigner, list, list[int]]] = []
+
+    signed: list[list[Any]] = []
+    for atc_idx, atc in enumerate(atcs):
+        if atc.status >= AtomicTransactionComposerStatus.SIGNED:
+            signed.append(atc.signed_txns)
+            continue
+
+        signed.append([None] * len(atc.txn_list))
+
+        # Same grouping as gather_signatures, so signers see the txns in order
+        group = atc.build_group()
+        signer_indexes: dict[TransactionSigner, list[int]] = {}
+        for idx, tws in enumerate(group):
+            signer_indexes.setdefault(tws.signer, []).append(idx)
+
+        for signer, indexes in signer_indexes.items():
+            if not isinstance(signer, CHUNKABLE_SIGNERS):
+                # Other signers may look at the rest of the group, so they get all of it
+                txn_group = [tws.txn for tws in group]
+                work = (atc_idx, indexes, signer, txn_group, indexes)
+                if isinstance(signer, POOLABLE_SIGNERS):
+                    pooled.append(work)
+                else:
+                    local.append(work)
+                continue
+
+            for start in range(0, len(indexes), chunk_size):
+                chunk = indexes[start : start + chunk_size]
+                txns = [group[idx].txn for idx in chunk]
+                pooled.append((atc_idx, chunk, signer, txns, list(range(len(chunk)))))
+
+    if sum(len(w[1]) for w in pooled) < serial_threshold:
+        local, pooled = local + pooled, []
+
+    results: list[tuple[int, list[int], list]] = []
+    if pooled:
+        owned = executor is None
+        pool = ProcessPoolExecutor(max_workers) if executor is None else executor
+        try:
+            futures = [
+                (atc_idx, chunk, pool.submit(_sign_chunk, signer, txns, positions))
+                for atc_idx, chunk, signer, txns, positions in pooled
+            ]
+            # Sign whatever can't be shipped while the pool works
+            for atc_idx, chunk, signer, txns, positions in local:
+                results.append((atc_idx, chunk, _sign_chunk(signer, txns, positions)))
+            for atc_idx, chunk, fut in futures:
+                results.append((atc_idx, chunk, fut.result()))
+        finally:
+            if owned:
+                pool.shutdown()
+    else:
+        for atc_idx, chunk, signer, txns, positions in local:
+            results.append((atc_idx, chunk, _sign_chunk(signer, txns, positions)))
+
+    for atc_idx, chunk, stxns in results:
+        for idx, stxn in zip(chunk, stxns):
+            signed[atc_idx][idx] = stxn
+
+    for atc, stxns in zip(atcs, signed):
+        if atc.status >= AtomicTransactionComposerStatus.SIGNED:
+            continue
+
+        if None in stxns:
+            raise AtomicTransactionComposerError(
+                "missing signatures, got {}".format(stxns)
+            )
+
+        atc.signed_txns = stxns
+        atc.status = AtomicTransactionComposerStatus.SIGNED
+
+    return signed
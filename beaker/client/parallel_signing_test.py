@@ -0,0 +1,137 @@
+import pickle
+from concurrent.futures import Executor, Future
+
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    AtomicTransactionComposerStatus,
+    LogicSigTransactionSigner,
+    MultisigTransactionSigner,
+    TransactionSigner,
+    TransactionWithSigner,
+)
+from algosdk.encoding import msgpack_encode
+from algosdk.future import transaction
+
+from beaker.client.parallel_signing import sign_parallel
+
+SP = transaction.SuggestedParams(
+    fee=1000, first=1, last=1000, gh="a" * 44, flat_fee=True
+)
+
+
+def build_atcs(
+    signers: list, groups: int, group_size: int = 16
+) -> list[AtomicTransactionComposer]:
+    atcs = []
+    for g in range(groups):
+        atc = AtomicTransactionComposer()
+        for i in range(group_size):
+            signer, sender = signers[i % len(signers)]
+            txn = transaction.PaymentTxn(sender, SP, sender, 0, note=f"{g}-{i}")
+            atc.add_transaction(TransactionWithSigner(txn, signer))
+        atcs.append(atc)
+    return atcs
+
+
+def all_signers() -> list:
+    sk1, addr1 = generate_account()
+    sk2, addr2 = generate_account()
+
+    msig = transaction.Multisig(1, 2, [addr1, addr2])
+    lsig = transaction.LogicSigAccount(b"\x06\x81\x01")  # #pragma version 6; int 1
+
+    return [
+        (AccountTransactionSigner(sk1), addr1),
+        (MultisigTransactionSigner(msig, [sk1, sk2]), msig.address()),
+        (LogicSigTransactionSigner(lsig), lsig.address()),
+    ]
+
+
+class PicklingExecutor(Executor):
+    """runs work in this process, after the pickle round trip a process pool would make"""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        fn, args, kwargs = pickle.loads(pickle.dumps((fn, args, kwargs)))
+        self.submitted += 1
+        fut: Future = Future()
+        fut.set_result(fn(*args, **kwargs))
+        return fut
+
+
+def encoded(stxns: list) -> list[str]:
+    return [msgpack_encode(stxn) for stxn in stxns]
+
+
+def test_sign_parallel_matches_serial():
+    signers = all_signers()
+
+    serial = build_atcs(signers, 8)
+    parallel = build_atcs(signers, 8)
+
+    expected = [encoded(atc.gather_signatures()) for atc in serial]
+
+    pool = PicklingExecutor()
+    signed = sign_parallel(parallel, executor=pool, chunk_size=5, serial_threshold=0)
+    assert pool.submitted > len(parallel), "Should sign in chunks"
+
+    assert [encoded(s) for s in signed] == expected
+    for atc in parallel:
+        assert atc.status == AtomicTransactionComposerStatus.SIGNED
+        # Cached, not signed again
+        assert encoded(atc.gather_signatures()) == encoded(atc.signed_txns)
+
+    # Already signed atcs are passed through untouched
+    assert sign_parallel(parallel) == signed
+
+
+def test_sign_parallel_serial_threshold():
+    signers = all_signers()
+    atcs = build_atcs(signers, 1)
+
+    # Small batches never start a pool, the executor is never touched
+    class NoExecutor:
+        def submit(self, *args, **kwargs):
+            raise AssertionError("should sign in process")
+
+    sign_parallel(atcs, executor=NoExecutor())  # type: ignore
+    assert atcs[0].status == AtomicTransactionComposerStatus.SIGNED
+
+
+class WalletSigner(TransactionSigner):
+    """stands in for a signer that can't be shipped to a worker, like a kmd wallet"""
+
+    def __init__(self, sk: str):
+        self.account = AccountTransactionSigner(sk)
+        self.calls: list[tuple[int, list[int]]] = []
+
+    def __reduce__(self):
+        raise pickle.PicklingError("holds a connection")
+
+    def sign_transactions(self, txn_group, indexes):
+        self.calls.append((len(txn_group), indexes))
+        return self.account.sign_transactions(txn_group, indexes)
+
+
+def test_sign_parallel_other_signers_get_whole_group():
+    sk, addr = generate_account()
+    wallet = WalletSigner(sk)
+    signers = all_signers() + [(wallet, addr)]
+
+    serial = build_atcs(signers, 4)
+    parallel = build_atcs(signers, 4)
+
+    signed = sign_parallel(
+        parallel, executor=PicklingExecutor(), chunk_size=2, serial_threshold=0
+    )
+    # Not chunked, one call per group with all of it and the original indexes
+    assert wallet.calls == [(16, [3, 7, 11, 15])] * 4
+
+    wallet.calls.clear()
+    expected = [encoded(atc.gather_signatures()) for atc in serial]
+    assert wallet.calls == [(16, [3, 7, 11, 15])] * 4
+    assert [encoded(s) for s in signed] == expected
@@ -0,0 +1,106 @@
+from dataclasses import dataclass, field
+
+#: Max accounts in the accounts array of a single app call
+MAX_APP_TXN_ACCOUNTS = 4
+#: Max apps in the foreign apps array of a single app call
+MAX_APP_TXN_FOREIGN_APPS = 8
+#: Max assets in the foreign assets array of a single app call
+MAX_APP_TXN_FOREIGN_ASSETS = 8
+#: Max accounts, apps and assets combined in a single app call
+MAX_APP_TOTAL_TXN_REFERENCES = 8
+#: First program version where an app call can use resources referenced by others in its group
+SHARED_REFERENCES_VERSION = 9
+
+
+@dataclass
+class References:
+    """References holds the foreign arrays of a single app call"""
+
+    accounts: list[str] = field(default_factory=list)
+    foreign_assets: list[int] = field(default_factory=list)
+    foreign_apps: list[int] = field(default_factory=list)
+
+    def total(self) -> int:
+        return len(self.accounts) + len(self.foreign_assets) + len(self.foreign_apps)
+
+    def fits(self) -> bool:
+        """returns True if these references fit in a single app call"""
+        return (
+            len(self.accounts) <= MAX_APP_TXN_ACCOUNTS
+            and len(self.foreign_assets) <= MAX_APP_TXN_FOREIGN_ASSETS
+            and len(self.foreign_apps) <= MAX_APP_TXN_FOREIGN_APPS
+            and self.total() <= MAX_APP_TOTAL_TXN_REFERENCES
+        )
+
+    def _room(self, kind: str) -> int:
+        limit = {
+            "accounts": MAX_APP_TXN_ACCOUNTS,
+            "foreign_assets": MAX_APP_TXN_FOREIGN_ASSETS,
+            "foreign_apps": MAX_APP_TXN_FOREIGN_APPS,
+        }[kind]
+        return min(
+            limit - len(getattr(self, kind)),
+            MAX_APP_TOTAL_TXN_REFERENCES - self.total(),
+        )
+
+
+def pack_references(
+    refs: References,
+    into: list[References] = None,
+    sender: str = None,
+    app_id: int = None,
+) -> list[References]:
+    """
+    pack_references distributes the references passed across app calls without exceeding the per call limits
+
+    References already present in a call are not added again, the sender and app id are skipped since
+    every call has access to them. Calls in ``into`` are filled first, in order, and are modified; only
+    appending keeps the indexes of references already in them valid. New calls are added only once those
+    are full and are returned after them, as few as the limits allow.
+
+    Args:
+        refs: The full set of references needed
+        into: Existing calls that have room for more references
+        sender: The sender of the calls, available without a reference
+        app_id: The app being called, available without a reference
+
+    Returns:
+        The calls passed in ``into`` followed by any new calls needed
+    """
+    calls = list(into) if into is not None else []
+    if len(calls) == 0:
+        calls.append(References())
+
+    present: dict[str, set] = {
+        "accounts": {a for c in calls for a in c.accounts},
+        "foreign_assets": {a for c in calls for a in c.foreign_assets},
+        "foreign_apps": {a for c in calls for a in c.foreign_apps},
+    }
+    implicit: dict[str, str | int | None] = {
+        "accounts": sender,
+        "foreign_assets": None,
+        "foreign_apps": app_id,
+    }
+
+    # Accounts have the tighter limit, place them first so they get the
+    # space they need before other references use up the call totals
+    for kind in ["accounts", "foreign_apps", "foreign_assets"]:
+        pending: list = []
+        for ref in getattr(refs, kind):
+            if ref == implicit[kind] or ref in present[kind]:
+                continue
+            present[kind].add(ref)
+            pending.append(ref)
+
+        idx = 0
+        while pending:
+            if idx == len(calls):
+                calls.append(References())
+
+            room = calls[idx]._room(kind)
+            if room > 0:
+                getattr(calls[idx], kind).extend(pending[:room])
+                pending = pending[room:]
+            idx += 1
+
+    return calls
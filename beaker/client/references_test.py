@@ -0,0 +1,193 @@
+import pyteal as pt
+import pytest
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+    TransactionWithSigner,
+)
+from algosdk.future import transaction
+
+from beaker.application import Application
+from beaker.client import application_client
+from beaker.client.application_client import ApplicationClient
+from beaker.client.references import (
+    SHARED_REFERENCES_VERSION,
+    References,
+    pack_references,
+)
+from beaker.decorators import bare_external, external
+
+APP_ID = 5
+SP = transaction.SuggestedParams(
+    fee=1000, first=1, last=1000, gh="a" * 44, flat_fee=True
+)
+
+
+def addrs(n: int) -> list[str]:
+    return [generate_account()[1] for _ in range(n)]
+
+
+@pytest.mark.parametrize(
+    "accounts, assets, apps, calls",
+    [
+        (0, 0, 0, 1),
+        (4, 4, 0, 1),
+        (0, 8, 0, 1),
+        (5, 0, 0, 2),
+        (4, 5, 0, 2),
+        (8, 8, 0, 2),
+        (9, 0, 0, 3),
+        (2, 10, 10, 3),
+        (13, 0, 20, 5),
+    ],
+)
+def test_pack_minimal(accounts: int, assets: int, apps: int, calls: int):
+    refs = References(
+        accounts=addrs(accounts),
+        foreign_assets=list(range(1, assets + 1)),
+        foreign_apps=list(range(100, 100 + apps)),
+    )
+
+    packed = pack_references(refs)
+    assert len(packed) == calls
+    assert all(p.fits() for p in packed)
+
+    assert sorted(a for p in packed for a in p.accounts) == sorted(refs.accounts)
+    assert sorted(a for p in packed for a in p.foreign_assets) == refs.foreign_assets
+    assert sorted(a for p in packed for a in p.foreign_apps) == refs.foreign_apps
+
+
+def test_pack_into_existing():
+    sender, other = addrs(2)
+    existing = References(accounts=[other], foreign_assets=[1, 2])
+
+    refs = References(
+        accounts=[sender, other] + addrs(4),
+        foreign_assets=[2, 3],
+        foreign_apps=[APP_ID],
+    )
+    packed = pack_references(refs, into=[existing], sender=sender, app_id=APP_ID)
+
+    # Existing references keep their place, duplicates and implicit refs are dropped
+    assert packed[0] is existing
+    assert existing.accounts[0] == other
+    assert existing.foreign_assets[:2] == [1, 2]
+    assert len(packed) == 2
+    assert sum(len(p.accounts) for p in packed) == 5
+    assert sum(len(p.foreign_assets) for p in packed) == 3
+    assert all(len(p.foreign_apps) == 0 for p in packed)
+
+
+class RefsApp(Application):
+    # Handles both the create and padding calls
+    @bare_external(no_op=pt.CallConfig.ALL)
+    def create(self):
+        return pt.Approve()
+
+    @external
+    def check(self, acct: pt.abi.Account, pay: pt.abi.PaymentTransaction):
+        return pt.Approve()
+
+
+@pytest.fixture
+def shared_references(monkeypatch):
+    # Apps here compile to version 7, pack as an app of version 9 would
+    monkeypatch.setattr(application_client, "SHARED_REFERENCES_VERSION", 7)
+
+
+def test_client_pads_group(shared_references):
+    sk, sender = generate_account()
+    signer = AccountTransactionSigner(sk)
+    ac = ApplicationClient(
+        None,  # type: ignore
+        RefsApp(),
+        app_id=APP_ID,
+        signer=signer,
+        suggested_params=SP,
+    )
+
+    acct = addrs(1)[0]
+    accounts = addrs(6)
+    pay = transaction.PaymentTxn(sender, SP, acct, 1)
+
+    atc = ac.add_method_call(
+        AtomicTransactionComposer(),
+        RefsApp.check,
+        acct=acct,
+        pay=TransactionWithSigner(pay, signer),
+        accounts=accounts,
+        foreign_assets=list(range(1, 5)),
+    )
+
+    txns = [t.txn for t in atc.txn_list]
+    # 7 accounts and 4 assets need one padding call, then the payment and the call
+    assert len(txns) == 3
+    assert txns[1] is pay
+    call = txns[2]
+    assert call.accounts[0] == acct, "Arg references stay in the call"
+    assert call.app_args[1] == b"\x01"
+
+    pads = txns[:1]
+    assert all(p.app_args is None or p.app_args == [] for p in pads)
+    seen = [a for t in pads + [call] for a in (t.accounts or [])]
+    assert sorted(set(seen)) == sorted(set(accounts + [acct]))
+    assert list(atc.method_dict.keys()) == [2]
+
+
+def test_client_needs_padding_handler(shared_references):
+    sk, _ = generate_account()
+
+    class NoBareApp(Application):
+        @external
+        def check(self):
+            return pt.Approve()
+
+    ac = ApplicationClient(
+        None,  # type: ignore
+        NoBareApp(),
+        app_id=APP_ID,
+        signer=AccountTransactionSigner(sk),
+        suggested_params=SP,
+    )
+    with pytest.raises(Exception, match="padding"):
+        ac.add_method_call(
+            AtomicTransactionComposer(), NoBareApp.check, accounts=addrs(5)
+        )
+
+    # Within the limits nothing changes
+    atc = ac.add_method_call(
+        AtomicTransactionComposer(), NoBareApp.check, accounts=addrs(4)
+    )
+    assert len(atc.txn_list) == 1
+
+
+def test_client_no_padding_before_v9():
+    sk, sender = generate_account()
+    signer = AccountTransactionSigner(sk)
+    ac = ApplicationClient(
+        None,  # type: ignore
+        RefsApp(),
+        app_id=APP_ID,
+        signer=signer,
+        suggested_params=SP,
+    )
+    assert ac.app.teal_version < SHARED_REFERENCES_VERSION
+
+    # A call can't use references from others in the group, so they're left as passed
+    acct = addrs(1)[0]
+    accounts = addrs(6)
+    pay = transaction.PaymentTxn(sender, SP, acct, 1)
+    atc = ac.add_method_call(
+        AtomicTransactionComposer(),
+        RefsApp.check,
+        acct=acct,
+        pay=TransactionWithSigner(pay, signer),
+        accounts=accounts,
+    )
+    txns = [t.txn for t in atc.txn_list]
+    assert len(txns) == 2
+    assert txns[1].accounts == accounts + [acct]
+
+    with pytest.raises(Exception, match="version 9"):
+        ac.add_padding_call(AtomicTransactionComposer(), References(accounts=accounts))
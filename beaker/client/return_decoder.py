@@ -0,0 +1,126 @@
+from typing import Any, Callable
+
+from algosdk import abi
+from algosdk.abi.base_type import ABI_LENGTH_SIZE
+from algosdk.encoding import encode_address
+from algosdk.error import ABIEncodingError
+
+#: Decodes an ABI encoded value held in a memoryview
+Decoder = Callable[[memoryview], Any]
+
+# Precompiled decoders by type string, types themselves aren't hashable
+_decoders: dict[str, Decoder] = {}
+
+
+def return_decoder(abi_type: abi.ABIType) -> Decoder:
+    """
+    return_decoder returns a decoder for the ABI type that reads directly from a memoryview
+    and returns the same value as ``abi_type.decode``
+
+    Decoders are built once per type. Uints, bytes, addresses, strings, byte arrays and static
+    tuples or arrays of those are decoded without copying the buffer, anything else is handed to
+    the generic decoder.
+    """
+    key = str(abi_type)
+    if (decoder := _decoders.get(key)) is None:
+        decoder = _build_decoder(abi_type)
+        _decoders[key] = decoder
+    return decoder
+
+
+def _build_decoder(t: abi.ABIType) -> Decoder:
+    match t:
+        case abi.UintType() | abi.UfixedType():
+            return _sized(t.byte_len(), _decode_uint)
+        case abi.ByteType():
+            return _sized(1, _decode_byte)
+        case abi.AddressType():
+            return _sized(32, _decode_address)
+        case abi.StringType():
+            return _dynamic(_decode_string)
+        case abi.ArrayStaticType() if isinstance(t.child_type, abi.ByteType):
+            return _sized(t.byte_len(), list)
+        case abi.ArrayDynamicType() if isinstance(t.child_type, abi.ByteType):
+            return _dynamic(list)
+        case abi.ArrayStaticType() if _static_packable(t.child_type):
+            return _static_tuple([t.child_type] * t.static_length)
+        case abi.TupleType() if all(_static_packable(c) for c in t.child_types):
+            return _static_tuple(t.child_types)
+
+    return _generic(t)
+
+
+def _static_packable(t: abi.ABIType) -> bool:
+    # Bools are packed into shared bytes, leave those to the generic decoder
+    if isinstance(t, abi.BoolType) or t.is_dynamic():
+        return False
+    if isinstance(t, abi.ArrayStaticType):
+        return _static_packable(t.child_type)
+    if isinstance(t, abi.TupleType):
+        return all(_static_packable(c) for c in t.child_types)
+    return True
+
+
+def _sized(size: int, decode: Callable[[memoryview], Any]) -> Decoder:
+    def _decode(mv: memoryview) -> Any:
+        if len(mv) != size:
+            raise ABIEncodingError(
+                f"expected {size} bytes to decode, got {len(mv)}: {bytes(mv)!r}"
+            )
+        return decode(mv)
+
+    return _decode
+
+
+def _dynamic(decode: Callable[[memoryview], Any]) -> Decoder:
+    def _decode(mv: memoryview) -> Any:
+        if len(mv) < ABI_LENGTH_SIZE:
+            raise ABIEncodingError(
+                f"dynamic value is too short to be decoded: {len(mv)}"
+            )
+        length = int.from_bytes(mv[:ABI_LENGTH_SIZE], "big")
+        if len(mv) != ABI_LENGTH_SIZE + length:
+            raise ABIEncodingError(
+                f"expected {length} bytes after the length prefix, got {len(mv) - ABI_LENGTH_SIZE}"
+            )
+        return decode(mv[ABI_LENGTH_SIZE:])
+
+    return _decode
+
+
+def _static_tuple(child_types: list[abi.ABIType]) -> Decoder:
+    children: list[tuple[int, int, Decoder]] = []
+    offset = 0
+    for ct in child_types:
+        size = ct.byte_len()
+        children.append((offset, offset + size, return_decoder(ct)))
+        offset += size
+
+    def _decode(mv: memoryview) -> list:
+        if len(mv) != offset:
+            raise ABIEncodingError(
+                f"expected {offset} bytes to decode, got {len(mv)}: {bytes(mv)!r}"
+            )
+        return [decode(mv[start:stop]) for start, stop, decode in children]
+
+    return _decode
+
+
+def _generic(t: abi.ABIType) -> Decoder:
+    return lambda mv: t.decode(bytes(mv))
+
+
+def _decode_uint(mv: memoryview) -> int:
+    return int.from_bytes(mv, "big")
+
+
+def _decode_byte(mv: memoryview) -> int:
+    return mv[0]
+
+
+def _decode_address(mv: memoryview) -> str:
+    return encode_address(bytes(mv))
+
+
+def _decode_string(mv: memoryview) -> str:
+    return str(mv, "utf-8")
@@ -0,0 +1,120 @@
+from base64 import b64encode
+
+import pytest
+from algosdk import abi
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    ABI_RETURN_HASH,
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+)
+from algosdk.error import ABIEncodingError
+from algosdk.future import transaction
+import pyteal as pt
+
+from beaker.application import Application
+from beaker.client.application_client import ApplicationClient
+from beaker.client.return_decoder import return_decoder
+from beaker.decorators import external
+
+_, ADDR = generate_account()
+
+DECODE_TESTS = [
+    ("uint64", 2**64 - 1),
+    ("uint8", 7),
+    ("ufixed64x2", 12345),
+    ("byte", 255),
+    ("address", ADDR),
+    ("string", "beaker"),
+    ("string", ""),
+    ("byte[4]", [1, 2, 3, 4]),
+    ("byte[]", [9, 8, 7]),
+    ("uint64[3]", [1, 2, 3]),
+    ("(uint64,byte[2],address)", [1, [2, 3], ADDR]),
+    ("(address,(uint64,uint8))", [ADDR, [5, 6]]),
+    # Handed to the generic decoder
+    ("bool", True),
+    ("(bool,bool,uint64)", [True, False, 10]),
+    ("uint64[]", [1, 2]),
+    ("(string,uint64)", ["hi", 3]),
+]
+
+
+@pytest.mark.parametrize("type_str, value", DECODE_TESTS)
+def test_matches_generic_decode(type_str: str, value):
+    abi_type = abi.ABIType.from_string(type_str)
+    encoded = abi_type.encode(value)
+
+    decode = return_decoder(abi_type)
+    assert decode(memoryview(encoded)) == abi_type.decode(encoded)
+    assert return_decoder(abi_type) is decode, "Should be built once"
+
+
+@pytest.mark.parametrize(
+    "type_str, encoded",
+    [
+        ("uint64", b"\x00" * 7),
+        ("address", b"\x00" * 31),
+        ("string", b"\x00\x05abc"),
+        ("byte[]", b"\x00"),
+        ("(uint64,byte[2])", b"\x00" * 9),
+    ],
+)
+def test_bad_length(type_str: str, encoded: bytes):
+    with pytest.raises(ABIEncodingError):
+        return_decoder(abi.ABIType.from_string(type_str))(memoryview(encoded))
+
+
+class ReturnApp(Application):
+    @external
+    def get(self, *, output: pt.abi.Uint64):
+        return output.set(pt.Int(1))
+
+
+def test_execute_decodes_returns(stub_algod):
+    sk, _ = generate_account()
+    sp = transaction.SuggestedParams(
+        fee=1000, first=1, last=1000, gh="a" * 44, flat_fee=True
+    )
+    ac = ApplicationClient(
+        stub_algod,
+        ReturnApp(),
+        app_id=5,
+        signer=AccountTransactionSigner(sk),
+        suggested_params=sp,
+    )
+
+    atc = ac.add_method_call(AtomicTransactionComposer(), ReturnApp.get, note=b"1")
+    ac.add_method_call(atc, ReturnApp.get, note=b"2")
+
+    logs = [b64encode(ABI_RETURN_HASH + (42).to_bytes(8, "big")).decode("utf-8")]
+    for tws in atc.build_group():
+        stub_algod.pending[tws.txn.get_txid()] = {"confirmed-round": 3, "logs": logs}
+
+    result = ac._execute(atc)
+    assert result.confirmed_round == 3
+    assert [r.return_value for r in result.abi_results] == [42, 42]
+    assert result.abi_results[0].raw_value == (42).to_bytes(8, "big")
+    assert len(stub_algod.sent) == 2
+
+    # A group already submitted is only waited on, not sent again
+    atc = ac.add_method_call(AtomicTransactionComposer(), ReturnApp.get, note=b"3")
+    for tws in atc.build_group():
+        stub_algod.pending[tws.txn.get_txid()] = {"confirmed-round": 4, "logs": logs}
+    atc.submit(stub_algod)
+    sent = len(stub_algod.sent)
+    assert ac._execute(atc).abi_results[0].return_value == 42
+    assert len(stub_algod.sent) == sent
+
+
+def test_decode_matches_sdk():
+    abi_type = abi.ABIType.from_string("(uint64,address,byte[8])")
+    logs = [
+        ABI_RETURN_HASH + abi_type.encode([i, ADDR, list(i.to_bytes(8, "big"))])
+        for i in range(100)
+    ]
+
+    decode = return_decoder(abi_type)
+    assert [decode(memoryview(log)[4:]) for log in logs] == [
+        abi_type.decode(log[4:]) for log in logs
+    ]
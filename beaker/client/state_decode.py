@@ -34,3 +34,13 @@ def decode_state(
 
         decoded_state[key] = val
     return decoded_state
+
+
+def str_or_hex_state(
+    state: dict[bytes, bytes | int]
+) -> dict[str | bytes, bytes | str | int]:
+    """converts raw state, as returned by ``decode_state(..., raw=True)``, to its non-raw form"""
+    return {
+        str_or_hex(k): (str_or_hex(v) if type(v) is bytes else v)
+        for k, v in state.items()
+    }
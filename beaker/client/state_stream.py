@@ -0,0 +1,139 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from algosdk.encoding import encode_address
+from pyteal import TealType
+
+from beaker.client.state_decode import str_or_hex
+from beaker.state import PackedStateValue, State, StateValue
+
+#: EvalDelta actions for a state key
+SET_BYTES = 1
+SET_UINT = 2
+DELETE = 3
+
+
+@dataclass
+class StateDiff:
+    """StateDiff holds the changes made to an application's state in a single round"""
+
+    #: the round the changes were committed in, resume a stream with `round + 1`
+    round: int
+    #: key => new value, None if the key was deleted
+    global_delta: dict[str | bytes, Any] = field(default_factory=dict)
+    #: address => key => new value, None if the key was deleted
+    local_deltas: dict[str, dict[str | bytes, Any]] = field(default_factory=dict)
+
+    def empty(self) -> bool:
+        return len(self.global_delta) == 0 and len(self.local_deltas) == 0
+
+
+#: The bytes of a declared state key => the name it's declared under and its value
+Schema = dict[bytes, tuple[str, StateValue]]
+
+
+def state_schema(state: Optional[State]) -> Schema:
+    """returns the declared values of an app's global or local state by the bytes of their key"""
+    if state is None:
+        return {}
+    return {
+        sv.str_key().encode(): (name, sv) for name, sv in state.declared_vals.items()
+    }
+
+
+def decode_value_delta(
+    vd: dict[bytes, Any], raw: bool = False, sv: Optional[StateValue] = None
+) -> Any:
+    """
+    decodes a single msgpack ValueDelta from a block
+
+    With the declared state value for the key, its stack type is checked and bytes are returned
+    as they are, decoded to a dict of fields for a ``PackedStateValue``. Without it, bytes are
+    decoded to a string if they're utf-8 and hex otherwise, unless ``raw`` is set.
+    """
+    match vd.get(b"at", 0):
+        case 1:
+            val = vd.get(b"bs", b"")
+            if sv is None:
+                return val if raw else str_or_hex(val)
+            _check_stack_type(sv, TealType.bytes, vd)
+            return sv.decode(val) if isinstance(sv, PackedStateValue) else val
+        case 2:
+            if sv is not None:
+                _check_stack_type(sv, TealType.uint64, vd)
+            return vd.get(b"ui", 0)
+        case 3:
+            return None
+
+    raise Exception(f"Unrecognized state delta action: {vd}")
+
+
+def _check_stack_type(sv: StateValue, stack_type: TealType, vd: dict[bytes, Any]):
+    if sv.stack_type != stack_type:
+        raise Exception(f"State delta {vd} doesn't match the declared type of {sv}")
+
+
+def _merge_delta(
+    into: dict[str | bytes, Any],
+    delta: dict[bytes, dict[bytes, Any]],
+    raw: bool,
+    schema: Schema,
+):
+    # Declared keys are decoded with the schema under their name, keys it doesn't declare,
+    # those of dynamic values and blobs, are decoded as they are
+    for k, vd in delta.items():
+        if not raw and k in schema:
+            name, sv = schema[k]
+            into[name] = decode_value_delta(vd, sv=sv)
+        else:
+            into[k if raw else str_or_hex(k)] = decode_value_delta(vd, raw)
+
+
+def _apply_txn(
+    diff: StateDiff,
+    stxn: dict[bytes, Any],
+    app_id: int,
+    raw: bool,
+    schemas: tuple[Schema, Schema],
+):
+    txn = stxn.get(b"txn", {})
+    eval_delta = stxn.get(b"dt", {})
+
+    # Creates have no app id in the txn, its in the apply data
+    txn_app_id = txn.get(b"apid", 0) or stxn.get(b"apid", 0)
+
+    if txn.get(b"type") == b"appl" and txn_app_id == app_id:
+        _merge_delta(diff.global_delta, eval_delta.get(b"gd", {}), raw, schemas[0])
+
+        # Local deltas are keyed by index, 0 is the sender then the accounts
+        # array followed by any shared accounts
+        accounts = [txn[b"snd"]] + txn.get(b"apat", []) + eval_delta.get(b"sa", [])
+        for idx, delta in eval_delta.get(b"ld", {}).items():
+            addr = encode_address(accounts[idx])
+            _merge_delta(diff.local_deltas.setdefault(addr, {}), delta, raw, schemas[1])
+
+    # Inner transactions may call the app too
+    for inner in eval_delta.get(b"itx", []):
+        _apply_txn(diff, inner, app_id, raw, schemas)
+
+
+def block_state_diff(
+    block: dict[bytes, Any],
+    app_id: int,
+    raw: bool = False,
+    app_state: Optional[State] = None,
+    acct_state: Optional[State] = None,
+) -> StateDiff:
+    """
+    collects the state changes for the app id from the transactions in a block
+
+    The block is expected to be msgpack decoded with `raw=True`, as algod may use
+    non utf-8 bytes for state keys. Changes to the values declared in the app's global and
+    local state are decoded with them, see ``decode_value_delta``.
+    """
+    schemas = (state_schema(app_state), state_schema(acct_state))
+    blk = block[b"block"]
+    diff = StateDiff(round=blk.get(b"rnd", 0))
+    for stxn in blk.get(b"txns", []):
+        _apply_txn(diff, stxn, app_id, raw, schemas)
+    return diff
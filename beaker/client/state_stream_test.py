@@ -0,0 +1,181 @@
+import asyncio
+
+import msgpack  # type: ignore
+import pytest
+from algosdk.account import generate_account
+from algosdk.encoding import decode_address
+
+from beaker.client.application_client import ApplicationClient
+from beaker.client.state_stream import (
+    DELETE,
+    SET_BYTES,
+    SET_UINT,
+    StateDiff,
+    block_state_diff,
+)
+from beaker.client.state_view_test import ViewApp
+
+APP_ID = 5
+
+
+def app_call(sender: str, app_id: int, eval_delta: dict, accounts: list[str] = None):
+    txn: dict = {b"type": b"appl", b"snd": decode_address(sender)}
+    if app_id:
+        txn[b"apid"] = app_id
+    if accounts:
+        txn[b"apat"] = [decode_address(a) for a in accounts]
+    return {b"txn": txn, b"dt": eval_delta}
+
+
+def block(rnd: int, txns: list[dict]) -> dict:
+    return {b"block": {b"rnd": rnd, b"txns": txns}}
+
+
+def test_block_state_diff():
+    _, sender = generate_account()
+    _, other = generate_account()
+
+    blk = block(
+        10,
+        [
+            app_call(
+                sender,
+                APP_ID,
+                {
+                    b"gd": {
+                        b"counter": {b"at": SET_UINT, b"ui": 2},
+                        b"name": {b"at": SET_BYTES, b"bs": b"beaker"},
+                    },
+                    b"ld": {
+                        0: {b"nick": {b"at": SET_BYTES, b"bs": b"ben"}},
+                        1: {b"nick": {b"at": DELETE}},
+                    },
+                },
+                accounts=[other],
+            ),
+            # A different app, ignored
+            app_call(sender, APP_ID + 1, {b"gd": {b"x": {b"at": SET_UINT, b"ui": 1}}}),
+            # Later txns in the round win, inner txns are followed
+            app_call(
+                sender,
+                APP_ID + 1,
+                {
+                    b"itx": [
+                        app_call(
+                            sender,
+                            APP_ID,
+                            {b"gd": {b"counter": {b"at": SET_UINT, b"ui": 3}}},
+                        )
+                    ]
+                },
+            ),
+        ],
+    )
+
+    diff = block_state_diff(blk, APP_ID)
+    assert diff.round == 10
+    assert diff.global_delta == {"counter": 3, "name": "beaker"}
+    assert diff.local_deltas == {sender: {"nick": "ben"}, other: {"nick": None}}
+
+    raw = block_state_diff(blk, APP_ID, raw=True)
+    assert raw.global_delta == {b"counter": 3, b"name": b"beaker"}
+
+    # Creates carry the app id in the apply data only
+    create = app_call(sender, 0, {b"gd": {b"counter": {b"at": SET_UINT, b"ui": 0}}})
+    create[b"apid"] = APP_ID
+    assert block_state_diff(block(11, [create]), APP_ID).global_delta == {"counter": 0}
+
+    assert block_state_diff(block(12, []), APP_ID).empty()
+
+
+def test_block_state_diff_schema():
+    _, sender = generate_account()
+    app = ViewApp()
+
+    blk = block(
+        10,
+        [
+            app_call(
+                sender,
+                APP_ID,
+                {
+                    b"gd": {
+                        b"counter": {b"at": SET_UINT, b"ui": 2},
+                        b"name": {b"at": SET_BYTES, b"bs": b"beaker"},
+                    },
+                    b"ld": {0: {b"nick": {b"at": SET_BYTES, b"bs": b"\xffben"}}},
+                },
+            )
+        ],
+    )
+
+    # Declared bytes are left as they are, keys the schema doesn't declare are decoded as before
+    diff = block_state_diff(
+        blk, APP_ID, app_state=app.app_state, acct_state=app.acct_state
+    )
+    assert diff.global_delta == {"counter": 2, "name": "beaker"}
+    assert diff.local_deltas == {sender: {"nick": b"\xffben"}}
+
+    mismatched = block(
+        11,
+        [
+            app_call(
+                sender, APP_ID, {b"gd": {b"counter": {b"at": SET_BYTES, b"bs": b""}}}
+            )
+        ],
+    )
+    with pytest.raises(Exception):
+        block_state_diff(mismatched, APP_ID, app_state=app.app_state)
+
+
+def test_app_client_watch_state(stub_algod):
+    _, sender = generate_account()
+
+    def encoded_block(rnd: int, txns: list[dict]) -> bytes:
+        return msgpack.packb(block(rnd, txns), use_bin_type=True)
+
+    stub_algod.blocks = {
+        3: encoded_block(
+            3,
+            [
+                app_call(
+                    sender, APP_ID, {b"gd": {b"counter": {b"at": SET_UINT, b"ui": 1}}}
+                )
+            ],
+        ),
+        4: encoded_block(4, []),
+        5: encoded_block(
+            5,
+            [
+                app_call(
+                    sender, APP_ID, {b"gd": {b"counter": {b"at": SET_UINT, b"ui": 2}}}
+                )
+            ],
+        ),
+    }
+
+    ac = ApplicationClient(stub_algod, ViewApp(), app_id=APP_ID)
+
+    diffs = list(ac.watch_state(start_round=3, stop_round=5))
+    assert diffs == [
+        StateDiff(round=3, global_delta={"counter": 1}),
+        StateDiff(round=5, global_delta={"counter": 2}),
+    ]
+    assert ac.state_view.round == 5, "Should observe each round streamed"
+
+    diffs = list(ac.watch_state(start_round=4, stop_round=4, include_empty=True))
+    assert diffs == [StateDiff(round=4)]
+
+    # Defaults to the round after the current one
+    stub_algod.round = 4
+    assert [d.round for d in ac.watch_state(stop_round=5)] == [5]
+
+    async def collect() -> list[StateDiff]:
+        return [
+            diff async for diff in ac.watch_state_async(start_round=3, stop_round=5)
+        ]
+
+    assert asyncio.run(collect()) == [
+        StateDiff(round=3, global_delta={"counter": 1}),
+        StateDiff(round=5, global_delta={"counter": 2}),
+    ]
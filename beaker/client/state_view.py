@@ -0,0 +1,212 @@
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from algosdk.v2client.algod import AlgodClient
+
+from beaker.client.state_decode import decode_state, str_or_hex_state
+
+
+@dataclass
+class CachedState:
+    """CachedState holds the raw state fetched for an app and the round it is known to be valid for"""
+
+    #: the round this state was known to be current at
+    round: int
+    #: raw key => raw value mapping of the state
+    state: dict[bytes, bytes | int]
+
+
+class StateView:
+    """
+    StateView is an in memory cache of the global and local state of applications
+
+    Entries are stamped with a round and are considered fresh until a newer round is observed,
+    either by fetching local state (algod reports the round), calling ``observe_round`` or by
+    an ApplicationClient confirming a transaction. An ApplicationClient invalidates the entries
+    for its app whenever it submits an app call so that reads following a write hit algod.
+
+    A StateView may be shared across threads, fetches happen outside the lock so concurrent
+    misses for the same entry may each go to algod.
+    """
+
+    def __init__(self, client: AlgodClient):
+        self.client = client
+
+        #: highest round observed so far, entries stamped before it are stale
+        self.round = 0
+
+        self._global: dict[int, CachedState] = {}
+        self._local: dict[tuple[int, str], CachedState] = {}
+
+        self._lock = threading.Lock()
+        # Bumped on invalidate and clear so a fetch that started before can't store what it got
+        self._generation: dict[int, int] = {}
+        self._cleared = 0
+
+    def observe_round(self, round: int):
+        """records that the chain has progressed to at least `round`, marking older entries stale"""
+        with self._lock:
+            if round > self.round:
+                self.round = round
+
+    def invalidate(self, app_id: int, account: str = None):
+        """drops the cached global state and local state for the app id passed
+
+        If an account is passed, only the local state for that account is dropped
+        """
+        with self._lock:
+            self._generation[app_id] = self._generation.get(app_id, 0) + 1
+
+            if account is not None:
+                self._local.pop((app_id, account), None)
+                return
+
+            self._global.pop(app_id, None)
+            for key in [k for k in self._local.keys() if k[0] == app_id]:
+                del self._local[key]
+
+    def clear(self):
+        """drops all cached entries"""
+        with self._lock:
+            self._cleared += 1
+            self._global.clear()
+            self._local.clear()
+
+    def is_fresh(self, entry: CachedState | None, min_round: int = None) -> bool:
+        if entry is None:
+            return False
+        if min_round is not None and entry.round < min_round:
+            return False
+        return entry.round >= self.round
+
+    def cached_global_state(self, app_id: int) -> CachedState | None:
+        """returns the cached global state entry for the app id if it is still fresh"""
+        entry = self._global.get(app_id)
+        return entry if self.is_fresh(entry) else None
+
+    def cached_local_state(self, app_id: int, account: str) -> CachedState | None:
+        """returns the cached local state entry for the app id and account if it is still fresh"""
+        entry = self._local.get((app_id, account))
+        return entry if self.is_fresh(entry) else None
+
+    def global_state(
+        self,
+        app_id: int,
+        raw: bool = False,
+        refresh: bool = False,
+        min_round: int = None,
+    ) -> dict[bytes | str, bytes | str | int]:
+        """gets the global state for the app id, using the cached copy if it is fresh
+
+        Args:
+            app_id: The id of the application to get the state for
+            raw: If true, keys and values are returned as bytes
+            refresh: If true, the state is fetched from algod regardless of the cache
+            min_round: If set, a cached entry stamped before this round is refetched
+        """
+        entry = self._global.get(app_id)
+        if entry is None or refresh or not self.is_fresh(entry, min_round):
+            entry = self.fetch_global_state(app_id)
+        return _present(entry.state, raw)
+
+    def local_state(
+        self,
+        app_id: int,
+        account: str,
+        raw: bool = False,
+        refresh: bool = False,
+        min_round: int = None,
+    ) -> dict[bytes | str, bytes | str | int]:
+        """gets the local state for the app id and account, using the cached copy if it is fresh
+
+        Args:
+            app_id: The id of the application to get the state for
+            account: The address of the account to get the local state for
+            raw: If true, keys and values are returned as bytes
+            refresh: If true, the state is fetched from algod regardless of the cache
+            min_round: If set, a cached entry stamped before this round is refetched
+        """
+        entry = self._local.get((app_id, account))
+        if entry is None or refresh or not self.is_fresh(entry, min_round):
+            entry = self.fetch_local_state(app_id, account)
+        return _present(entry.state, raw)
+
+    def fetch_global_state(self, app_id: int) -> CachedState:
+        """fetches the global state from algod and caches it
+
+        algod does not report a round with application info so the entry is stamped
+        with the highest round observed, the state is at least that recent
+        """
+        if self.round == 0:
+            # Nothing observed yet, ask once so the stamp is meaningful
+            self.observe_round(self.client.status()["last-round"])
+
+        round = self.round
+        generation = self.generation(app_id)
+        app_info = self.client.application_info(app_id)
+        entry = CachedState(round=round, state=_raw_global_state(app_info))
+        with self._lock:
+            if self._current_generation(app_id) == generation:
+                self._global[app_id] = entry
+        return entry
+
+    def fetch_local_state(self, app_id: int, account: str) -> CachedState:
+        """fetches the local state for the account from algod and caches it"""
+        generation = self.generation(app_id)
+        acct_info = self.client.account_application_info(account, app_id)
+        return self.cache_local_state(app_id, account, acct_info, generation)
+
+    def cache_local_state(
+        self,
+        app_id: int,
+        account: str,
+        acct_info: dict[str, Any],
+        generation: int = None,
+    ) -> CachedState:
+        """caches the local state from an `account_application_info` response
+
+        If `generation` is passed the entry is only cached if the app hasn't been invalidated,
+        or the view cleared, since
+        """
+        round = acct_info.get("round", self.round)
+        self.observe_round(round)
+
+        entry = CachedState(round=round, state=_raw_local_state(acct_info))
+        with self._lock:
+            if generation is None or self._current_generation(app_id) == generation:
+                self._local[(app_id, account)] = entry
+        return entry
+
+    def generation(self, app_id: int) -> int:
+        """returns a counter that changes whenever the entries for the app id are invalidated or cleared"""
+        with self._lock:
+            return self._current_generation(app_id)
+
+    def _current_generation(self, app_id: int) -> int:
+        # Both counters only go up, so their sum changes whenever either does
+        return self._cleared + self._generation.get(app_id, 0)
+
+
+def _raw_global_state(app_info: dict[str, Any]) -> dict[bytes, bytes | int]:
+    if "params" not in app_info or "global-state" not in app_info["params"]:
+        return {}
+    return decode_state(app_info["params"]["global-state"], raw=True)  # type: ignore
+
+
+def _raw_local_state(acct_info: dict[str, Any]) -> dict[bytes, bytes | int]:
+    if (
+        "app-local-state" not in acct_info
+        or "key-value" not in acct_info["app-local-state"]
+    ):
+        return {}
+    return decode_state(acct_info["app-local-state"]["key-value"], raw=True)  # type: ignore
+
+
+def _present(
+    state: dict[bytes, bytes | int], raw: bool
+) -> dict[bytes | str, bytes | str | int]:
+    # Hand out a copy so callers can't mutate the cached entry
+    if raw:
+        return {k: v for k, v in state.items()}
+    return str_or_hex_state(state)
@@ -0,0 +1,200 @@
+import threading
+
+import pytest
+import pyteal as pt
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+)
+from algosdk.future.transaction import SuggestedParams
+
+from beaker.application import Application
+from beaker.decorators import external
+from beaker.state import ApplicationStateValue, AccountStateValue
+from beaker.client.application_client import ApplicationClient
+from beaker.client.state_view import StateView
+
+APP_ID = 5
+
+
+class ViewApp(Application):
+    counter = ApplicationStateValue(pt.TealType.uint64)
+    nick = AccountStateValue(pt.TealType.bytes)
+
+    @external
+    def incr(self):
+        return self.counter.increment()
+
+
+def test_global_state_cached(stub_algod):
+    stub_algod.global_state[APP_ID] = {b"counter": 1, b"name": b"beaker"}
+
+    sv = StateView(stub_algod)
+    assert sv.global_state(APP_ID) == {"counter": 1, "name": "beaker"}
+    assert sv.global_state(APP_ID, raw=True) == {b"counter": 1, b"name": b"beaker"}
+    assert stub_algod.calls["application_info"] == 1, "Should have hit the cache"
+
+    stub_algod.global_state[APP_ID][b"counter"] = 2
+    assert sv.global_state(APP_ID)["counter"] == 1, "Should still be cached"
+    assert sv.global_state(APP_ID, refresh=True)["counter"] == 2
+    assert stub_algod.calls["application_info"] == 2
+
+
+def test_cached_copy_not_mutable(stub_algod):
+    stub_algod.global_state[APP_ID] = {b"counter": 1}
+
+    sv = StateView(stub_algod)
+    sv.global_state(APP_ID, raw=True)[b"counter"] = 100
+    assert sv.global_state(APP_ID, raw=True) == {b"counter": 1}
+
+
+def test_newer_round_refreshes(stub_algod):
+    _, addr = generate_account()
+    stub_algod.global_state[APP_ID] = {b"counter": 1}
+    stub_algod.local_state[(APP_ID, addr)] = {b"nick": b"ben"}
+
+    sv = StateView(stub_algod)
+    sv.global_state(APP_ID)
+    assert sv.local_state(APP_ID, addr) == {"nick": "ben"}
+    assert sv.round == stub_algod.round, "Should observe the round algod reported"
+
+    sv.local_state(APP_ID, addr)
+    assert stub_algod.calls["account_application_info"] == 1
+
+    stub_algod.round += 1
+    sv.observe_round(stub_algod.round)
+    assert sv.cached_global_state(APP_ID) is None
+    assert sv.cached_local_state(APP_ID, addr) is None
+
+    sv.global_state(APP_ID)
+    sv.local_state(APP_ID, addr)
+    assert stub_algod.calls["application_info"] == 2
+    assert stub_algod.calls["account_application_info"] == 2
+
+    sv.local_state(APP_ID, addr, min_round=stub_algod.round + 1)
+    assert stub_algod.calls["account_application_info"] == 3
+
+
+def test_invalidate(stub_algod):
+    _, addr = generate_account()
+    _, other = generate_account()
+    stub_algod.global_state[APP_ID] = {b"counter": 1}
+
+    sv = StateView(stub_algod)
+    sv.global_state(APP_ID)
+    sv.local_state(APP_ID, addr)
+    sv.local_state(APP_ID, other)
+
+    sv.invalidate(APP_ID, addr)
+    assert sv.cached_global_state(APP_ID) is not None
+    assert sv.cached_local_state(APP_ID, addr) is None
+    assert sv.cached_local_state(APP_ID, other) is not None
+
+    sv.invalidate(APP_ID)
+    assert sv.cached_global_state(APP_ID) is None
+    assert sv.cached_local_state(APP_ID, other) is None
+
+
+def test_clear_during_fetch(stub_algod):
+    _, addr = generate_account()
+    stub_algod.global_state[APP_ID] = {b"counter": 1}
+    stub_algod.local_state[(APP_ID, addr)] = {b"nick": b"ben"}
+
+    sv = StateView(stub_algod)
+    sv.observe_round(stub_algod.round)
+
+    # Hold each fetch in algod until the view has been cleared
+    fetching, cleared = threading.Event(), threading.Event()
+
+    def blocking(fetch):
+        def wrapped(*args, **kwargs):
+            fetching.set()
+            cleared.wait(5)
+            return fetch(*args, **kwargs)
+
+        return wrapped
+
+    stub_algod.application_info = blocking(stub_algod.application_info)
+    stub_algod.account_application_info = blocking(stub_algod.account_application_info)
+
+    for read in [
+        lambda: sv.global_state(APP_ID),
+        lambda: sv.local_state(APP_ID, addr),
+    ]:
+        fetching.clear()
+        cleared.clear()
+        reader = threading.Thread(target=read)
+        reader.start()
+        assert fetching.wait(5)
+        sv.clear()
+        cleared.set()
+        reader.join(5)
+
+    # What was fetched before the clear isn't cached after it
+    assert sv.cached_global_state(APP_ID) is None
+    assert sv.cached_local_state(APP_ID, addr) is None
+
+    sv.global_state(APP_ID)
+    sv.local_state(APP_ID, addr)
+    assert sv.cached_global_state(APP_ID) is not None
+    assert sv.cached_local_state(APP_ID, addr) is not None
+
+
+def test_app_client_cached_state(stub_algod):
+    sk, addr = generate_account()
+    stub_algod.global_state[APP_ID] = {b"counter": 3}
+    stub_algod.local_state[(APP_ID, addr)] = {b"nick": b"ben"}
+
+    ac = ApplicationClient(
+        stub_algod, ViewApp(), app_id=APP_ID, signer=AccountTransactionSigner(sk)
+    )
+    assert ac.get_application_state(cached=True) == {"counter": 3}
+    assert ac.get_application_state(cached=True) == {"counter": 3}
+    assert ac.get_account_state(cached=True) == {"nick": "ben"}
+    assert ac.get_account_state(cached=True) == {"nick": "ben"}
+    assert stub_algod.calls["application_info"] == 1
+    assert stub_algod.calls["account_application_info"] == 1
+
+    # Uncached reads always go to algod
+    ac.get_application_state()
+    assert stub_algod.calls["application_info"] == 2
+
+    # Prepared copies share the view
+    ac2 = ac.prepare()
+    assert ac2.state_view is ac.state_view
+    ac2.get_application_state(cached=True)
+    assert stub_algod.calls["application_info"] == 2
+
+
+def test_app_client_submit_invalidates(stub_algod):
+    sk, addr = generate_account()
+    stub_algod.global_state[APP_ID] = {b"counter": 3}
+
+    sp = SuggestedParams(fee=1000, first=1, last=1000, gh="a" * 44, flat_fee=True)
+    ac = ApplicationClient(
+        stub_algod,
+        ViewApp(),
+        app_id=APP_ID,
+        signer=AccountTransactionSigner(sk),
+        suggested_params=sp,
+    )
+
+    ac.get_application_state(cached=True)
+    ac.get_account_state(cached=True)
+    assert ac.state_view.cached_global_state(APP_ID) is not None
+
+    atc = AtomicTransactionComposer()
+    ac.add_method_call(atc, ViewApp.incr)
+
+    def reject(*args, **kwargs):
+        raise Exception("rejected")
+
+    stub_algod.send_transactions = reject  # type: ignore
+
+    # The submit failed, but the cache must be dropped regardless
+    with pytest.raises(Exception):
+        ac._execute(atc)
+
+    assert ac.state_view.cached_global_state(APP_ID) is None
+    assert ac.state_view.cached_local_state(APP_ID, addr) is None
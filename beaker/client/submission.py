@@ -0,0 +1,92 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from urllib.error import URLError
+
+import msgpack  # type: ignore
+from algosdk.encoding import checksum
+from algosdk.error import AlgodHTTPError, ConfirmationTimeoutError
+from algosdk.future import transaction
+
+#: HTTP status codes from algod worth retrying
+TRANSIENT_HTTP_CODES = {429, 500, 502, 503, 504}
+
+# Fields left out of a lease so that rebuilding the same call with new
+# suggested params produces the same lease
+_LEASE_EXCLUDED_FIELDS = {"fee", "fv", "lv", "gh", "gen", "grp", "lx"}
+
+
+def is_transient_error(e: Exception) -> bool:
+    """returns True if the error may go away by trying again, rejections by the ledger or logic are not transient"""
+    if isinstance(e, ConfirmationTimeoutError):
+        return True
+    if isinstance(e, AlgodHTTPError):
+        return e.code in TRANSIENT_HTTP_CODES
+    if isinstance(e, (URLError, ConnectionError, TimeoutError)):
+        return True
+    return False
+
+
+def deterministic_lease(txn: transaction.Transaction) -> bytes:
+    """
+    returns a lease derived from the contents of the transaction, ignoring fees, validity rounds and group
+
+    Two transactions from the same sender with the same lease can't both be confirmed while their
+    validity windows overlap, so a call rebuilt after a failed submission can't execute twice.
+    """
+    fields = {k: v for k, v in txn.dictify().items() if k not in _LEASE_EXCLUDED_FIELDS}
+    return checksum(msgpack.packb(fields, use_bin_type=True))
+
+
+@dataclass
+class SubmissionPolicy:
+    """
+    SubmissionPolicy controls how an ApplicationClient submits and waits on transactions
+
+    When set on a client, transient errors during submission or while waiting are retried with
+    exponential backoff. Before anything is sent again the status of the first transaction is
+    checked by txid so a group that already landed or is still in the pool is never resubmitted.
+    """
+
+    #: times to retry after the first attempt
+    retries: int = 3
+    #: seconds to wait before the first retry, doubled for each retry after
+    backoff: float = 0.5
+    #: upper bound on the seconds waited between retries
+    max_backoff: float = 8.0
+    #: rounds to wait for confirmation in each attempt
+    wait_rounds: int = 4
+    #: attach a deterministic lease to app calls that don't pass one, off by default as identical
+    #: calls from the same sender within the validity window are then rejected as overlapping,
+    #: pass a distinct note to each call that should be allowed to run more than once
+    lease: bool = False
+    #: decides whether an error is worth retrying
+    is_transient: Callable[[Exception], bool] = field(default=is_transient_error)
+    #: used to wait between retries
+    sleep: Callable[[float], Any] = field(default=time.sleep)
+
+    def delay(self, attempt: int) -> float:
+        """returns the seconds to wait before the retry number passed, starting at 1"""
+        return min(self.backoff * (2 ** (attempt - 1)), self.max_backoff)
+
+
+#: Status of a transaction by txid
+TXN_UNKNOWN = "unknown"
+TXN_PENDING = "pending"
+TXN_CONFIRMED = "confirmed"
+TXN_REJECTED = "rejected"
+
+
+def txn_status(client: Any, txid: str) -> tuple[str, dict[str, Any]]:
+    """returns the status of the transaction with the txid passed along with the pending info algod returned"""
+    try:
+        info = client.pending_transaction_info(txid)
+    except AlgodHTTPError:
+        # Not in the pool and not recently confirmed as far as this node knows
+        return TXN_UNKNOWN, {}
+
+    if info.get("confirmed-round", 0) > 0:
+        return TXN_CONFIRMED, info
+    if info.get("pool-error", ""):
+        return TXN_REJECTED, info
+    return TXN_PENDING, info
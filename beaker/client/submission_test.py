@@ -0,0 +1,181 @@
+from urllib.error import URLError
+
+import pytest
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+)
+from algosdk.error import (
+    AlgodHTTPError,
+    ConfirmationTimeoutError,
+    TransactionRejectedError,
+)
+from algosdk.future import transaction
+
+from beaker.client.application_client import ApplicationClient
+from beaker.client.state_view_test import ViewApp
+from beaker.client.submission import (
+    SubmissionPolicy,
+    deterministic_lease,
+    is_transient_error,
+)
+
+APP_ID = 5
+SP = transaction.SuggestedParams(
+    fee=1000, first=1, last=1000, gh="a" * 44, flat_fee=True
+)
+
+
+@pytest.mark.parametrize(
+    "err, transient",
+    [
+        (URLError("down"), True),
+        (ConnectionResetError(), True),
+        (ConfirmationTimeoutError("timed out"), True),
+        (AlgodHTTPError("busy", 503), True),
+        (AlgodHTTPError("logic eval error", 400), False),
+        (TransactionRejectedError("overspend"), False),
+        (Exception("logic eval error"), False),
+    ],
+)
+def test_is_transient_error(err: Exception, transient: bool):
+    assert is_transient_error(err) == transient
+
+
+def client_with_policy(stub_algod, **kwargs) -> ApplicationClient:
+    sk, _ = generate_account()
+    sleeps: list[float] = []
+    policy = SubmissionPolicy(sleep=sleeps.append, **kwargs)
+    ac = ApplicationClient(
+        stub_algod,
+        ViewApp(),
+        app_id=APP_ID,
+        signer=AccountTransactionSigner(sk),
+        suggested_params=SP,
+        submission_policy=policy,
+    )
+    ac.sleeps = sleeps  # type: ignore
+    return ac
+
+
+def incr(ac: ApplicationClient) -> AtomicTransactionComposer:
+    return ac.add_method_call(AtomicTransactionComposer(), ViewApp.incr)
+
+
+def test_lease():
+    sk, _ = generate_account()
+    signer = AccountTransactionSigner(sk)
+    sp2 = transaction.SuggestedParams(
+        fee=2000, first=500, last=1500, gh="a" * 44, flat_fee=True
+    )
+
+    plain = ApplicationClient(
+        None, ViewApp(), app_id=APP_ID, signer=signer, suggested_params=SP  # type: ignore
+    )
+    assert incr(plain).txn_list[0].txn.lease is None
+
+    # Off unless asked for, identical calls would otherwise overlap
+    retrying = plain.prepare(submission_policy=SubmissionPolicy())
+    assert incr(retrying).txn_list[0].txn.lease is None
+
+    ac = plain.prepare(submission_policy=SubmissionPolicy(lease=True))
+    lease = incr(ac).txn_list[0].txn.lease
+    assert lease is not None and len(lease) == 32
+
+    # Rebuilding with new params keeps the lease, a different call changes it
+    assert incr(ac.prepare(suggested_params=sp2)).txn_list[0].txn.lease == lease
+    other = ac.add_method_call(AtomicTransactionComposer(), ViewApp.incr, note=b"2")
+    assert other.txn_list[0].txn.lease != lease
+
+    # An explicit lease is left alone
+    explicit = ac.add_method_call(
+        AtomicTransactionComposer(), ViewApp.incr, lease=b"\x01" * 32
+    )
+    assert explicit.txn_list[0].txn.lease == b"\x01" * 32
+
+    txn = incr(ac).txn_list[0].txn
+    assert deterministic_lease(txn) == lease
+
+
+def test_retry_resends_when_unknown(stub_algod):
+    ac = client_with_policy(stub_algod)
+    send = stub_algod.send_transactions
+
+    failures = [URLError("down")]
+
+    def flaky_send(txns, **kwargs):
+        if failures:
+            raise failures.pop()
+        return send(txns)
+
+    def pending(txid, **kwargs):
+        if not stub_algod.sent:
+            raise AlgodHTTPError("not found", 404)
+        return {"confirmed-round": 7}
+
+    stub_algod.send_transactions = flaky_send
+    stub_algod.pending_transaction_info = pending
+
+    result = ac._execute(incr(ac))
+    assert result.confirmed_round == 7
+    assert len(stub_algod.sent) == 1
+    assert ac.sleeps == [0.5]  # type: ignore
+
+
+def test_retry_does_not_resend_landed(stub_algod):
+    ac = client_with_policy(stub_algod)
+
+    def lost_response(txns, **kwargs):
+        # Made it to the pool, but the response never did
+        stub_algod.sent.extend(txns)
+        raise URLError("reset")
+
+    stub_algod.send_transactions = lost_response
+
+    result = ac._execute(incr(ac))
+    assert result.confirmed_round == stub_algod.round
+    assert len(stub_algod.sent) == 1, "Should not have sent again"
+
+
+def test_retry_waits_on_pending(stub_algod):
+    ac = client_with_policy(stub_algod, wait_rounds=0)
+
+    def pending(txid, **kwargs):
+        # Stays pending until the first wait has timed out
+        if not ac.sleeps:  # type: ignore
+            return {"confirmed-round": 0}
+        return {"confirmed-round": 9}
+
+    stub_algod.pending_transaction_info = pending
+    stub_algod.status_after_block = lambda r, **kw: {"last-round": r + 1}
+
+    result = ac._execute(incr(ac))
+    assert result.confirmed_round == 9
+    assert len(stub_algod.sent) == 1
+    assert ac.sleeps == [0.5]  # type: ignore
+
+
+def test_gives_up(stub_algod):
+    ac = client_with_policy(stub_algod, retries=2)
+
+    def down(*args, **kwargs):
+        raise URLError("down")
+
+    stub_algod.send_transactions = down
+    stub_algod.pending_transaction_info = lambda *a, **kw: (_ for _ in ()).throw(
+        AlgodHTTPError("not found", 404)
+    )
+
+    with pytest.raises(URLError):
+        ac._execute(incr(ac))
+    assert ac.sleeps == [0.5, 1.0]  # type: ignore
+
+    # Not transient, no retry at all
+    ac = client_with_policy(stub_algod)
+    stub_algod.send_transactions = lambda *a, **kw: (_ for _ in ()).throw(
+        AlgodHTTPError("logic eval error", 400)
+    )
+    with pytest.raises(Exception):
+        ac._execute(incr(ac))
+    assert ac.sleeps == []  # type: ignore
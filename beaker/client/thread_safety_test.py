@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from algosdk.account import generate_account
+from algosdk.atomic_transaction_composer import (
+    AccountTransactionSigner,
+    AtomicTransactionComposer,
+)
+
+from beaker.client.application_client import ApplicationClient
+from beaker.client.state_view import StateView
+from beaker.client.state_view_test import ViewApp
+
+APP_ID = 5
+THREADS = 16
+ITERATIONS = 25
+
+
+def test_shared_client_stress(stub_algod):
+    stub_algod.latency = 0.001
+    stub_algod.global_state[APP_ID] = {b"counter": 1}
+
+    shared = ApplicationClient(stub_algod, ViewApp(), app_id=APP_ID)
+
+    def worker(n: int) -> int:
+        sk, addr = generate_account()
+        stub_algod.local_state[(APP_ID, addr)] = {b"nick": f"{n}".encode()}
+
+        # Per thread signer, everything else is shared
+        ac = shared.prepare(signer=AccountTransactionSigner(sk))
+
+        done = 0
+        for _ in range(ITERATIONS):
+            ac.build()
+            assert ac.approval_binary is not None
+
+            assert ac.get_application_state(cached=True) == {"counter": 1}
+            assert ac.get_account_state(cached=True) == {"nick": f"{n}"}
+
+            atc = ac.add_method_call(AtomicTransactionComposer(), ViewApp.incr)
+            result = ac._execute(atc)
+            assert result.confirmed_round == stub_algod.round
+            done += 1
+        return done
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        assert sum(pool.map(worker, range(THREADS))) == THREADS * ITERATIONS
+
+    # Built exactly once no matter how many threads raced to do it
+    assert stub_algod.calls["compile"] == 2
+    assert len(shared._method_plans) == 1
+    assert len(stub_algod.sent) == THREADS * ITERATIONS
+
+
+def test_invalidate_during_fetch(stub_algod):
+    stub_algod.global_state[APP_ID] = {b"counter": 1}
+    sv = StateView(stub_algod)
+    sv.observe_round(1)
+
+    application_info = stub_algod.application_info
+
+    def racing_info(app_id, **kwargs):
+        info = application_info(app_id)
+        # A write lands while the response is on its way back
+        sv.invalidate(app_id)
+        return info
+
+    stub_algod.application_info = racing_info
+
+    assert sv.global_state(APP_ID) == {"counter": 1}
+    assert sv.cached_global_state(APP_ID) is None, "Stale response must not be cached"
+
+    stub_algod.application_info = application_info
+    sv.global_state(APP_ID)
+    assert sv.cached_global_state(APP_ID) is not None
@@ -39,6 +39,13 @@ MAX_LOCAL_STATE = 16
 #: The max number of global state values that may be declared
 MAX_GLOBAL_STATE = 64
 
+#: The max size in bytes of a single box
+MAX_BOX_SIZE = 32768
+#: Flat minimum balance increase of the app account for each box it holds
+BOX_FLAT_MIN_BALANCE = 2500
+#: Minimum balance increase of the app account for each byte of box name and contents
+BOX_BYTE_MIN_BALANCE = 400
+
 #: The maximum number of args that may be included in an lsig
 LSIG_MAX_ARGS = 255
 
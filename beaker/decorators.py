@@ -28,7 +28,7 @@ from pyteal import (
     Txn,
 )
 
-from beaker.state import AccountStateValue, ApplicationStateValue
+from beaker.state import AccountStateValue, ApplicationStateValue, StateCache
 
 HandlerFunc = Callable[..., Expr]
 
@@ -308,6 +308,16 @@ def _authorize(allowed: SubroutineFnWrapper) -> Callable[..., HandlerFunc]:
     return _decorate
 
 
+def _cache_state(fn: HandlerFunc) -> HandlerFunc:
+    @wraps(fn)
+    def _impl(*args, **kwargs) -> Expr:
+        with StateCache() as cache:
+            body = fn(*args, **kwargs)
+        return cache.wrap(body)
+
+    return _impl
+
+
 def _readonly(fn: HandlerFunc) -> HandlerFunc:
     set_handler_config(fn, read_only=True)
     return fn
@@ -432,6 +442,7 @@ def external(
     authorize: SubroutineFnWrapper = None,
     method_config: MethodConfig = None,
     read_only: bool = False,
+    cache_state: bool = False,
 ) -> HandlerFunc:
 
     """
@@ -442,6 +453,7 @@ def external(
         authorize: a subroutine with input of ``Txn.sender()`` and output uint64 interpreted as allowed if the output>0.
         method_config:  A subroutine that should take a single argument (Txn.sender()) and evaluate to 1/0 depending on the app call transaction sender.
         read_only: Mark a method as callable with no fee using dryrun or simulate
+        cache_state: Load the application state values the method uses into scratch once and write the ones it sets back once when it ends, see ``StateCache``
 
     Returns:
         The original method with additional elements set in its  :code:`__handler_config__` attribute
@@ -452,6 +464,8 @@ def external(
         fn = _capture_defaults(fn)
         fn = _replace_structs(fn)
 
+        if cache_state:
+            fn = _cache_state(fn)
         if authorize is not None:
             fn = _authorize(authorize)(fn)
         if method_config is not None:
@@ -0,0 +1,4 @@
+from .priority_queue import PriorityQueue
+from .map import HashMap
+from .bitmap import Bitmap
+from .record_array import RecordArray
@@ -0,0 +1,338 @@
+from typing import Callable
+
+from pyteal import (
+    And,
+    Bytes,
+    BytesZero,
+    Expr,
+    Extract,
+    GetBit,
+    If,
+    Int,
+    Len,
+    Not,
+    ScratchLoad,
+    ScratchVar,
+    Seq,
+    SetBit,
+    TealType,
+    While,
+)
+
+from beaker.lib.storage.blob import blob_page_size, splice
+from beaker.lib.storage.box import BoxExtract, BoxReplace
+from beaker.state import (
+    AccountStateBlob,
+    ApplicationStateBlob,
+    BoxStateBlob,
+    StateBlob,
+)
+
+#: Bits held in each page of a blob, range ops work a page at a time
+PAGE_BITS = blob_page_size * 8
+
+# A page of set bits to fill whole bytes of a range from
+_ONES = Bytes(b"\xff" * blob_page_size)
+
+
+class Bitmap:
+    """
+    Bitmap is an array of bits held in an application blob, an account blob or a box blob
+
+    The blob is declared on the Application as usual and the bitmap over it::
+
+        seen_pages = ApplicationStateBlob(keys=4)
+        seen = Bitmap(seen_pages)
+
+    Bits are numbered from the high bit of the first byte, the order ``getbit`` and ``setbit``
+    use on byte arrays, so bit ops work on the page as it is stored. A single bit op gets and
+    puts one page of an application or account blob, or extracts and replaces one byte of a box.
+    Range ops read and write each page they cover once, whole bytes of the range are tested or
+    filled at a time.
+    """
+
+    def __init__(self, storage: StateBlob):
+        if not isinstance(
+            storage, (ApplicationStateBlob, AccountStateBlob, BoxStateBlob)
+        ):
+            raise ValueError(
+                "Bitmap needs an ApplicationStateBlob, AccountStateBlob or BoxStateBlob"
+            )
+        self.storage = storage
+
+    def __getitem__(self, acct: Expr) -> "Bitmap":
+        """the bitmap held in the local state of ``acct``, for a bitmap over an AccountStateBlob"""
+        if not isinstance(self.storage, AccountStateBlob):
+            raise ValueError(
+                "Only a bitmap over an AccountStateBlob is held per account"
+            )
+        return Bitmap(self.storage[acct])
+
+    @property
+    def max_bits(self) -> int:
+        """the number of bits the bitmap holds"""
+        match self.storage:
+            case BoxStateBlob():
+                return self.storage.size * 8
+            case ApplicationStateBlob() | AccountStateBlob():
+                return self.storage.blob._max_bytes * 8
+        raise ValueError(f"Unsupported storage {self.storage}")
+
+    def get_bit(self, bit: Expr) -> Expr:
+        """evaluates to the bit at ``bit`` as a uint64"""
+        if isinstance(self.storage, BoxStateBlob):
+            return GetBit(self._get_byte(bit / Int(8)), bit % Int(8))
+        return GetBit(self._get_page(bit / Int(PAGE_BITS)), bit % Int(PAGE_BITS))
+
+    def set_bit(self, bit: Expr, value: Expr) -> Expr:
+        """sets the bit at ``bit`` to ``value``, 0 or 1"""
+        return self._update(bit, lambda buf, at: SetBit(buf, at, value))
+
+    def test_and_set(self, bit: Expr) -> Expr:
+        """
+        sets the bit at ``bit`` and evaluates to what it was before
+
+        The unit holding the bit is only written back if the bit wasn't already set, so
+        ``Assert(Not(bitmap.test_and_set(seq)))`` rejects a sequence number seen before.
+        """
+        prev = ScratchVar(TealType.uint64)
+        return Seq(
+            self._update(
+                bit,
+                lambda buf, at: SetBit(buf, at, Int(1)),
+                lambda buf, at: Seq(prev.store(GetBit(buf, at)), Not(prev.load())),
+            ),
+            prev.load(),
+        )
+
+    def set_range(self, start: Expr, stop: Expr, value: Expr) -> Expr:
+        """sets every bit between ``start`` and ``stop`` to ``value``, 0 or 1"""
+        fill = ScratchVar(TealType.bytes)
+        return Seq(
+            fill.store(If(value, _ONES, BytesZero(Int(blob_page_size)))),
+            self._each_page(
+                start,
+                stop,
+                lambda page, lo, hi: page.store(
+                    _set_bits(page.load(), lo, hi, value, fill.load())
+                ),
+                write=True,
+            ),
+        )
+
+    def any_set(self, start: Expr, stop: Expr) -> Expr:
+        """evaluates to 1 if any bit between ``start`` and ``stop`` is set"""
+        found = ScratchVar(TealType.uint64)
+        return Seq(
+            found.store(Int(0)),
+            self._each_page(
+                start,
+                stop,
+                lambda page, lo, hi: found.store(
+                    _any_bits(page.load(), lo, hi, Int(1))
+                ),
+                done=found.load(),
+            ),
+            found.load(),
+        )
+
+    def all_set(self, start: Expr, stop: Expr) -> Expr:
+        """evaluates to 1 if every bit between ``start`` and ``stop`` is set"""
+        missing = ScratchVar(TealType.uint64)
+        return Seq(
+            missing.store(Int(0)),
+            self._each_page(
+                start,
+                stop,
+                lambda page, lo, hi: missing.store(
+                    _any_bits(page.load(), lo, hi, Int(0))
+                ),
+                done=missing.load(),
+            ),
+            Not(missing.load()),
+        )
+
+    def _get_byte(self, idx: Expr) -> Expr:
+        return BoxExtract(self._box_name(), idx, Int(1))
+
+    def _box_name(self) -> Expr:
+        assert isinstance(self.storage, BoxStateBlob)
+        return self.storage._blob().name
+
+    def _get_page(self, page: Expr) -> Expr:
+        match self.storage:
+            case ApplicationStateBlob() | AccountStateBlob():
+                return self.storage.get_page(page)
+            case BoxStateBlob():
+                # The last page of a box may be short
+                size = self.storage.size
+                length: Expr = Int(blob_page_size)
+                if size % blob_page_size:
+                    length = If(
+                        page == Int(size // blob_page_size),
+                        Int(size % blob_page_size),
+                        length,
+                    )
+                return BoxExtract(self._box_name(), page * Int(blob_page_size), length)
+        raise ValueError(f"Unsupported storage {self.storage}")
+
+    def _put_page(self, page: Expr, val: Expr) -> Expr:
+        match self.storage:
+            case ApplicationStateBlob() | AccountStateBlob():
+                return self.storage.put_page(page, val)
+            case BoxStateBlob():
+                return BoxReplace(self._box_name(), page * Int(blob_page_size), val)
+        raise ValueError(f"Unsupported storage {self.storage}")
+
+    def _update(
+        self,
+        bit: Expr,
+        op: Callable[[Expr, Expr], Expr],
+        cond: Callable[[Expr, Expr], Expr] | None = None,
+    ) -> Expr:
+        # Reads the byte or page holding the bit, writes back op of it if cond holds
+        keep: Expr = Seq()
+        if not isinstance(bit, (ScratchLoad, Int)):
+            tmp = ScratchVar(TealType.uint64)
+            keep, bit = tmp.store(bit), tmp.load()
+
+        buf = ScratchVar(TealType.bytes)
+        if isinstance(self.storage, BoxStateBlob):
+            unit, at = bit / Int(8), bit % Int(8)
+            read = self._get_byte(unit)
+            write = BoxReplace(self._box_name(), unit, op(buf.load(), at))
+        else:
+            unit, at = bit / Int(PAGE_BITS), bit % Int(PAGE_BITS)
+            read = self._get_page(unit)
+            write = self._put_page(unit, op(buf.load(), at))
+
+        return Seq(
+            keep,
+            buf.store(read),
+            write if cond is None else If(cond(buf.load(), at)).Then(write),
+        )
+
+    def _each_page(
+        self,
+        start: Expr,
+        stop: Expr,
+        op: Callable[[ScratchVar, Expr, Expr], Expr],
+        write: bool = False,
+        done: Expr | None = None,
+    ) -> Expr:
+        # Runs op on each page the range covers with the bounds of the range in that page,
+        # stopping early once done holds
+        first = ScratchVar(TealType.uint64)
+        end = ScratchVar(TealType.uint64)
+        last = ScratchVar(TealType.uint64)
+        page_idx = ScratchVar(TealType.uint64)
+        page = ScratchVar(TealType.bytes)
+        base = ScratchVar(TealType.uint64)
+        page_bits = Int(PAGE_BITS)
+
+        cond = page_idx.load() <= last.load()
+        if done is not None:
+            cond = And(Not(done), cond)
+
+        return Seq(
+            first.store(start),
+            end.store(stop),
+            If(first.load() < end.load()).Then(
+                page_idx.store(first.load() / page_bits),
+                last.store((end.load() - Int(1)) / page_bits),
+                While(cond).Do(
+                    page.store(self._get_page(page_idx.load())),
+                    base.store(page_idx.load() * page_bits),
+                    op(
+                        page,
+                        If(
+                            first.load() > base.load(),
+                            first.load() - base.load(),
+                            Int(0),
+                        ),
+                        If(
+                            page_idx.load() < last.load(),
+                            Len(page.load()) * Int(8),
+                            end.load() - base.load(),
+                        ),
+                    ),
+                    self._put_page(page_idx.load(), page.load()) if write else Seq(),
+                    page_idx.store(page_idx.load() + Int(1)),
+                ),
+            ),
+        )
+
+
+def _set_bits(buf: Expr, lo: Expr, hi: Expr, value: Expr, fill: Expr) -> Expr:
+    # Sets the bits of buf in lo..hi, bit at a time up to the first whole byte and after the
+    # last, the bytes in between at once from fill
+    out = ScratchVar(TealType.bytes)
+    at = ScratchVar(TealType.uint64)
+    end = ScratchVar(TealType.uint64)
+    n = ScratchVar(TealType.uint64)
+    return Seq(
+        out.store(buf),
+        at.store(lo),
+        end.store(hi),
+        While(And(at.load() < end.load(), at.load() % Int(8))).Do(
+            out.store(SetBit(out.load(), at.load(), value)),
+            at.store(at.load() + Int(1)),
+        ),
+        n.store((end.load() - at.load()) / Int(8)),
+        If(n.load()).Then(
+            out.store(
+                splice(
+                    out.load(),
+                    at.load() / Int(8),
+                    at.load() / Int(8) + n.load(),
+                    Extract(fill, Int(0), n.load()),
+                )
+            ),
+            at.store(at.load() + n.load() * Int(8)),
+        ),
+        While(at.load() < end.load()).Do(
+            out.store(SetBit(out.load(), at.load(), value)),
+            at.store(at.load() + Int(1)),
+        ),
+        out.load(),
+    )
+
+
+def _any_bits(buf: Expr, lo: Expr, hi: Expr, value: Int) -> Expr:
+    # 1 if any bit of buf in lo..hi is value, whole bytes are compared at once
+    bits = ScratchVar(TealType.bytes)
+    found = ScratchVar(TealType.uint64)
+    at = ScratchVar(TealType.uint64)
+    end = ScratchVar(TealType.uint64)
+    n = ScratchVar(TealType.uint64)
+
+    def is_value(bit: Expr) -> Expr:
+        return bit if value.value else Not(bit)
+
+    def any_byte(n: Expr) -> Expr:
+        # Whole bytes with a bit set aren't all zero, with a bit clear aren't all ones
+        got = Extract(bits.load(), at.load() / Int(8), n)
+        if value.value:
+            return got != BytesZero(n)
+        return got != Extract(_ONES, Int(0), n)
+
+    return Seq(
+        bits.store(buf),
+        found.store(Int(0)),
+        at.store(lo),
+        end.store(hi),
+        While(And(Not(found.load()), at.load() < end.load(), at.load() % Int(8))).Do(
+            found.store(is_value(GetBit(bits.load(), at.load()))),
+            at.store(at.load() + Int(1)),
+        ),
+        n.store((end.load() - at.load()) / Int(8)),
+        If(And(Not(found.load()), n.load())).Then(
+            found.store(any_byte(n.load())),
+            at.store(at.load() + n.load() * Int(8)),
+        ),
+        While(And(Not(found.load()), at.load() < end.load())).Do(
+            found.store(is_value(GetBit(bits.load(), at.load()))),
+            at.store(at.load() + Int(1)),
+        ),
+        found.load(),
+    )
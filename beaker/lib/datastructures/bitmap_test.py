@@ -0,0 +1,164 @@
+import random
+from typing import cast
+
+import pytest
+import pyteal as pt
+import beaker as bkr
+
+from beaker.client.avm import AVMError
+from beaker.client.bitmap_reader import BitmapReader
+from beaker.lib.datastructures import Bitmap
+from beaker.testing import LocalApp
+
+
+class BitmapApp(bkr.Application):
+    data: bkr.ApplicationStateBlob | bkr.AccountStateBlob | bkr.BoxStateBlob
+    bits: Bitmap
+
+    @bkr.external
+    def init(self):
+        return self.data.initialize()
+
+    @bkr.external
+    def get_bit(self, bit: pt.abi.Uint64, *, output: pt.abi.Uint64):
+        return output.set(self.bits.get_bit(bit.get()))
+
+    @bkr.external
+    def set_bit(self, bit: pt.abi.Uint64, value: pt.abi.Uint8):
+        return self.bits.set_bit(bit.get(), value.get())
+
+    @bkr.external
+    def test_and_set(self, bit: pt.abi.Uint64, *, output: pt.abi.Uint64):
+        return output.set(self.bits.test_and_set(bit.get()))
+
+    @bkr.external
+    def dedupe(self, seq: pt.abi.Uint64):
+        """rejects a sequence number seen before"""
+        return pt.Assert(pt.Not(self.bits.test_and_set(seq.get())))
+
+    @bkr.external
+    def set_range(self, start: pt.abi.Uint64, stop: pt.abi.Uint64, value: pt.abi.Uint8):
+        return self.bits.set_range(start.get(), stop.get(), value.get())
+
+    @bkr.external
+    def any_set(
+        self, start: pt.abi.Uint64, stop: pt.abi.Uint64, *, output: pt.abi.Uint64
+    ):
+        return output.set(self.bits.any_set(start.get(), stop.get()))
+
+    @bkr.external
+    def all_set(
+        self, start: pt.abi.Uint64, stop: pt.abi.Uint64, *, output: pt.abi.Uint64
+    ):
+        return output.set(self.bits.all_set(start.get(), stop.get()))
+
+
+class GlobalBitmap(BitmapApp):
+    data = bkr.ApplicationStateBlob(keys=4)
+    bits = Bitmap(data)
+
+
+class LocalBitmap(BitmapApp):
+    data = bkr.AccountStateBlob(keys=3)
+    bits = Bitmap(data)
+
+
+class BoxBitmap(BitmapApp):
+    # Three pages, the last one short
+    data = bkr.BoxStateBlob(size=300)
+    bits = Bitmap(data)
+
+
+def stored(local: LocalApp, app: BitmapApp) -> bytes:
+    match app.data:
+        case bkr.BoxStateBlob():
+            return cast(dict, local.snapshot.boxes)[app.data.name]
+        case bkr.ApplicationStateBlob():
+            state = local.snapshot.global_state
+        case _:
+            state = local.snapshot.local_state[local.sender]
+    keys = cast(bkr.ApplicationStateBlob, app.data).blob.byte_keys
+    return b"".join(cast(bytes, state[key]) for key in keys)
+
+
+@pytest.mark.parametrize(
+    "app_class",
+    [GlobalBitmap, LocalBitmap, BoxBitmap],
+)
+def test_bitmap(app_class: type[BitmapApp]):
+    app = app_class()
+    local = LocalApp(app)
+    local.call(app.init, budget=16 * 700)
+
+    max_bits = app.bits.max_bits
+    expected = [0] * max_bits
+
+    rng = random.Random(max_bits)
+    for bit in rng.sample(range(max_bits), 20) + [0, max_bits - 1]:
+        local.call(app.set_bit, bit=bit, value=1)
+        expected[bit] = 1
+    assert BitmapReader(stored(local, app)).to_list() == expected
+
+    for bit in rng.sample(range(max_bits), 10):
+        assert local.call(app.get_bit, bit=bit) == expected[bit]
+        assert local.call(app.test_and_set, bit=bit) == expected[bit]
+        expected[bit] = 1
+        assert local.call(app.get_bit, bit=bit) == 1
+
+    local.call(app.set_bit, bit=max_bits - 1, value=0)
+    expected[max_bits - 1] = 0
+
+    with pytest.raises(AVMError):
+        local.call(app.get_bit, bit=max_bits)
+
+    # Ranges within a byte, across bytes and across every page
+    ranges = [(3, 6), (5, 30), (1000, 1040), (8, 2000), (1, max_bits - 1)]
+    for i, (start, stop) in enumerate(ranges):
+        value = i % 2
+        local.call(app.set_range, start=start, stop=stop, value=value, budget=16 * 700)
+        expected[start:stop] = [value] * (stop - start)
+        assert BitmapReader(stored(local, app)).to_list() == expected
+
+        for start, stop in [(start, stop), (0, max_bits), (start, start + 1)]:
+            assert local.call(
+                app.any_set, start=start, stop=stop, budget=16 * 700
+            ) == int(any(expected[start:stop]))
+            assert local.call(
+                app.all_set, start=start, stop=stop, budget=16 * 700
+            ) == int(all(expected[start:stop]))
+
+    # An empty range has nothing set and nothing clear
+    assert local.call(app.any_set, start=10, stop=10) == 0
+    assert local.call(app.all_set, start=10, stop=10) == 1
+
+
+def test_bitmap_dedupe():
+    app = GlobalBitmap()
+    local = LocalApp(app)
+    local.call(app.init, budget=16 * 700)
+
+    for seq in [5, 900, 1017]:
+        local.call(app.dedupe, seq=seq)
+    before = local.snapshot
+    with pytest.raises(AVMError):
+        local.call(app.dedupe, seq=900)
+    assert local.snapshot == before
+
+    reader = BitmapReader(stored(local, app))
+    assert list(reader.set_bits()) == [5, 900, 1017]
+    assert reader.count(0, 900) == 1
+    assert reader[1017] and not reader[1016]
+
+
+def test_bitmap_storage():
+    with pytest.raises(ValueError):
+        Bitmap(cast(bkr.ApplicationStateBlob, object()))
+    with pytest.raises(ValueError):
+        GlobalBitmap.bits[pt.Txn.sender()]
+    assert isinstance(LocalBitmap.bits[pt.Txn.accounts[1]], Bitmap)
+    assert BoxBitmap.bits.max_bits == 2400
+
+
+def test_bitmap_box_version():
+    with pytest.raises(pt.TealInputError, match="Minimum.* is 8"):
+        BoxBitmap(version=7)
@@ -1,2 +1,149 @@
+import hashlib
+from typing import Any
+
+from algosdk import abi as sdk_abi
+from pyteal import (
+    Assert,
+    Bytes,
+    Concat,
+    Expr,
+    Pop,
+    ScratchVar,
+    Seq,
+    Sha256,
+    abi,
+)
+
+from beaker.lib.storage.box import (
+    BoxDelete,
+    BoxExists,
+    BoxGet,
+    BoxPut,
+    box_min_balance,
+    box_name_bytes,
+)
+
+#: The max length of a box name
+MAX_BOX_NAME_LENGTH = 64
+
+
 class HashMap:
-    pass
+    """
+    HashMap maps ABI encoded keys to ABI encoded values, one box per entry
+
+    The box name is ``prefix`` followed by the key encoding so get, put and delete are a
+    single box op, and maps with different prefixes can live in the same app. Keys whose
+    encoding, with the prefix, could be longer than the 64 bytes a box name allows must set
+    ``hash_keys`` to name boxes by the sha256 of the key instead, which means keys can't be
+    listed off chain.
+
+    Values of a static type are written in place, dynamic values replace the box. The app
+    account must be funded for ``min_balance`` of each entry before it is put, and each call
+    must reference the boxes it touches.
+    """
+
+    def __init__(
+        self,
+        key_type: abi.TypeSpec,
+        value_type: abi.TypeSpec,
+        prefix: str | bytes = b"",
+        hash_keys: bool = False,
+    ):
+        self.key_type = key_type
+        self.value_type = value_type
+        self.prefix = box_name_bytes(prefix)
+        self.hash_keys = hash_keys
+
+        # Dynamic keys that are too long fail when used
+        if hash_keys or not key_type.is_dynamic():
+            key_length = 32 if hash_keys else key_type.byte_length_static()
+            if len(self.prefix) + key_length > MAX_BOX_NAME_LENGTH:
+                raise ValueError(
+                    f"Keys with prefix {self.prefix!r} don't fit in a box name, use hash_keys"
+                )
+
+        self._key_codec = sdk_abi.ABIType.from_string(str(key_type))
+        self._value_codec = sdk_abi.ABIType.from_string(str(value_type))
+
+    def min_balance(self, value_size: int = None) -> int:
+        """
+        the minimum balance in microalgos the app account needs for each entry
+
+        ``value_size`` is required for dynamic value types, for keys of a dynamic type the
+        longest possible name is assumed.
+        """
+        if value_size is None:
+            if self.value_type.is_dynamic():
+                raise ValueError("value_size is needed for dynamic value types")
+            value_size = self.value_type.byte_length_static()
+
+        if self.hash_keys:
+            key_size = 32
+        elif self.key_type.is_dynamic():
+            key_size = MAX_BOX_NAME_LENGTH - len(self.prefix)
+        else:
+            key_size = self.key_type.byte_length_static()
+
+        return box_min_balance(len(self.prefix), key_size + value_size)
+
+    def box_name(self, key: abi.BaseType | Expr) -> Expr:
+        """evaluates to the name of the box holding the entry for ``key``"""
+        encoded = key.encode() if isinstance(key, abi.BaseType) else key
+        if self.hash_keys:
+            encoded = Sha256(encoded)
+        if self.prefix:
+            return Concat(Bytes(self.prefix), encoded)
+        return encoded
+
+    def get(self, key: abi.BaseType | Expr, output: abi.BaseType) -> Expr:
+        """decodes the value for ``key`` into ``output``, failing if there is no entry"""
+        return output.decode(BoxGet(self.box_name(key)))
+
+    def contains(self, key: abi.BaseType | Expr) -> Expr:
+        """evaluates to 1 if there is an entry for ``key``"""
+        return BoxExists(self.box_name(key))
+
+    def put(self, key: abi.BaseType | Expr, value: abi.BaseType | Expr) -> Expr:
+        """sets the value for ``key``"""
+        encoded = value.encode() if isinstance(value, abi.BaseType) else value
+        if not self.value_type.is_dynamic():
+            return BoxPut(self.box_name(key), encoded)
+
+        # Box sizes are fixed, a value of a different length needs a new box
+        name = ScratchVar()
+        return Seq(
+            name.store(self.box_name(key)),
+            Pop(BoxDelete(name.load())),
+            BoxPut(name.load(), encoded),
+        )
+
+    def delete(self, key: abi.BaseType | Expr) -> Expr:
+        """removes the entry for ``key``, failing if there is none"""
+        return Assert(BoxDelete(self.box_name(key)))
+
+    def name_for(self, key: Any) -> bytes:
+        """returns the box name for ``key`` given as a python value, for box references"""
+        encoded = self._key_codec.encode(key)
+        if self.hash_keys:
+            encoded = hashlib.sha256(encoded).digest()
+        return self.prefix + encoded
+
+    def key_for(self, name: bytes) -> Any:
+        """
+        returns the python value of the key a box name was made from, None if it isn't one of this map's
+
+        Only maps with a prefix can tell their boxes from other boxes of the app, without one
+        any name that happens to decode as a key would be claimed so this raises a ValueError.
+        """
+        if not self.prefix:
+            raise ValueError("Box names can only be matched to a map with a prefix")
+        if self.hash_keys or not name.startswith(self.prefix):
+            return None
+        try:
+            return self._key_codec.decode(name[len(self.prefix) :])
+        except Exception:
+            return None
+
+    def decode_value(self, value: bytes) -> Any:
+        """returns the python value of an encoded value"""
+        return self._value_codec.decode(value)
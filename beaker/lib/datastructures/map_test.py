@@ -0,0 +1,100 @@
+import pytest
+import pyteal as pt
+import beaker as bkr
+
+from beaker.client.avm import AVMError
+from beaker.lib.datastructures import HashMap
+from beaker.testing import LocalApp
+
+Position = pt.abi.Tuple2[pt.abi.Uint64, pt.abi.Uint64]
+
+
+class Ledger(bkr.Application):
+    balances = HashMap(pt.abi.AddressTypeSpec(), pt.abi.Uint64TypeSpec(), prefix="bal")
+    names = HashMap(
+        pt.abi.Uint64TypeSpec(), pt.abi.StringTypeSpec(), prefix="n", hash_keys=True
+    )
+
+    @bkr.external
+    def set_balance(self, addr: pt.abi.Address, amount: pt.abi.Uint64):
+        return self.balances.put(addr, amount)
+
+    @bkr.external
+    def get_balance(self, addr: pt.abi.Address, *, output: pt.abi.Uint64):
+        return self.balances.get(addr, output)
+
+    @bkr.external
+    def has_balance(self, addr: pt.abi.Address, *, output: pt.abi.Bool):
+        return output.set(self.balances.contains(addr))
+
+    @bkr.external
+    def remove_balance(self, addr: pt.abi.Address):
+        return self.balances.delete(addr)
+
+    @bkr.external
+    def set_name(self, id: pt.abi.Uint64, name: pt.abi.String):
+        return self.names.put(id, name)
+
+    @bkr.external
+    def get_name(self, id: pt.abi.Uint64, *, output: pt.abi.String):
+        return self.names.get(id, output)
+
+
+def test_hash_map():
+    local = LocalApp(Ledger())
+    addr = local.sender
+
+    assert local.call(Ledger.has_balance, addr=addr) is False
+    with pytest.raises(AVMError):
+        local.call(Ledger.get_balance, addr=addr)
+
+    local.call(Ledger.set_balance, addr=addr, amount=10)
+    local.call(Ledger.set_balance, addr=addr, amount=25)
+    assert local.call(Ledger.get_balance, addr=addr) == 25
+    assert local.call(Ledger.has_balance, addr=addr) is True
+    assert local.snapshot.boxes == {
+        Ledger.balances.name_for(addr): (25).to_bytes(8, "big")
+    }
+    assert Ledger.balances.key_for(Ledger.balances.name_for(addr)) == addr
+
+    local.call(Ledger.remove_balance, addr=addr)
+    assert local.snapshot.boxes == {}
+    with pytest.raises(AVMError):
+        local.call(Ledger.remove_balance, addr=addr)
+
+    # Dynamic values can change length
+    local.call(Ledger.set_name, id=1, name="short")
+    local.call(Ledger.set_name, id=1, name="a longer name")
+    assert local.call(Ledger.get_name, id=1) == "a longer name"
+    assert list(local.snapshot.boxes) == [Ledger.names.name_for(1)]
+    assert Ledger.names.key_for(Ledger.names.name_for(1)) is None
+
+
+def test_hash_map_names():
+    with pytest.raises(ValueError):
+        HashMap(pt.abi.AddressTypeSpec(), pt.abi.Uint64TypeSpec(), prefix="p" * 33)
+
+    # Hashed keys are always 32 bytes
+    HashMap(
+        pt.abi.StaticArrayTypeSpec(pt.abi.ByteTypeSpec(), 100),
+        pt.abi.Uint64TypeSpec(),
+        prefix="p" * 32,
+        hash_keys=True,
+    )
+
+    assert Ledger.balances.min_balance() == 2500 + 400 * (3 + 32 + 8)
+    with pytest.raises(ValueError):
+        Ledger.names.min_balance()
+    assert Ledger.names.min_balance(10) == 2500 + 400 * (1 + 32 + 10)
+
+
+def test_hash_map_key_for():
+    addr = Ledger.balances.key_for(Ledger.balances.name_for(bytes(32)))
+    assert addr == Ledger.balances.key_for(b"bal" + bytes(32))
+    assert Ledger.balances.key_for(b"data" + bytes(31)) is None
+    assert Ledger.names.key_for(Ledger.names.name_for(1)) is None
+
+    # Without a prefix any name of the right length would decode as a key
+    unprefixed = HashMap(pt.abi.Uint64TypeSpec(), pt.abi.Uint64TypeSpec())
+    with pytest.raises(ValueError):
+        unprefixed.key_for(b"box_name")
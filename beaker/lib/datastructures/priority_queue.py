@@ -1,270 +1,282 @@
-# from pyteal import *
-# from typing import List
-# from application import GlobalStorageValue
-#
-# ou = OpUp(OpUpMode.OnCall)
-#
-#
-# class PriorityQueue:
-#    def __init__(self, box_name: str, box_size: Int, lt: Int, type_spec: abi.TypeSpec):
-#        self.box_name_str = box_name
-#        self.box_name = Bytes(box_name)
-#        self.box_size = box_size
-#        self.type_spec = type_spec
-#        self.lt = lt
-#        self.type_size = Int(abi.size_of(self.type_spec))
-#        self.counter = GlobalStorageValue(self.box_name_str, TealType.uint64)
-#
-#    def initialize(self) -> Expr:
-#        return BoxCreate(self.box_name, self.box_size)
-#
-#    def count(self) -> Expr:
-#        """count returns the number of elements in the priority queue, tracked by global state var"""
-#        return self.counter.get()
-#
-#    def insert(self, thing: abi.BaseType) -> Expr:
-#        """insert adds a new element in sorted order"""
-#        return pq_insert(self.box_name, thing.encode(), self.lt)
-#
-#    def update(self, idx: Expr, thing: abi.BaseType) -> Expr:
-#        """insert adds a new element in sorted order"""
-#        return pq_write(self.box_name, idx, thing.encode())
-#
-#    def delete(self, thing: abi.BaseType) -> Expr:
-#        """delete removes a given element by finding it in the pq then removing it by index"""
-#        return self.remove(self.search(thing))
-#
-#    def pop(self) -> Expr:
-#        """pop removes the first element from the pq and returns it after resorting the pq"""
-#        return pq_pop(self.box_name, self.type_size, self.lt)
-#
-#    def remove(self, idx: Expr) -> Expr:
-#        """remove removes an element by its index"""
-#        return pq_remove(self.box_name, idx, self.type_size, self.lt)
-#
-#    def peek(self) -> Expr:
-#        """peak reads the root element but doesn't modify the pq"""
-#        return pq_read(self.box_name, Int(0), self.type_size)
-#
-#    def get(self, idx: abi.Uint64) -> Expr:
-#        """get returns an element at a given index"""
-#        return pq_read(self.box_name, idx.get(), self.type_size)
-#
-#    def search(self, thing: abi.BaseType) -> Expr:
-#        """search tries to find the element in the pq"""
-#        return pq_search(self.box_name, thing.encode())
-#
-#
-# # pq counter stored in global state
-# def pq_count(key):
-#    return App.globalGet(key)
-#
-#
-# def pq_count_incr(key):
-#    return App.globalPut(key, pq_count(key) + Int(1))
-#
-#
-# def pq_count_decr(key):
-#    return App.globalPut(key, pq_count(key) - Int(1))
-#
-#
-# # pq idx helpers
-# def child_idx_left(pos) -> Expr:
-#    return (pos * Int(2)) + Int(1)
-#
-#
-# def child_idx_right(pos) -> Expr:
-#    return (pos * Int(2)) + Int(2)
-#
-#
-# def parent_idx(pos) -> Expr:
-#    return If(pos % Int(2) == Int(0), pos - Int(2), pos - Int(1)) / Int(2)
-#
-#
-# #### pq read/writes
-# def pq_write(key, idx, val):
-#    return BoxReplace(key, idx * Len(val), val)
-#
-#
-# def pq_read(key, idx, len):
-#    return BoxExtract(key, idx * len, len)
-#
-#
-# def pq_zero(key, idx, len):
-#    return pq_write(key, idx, BytesZero(len))
-#
-#
-# @Subroutine(TealType.uint64)
-# def unsorted(a, b, lt):
-#    """unsorted takes a and b as bytes and lt as the sort order,
-#    returning whether or not the elements are in correct order
-#    """
-#    return If(
-#        Or(Len(a) == Int(0), Len(b) == Int(0)),
-#        Int(0),
-#        If(
-#            lt,
-#            # sorted_lt checks to see if a is less than b by comparing the price|sequence both uint64
-#            BytesLt(Extract(a, Int(0), Int(2 * 8)), Extract(b, Int(0), Int(2 * 8))),
-#            # sorted_gt checks to see if a is greater than b by comparing the price|~sequence both uint64
-#            BytesGt(
-#                Concat(
-#                    Extract(a, Int(0), Int(8)),
-#                    BytesNot(Extract(a, Int(8), Int(8))),
-#                ),
-#                Concat(
-#                    Extract(b, Int(0), Int(8)),
-#                    BytesNot(Extract(b, Int(8), Int(8))),
-#                ),
-#            ),
-#        ),
-#    )
-#
-#
-# ## pq operations
-# @Subroutine(TealType.none)
-# def pq_insert(key, val, sort):
-#    return Seq(
-#        # Write the first element in the last spot
-#        pq_write(key, pq_count(key), val),
-#        # Restore heap invariant starting with the last element
-#        pq_upheap(key, pq_count(key), Len(val), sort),
-#        # Increment the counter
-#        pq_count_incr(key),
-#    )
-#
-#
-# @Subroutine(TealType.bytes)
-# def pq_pop(key, len, sort):
-#    return Seq(
-#        # Read the top element
-#        (top := ScratchVar()).store(BoxExtract(key, Int(0), len)),
-#        # Decrement the counter so we have the correct last element
-#        pq_count_decr(key),
-#        # Swap last for first
-#        pq_swap(key, Int(0), pq_count(key), len),
-#        # Restore heap property
-#        pq_downheap(key, Int(0), len, sort),
-#        # Zero out bytes for the last one
-#        pq_zero(key, pq_count(key), len),
-#        # Return the top element
-#        top.load(),
-#    )
-#
-#
-# @Subroutine(TealType.none)
-# def pq_remove(key, idx, len, sort):
-#    return Seq(
-#        # Decrement the counter
-#        pq_count_decr(key),
-#        # Swap the index to remove for last
-#        pq_swap(key, idx, pq_count(key), len),
-#        # Restore heap invariant
-#        pq_downheap(key, idx, len, sort),
-#        # Zero out bytes for the last one (the one we're removing)
-#        pq_zero(key, pq_count(key), len),
-#    )
-#
-#
-# @Subroutine(TealType.none)
-# def pq_swap(key, aidx, bidx, len):
-#    return Seq(
-#        # Store a and b in scratch
-#        (a := ScratchVar()).store(pq_read(key, aidx, len)),
-#        (b := ScratchVar()).store(pq_read(key, bidx, len)),
-#        # Write b to a index
-#        pq_write(key, bidx, a.load()),
-#        # Write a to b index
-#        pq_write(key, aidx, b.load()),
-#    )
-#
-#
-# @Subroutine(TealType.uint64)
-# def pq_search(key, val):
-#    i = ScratchVar()
-#    init = i.store(Int(0))
-#    cond = i.load() < pq_count(key)
-#    iter = i.store(i.load() + Int(1))
-#    return Seq(
-#        For(init, cond, iter).Do(
-#            If(val == pq_read(key, i.load(), Len(val)), Return(i.load()))
-#        ),
-#        # lie
-#        pq_count(key) + Int(1),
-#    )
-#
-#
-# # pq Heap invariant restoring operations
-# @Subroutine(TealType.none)
-# def pq_upheap(key, idx, len, sort_lt):
-#    """pq_upheap restores the heap invariant property starting from a given index up the heap
-#    by comparing the child with its parent, if needed, we swap the items and check again
-#    """
-#    return If(
-#        idx != Int(0),
-#        Seq(
-#            ou.ensure_budget(Int(500)),
-#            (p_pos := ScratchVar()).store(parent_idx(idx)),
-#            If(
-#                unsorted(
-#                    pq_read(key, idx, len),
-#                    pq_read(key, p_pos.load(), len),
-#                    sort_lt,
-#                ),
-#                Seq(
-#                    pq_swap(key, idx, p_pos.load(), len),
-#                    pq_upheap(key, p_pos.load(), len, sort_lt),
-#                ),
-#            ),
-#        ),
-#    )
-#
-#
-# @Subroutine(TealType.none)
-# def pq_downheap(key, idx, len, sort_lt):
-#    """pq_downheap restores the heap invariant property starting from a given index down the heap
-#    by comparing a parent with its children, if one or the other is larger we swap the items and check again
-#    we preferr to swap the right element if both are larger
-#    """
-#    return If(
-#        idx < pq_count(key),
-#        Seq(
-#            ou.ensure_budget(Int(500)),
-#            (curr_idx := ScratchVar()).store(idx),
-#            (left_idx := ScratchVar()).store(child_idx_left(idx)),
-#            (right_idx := ScratchVar()).store(child_idx_right(idx)),
-#            # Check the left side first
-#            If(
-#                left_idx.load() < pq_count(key),
-#                If(
-#                    unsorted(
-#                        pq_read(key, left_idx.load(), len),
-#                        pq_read(key, curr_idx.load(), len),
-#                        sort_lt,
-#                    ),
-#                    curr_idx.store(left_idx.load()),
-#                ),
-#            ),
-#            # Check the right side second
-#            If(
-#                right_idx.load() < pq_count(key),
-#                If(
-#                    unsorted(
-#                        pq_read(key, right_idx.load(), len),
-#                        pq_read(key, curr_idx.load(), len),
-#                        sort_lt,
-#                    ),
-#                    curr_idx.store(right_idx.load()),
-#                ),
-#            ),
-#            # If largest is now different than current swap them and start over
-#            If(
-#                curr_idx.load() != idx,
-#                Seq(
-#                    pq_swap(key, idx, curr_idx.load(), len),
-#                    pq_downheap(key, curr_idx.load(), len, sort_lt),
-#                ),
-#            ),
-#        ),
-#    )
-#
+from typing import Callable
+
+from pyteal import (
+    And,
+    Assert,
+    Break,
+    Bytes,
+    BytesLt,
+    BytesZero,
+    Expr,
+    Extract,
+    ExtractUint64,
+    For,
+    If,
+    Int,
+    Itob,
+    Len,
+    Not,
+    ScratchVar,
+    Seq,
+    Subroutine,
+    Suffix,
+    TealType,
+    While,
+    abi,
+)
+
+from beaker.consts import MAX_BOX_SIZE
+from beaker.lib.storage.box import (
+    BoxCreate,
+    BoxExtract,
+    BoxReplace,
+    box_min_balance,
+    box_name_bytes,
+)
+
+#: Bytes at the start of the box holding the element count
+COUNT_SIZE = 8
+
+#: Takes the encodings of two elements, evaluates to 1 if the first comes out of the queue first
+Comparator = Callable[[Expr, Expr], Expr]
+
+
+class PriorityQueue:
+    """
+    PriorityQueue is a binary heap of static ABI elements held in a single box
+
+    Insert and pop are O(log n) and touch only the elements along one path of the heap. The
+    element count is kept in the first 8 bytes of the box so the queue needs no state schema.
+
+    Elements are compared by their encoding with ``comparator``. The default, ``BytesLt``, makes
+    a min-heap for uints and for tuples of uints, ordered by the first field then the next.
+    Byte math is limited to 64 bytes, for larger elements pass a comparator that extracts the
+    fields to order by.
+
+    Box opcodes need AVM 8 and every call must reference the box. Box reads and writes are
+    limited to 1k per reference, so a larger queue needs a reference for each 1k it holds.
+    """
+
+    def __init__(
+        self,
+        name: str | bytes,
+        type_spec: abi.TypeSpec,
+        max_elements: int,
+        comparator: Comparator = BytesLt,
+    ):
+        if type_spec.is_dynamic():
+            raise ValueError("PriorityQueue elements must be a static type")
+
+        self.name_bytes = box_name_bytes(name)
+        self.name = Bytes(self.name_bytes)
+        self.type_spec = type_spec
+        self.comparator = comparator
+
+        self.element_size = type_spec.byte_length_static()
+        self.max_elements = max_elements
+        # One spare element past the end so the last pair of children can be read together
+        self.box_size = COUNT_SIZE + (max_elements + 1) * self.element_size
+        if self.box_size > MAX_BOX_SIZE:
+            raise ValueError(
+                f"{max_elements} elements of {self.element_size} bytes don't fit in a box"
+            )
+
+        self._build()
+
+    @property
+    def min_balance(self) -> int:
+        """the minimum balance in microalgos the app account needs to hold the box"""
+        return box_min_balance(len(self.name_bytes), self.box_size)
+
+    def initialize(self) -> Expr:
+        """creates the empty queue, the app account must be funded for ``min_balance`` first"""
+        return Assert(BoxCreate(self.name, Int(self.box_size)))
+
+    def count(self) -> Expr:
+        """evaluates to the number of elements in the queue"""
+        return ExtractUint64(BoxExtract(self.name, Int(0), Int(COUNT_SIZE)), Int(0))
+
+    def insert(self, element: abi.BaseType | Expr) -> Expr:
+        """adds an element, failing if the queue is full"""
+        if isinstance(element, abi.BaseType):
+            element = element.encode()
+        return self._insert(element)
+
+    def insert_many(self, elements: abi.Array | Expr) -> Expr:
+        """
+        adds every element of the array, or of the concatenated encodings passed
+
+        Cheaper than inserting one at a time as the count is read and written once.
+        """
+        match elements:
+            case abi.DynamicArray():
+                return self._insert_many(Suffix(elements.encode(), Int(2)))
+            case abi.StaticArray():
+                return self._insert_many(elements.encode())
+            case _:
+                return self._insert_many(elements)
+
+    def pop(self) -> Expr:
+        """removes the first element and evaluates to its encoding, failing if the queue is empty"""
+        return self._pop()
+
+    def peek(self) -> Expr:
+        """evaluates to the encoding of the first element without removing it"""
+        return Seq(Assert(self.count()), self._read(Int(0)))
+
+    def get(self, idx: Expr) -> Expr:
+        """evaluates to the encoding of the element at heap position ``idx``"""
+        return Seq(Assert(idx < self.count()), self._read(idx))
+
+    def remove(self, idx: Expr) -> Expr:
+        """removes the element at heap position ``idx``"""
+        return self._remove(idx)
+
+    def _offset(self, idx: Expr) -> Expr:
+        return idx * Int(self.element_size) + Int(COUNT_SIZE)
+
+    def _left_child(self, offset: Expr) -> Expr:
+        # offset of the left child of the element at offset, 2 * idx + 1 in offsets
+        if self.element_size >= COUNT_SIZE:
+            return offset * Int(2) + Int(self.element_size - COUNT_SIZE)
+        return offset * Int(2) - Int(COUNT_SIZE - self.element_size)
+
+    def _read(self, idx: Expr) -> Expr:
+        return BoxExtract(self.name, self._offset(idx), Int(self.element_size))
+
+    def _write(self, idx: Expr, val: Expr) -> Expr:
+        return BoxReplace(self.name, self._offset(idx), val)
+
+    def _set_count(self, n: Expr) -> Expr:
+        return BoxReplace(self.name, Int(0), Itob(n))
+
+    def _build(self):
+        # insert, insert_many, pop and remove all sift with upheap and downheap, making
+        # them subroutines here emits each sift loop once per queue however many methods
+        # call it
+        size = Int(self.element_size)
+        first = self.comparator
+
+        @Subroutine(TealType.none)
+        def upheap(idx: Expr, val: Expr) -> Expr:
+            # Shifts parents down until val can go in the hole, a write per level not a swap
+            i = ScratchVar()
+            parent_idx = ScratchVar()
+            parent = ScratchVar()
+            return Seq(
+                i.store(idx),
+                While(i.load() > Int(0)).Do(
+                    parent_idx.store((i.load() - Int(1)) / Int(2)),
+                    parent.store(self._read(parent_idx.load())),
+                    If(Not(first(val, parent.load()))).Then(Break()),
+                    self._write(i.load(), parent.load()),
+                    i.store(parent_idx.load()),
+                ),
+                self._write(i.load(), val),
+            )
+
+        @Subroutine(TealType.none)
+        def downheap(idx: Expr, val: Expr, n: Expr) -> Expr:
+            # Shifts the first child up until val can go in the hole. Works on byte offsets
+            # and reads both children with one box_extract, the box has a spare element at
+            # the end so that's always in bounds
+            at = ScratchVar()
+            child_at = ScratchVar()
+            end = ScratchVar()
+            children = ScratchVar()
+            child = ScratchVar()
+            return Seq(
+                at.store(self._offset(idx)),
+                end.store(self._offset(n)),
+                child_at.store(self._left_child(at.load())),
+                While(child_at.load() < end.load()).Do(
+                    children.store(
+                        BoxExtract(self.name, child_at.load(), size * Int(2))
+                    ),
+                    child.store(Extract(children.load(), Int(0), size)),
+                    If(
+                        And(
+                            child_at.load() + size < end.load(),
+                            first(Extract(children.load(), size, size), child.load()),
+                        )
+                    ).Then(
+                        child_at.store(child_at.load() + size),
+                        child.store(Extract(children.load(), size, size)),
+                    ),
+                    If(Not(first(child.load(), val))).Then(Break()),
+                    BoxReplace(self.name, at.load(), child.load()),
+                    at.store(child_at.load()),
+                    child_at.store(self._left_child(at.load())),
+                ),
+                BoxReplace(self.name, at.load(), val),
+            )
+
+        @Subroutine(TealType.none)
+        def insert(val: Expr) -> Expr:
+            n = ScratchVar()
+            return Seq(
+                Assert(Len(val) == size),
+                n.store(self.count()),
+                Assert(n.load() < Int(self.max_elements)),
+                self._set_count(n.load() + Int(1)),
+                upheap(n.load(), val),
+            )
+
+        @Subroutine(TealType.none)
+        def insert_many(buff: Expr) -> Expr:
+            n = ScratchVar()
+            pos = ScratchVar()
+            return Seq(
+                Assert(Len(buff) % size == Int(0)),
+                n.store(self.count()),
+                Assert(n.load() + Len(buff) / size <= Int(self.max_elements)),
+                # upheap only reads positions before the one it starts at
+                For(
+                    pos.store(Int(0)),
+                    pos.load() < Len(buff),
+                    pos.store(pos.load() + size),
+                ).Do(
+                    upheap(n.load(), Extract(buff, pos.load(), size)),
+                    n.store(n.load() + Int(1)),
+                ),
+                self._set_count(n.load()),
+            )
+
+        @Subroutine(TealType.bytes)
+        def pop() -> Expr:
+            n = ScratchVar()
+            top = ScratchVar()
+            return Seq(
+                n.store(self.count()),
+                Assert(n.load()),
+                top.store(self._read(Int(0))),
+                n.store(n.load() - Int(1)),
+                self._set_count(n.load()),
+                If(n.load()).Then(downheap(Int(0), self._read(n.load()), n.load())),
+                self._write(n.load(), BytesZero(size)),
+                top.load(),
+            )
+
+        @Subroutine(TealType.none)
+        def remove(idx: Expr) -> Expr:
+            n = ScratchVar()
+            last = ScratchVar()
+            return Seq(
+                n.store(self.count()),
+                Assert(idx < n.load()),
+                n.store(n.load() - Int(1)),
+                self._set_count(n.load()),
+                If(idx < n.load()).Then(
+                    last.store(self._read(n.load())),
+                    # The last element may belong above or below the one it replaces
+                    If(first(last.load(), self._read(idx)))
+                    .Then(upheap(idx, last.load()))
+                    .Else(downheap(idx, last.load(), n.load())),
+                ),
+                self._write(n.load(), BytesZero(size)),
+            )
+
+        self._insert = insert
+        self._insert_many = insert_many
+        self._pop = pop
+        self._remove = remove
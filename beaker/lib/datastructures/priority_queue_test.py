@@ -0,0 +1,182 @@
+import random
+from typing import cast
+
+import pytest
+import pyteal as pt
+import beaker as bkr
+
+from beaker.client.avm import AVMError, AVMSnapshot
+from beaker.lib.datastructures import PriorityQueue
+from beaker.lib.datastructures.priority_queue import COUNT_SIZE
+from beaker.testing import LocalApp
+
+Order = pt.abi.Tuple2[pt.abi.Uint64, pt.abi.Uint64]
+
+
+class QueueApp(bkr.Application):
+    queue: PriorityQueue
+
+    @bkr.external
+    def init(self):
+        return self.queue.initialize()
+
+    @bkr.external
+    def insert(self, val: pt.abi.Uint16):
+        return self.queue.insert(val)
+
+    @bkr.external
+    def insert_many(self, vals: pt.abi.DynamicArray[pt.abi.Uint16]):
+        return self.queue.insert_many(vals)
+
+    @bkr.external
+    def pop(self, *, output: pt.abi.Uint16):
+        return output.decode(self.queue.pop())
+
+    @bkr.external
+    def peek(self, *, output: pt.abi.Uint16):
+        return output.decode(self.queue.peek())
+
+    @bkr.external
+    def remove(self, idx: pt.abi.Uint64):
+        return self.queue.remove(idx.get())
+
+    @bkr.external
+    def count(self, *, output: pt.abi.Uint64):
+        return output.set(self.queue.count())
+
+
+class SmallQueue(QueueApp):
+    queue = PriorityQueue("q", pt.abi.Uint16TypeSpec(), 64)
+
+
+def heap_values(local: LocalApp, queue: PriorityQueue) -> list[int]:
+    box = cast(dict, local.snapshot.boxes)[queue.name_bytes]
+    n = int.from_bytes(box[:COUNT_SIZE], "big")
+    size = queue.element_size
+    return [
+        int.from_bytes(box[COUNT_SIZE + i * size : COUNT_SIZE + (i + 1) * size], "big")
+        for i in range(n)
+    ]
+
+
+def test_priority_queue():
+    local = LocalApp(SmallQueue())
+    local.call(SmallQueue.init)
+
+    with pytest.raises(AVMError):
+        local.call(SmallQueue.pop)
+
+    rng = random.Random(7)
+    vals = [rng.randrange(1 << 16) for _ in range(40)]
+    for v in vals[:20]:
+        local.call(SmallQueue.insert, val=v)
+    local.call(SmallQueue.insert_many, vals=vals[20:], budget=16 * 700)
+
+    assert local.call(SmallQueue.count) == 40
+    assert local.call(SmallQueue.peek) == min(vals)
+
+    heap = heap_values(local, SmallQueue.queue)
+    assert all(heap[(i - 1) // 2] <= heap[i] for i in range(1, len(heap)))
+
+    # Removing from the middle keeps the heap valid
+    local.call(SmallQueue.remove, idx=5)
+    vals.remove(heap[5])
+
+    popped = [local.call(SmallQueue.pop) for _ in range(len(vals))]
+    assert popped == sorted(vals)
+    assert local.call(SmallQueue.count) == 0
+    assert local.snapshot.boxes == {b"q": bytes(SmallQueue.queue.box_size)}
+
+
+def test_priority_queue_full():
+    local = LocalApp(SmallQueue())
+    local.call(SmallQueue.init)
+    local.call(SmallQueue.insert_many, vals=list(range(64)), budget=16 * 700)
+    with pytest.raises(AVMError):
+        local.call(SmallQueue.insert, val=1)
+
+
+class OrderBook(bkr.Application):
+    # Highest price first, ties broken by the lowest sequence
+    bids = PriorityQueue(
+        "bids",
+        pt.abi.type_spec_from_annotation(Order),
+        32,
+        comparator=lambda a, b: pt.BytesGt(
+            pt.Concat(
+                pt.Extract(a, pt.Int(0), pt.Int(8)),
+                pt.BytesNot(pt.Suffix(a, pt.Int(8))),
+            ),
+            pt.Concat(
+                pt.Extract(b, pt.Int(0), pt.Int(8)),
+                pt.BytesNot(pt.Suffix(b, pt.Int(8))),
+            ),
+        ),
+    )
+
+    @bkr.external
+    def init(self):
+        return self.bids.initialize()
+
+    @bkr.external
+    def bid(self, order: Order):
+        return self.bids.insert(order)
+
+    @bkr.external
+    def fill(self, *, output: Order):
+        return output.decode(self.bids.pop())
+
+
+def test_priority_queue_comparator():
+    local = LocalApp(OrderBook())
+    local.call(OrderBook.init)
+    for seq, price in enumerate([10, 30, 20, 30, 10]):
+        local.call(OrderBook.bid, order=[price, seq])
+
+    fills = [local.call(OrderBook.fill) for _ in range(5)]
+    assert fills == [[30, 1], [30, 3], [20, 2], [10, 0], [10, 4]]
+
+
+def test_priority_queue_sizes():
+    with pytest.raises(ValueError):
+        PriorityQueue("big", pt.abi.Uint64TypeSpec(), 4096)
+    with pytest.raises(ValueError):
+        PriorityQueue("dynamic", pt.abi.StringTypeSpec(), 10)
+
+
+class Queue1k(QueueApp):
+    queue = PriorityQueue("q", pt.abi.Uint16TypeSpec(), 1000)
+
+
+class Queue10k(QueueApp):
+    queue = PriorityQueue("q", pt.abi.Uint16TypeSpec(), 10000)
+
+
+def filled(app: QueueApp, n: int) -> LocalApp:
+    # A sorted array is a valid min-heap, leave room for one more
+    queue = app.queue
+    box = bytearray(queue.box_size)
+    box[:COUNT_SIZE] = (n - 1).to_bytes(COUNT_SIZE, "big")
+    for i in range(n - 1):
+        offset = COUNT_SIZE + i * queue.element_size
+        box[offset : offset + queue.element_size] = (i + 1).to_bytes(2, "big")
+    return LocalApp(app, snapshot=AVMSnapshot(app_id=1, boxes={b"q": bytes(box)}))
+
+
+def test_priority_queue_cost():
+    costs = {}
+    for app, n in [(Queue1k(), 1000), (Queue10k(), 10000)]:
+        # Inserting the smallest value moves it all the way to the root
+        local = filled(app, n)
+        local.call(app.insert, val=0)
+        insert = local.cost
+        assert local.call(app.pop) == 0
+
+        # The last element moved to the root sinks all the way to a leaf
+        local.call(app.pop)
+        costs[n] = (insert, local.cost)
+
+    # Logarithmic, 10x the elements is ~3 more levels of the heap
+    assert costs[10000][0] < costs[1000][0] * 1.5
+    assert costs[10000][1] < costs[1000][1] * 1.5
+    assert max(costs[10000]) <= 700, "A single call should be enough at 10k"
@@ -0,0 +1,269 @@
+from pyteal import (
+    Assert,
+    Bytes,
+    Expr,
+    Extract,
+    GetBit,
+    If,
+    Int,
+    Len,
+    ScratchVar,
+    Seq,
+    SetBit,
+    TealType,
+    abi,
+)
+
+from beaker.lib.storage.blob import blob_page_size, splice
+from beaker.lib.storage.box import BoxExtract, BoxReplace
+from beaker.state import (
+    AccountStateBlob,
+    ApplicationStateBlob,
+    BoxStateBlob,
+    StateBlob,
+)
+
+
+class RecordField:
+    """where a field of a record sits, in bytes from the start of the record"""
+
+    def __init__(self, type_spec: abi.TypeSpec, offset: int, bit: int | None = None):
+        self.type_spec = type_spec
+        self.offset = offset
+        # Bools share bytes, the bit of the byte at offset that holds this one
+        self.bit = bit
+
+    @property
+    def size(self) -> int:
+        return 1 if self.bit is not None else self.type_spec.byte_length_static()
+
+
+def record_fields(type_spec: abi.TypeSpec) -> dict[str | int, RecordField]:
+    """
+    returns the fields of a static tuple by position, and by name for a named tuple
+
+    Offsets follow the ABI encoding, consecutive bools are packed into the bits of a byte.
+    """
+    if not isinstance(type_spec, abi.TupleTypeSpec):
+        return {}
+
+    specs = type_spec.value_type_specs()
+    by_position: list[RecordField] = []
+    offset = 0
+    bools = 0
+    for spec in specs:
+        if isinstance(spec, abi.BoolTypeSpec):
+            if bools % 8 == 0:
+                offset += 1
+            by_position.append(RecordField(spec, offset - 1, bools % 8))
+            bools += 1
+            continue
+
+        bools = 0
+        by_position.append(RecordField(spec, offset))
+        offset += spec.byte_length_static()
+
+    fields: dict[str | int, RecordField] = dict(enumerate(by_position))
+    if isinstance(type_spec, abi.NamedTupleTypeSpec):
+        names = type_spec.annotation_type().__annotations__
+        fields.update(zip(names, by_position))
+    return fields
+
+
+class RecordArray:
+    """
+    RecordArray is a fixed size array of static ABI records held in an application, account or
+    box blob
+
+    The blob is declared on the Application as usual and the array over it::
+
+        class Order(abi.NamedTuple):
+            price: abi.Field[abi.Uint64]
+            live: abi.Field[abi.Bool]
+
+        order_pages = ApplicationStateBlob(keys=8)
+        orders = RecordArray(order_pages, Order)
+
+    Records are laid out back to back from the start of the blob, with every offset known when
+    the program is built. ``get`` and ``set`` read and write a record's encoding, fields are read
+    and written in place without touching the rest of the record. In an application or account
+    blob an access is a single ``extract`` from one page, or a splice into it, unless the record
+    straddles two pages and the blob's read or write is used instead. In a box every access is a
+    single ``box_extract`` or ``box_replace``.
+    """
+
+    def __init__(self, storage: StateBlob, record: type[abi.NamedTuple] | abi.TypeSpec):
+        if not isinstance(
+            storage, (ApplicationStateBlob, AccountStateBlob, BoxStateBlob)
+        ):
+            raise ValueError(
+                "RecordArray needs an ApplicationStateBlob, AccountStateBlob or BoxStateBlob"
+            )
+
+        type_spec = record if isinstance(record, abi.TypeSpec) else record().type_spec()
+        if type_spec.is_dynamic():
+            raise ValueError("RecordArray records must be a static type")
+
+        self.storage = storage
+        self.type_spec = type_spec
+        self.record_size = type_spec.byte_length_static()
+        self.fields = record_fields(type_spec)
+
+    def __getitem__(self, acct: Expr) -> "RecordArray":
+        """the array held in the local state of ``acct``, for an array over an AccountStateBlob"""
+        if not isinstance(self.storage, AccountStateBlob):
+            raise ValueError(
+                "Only an array over an AccountStateBlob is held per account"
+            )
+        return RecordArray(self.storage[acct], self.type_spec)
+
+    @property
+    def length(self) -> int:
+        """the number of records the array holds"""
+        match self.storage:
+            case BoxStateBlob():
+                max_bytes = self.storage.size
+            case ApplicationStateBlob() | AccountStateBlob():
+                max_bytes = self.storage.blob._max_bytes
+        return max_bytes // self.record_size
+
+    def get(self, idx: Expr) -> Expr:
+        """evaluates to the encoding of the record at ``idx``"""
+        return self._read(idx, 0, self.record_size)
+
+    def set(self, idx: Expr, value: abi.BaseType | Expr) -> Expr:
+        """sets the record at ``idx`` to the value, or encoding, passed"""
+        return self._write(idx, 0, self.record_size, value)
+
+    def get_field(self, idx: Expr, field: str | int) -> Expr:
+        """evaluates to the encoding of a field of the record at ``idx``, by name or position"""
+        f = self._field(field)
+        if f.bit is None:
+            return self._read(idx, f.offset, f.size)
+        return SetBit(
+            Bytes(b"\x00"), Int(0), GetBit(self._read(idx, f.offset, 1), Int(f.bit))
+        )
+
+    def set_field(
+        self, idx: Expr, field: str | int, value: abi.BaseType | Expr
+    ) -> Expr:
+        """sets a field of the record at ``idx`` to the value, or encoding, passed"""
+        f = self._field(field)
+        if f.bit is None:
+            return self._write(idx, f.offset, f.size, value)
+
+        # The byte holding the bool is read and written back with the bit changed
+        encoded = value.encode() if isinstance(value, abi.BaseType) else value
+        byte = ScratchVar(TealType.bytes)
+        at = ScratchVar(TealType.uint64)
+        return Seq(
+            at.store(idx),
+            byte.store(self._read(at.load(), f.offset, 1)),
+            self._write(
+                at.load(),
+                f.offset,
+                1,
+                SetBit(byte.load(), Int(f.bit), GetBit(encoded, Int(0))),
+            ),
+        )
+
+    def get_range(self, start: Expr, stop: Expr) -> Expr:
+        """
+        evaluates to the encodings of the records from ``start`` up to ``stop``, back to back
+
+        That's the encoding of a static array of ``stop - start`` records.
+        """
+        first = ScratchVar(TealType.uint64)
+        end = ScratchVar(TealType.uint64)
+        size = Int(self.record_size)
+        return Seq(
+            first.store(start * size),
+            end.store(stop * size),
+            Assert(first.load() <= end.load(), end.load() <= Int(self._max_offset)),
+            self.storage.read(first.load(), end.load()),
+        )
+
+    @property
+    def _max_offset(self) -> int:
+        return self.length * self.record_size
+
+    def _field(self, field: str | int) -> RecordField:
+        if field not in self.fields:
+            raise ValueError(f"{self.type_spec} has no field {field}")
+        return self.fields[field]
+
+    def _box_name(self) -> Expr:
+        assert isinstance(self.storage, BoxStateBlob)
+        return self.storage._blob().name
+
+    def _offset(self, at: ScratchVar, idx: Expr, offset: int) -> Expr:
+        # Offset of the bytes in the blob, failing past the last record
+        return Seq(
+            at.store(idx * Int(self.record_size) + Int(offset)),
+            Assert(at.load() < Int(self._max_offset)),
+        )
+
+    def _read(self, idx: Expr, offset: int, size: int) -> Expr:
+        at = ScratchVar(TealType.uint64)
+        n = Int(size)
+        match self.storage:
+            case BoxStateBlob():
+                read: Expr = BoxExtract(self._box_name(), at.load(), n)
+            case ApplicationStateBlob() | AccountStateBlob():
+                read = self.storage.read(at.load(), at.load() + n)
+                if size <= blob_page_size:
+                    page_size = Int(blob_page_size)
+                    read = If(
+                        at.load() % page_size + n <= page_size,
+                        Extract(
+                            self.storage.get_page(at.load() / page_size),
+                            at.load() % page_size,
+                            n,
+                        ),
+                        read,
+                    )
+        return Seq(self._offset(at, idx, offset), read)
+
+    def _write(
+        self, idx: Expr, offset: int, size: int, value: abi.BaseType | Expr
+    ) -> Expr:
+        at = ScratchVar(TealType.uint64)
+        buf = ScratchVar(TealType.bytes)
+        n = Int(size)
+
+        if isinstance(value, abi.BaseType):
+            store = buf.store(value.encode())
+        else:
+            store = Seq(buf.store(value), Assert(Len(buf.load()) == n))
+
+        match self.storage:
+            case BoxStateBlob():
+                write: Expr = BoxReplace(self._box_name(), at.load(), buf.load())
+            case ApplicationStateBlob() | AccountStateBlob():
+                write = self.storage.write(at.load(), buf.load())
+                if size <= blob_page_size:
+                    write = self._splice(at, buf, n, write)
+        return Seq(self._offset(at, idx, offset), store, write)
+
+    def _splice(
+        self, at: ScratchVar, buf: ScratchVar, n: Expr, straddles: Expr
+    ) -> Expr:
+        # Patches the page holding the bytes, if they straddle two pages the blob writes them
+        assert isinstance(self.storage, (ApplicationStateBlob, AccountStateBlob))
+        page_size = Int(blob_page_size)
+        start = at.load() % page_size
+        return (
+            If(start + n <= page_size)
+            .Then(
+                self.storage.put_page(
+                    at.load() / page_size,
+                    splice(
+                        self.storage.get_page(at.load() / page_size),
+                        start,
+                        start + n,
+                        buf.load(),
+                    ),
+                ),
+            )
+            .Else(straddles)
+        )
@@ -0,0 +1,160 @@
+import random
+from typing import Literal as L
+
+import pytest
+import pyteal as pt
+import beaker as bkr
+from algosdk import abi as sdk_abi
+
+from beaker.client.avm import AVMError
+from beaker.lib.datastructures import RecordArray
+from beaker.testing import LocalApp
+
+
+class Order(pt.abi.NamedTuple):
+    price: pt.abi.Field[pt.abi.Uint64]
+    qty: pt.abi.Field[pt.abi.Uint32]
+    live: pt.abi.Field[pt.abi.Bool]
+    buy: pt.abi.Field[pt.abi.Bool]
+    tag: pt.abi.Field[pt.abi.StaticBytes[L[3]]]
+
+
+codec = sdk_abi.ABIType.from_string("(uint64,uint32,bool,bool,byte[3])")
+
+
+class OrderApp(bkr.Application):
+    data: bkr.ApplicationStateBlob | bkr.AccountStateBlob | bkr.BoxStateBlob
+    orders: RecordArray
+
+    @bkr.external
+    def init(self):
+        return self.data.initialize()
+
+    @bkr.external
+    def put(self, idx: pt.abi.Uint64, order: Order):
+        return self.orders.set(idx.get(), order)
+
+    @bkr.external
+    def get(self, idx: pt.abi.Uint64, *, output: Order):
+        return output.decode(self.orders.get(idx.get()))
+
+    @bkr.external
+    def get_price(self, idx: pt.abi.Uint64, *, output: pt.abi.Uint64):
+        return output.decode(self.orders.get_field(idx.get(), "price"))
+
+    @bkr.external
+    def set_price(self, idx: pt.abi.Uint64, price: pt.abi.Uint64):
+        return self.orders.set_field(idx.get(), "price", price)
+
+    @bkr.external
+    def get_buy(self, idx: pt.abi.Uint64, *, output: pt.abi.Bool):
+        return output.decode(self.orders.get_field(idx.get(), "buy"))
+
+    @bkr.external
+    def set_buy(self, idx: pt.abi.Uint64, buy: pt.abi.Bool):
+        return self.orders.set_field(idx.get(), 3, buy)
+
+    @bkr.external
+    def get_range(
+        self, start: pt.abi.Uint64, stop: pt.abi.Uint64, *, output: pt.abi.DynamicBytes
+    ):
+        return output.set(self.orders.get_range(start.get(), stop.get()))
+
+
+class GlobalOrders(OrderApp):
+    data = bkr.ApplicationStateBlob(keys=4)
+    orders = RecordArray(data, Order)
+
+
+class LocalOrders(OrderApp):
+    data = bkr.AccountStateBlob(keys=2)
+    orders = RecordArray(data, Order)
+
+
+class BoxOrders(OrderApp):
+    data = bkr.BoxStateBlob(size=300)
+    orders = RecordArray(data, Order)
+
+
+def random_order(rng: random.Random) -> list:
+    return [
+        rng.randrange(1 << 64),
+        rng.randrange(1 << 32),
+        rng.random() < 0.5,
+        rng.random() < 0.5,
+        list(rng.randbytes(3)),
+    ]
+
+
+@pytest.mark.parametrize(
+    "app_class",
+    [GlobalOrders, LocalOrders, BoxOrders],
+)
+def test_record_array(app_class: type[OrderApp]):
+    app = app_class()
+    assert app.orders.record_size == 16
+    local = LocalApp(app)
+    local.call(app.init, budget=16 * 700)
+
+    rng = random.Random(app.orders.length)
+    expected = [[0, 0, False, False, [0, 0, 0]] for _ in range(app.orders.length)]
+    for idx in range(app.orders.length):
+        expected[idx] = random_order(rng)
+        local.call(app.put, idx=idx, order=expected[idx])
+
+    for idx in range(app.orders.length):
+        assert local.call(app.get, idx=idx) == expected[idx]
+        assert local.call(app.get_price, idx=idx) == expected[idx][0]
+        assert local.call(app.get_buy, idx=idx) == expected[idx][3]
+
+    # Record 7 straddles the first two pages of a blob
+    for idx in [0, 7, app.orders.length - 1]:
+        local.call(app.set_price, idx=idx, price=idx + 1)
+        local.call(app.set_buy, idx=idx, buy=not expected[idx][3])
+        expected[idx][0] = idx + 1
+        expected[idx][3] = not expected[idx][3]
+        assert local.call(app.get, idx=idx) == expected[idx]
+
+    for start, stop in [(0, 1), (5, 9), (0, app.orders.length)]:
+        got = bytes(local.call(app.get_range, start=start, stop=stop, budget=16 * 700))
+        assert got == b"".join(codec.encode(o) for o in expected[start:stop])
+
+    with pytest.raises(AVMError):
+        local.call(app.get, idx=app.orders.length)
+    with pytest.raises(AVMError):
+        local.call(app.get_range, start=0, stop=app.orders.length + 1)
+
+
+def test_record_array_single_extract():
+    app = GlobalOrders()
+    local = LocalApp(app)
+    local.call(app.init, budget=16 * 700)
+
+    # Record 2 sits in the first page, record 7 spans bytes 112 to 128
+    local.call(app.get, idx=2)
+    inside = local.cost
+    local.call(app.get, idx=7)
+    straddles = local.cost
+    assert inside < straddles
+
+
+def test_record_array_types():
+    blob = bkr.ApplicationStateBlob(keys=1)
+    with pytest.raises(ValueError):
+        RecordArray(blob, pt.abi.StringTypeSpec())
+    with pytest.raises(ValueError):
+        RecordArray(blob, Order).get_field(pt.Int(0), "missing")
+
+    # Any static type, fields only for tuples
+    uints = RecordArray(blob, pt.abi.Uint16TypeSpec())
+    assert uints.length == 63 and uints.fields == {}
+    fields = RecordArray(blob, Order).fields
+    assert [
+        (fields[n].offset, fields[n].bit) for n in ["qty", "live", "buy", "tag"]
+    ] == [
+        (8, None),
+        (12, 0),
+        (12, 1),
+        (13, None),
+    ]
+    assert fields[2] is fields["live"]
@@ -5,10 +5,10 @@ from pyteal import CompileOptions, Expr, LeafExpr, Mode, TealBlock, TealOp, Teal
 
 
 class CustomOp:
-    def __init__(self, opcode):
+    def __init__(self, opcode, min_version: int = 2):
         self.opcode = opcode
         self.mode = Mode.Signature | Mode.Application
-        self.min_version = 2
+        self.min_version = min_version
 
     def __str__(self) -> str:
         return self.opcode
@@ -27,15 +27,21 @@ class InlineAssembly(LeafExpr):
         opcode: string containing the teal to inject
         args: any number of PyTEAL expressions to place before this opcode
         type: The type this Expression returns, to help during PyTEAL compilation
+        min_version: The lowest program version the opcode is available in, compiling for
+            an earlier version raises a TealInputError
 
     """
 
     def __init__(
-        self, opcode: str, *args: "Expr", type: TealType = TealType.none
+        self,
+        opcode: str,
+        *args: "Expr",
+        type: TealType = TealType.none,
+        min_version: int = 2,
     ) -> None:
         super().__init__()
         opcode_with_args = opcode.split(" ")
-        self.op = CustomOp(opcode_with_args[0])
+        self.op = CustomOp(opcode_with_args[0], min_version)
         self.type = type
         self.opcode_args = opcode_with_args[1:]
         self.args = args
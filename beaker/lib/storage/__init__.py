@@ -1,2 +1,4 @@
 from .local_blob import LocalBlob
 from .global_blob import GlobalBlob
+from .box_blob import BoxBlob
+from .blob_session import BlobSession
@@ -1,19 +1,100 @@
 from abc import ABC, abstractmethod
-from typing import Optional
-from pyteal import BytesZero, Int, Expr, Extract, Bytes, TealTypeError
+from typing import Callable, Optional
+from pyteal import (
+    Assert,
+    BytesZero,
+    CompileOptions,
+    Concat,
+    If,
+    Int,
+    Expr,
+    Extract,
+    Bytes,
+    Len,
+    Replace,
+    ScratchVar,
+    Seq,
+    Substring,
+    Suffix,
+    TealType,
+    TealTypeError,
+    While,
+)
 
 blob_page_size = 128 - 1  # need 1 byte for key
 BLOB_PAGE_SIZE = Int(blob_page_size)
 EMPTY_PAGE = BytesZero(BLOB_PAGE_SIZE)
 
+#: Takes the position of a page in the blob keys, evaluates to the page
+PageGetter = Callable[[int | Expr], Expr]
+
+#: Takes the position of a page in the blob keys and the page, writes it back
+PagePutter = Callable[[int | Expr, Expr], Expr]
+
+#: The first program version with ``replace2`` and ``replace3``
+REPLACE_VERSION = 7
+
+
+class _ByVersion(Expr):
+    # Compiles to one expression for programs of at least a version, the other below it
+
+    def __init__(self, version: int, then: Expr, otherwise: Expr):
+        super().__init__()
+        self.version = version
+        self.then = then
+        self.otherwise = otherwise
+
+    def __teal__(self, options: CompileOptions):
+        if options.version >= self.version:
+            return self.then.__teal__(options)
+        return self.otherwise.__teal__(options)
+
+    def __str__(self) -> str:
+        return f"(ByVersion {self.version} {self.then} {self.otherwise})"
+
+    def type_of(self) -> TealType:
+        return self.then.type_of()
+
+    def has_return(self) -> bool:
+        return False
+
+
+def splice(buf: Expr, start: Expr, stop: Expr, val: Expr) -> Expr:
+    """
+    evaluates to buf with the bytes from start up to stop replaced by val, which is
+    ``stop - start`` bytes long
+
+    From program version 7 this is a single ``replace``, below it buf is cut around the bytes
+    and joined back with val.
+    """
+    cut = ScratchVar(TealType.bytes)
+    return _ByVersion(
+        REPLACE_VERSION,
+        Replace(buf, start, val),
+        Seq(
+            cut.store(buf),
+            Concat(Substring(cut.load(), Int(0), start), val, Suffix(cut.load(), stop)),
+        ),
+    )
+
 
 class Blob(ABC):
     """
     Blob is a class holding static methods to work with the global storage of an application as a binary large object
 
+    A ``lazy`` blob isn't zeroed up front, pages are created on their first write and a page
+    that doesn't exist yet reads as zero bytes. That saves the puts of ``zero``, for a bit more
+    on each page read.
     """
 
-    def __init__(self, key_limit: int, /, *, keys: Optional[int | list[int]] = None):
+    def __init__(
+        self,
+        key_limit: int,
+        /,
+        *,
+        keys: Optional[int | list[int]] = None,
+        lazy: bool = False,
+    ):
 
         _keys: list[int] = []
 
@@ -39,22 +120,204 @@ class Blob(ABC):
         self._max_bytes = self._max_keys * blob_page_size
         self._max_bits = self._max_bytes * 8
 
+        self.lazy = lazy
+
         self.max_keys = Int(self._max_keys)
         self.max_bytes = Int(self._max_bytes)
 
     def _key(self, i) -> Expr:
         return Extract(self.byte_key_str, i, Int(1))
 
-    def _key_idx(self, idx: Int) -> Expr:
+    def _page_key(self, page: int | Expr) -> Expr:
+        # A page known at compile time uses its key directly
+        if isinstance(page, int):
+            return Bytes(self.byte_keys[page])
+        return self._key(page)
+
+    def _key_idx(self, idx: Expr) -> Expr:
         return idx / BLOB_PAGE_SIZE
 
-    def _offset_for_idx(self, idx: Int) -> Expr:
+    def _offset_for_idx(self, idx: Expr) -> Expr:
         return idx % BLOB_PAGE_SIZE
 
+    def _check_range(self, start: int, stop: int):
+        if not 0 <= start <= stop <= self._max_bytes:
+            raise ValueError(
+                f"range {start}:{stop} out of bounds for a blob of {self._max_bytes} bytes"
+            )
+
+    def _pages(self, start: int, stop: int) -> list[tuple[int, int, int]]:
+        # Each page a range known at compile time covers, with the bounds of the range in it
+        if start >= stop:
+            return []
+        return [
+            (
+                page,
+                max(start - page * blob_page_size, 0),
+                min(stop - page * blob_page_size, blob_page_size),
+            )
+            for page in range(start // blob_page_size, (stop - 1) // blob_page_size + 1)
+        ]
+
+    def _read_pages(self, get_page: PageGetter, bstart: Expr, bstop: Expr) -> Expr:
+        """
+        reads the bytes between bstart and bstop a page at a time
+
+        The first and last page are cut down to the range, the pages in between are joined on
+        whole. A range known at compile time is read without a loop, each page by its key.
+        """
+        if isinstance(bstart, Int) and isinstance(bstop, Int):
+            self._check_range(bstart.value, bstop.value)
+            parts = [
+                get_page(page)
+                if (lo, hi) == (0, blob_page_size)
+                else Extract(get_page(page), Int(lo), Int(hi - lo))
+                for page, lo, hi in self._pages(bstart.value, bstop.value)
+            ]
+            if not parts:
+                return Bytes("")
+            return parts[0] if len(parts) == 1 else Concat(*parts)
+
+        start = ScratchVar(TealType.uint64)
+        stop = ScratchVar(TealType.uint64)
+        key = ScratchVar(TealType.uint64)
+        last = ScratchVar(TealType.uint64)
+        buff = ScratchVar(TealType.bytes)
+
+        # Where the range ends in the last page, a whole page if it ends on a page boundary
+        last_stop = (stop.load() - Int(1)) % BLOB_PAGE_SIZE + Int(1)
+
+        return Seq(
+            start.store(bstart),
+            stop.store(bstop),
+            If(start.load() >= stop.load())
+            .Then(Bytes(""))
+            .Else(
+                Seq(
+                    key.store(self._key_idx(start.load())),
+                    last.store(self._key_idx(stop.load() - Int(1))),
+                    buff.store(
+                        Substring(
+                            get_page(key.load()),
+                            self._offset_for_idx(start.load()),
+                            If(key.load() == last.load(), last_stop, BLOB_PAGE_SIZE),
+                        )
+                    ),
+                    If(key.load() < last.load()).Then(
+                        key.store(key.load() + Int(1)),
+                        While(key.load() < last.load()).Do(
+                            buff.store(Concat(buff.load(), get_page(key.load()))),
+                            key.store(key.load() + Int(1)),
+                        ),
+                        buff.store(
+                            Concat(
+                                buff.load(),
+                                Extract(get_page(last.load()), Int(0), last_stop),
+                            )
+                        ),
+                    ),
+                    buff.load(),
+                )
+            ),
+        )
+
+    def _write_pages(
+        self,
+        get_page: PageGetter,
+        put_page: PagePutter,
+        bstart: Expr,
+        buff: Expr,
+        size: Optional[int] = None,
+    ) -> Expr:
+        """
+        writes buff to the blob from bstart a page at a time
+
+        The first and last page are patched with ``splice``, a ``replace`` from program
+        version 7, the pages in between are put whole from buff. A write from a start known at
+        compile time, of a ``size`` known too, is made without a loop, each page by its key.
+        """
+        data = ScratchVar(TealType.bytes)
+
+        if isinstance(bstart, Int) and size is not None:
+            self._check_range(bstart.value, bstart.value + size)
+            writes: list[Expr] = []
+            for page, lo, hi in self._pages(bstart.value, bstart.value + size):
+                part = Extract(
+                    data.load(),
+                    Int(page * blob_page_size + lo - bstart.value),
+                    Int(hi - lo),
+                )
+                if (lo, hi) != (0, blob_page_size):
+                    part = splice(get_page(page), Int(lo), Int(hi), part)
+                writes.append(put_page(page, part))
+            return Seq(data.store(buff), Assert(Len(data.load()) == Int(size)), *writes)
+
+        start = ScratchVar(TealType.uint64)
+        stop = ScratchVar(TealType.uint64)
+        key = ScratchVar(TealType.uint64)
+        last = ScratchVar(TealType.uint64)
+        written = ScratchVar(TealType.uint64)
+
+        return Seq(
+            start.store(bstart),
+            data.store(buff),
+            stop.store(start.load() + Len(data.load())),
+            If(start.load() < stop.load()).Then(
+                key.store(self._key_idx(start.load())),
+                last.store(self._key_idx(stop.load() - Int(1))),
+                # The first page, as much of the range as it holds
+                written.store(
+                    If(
+                        key.load() == last.load(),
+                        stop.load() - start.load(),
+                        BLOB_PAGE_SIZE - self._offset_for_idx(start.load()),
+                    )
+                ),
+                put_page(
+                    key.load(),
+                    splice(
+                        get_page(key.load()),
+                        self._offset_for_idx(start.load()),
+                        self._offset_for_idx(start.load()) + written.load(),
+                        Extract(data.load(), Int(0), written.load()),
+                    ),
+                ),
+                If(key.load() < last.load()).Then(
+                    key.store(key.load() + Int(1)),
+                    While(key.load() < last.load()).Do(
+                        put_page(
+                            key.load(),
+                            Extract(data.load(), written.load(), BLOB_PAGE_SIZE),
+                        ),
+                        written.store(written.load() + BLOB_PAGE_SIZE),
+                        key.store(key.load() + Int(1)),
+                    ),
+                    # The last page, the rest of buff
+                    put_page(
+                        last.load(),
+                        splice(
+                            get_page(last.load()),
+                            Int(0),
+                            stop.load() - start.load() - written.load(),
+                            Suffix(data.load(), written.load()),
+                        ),
+                    ),
+                ),
+            ),
+        )
+
     @abstractmethod
     def zero(self) -> Expr:
         ...
 
+    @abstractmethod
+    def get_page(self, page) -> Expr:
+        ...
+
+    @abstractmethod
+    def put_page(self, page, val) -> Expr:
+        ...
+
     @abstractmethod
     def get_byte(self, idx) -> Expr:
         ...
@@ -0,0 +1,216 @@
+from typing import Callable
+
+from pyteal import (
+    Concat,
+    Expr,
+    Extract,
+    GetByte,
+    If,
+    Int,
+    Len,
+    ScratchLoad,
+    ScratchVar,
+    Seq,
+    SetByte,
+    Subroutine,
+    Substring,
+    Suffix,
+    TealType,
+)
+
+from beaker.lib.storage.blob import Blob, PageGetter, PagePutter, blob_page_size
+
+#: Pages held in each scratch slot, as many as fit in the 4096 byte limit
+CHUNK_PAGES = 4096 // blob_page_size
+
+#: Bytes held in each scratch slot
+CHUNK_SIZE = CHUNK_PAGES * blob_page_size
+
+
+class BlobSession:
+    """
+    BlobSession holds a copy of a whole blob in scratch so byte operations cost a few opcodes
+    each instead of a state get and put
+
+    ``begin`` reads every page into scratch, reads and writes in between work on the copy, and
+    ``flush`` writes the pages back if any changed::
+
+        session = self.data.session()
+        return Seq(
+            session.begin(),
+            For(...).Do(session.set_byte(idx, byte)),
+            session.flush(),
+        )
+
+    Reading every page costs a few opcodes per page, so a session pays off once a method makes
+    more than a handful of byte operations. The copy is held as one byte string for every 32
+    pages. ``flush`` skips those 32 pages with a single compare if none changed, otherwise it
+    compares each page and puts only the ones that changed. Reads and writes of the blob made
+    outside the session while it is open don't see, and may be overwritten by, its copy.
+    """
+
+    def __init__(self, blob: Blob, get_page: PageGetter, put_page: PagePutter):
+        self.blob = blob
+        self._get_page = get_page
+        self._put_page = put_page
+
+        pages = list(range(blob._max_keys))
+        self._chunk_pages = [
+            pages[i : i + CHUNK_PAGES] for i in range(0, len(pages), CHUNK_PAGES)
+        ]
+        self.chunks = [ScratchVar(TealType.bytes) for _ in self._chunk_pages]
+        # The pages as they were read or last flushed, to find the ones that changed
+        self._flushed = [ScratchVar(TealType.bytes) for _ in self._chunk_pages]
+
+        self._build()
+
+    def begin(self) -> Expr:
+        """reads the blob into scratch"""
+        return Seq(
+            *[
+                Seq(
+                    chunk.store(Concat(*[self._get_page(p) for p in pages])),
+                    flushed.store(chunk.load()),
+                )
+                for chunk, flushed, pages in zip(
+                    self.chunks, self._flushed, self._chunk_pages
+                )
+            ]
+        )
+
+    def flush(self) -> Expr:
+        """writes back the pages that changed since the session began or was last flushed"""
+        # A chunk that didn't change is skipped with a single compare
+        return Seq(
+            *[
+                If(chunk.load() != flushed.load()).Then(flush())
+                for chunk, flushed, flush in zip(
+                    self.chunks, self._flushed, self._flush_chunks
+                )
+            ]
+        )
+
+    def get_byte(self, idx: Expr) -> Expr:
+        """evaluates to the byte at ``idx`` as a uint64"""
+        return self._in_chunk(idx, lambda chunk, idx: GetByte(chunk.load(), idx))
+
+    def set_byte(self, idx: Expr, byte: Expr) -> Expr:
+        """sets the byte at ``idx``"""
+        return self._in_chunk(
+            idx, lambda chunk, idx: chunk.store(SetByte(chunk.load(), idx, byte))
+        )
+
+    def read(self, bstart: Expr, bstop: Expr) -> Expr:
+        """evaluates to the bytes between ``bstart`` and ``bstop``"""
+        if len(self.chunks) == 1:
+            return Substring(self.chunks[0].load(), bstart, bstop)
+        return self._read(bstart, bstop)
+
+    def write(self, bstart: Expr, buff: Expr) -> Expr:
+        """writes ``buff`` starting at ``bstart``"""
+        return self._write(bstart, buff)
+
+    def _in_chunk(self, idx: Expr, op: Callable[[ScratchVar, Expr], Expr]) -> Expr:
+        # Byte ops are inlined, with two chunks a branch picks the one holding idx
+        if len(self.chunks) == 1:
+            return op(self.chunks[0], idx)
+
+        keep: Expr = Seq()
+        if not isinstance(idx, (ScratchLoad, Int)):
+            tmp = ScratchVar(TealType.uint64)
+            keep, idx = tmp.store(idx), tmp.load()
+
+        size = Int(CHUNK_SIZE)
+        return Seq(
+            keep,
+            If(idx < size)
+            .Then(op(self.chunks[0], idx))
+            .Else(op(self.chunks[1], idx - size)),
+        )
+
+    def _build(self):
+        # Every read and write of the session goes through these, as subroutines the
+        # split at the chunk boundary is emitted once instead of at each call site
+        size = Int(CHUNK_SIZE)
+
+        def patch(chunk: ScratchVar, start: Expr, buff: Expr) -> Expr:
+            return chunk.store(
+                Concat(
+                    Substring(chunk.load(), Int(0), start),
+                    buff,
+                    Substring(chunk.load(), start + Len(buff), Len(chunk.load())),
+                )
+            )
+
+        @Subroutine(TealType.none)
+        def write(bstart: Expr, buff: Expr) -> Expr:
+            if len(self.chunks) == 1:
+                return patch(self.chunks[0], bstart, buff)
+
+            # Split at the chunk boundary, either part may be empty
+            first, second = self.chunks
+            return Seq(
+                If(bstart < size).Then(
+                    patch(
+                        first,
+                        bstart,
+                        If(bstart + Len(buff) <= size)
+                        .Then(buff)
+                        .Else(Extract(buff, Int(0), size - bstart)),
+                    )
+                ),
+                If(bstart + Len(buff) > size).Then(
+                    If(bstart < size)
+                    .Then(patch(second, Int(0), Suffix(buff, size - bstart)))
+                    .Else(patch(second, bstart - size, buff))
+                ),
+            )
+
+        @Subroutine(TealType.bytes)
+        def read(bstart: Expr, bstop: Expr) -> Expr:
+            first, second = self.chunks
+            return (
+                If(bstop <= size)
+                .Then(Substring(first.load(), bstart, bstop))
+                .ElseIf(bstart >= size)
+                .Then(Substring(second.load(), bstart - size, bstop - size))
+                .Else(
+                    Concat(
+                        Suffix(first.load(), bstart),
+                        Extract(second.load(), Int(0), bstop - size),
+                    )
+                )
+            )
+
+        def flush_chunk(chunk: ScratchVar, flushed: ScratchVar, pages: list[int]):
+            # Only the pages that changed are put so untouched keys, of a lazy blob say,
+            # aren't written. A subroutine per chunk keeps the branches of each one apart
+            page = Int(blob_page_size)
+
+            @Subroutine(TealType.none)
+            def flush() -> Expr:
+                return Seq(
+                    *[
+                        If(
+                            Extract(chunk.load(), Int(i * blob_page_size), page)
+                            != Extract(flushed.load(), Int(i * blob_page_size), page)
+                        ).Then(
+                            self._put_page(
+                                p, Extract(chunk.load(), Int(i * blob_page_size), page)
+                            )
+                        )
+                        for i, p in enumerate(pages)
+                    ],
+                    flushed.store(chunk.load()),
+                )
+
+            return flush
+
+        self._write = write
+        self._read = read
+        self._flush_chunks = [
+            flush_chunk(chunk, flushed, pages)
+            for chunk, flushed, pages in zip(
+                self.chunks, self._flushed, self._chunk_pages
+            )
+        ]
@@ -0,0 +1,171 @@
+import random
+from typing import cast
+
+import pytest
+import pyteal as pt
+import beaker as bkr
+
+from beaker.lib.storage import BlobSession, GlobalBlob
+from beaker.lib.storage.blob import blob_page_size
+from beaker.testing import LocalApp
+
+Indices = pt.abi.DynamicArray[pt.abi.Uint16]
+
+
+class BlobApp(bkr.Application):
+    data: bkr.ApplicationStateBlob | bkr.AccountStateBlob
+
+    @bkr.external
+    def zero(self):
+        return self.data.initialize()
+
+    @bkr.external
+    def scatter(self, idxs: Indices, byte: pt.abi.Uint8):
+        """sets the byte at each index, one blob op per byte"""
+        i = pt.ScratchVar()
+        return pt.For(
+            i.store(pt.Int(0)), i.load() < idxs.length(), i.store(i.load() + pt.Int(1))
+        ).Do(
+            (idx := pt.abi.Uint16()).set(idxs[i.load()]),
+            self.data.write_byte(idx.get(), byte.get()),
+        )
+
+    @bkr.external
+    def scatter_session(self, idxs: Indices, byte: pt.abi.Uint8):
+        """sets the byte at each index in a session"""
+        session = self.data.session()
+        i = pt.ScratchVar()
+        return pt.Seq(
+            session.begin(),
+            pt.For(
+                i.store(pt.Int(0)),
+                i.load() < idxs.length(),
+                i.store(i.load() + pt.Int(1)),
+            ).Do(
+                (idx := pt.abi.Uint16()).set(idxs[i.load()]),
+                session.set_byte(idx.get(), byte.get()),
+            ),
+            session.flush(),
+        )
+
+    @bkr.external
+    def patch_session(
+        self, start: pt.abi.Uint64, buff: pt.abi.DynamicBytes, *, output: pt.abi.Uint64
+    ):
+        """writes buff, flips the first byte written and sums the range, all in a session"""
+        session = self.data.session()
+        total = pt.ScratchVar()
+        i = pt.ScratchVar()
+        return pt.Seq(
+            session.begin(),
+            session.write(start.get(), buff.get()),
+            session.set_byte(start.get(), pt.Int(255) - session.get_byte(start.get())),
+            total.store(pt.Int(0)),
+            pt.For(
+                i.store(pt.Int(0)),
+                i.load() < buff.length(),
+                i.store(i.load() + pt.Int(1)),
+            ).Do(total.store(total.load() + session.get_byte(start.get() + i.load()))),
+            pt.Assert(
+                pt.Len(session.read(start.get(), start.get() + buff.length()))
+                == buff.length()
+            ),
+            session.flush(),
+            output.set(total.load()),
+        )
+
+
+class GlobalBlobApp(BlobApp):
+    data = bkr.ApplicationStateBlob(keys=64)
+
+
+class LocalBlobApp(BlobApp):
+    data = bkr.AccountStateBlob(keys=16)
+
+
+class LazyBlobApp(BlobApp):
+    data = bkr.ApplicationStateBlob(keys=8, lazy=True)
+
+
+def zeroed(app: BlobApp) -> LocalApp:
+    local = LocalApp(app)
+    local.call(app.zero, budget=16 * 700)
+    return local
+
+
+@pytest.mark.parametrize("app", [GlobalBlobApp(), LocalBlobApp()])
+def test_blob_session_matches_blob(app: BlobApp):
+    max_bytes = app.data.blob._max_bytes
+    idxs = random.Random(1).sample(range(max_bytes), 40)
+
+    plain, session = zeroed(app), zeroed(app)
+    plain.call(app.scatter, idxs=idxs, byte=7, budget=16 * 700)
+    session.call(app.scatter_session, idxs=idxs, byte=7, budget=16 * 700)
+    assert plain.snapshot == session.snapshot
+
+    # Writes spanning pages, and for the global blob both scratch slots, then patched and
+    # read back in the same session
+    start = 4000 if isinstance(app, GlobalBlobApp) else 100
+    buff = bytes(range(1, 201))
+    total = session.call(app.patch_session, start=start, buff=buff, budget=16 * 700)
+    assert total == sum(buff) - 1 + (255 - 1)
+
+    expected = bytearray(max_bytes)
+    for idx in idxs:
+        expected[idx] = 7
+    expected[start : start + 200] = buff
+    expected[start] = 254
+
+    state = (
+        session.snapshot.global_state
+        if isinstance(app, GlobalBlobApp)
+        else session.snapshot.local_state[session.sender]
+    )
+    blob = b"".join(cast(bytes, state[key]) for key in app.data.blob.byte_keys)
+    assert blob == bytes(expected)
+
+
+def test_blob_session_chunks():
+    # Held 32 pages to a scratch slot
+    assert len(GlobalBlob(keys=64).session().chunks) == 2
+    assert len(GlobalBlob(keys=32).session().chunks) == 1
+    assert isinstance(LocalBlobApp.data.session(), BlobSession)
+
+
+def test_blob_session_flush_changed_pages():
+    app = GlobalBlobApp()
+    local = zeroed(app)
+    keys = app.data.blob.byte_keys
+
+    # Only the pages written are put, within a chunk and across both
+    idxs = [0, 5, 2 * blob_page_size + 1, 40 * blob_page_size]
+    local.call(app.scatter_session, idxs=idxs, byte=1, budget=16 * 700)
+    assert set(local.last_result.global_delta) == {keys[0], keys[2], keys[40]}
+
+    # Writing what is already there puts nothing
+    local.call(app.scatter_session, idxs=idxs, byte=1, budget=16 * 700)
+    assert local.last_result.global_delta == {}
+
+    # Pages of a lazy blob that weren't written aren't created
+    app = LazyBlobApp()
+    local = LocalApp(app)
+    local.call(app.scatter_session, idxs=[3, 3 * blob_page_size], byte=1)
+    keys = app.data.blob.byte_keys
+    assert set(local.snapshot.global_state) == {keys[0], keys[3]}
+
+
+def test_blob_session_cost():
+    # 100 bytes scattered over 1k, the whole blob and two pages
+    for app in [GlobalBlobApp(), LocalBlobApp()]:
+        rng = random.Random(100)
+        max_bytes = app.data.blob._max_bytes
+        for idxs in [
+            rng.sample(range(1024), 100),
+            rng.sample(range(max_bytes), 100),
+            rng.sample(range(254), 100),
+        ]:
+            plain, session = zeroed(app), zeroed(app)
+            plain.call(app.scatter, idxs=idxs, byte=1, budget=16 * 700)
+            session.call(app.scatter_session, idxs=idxs, byte=1, budget=16 * 700)
+            assert plain.snapshot == session.snapshot
+            assert session.cost < plain.cost
@@ -0,0 +1,66 @@
+from pyteal import App, Expr, TealType
+
+from beaker.consts import BOX_BYTE_MIN_BALANCE, BOX_FLAT_MIN_BALANCE
+from beaker.lib.inline import InlineAssembly
+
+# Box opcodes need AVM 8, compiling a program that uses them for an earlier version raises
+# a TealInputError. The ones that push a value and a flag assert or drop the flag inline,
+# PyTeal's MaybeValue would store both to scratch first.
+
+BOX_VERSION = 8
+
+
+def box_name_bytes(name: str | bytes) -> bytes:
+    """returns a box name or name prefix as bytes, strings are utf-8 encoded"""
+    return name.encode("utf-8") if isinstance(name, str) else name
+
+
+def box_min_balance(name_length: int, size: int) -> int:
+    """the minimum balance in microalgos an app account needs to hold a box with a name of ``name_length`` bytes and ``size`` bytes of content"""
+    return BOX_FLAT_MIN_BALANCE + BOX_BYTE_MIN_BALANCE * (name_length + size)
+
+
+def BoxCreate(name: Expr, size: Expr) -> Expr:
+    """creates a box of ``size`` zero bytes, evaluates to 1 if it was created or 0 if it already existed"""
+    return App.box_create(name, size)
+
+
+def BoxDelete(name: Expr) -> Expr:
+    """deletes a box, evaluates to 1 if it existed or 0 if it didn't"""
+    return App.box_delete(name)
+
+
+def BoxExtract(name: Expr, start: Expr, length: Expr) -> Expr:
+    """reads ``length`` bytes of a box starting at ``start``"""
+    return App.box_extract(name, start, length)
+
+
+def BoxReplace(name: Expr, start: Expr, value: Expr) -> Expr:
+    """writes ``value`` into a box starting at ``start``, the box must be large enough"""
+    return App.box_replace(name, start, value)
+
+
+def BoxLen(name: Expr) -> Expr:
+    """evaluates to the length of a box, failing if it doesn't exist"""
+    return InlineAssembly(
+        "box_len\nassert", name, type=TealType.uint64, min_version=BOX_VERSION
+    )
+
+
+def BoxExists(name: Expr) -> Expr:
+    """evaluates to 1 if the box exists, 0 otherwise"""
+    return InlineAssembly(
+        "box_len\npop", name, type=TealType.uint64, min_version=BOX_VERSION
+    )
+
+
+def BoxGet(name: Expr) -> Expr:
+    """reads the whole contents of a box, failing if it doesn't exist"""
+    return InlineAssembly(
+        "box_get\nassert", name, type=TealType.bytes, min_version=BOX_VERSION
+    )
+
+
+def BoxPut(name: Expr, value: Expr) -> Expr:
+    """writes the whole contents of a box, creating it if needed, an existing box must be the same length"""
+    return App.box_put(name, value)
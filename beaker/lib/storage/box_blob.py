@@ -0,0 +1,69 @@
+from pyteal import Bytes, Expr, Extract, GetByte, Int, Itob, Pop, Seq
+
+from beaker.consts import MAX_BOX_SIZE
+from beaker.lib.storage.box import (
+    BoxCreate,
+    BoxDelete,
+    BoxExtract,
+    BoxReplace,
+    box_min_balance,
+    box_name_bytes,
+)
+
+
+class BoxBlob:
+    """
+    BoxBlob is a binary large object of up to 32k bytes held in a single box of the application
+
+    Unlike ``GlobalBlob`` and ``LocalBlob`` it uses no state schema and reads and writes touch
+    only the byte range requested with ``box_extract`` and ``box_replace`` rather than whole pages.
+
+    Box opcodes need AVM 8 and every call that touches the box must list it in its box references.
+    """
+
+    def __init__(self, name: str | bytes, size: int):
+        if not 0 < size <= MAX_BOX_SIZE:
+            raise ValueError(f"Box size must be between 1 and {MAX_BOX_SIZE}")
+
+        self.name_bytes = box_name_bytes(name)
+        self.name = Bytes(self.name_bytes)
+
+        self._max_bytes = size
+        self.max_bytes = Int(size)
+
+    @property
+    def min_balance(self) -> int:
+        """the minimum balance in microalgos the app account needs to hold the box"""
+        return box_min_balance(len(self.name_bytes), self._max_bytes)
+
+    def zero(self) -> Expr:
+        """
+        creates the box filled with zero bytes, replacing it if it already exists
+
+        The app account must be funded for the minimum balance of the box before calling this
+        """
+        return Seq(Pop(BoxDelete(self.name)), Pop(BoxCreate(self.name, self.max_bytes)))
+
+    def get_byte(self, idx: Expr) -> Expr:
+        """
+        Get a single byte from the box by index
+        """
+        return GetByte(BoxExtract(self.name, idx, Int(1)), Int(0))
+
+    def set_byte(self, idx: Expr, byte: Expr) -> Expr:
+        """
+        Set a single byte in the box by index
+        """
+        return BoxReplace(self.name, idx, Extract(Itob(byte), Int(7), Int(1)))
+
+    def read(self, bstart: Expr, bstop: Expr) -> Expr:
+        """
+        read bytes between bstart and bstop from the box
+        """
+        return BoxExtract(self.name, bstart, bstop - bstart)
+
+    def write(self, bstart: Expr, buff: Expr) -> Expr:
+        """
+        write buff to the box starting at bstart
+        """
+        return BoxReplace(self.name, bstart, buff)
@@ -0,0 +1,156 @@
+import pytest
+import pyteal as pt
+import beaker as bkr
+
+from beaker.client.avm import AVMError
+from beaker.lib.storage.box_blob import BoxBlob
+from beaker.testing import LocalApp
+
+BOX_SIZE = 8128
+
+
+class BoxBlobApp(bkr.Application):
+    data = bkr.BoxStateBlob(BOX_SIZE)
+
+    @bkr.external
+    def zero(self):
+        return self.data.initialize()
+
+    @bkr.external
+    def write(self, start: pt.abi.Uint64, buff: pt.abi.DynamicBytes):
+        return self.data.write(start.get(), buff.get())
+
+    @bkr.external
+    def read(
+        self, start: pt.abi.Uint64, stop: pt.abi.Uint64, *, output: pt.abi.DynamicBytes
+    ):
+        return output.set(self.data.read(start.get(), stop.get()))
+
+    @bkr.external
+    def write_byte(self, idx: pt.abi.Uint64, byte: pt.abi.Uint8):
+        return self.data.write_byte(idx.get(), byte.get())
+
+    @bkr.external
+    def read_byte(self, idx: pt.abi.Uint64, *, output: pt.abi.Uint8):
+        return output.set(self.data.read_byte(idx.get()))
+
+
+def test_box_blob_declaration():
+    assert BoxBlobApp.data.name == b"data"
+    assert BoxBlobApp.data.min_balance == 2500 + 400 * (4 + BOX_SIZE)
+    assert bkr.BoxStateBlob(10, name="other").name == b"other"
+
+    with pytest.raises(ValueError):
+        BoxBlob("big", 32769)
+
+    # Named by the attribute it's declared as, so it can't be declared twice
+    shared = bkr.BoxStateBlob(10)
+    # Python 3.12 stopped wrapping errors raised by __set_name__
+    with pytest.raises((RuntimeError, pt.TealInputError)):
+
+        class Twice(bkr.Application):
+            first = shared
+            second = shared
+
+
+def test_box_blob_version():
+    with pytest.raises(pt.TealInputError, match="Minimum.* is 8"):
+        BoxBlobApp(version=7)
+
+
+def test_box_blob_app():
+    app = BoxBlobApp()
+    assert app.box_blobs == {"data": BoxBlobApp.data}
+    # Boxes take no schema
+    assert app.app_state.num_byte_slices == 0
+
+
+def test_box_blob_write_read():
+    local = LocalApp(BoxBlobApp())
+    local.call(BoxBlobApp.zero)
+    assert local.snapshot.boxes == {b"data": bytes(BOX_SIZE)}
+
+    local.call(BoxBlobApp.write, start=125, buff=b"deadbeef")
+    assert local.call(BoxBlobApp.read, start=124, stop=134) == list(b"\x00deadbeef\x00")
+
+    local.call(BoxBlobApp.write_byte, idx=BOX_SIZE - 1, byte=255)
+    assert local.call(BoxBlobApp.read_byte, idx=BOX_SIZE - 1) == 255
+    assert local.call(BoxBlobApp.read_byte, idx=125) == ord("d")
+
+    # Only the range written changes
+    expected = bytearray(BOX_SIZE)
+    expected[125:133] = b"deadbeef"
+    expected[-1] = 255
+    assert local.snapshot.boxes == {b"data": bytes(expected)}
+
+    # Zeroing again clears it
+    local.call(BoxBlobApp.zero)
+    assert local.snapshot.boxes == {b"data": bytes(BOX_SIZE)}
+
+
+def test_box_blob_out_of_range():
+    local = LocalApp(BoxBlobApp())
+    with pytest.raises(AVMError):
+        local.call(BoxBlobApp.read, start=0, stop=1)
+
+    local.call(BoxBlobApp.zero)
+    with pytest.raises(AVMError):
+        local.call(BoxBlobApp.write, start=BOX_SIZE - 2, buff=b"abc")
+    with pytest.raises(AVMError):
+        local.call(BoxBlobApp.read, start=BOX_SIZE, stop=BOX_SIZE + 1)
+
+
+class BlobBench(bkr.Application):
+    """writes and reads n bytes at an offset, returning the length read"""
+
+    blob: bkr.state.StateBlob
+
+    @bkr.external
+    def zero(self):
+        return self.blob.initialize()
+
+    @bkr.external
+    def write(self, start: pt.abi.Uint64, n: pt.abi.Uint64):
+        return self.blob.write(start.get(), pt.BytesZero(n.get()))
+
+    @bkr.external
+    def read(self, start: pt.abi.Uint64, n: pt.abi.Uint64, *, output: pt.abi.Uint64):
+        return output.set(pt.Len(self.blob.read(start.get(), start.get() + n.get())))
+
+
+class GlobalBlobBench(BlobBench):
+    blob = bkr.ApplicationStateBlob(keys=64)
+
+
+class BoxBlobBench(BlobBench):
+    blob = bkr.BoxStateBlob(BOX_SIZE)
+
+
+def blob_costs(
+    app: BlobBench, sizes: list[int], start: int
+) -> dict[int, tuple[int, int]]:
+    local = LocalApp(app)
+    local.call(app.zero, budget=16 * 700)
+
+    costs = {}
+    for n in sizes:
+        local.call(app.write, start=start, n=n, budget=16 * 700)
+        write_cost = local.cost
+        assert local.call(app.read, start=start, n=n, budget=16 * 700) == n
+        costs[n] = (write_cost, local.cost)
+    return costs
+
+
+def test_box_blob_cost():
+    # Offset so global blob reads and writes start mid page
+    sizes, start = [1, 32, 127, 512, 2048, 4096], 100
+
+    global_costs = blob_costs(GlobalBlobBench(), sizes, start)
+    box_costs = blob_costs(BoxBlobBench(), sizes, start)
+
+    for n in sizes:
+        assert box_costs[n][0] < global_costs[n][0]
+        assert box_costs[n][1] < global_costs[n][1]
+
+    # Box costs don't grow with the size of the range
+    assert len({c for c in box_costs.values()}) == 1
@@ -2,60 +2,71 @@ from typing import Optional
 from pyteal import (
     App,
     Bytes,
-    Concat,
     Expr,
-    Extract,
-    For,
     GetByte,
     If,
     Int,
-    Len,
-    Or,
     ScratchVar,
     Seq,
     SetByte,
     Subroutine,
-    Substring,
     TealType,
 )
 
-from beaker.lib.inline import InlineAssembly
-from beaker.lib.storage.blob import BLOB_PAGE_SIZE, EMPTY_PAGE, Blob
+from beaker.lib.storage.blob import EMPTY_PAGE, Blob
+from beaker.lib.storage.blob_session import BlobSession
 
 
 class GlobalBlob(Blob):
-    def __init__(self, /, *, keys: Optional[int | list[int]] = None):
-        super().__init__(64, keys=keys)
+    def __init__(
+        self, /, *, keys: Optional[int | list[int]] = None, lazy: bool = False
+    ):
+        super().__init__(64, keys=keys, lazy=lazy)
 
     def zero(self) -> Expr:
         """
-        initializes global state of an application to all zero bytes
+        initializes the keys of the blob in global state of an application to all zero bytes
 
-        This allows us to be lazy later and _assume_ all the strings are the same size
+        This allows us to be lazy later and _assume_ all the strings are the same size.
+        A lazy blob is left as it is, its pages are created as they are written.
         """
+        if self.lazy:
+            return Seq()
 
         @Subroutine(TealType.none)
         def zero_impl():
-            zloop = """
-    zero_loop:
-        int 1
-        -               // ["00"*page_size, key-1]
-        dup2            // ["00"*page_size, key, "00"*page_size, key]
-        itob            // ["00"*page_size, key, "00"*page_size, itob(key)]
-        extract 7 1     // ["00"*page_size, key, "00"*page_size, itob(key)[-1]] get the last byte of the int
-        swap            // ["00"*page_size, key, itob(key)[-1], "00"*page_size]
-        app_global_put  // ["00"*page_size, key]  (removes top 2 elements)
-        dup             // ["00"*page_size, key-1, key-1]
-        bnz zero_loop   // start loop over if key-1>0
-        pop
-        pop             // take extra junk off the stack
-        retsub
-    callsub zero_loop
-            """
-            return InlineAssembly(zloop, EMPTY_PAGE, self.max_keys, type=TealType.none)
+            # Only the declared keys, one zero page put under each
+            page = ScratchVar(TealType.bytes)
+            return Seq(
+                page.store(EMPTY_PAGE),
+                *[App.globalPut(Bytes(bk), page.load()) for bk in self.byte_keys],
+            )
 
         return zero_impl()
 
+    def get_page(self, page: int | Expr) -> Expr:
+        """
+        Get a whole page from global storage of an application by its position in the keys
+        """
+        if self.lazy:
+            return Seq(
+                v := App.globalGetEx(Int(0), self._page_key(page)),
+                If(v.hasValue(), v.value(), EMPTY_PAGE),
+            )
+        return App.globalGet(self._page_key(page))
+
+    def put_page(self, page: int | Expr, val: Expr) -> Expr:
+        """
+        Set a whole page in global storage of an application by its position in the keys
+        """
+        return App.globalPut(self._page_key(page), val)
+
+    def session(self) -> BlobSession:
+        """
+        Returns a session holding a copy of the blob in scratch, see ``BlobSession``
+        """
+        return BlobSession(self, self.get_page, self.put_page)
+
     def get_byte(self, idx):
         """
         Get a single byte from global storage of an application by index
@@ -63,9 +74,7 @@ class GlobalBlob(Blob):
 
         @Subroutine(TealType.uint64)
         def get_byte_impl(idx):
-            return GetByte(
-                App.globalGet(self._key(self._key_idx(idx))), self._offset_for_idx(idx)
-            )
+            return GetByte(self.get_page(self._key_idx(idx)), self._offset_for_idx(idx))
 
         return get_byte_impl(idx)
 
@@ -77,10 +86,12 @@ class GlobalBlob(Blob):
         @Subroutine(TealType.none)
         def set_byte_impl(idx, byte):
             return Seq(
-                (key := ScratchVar()).store(self._key(self._key_idx(idx))),
-                App.globalPut(
-                    key.load(),
-                    SetByte(App.globalGet(key.load()), self._offset_for_idx(idx), byte),
+                (page := ScratchVar()).store(self._key_idx(idx)),
+                self.put_page(
+                    page.load(),
+                    SetByte(
+                        self.get_page(page.load()), self._offset_for_idx(idx), byte
+                    ),
                 ),
             )
 
@@ -89,119 +100,30 @@ class GlobalBlob(Blob):
     def read(self, bstart, bstop) -> Expr:
         """
         read bytes between bstart and bend from global storage of an application by index
+
+        A range of ``Int`` constants is read inline, each page by its key.
         """
+        if isinstance(bstart, Int) and isinstance(bstop, Int):
+            return self._read_pages(self.get_page, bstart, bstop)
 
         @Subroutine(TealType.bytes)
         def read_impl(bstart, bstop):
-            start_key = self._key_idx(bstart)
-            start_offset = self._offset_for_idx(bstart)
-
-            stop_key = self._key_idx(bstop)
-            stop_offset = self._offset_for_idx(bstop)
-
-            key = ScratchVar()
-            buff = ScratchVar()
-
-            start = ScratchVar()
-            stop = ScratchVar()
-
-            init = key.store(start_key)
-            cond = key.load() <= stop_key
-            incr = key.store(key.load() + Int(1))
-
-            return Seq(
-                buff.store(Bytes("")),
-                For(init, cond, incr).Do(
-                    Seq(
-                        start.store(If(key.load() == start_key, start_offset, Int(0))),
-                        stop.store(
-                            If(key.load() == stop_key, stop_offset, BLOB_PAGE_SIZE)
-                        ),
-                        buff.store(
-                            Concat(
-                                buff.load(),
-                                Substring(
-                                    App.globalGet(self._key(key.load())),
-                                    start.load(),
-                                    stop.load(),
-                                ),
-                            )
-                        ),
-                    )
-                ),
-                buff.load(),
-            )
+            return self._read_pages(self.get_page, bstart, bstop)
 
         return read_impl(bstart, bstop)
 
-    def write(self, bstart, buff) -> Expr:
+    def write(self, bstart, buff, size: Optional[int] = None) -> Expr:
         """
         write bytes between bstart and len(buff) to global storage of an application
+
+        A write from an ``Int`` start is made inline, each page by its key, if the ``size`` of
+        buff is passed too.
         """
+        if isinstance(bstart, Int) and size is not None:
+            return self._write_pages(self.get_page, self.put_page, bstart, buff, size)
 
         @Subroutine(TealType.none)
         def write_impl(bstart, buff):
-            start_key = self._key_idx(bstart)
-            start_offset = self._offset_for_idx(bstart)
-
-            stop_key = self._key_idx(bstart + Len(buff))
-            stop_offset = self._offset_for_idx(bstart + Len(buff))
-
-            key = ScratchVar()
-            start = ScratchVar()
-            stop = ScratchVar()
-            written = ScratchVar()
-
-            init = key.store(start_key)
-            cond = key.load() <= stop_key
-            incr = key.store(key.load() + Int(1))
-
-            delta = ScratchVar()
-
-            return Seq(
-                written.store(Int(0)),
-                For(init, cond, incr).Do(
-                    Seq(
-                        start.store(If(key.load() == start_key, start_offset, Int(0))),
-                        stop.store(
-                            If(key.load() == stop_key, stop_offset, BLOB_PAGE_SIZE)
-                        ),
-                        App.globalPut(
-                            self._key(key.load()),
-                            If(
-                                Or(
-                                    stop.load() != BLOB_PAGE_SIZE,
-                                    start.load() != Int(0),
-                                )
-                            )  # Its a partial write
-                            .Then(
-                                Seq(
-                                    delta.store(stop.load() - start.load()),
-                                    Concat(
-                                        Substring(
-                                            App.globalGet(self._key(key.load())),
-                                            Int(0),
-                                            start.load(),
-                                        ),
-                                        Extract(buff, written.load(), delta.load()),
-                                        Substring(
-                                            App.globalGet(self._key(key.load())),
-                                            stop.load(),
-                                            BLOB_PAGE_SIZE,
-                                        ),
-                                    ),
-                                )
-                            )
-                            .Else(
-                                Seq(
-                                    delta.store(BLOB_PAGE_SIZE),
-                                    Extract(buff, written.load(), BLOB_PAGE_SIZE),
-                                )
-                            ),
-                        ),
-                        written.store(written.load() + delta.load()),
-                    )
-                ),
-            )
+            return self._write_pages(self.get_page, self.put_page, bstart, buff)
 
         return write_impl(bstart, buff)
@@ -1,7 +1,10 @@
+from typing import Literal
+
 import pytest
 import pyteal as pt
 import beaker as bkr
 
+from beaker.testing import LocalApp
 from beaker.testing.unit_testing_helpers import UnitTestingApp, assert_output
 
 from beaker.lib.storage.global_blob import GlobalBlob
@@ -108,3 +111,184 @@ def test_global_blob_set_past_end():
 
     with pytest.raises(bkr.client.LogicException):
         assert_output(LB(), [], expected, opups=1)
+
+
+class ZeroApp(bkr.Application):
+    data = bkr.ApplicationStateBlob(keys=[2, 3, 4])
+    lazy = bkr.ApplicationStateBlob(keys=[5, 6, 7], lazy=True)
+
+    @bkr.external
+    def init(self):
+        return self.initialize_application_state()
+
+    @bkr.external
+    def write(self, start: pt.abi.Uint64, buff: pt.abi.DynamicBytes):
+        return pt.Seq(
+            self.data.write(start.get(), buff.get()),
+            self.lazy.write(start.get(), buff.get()),
+        )
+
+    @bkr.external
+    def read(
+        self, start: pt.abi.Uint64, stop: pt.abi.Uint64, *, output: pt.abi.DynamicBytes
+    ):
+        return pt.Seq(
+            pt.Assert(
+                self.data.read(start.get(), stop.get())
+                == self.lazy.read(start.get(), stop.get())
+            ),
+            output.set(self.lazy.read(start.get(), stop.get())),
+        )
+
+
+def test_global_blob_zero_declared_keys():
+    local = LocalApp(ZeroApp())
+    local.call(ZeroApp.init)
+
+    # Only the declared keys are zeroed, a lazy blob is left alone
+    assert local.snapshot.global_state == {
+        k: bytes(blob_page_size) for k in [b"\x02", b"\x03", b"\x04"]
+    }
+
+    # Missing pages read as zero, a write creates the pages it touches
+    assert bytes(local.call(ZeroApp.read, start=100, stop=300)) == bytes(200)
+    local.call(ZeroApp.write, start=130, buff=b"\x01" * 10, budget=16 * 700)
+    assert b"\x06" in local.snapshot.global_state
+    assert b"\x05" not in local.snapshot.global_state
+    assert b"\x07" not in local.snapshot.global_state
+
+    got = bytes(local.call(ZeroApp.read, start=120, stop=380, budget=16 * 700))
+    assert got == bytes(10) + b"\x01" * 10 + bytes(240)
+
+
+class RangeApp(bkr.Application):
+    data = bkr.ApplicationStateBlob(keys=4)
+    lazy = bkr.ApplicationStateBlob(keys=[4, 5, 6, 7], lazy=True)
+    acct = bkr.AccountStateBlob(keys=4)
+
+    @bkr.external
+    def init(self):
+        return pt.Seq(self.data.initialize(), self.acct.initialize())
+
+    @bkr.external
+    def write(self, start: pt.abi.Uint64, buff: pt.abi.DynamicBytes):
+        return pt.Seq(
+            self.data.write(start.get(), buff.get()),
+            self.lazy.write(start.get(), buff.get()),
+            self.acct.write(start.get(), buff.get()),
+        )
+
+    @bkr.external
+    def read(
+        self, start: pt.abi.Uint64, stop: pt.abi.Uint64, *, output: pt.abi.DynamicBytes
+    ):
+        return pt.Seq(
+            (got := pt.ScratchVar()).store(self.data.read(start.get(), stop.get())),
+            pt.Assert(got.load() == self.lazy.read(start.get(), stop.get())),
+            pt.Assert(got.load() == self.acct.read(start.get(), stop.get())),
+            output.set(got.load()),
+        )
+
+    @bkr.external
+    def write_const(self, buff: pt.abi.StaticBytes[Literal[140]]):
+        return pt.Seq(
+            self.data.write(pt.Int(125), buff.get(), size=140),
+            self.acct.write(pt.Int(125), buff.get(), size=140),
+        )
+
+    @bkr.external
+    def read_const(self, *, output: pt.abi.DynamicBytes):
+        return pt.Seq(
+            (got := pt.ScratchVar()).store(self.data.read(pt.Int(120), pt.Int(508))),
+            pt.Assert(got.load() == self.acct.read(pt.Int(120), pt.Int(508))),
+            output.set(got.load()),
+        )
+
+
+@pytest.mark.parametrize("version", [6, 7])
+def test_global_blob_ranges(version: int):
+    local = LocalApp(RangeApp(version=version))
+    local.call(RangeApp.init, budget=16 * 700)
+    expected = bytearray(4 * blob_page_size)
+
+    # Within a page, across pages, page aligned, up to the end and empty
+    writes = [(5, 120), (100, 400), (127, 254), (300, 508), (506, 508), (10, 10)]
+    for i, (start, stop) in enumerate(writes):
+        buff = bytes((i + 1 + b) % 256 for b in range(stop - start))
+        local.call(RangeApp.write, start=start, buff=buff, budget=16 * 700)
+        expected[start:stop] = buff
+
+        for start, stop in [(0, 508), (start, stop), (126, 128), (381, 508), (7, 7)]:
+            got = local.call(RangeApp.read, start=start, stop=stop, budget=16 * 700)
+            assert bytes(got) == expected[start:stop]
+
+    buff = bytes(range(100, 240))
+    local.call(RangeApp.write_const, buff=buff, budget=16 * 700)
+    expected[125:265] = buff
+    assert bytes(local.call(RangeApp.read_const)) == expected[120:]
+
+    with pytest.raises(ValueError):
+        RangeApp.data.read(pt.Int(0), pt.Int(509))
+
+
+def test_global_blob_empty_const_range():
+    blob = GlobalBlob(keys=4)
+
+    # Off a page boundary too, an empty range covers no page so none is read or written
+    assert blob._pages(130, 130) == []
+    assert blob._pages(blob_page_size, blob_page_size) == []
+    assert blob._pages(130, 140) == [(1, 130 - blob_page_size, 140 - blob_page_size)]
+
+    read = blob.read(pt.Int(130), pt.Int(130))
+    assert isinstance(read, pt.Bytes)
+    assert "app_global_get" not in pt.compileTeal(
+        pt.Seq(blob.write(pt.Int(130), pt.Bytes(""), size=0), pt.Int(1)),
+        mode=pt.Mode.Application,
+        version=7,
+    )
+
+
+class CostApp(bkr.Application):
+    data = bkr.ApplicationStateBlob(keys=16)
+
+    @bkr.external
+    def init(self):
+        return self.initialize_application_state()
+
+    @bkr.external
+    def read(self, start: pt.abi.Uint64, stop: pt.abi.Uint64, *, output: pt.abi.Uint64):
+        return output.set(pt.Len(self.data.read(start.get(), stop.get())))
+
+    @bkr.external
+    def read_const(self, *, output: pt.abi.Uint64):
+        return output.set(pt.Len(self.data.read(pt.Int(5), pt.Int(1029))))
+
+    @bkr.external
+    def write(self, start: pt.abi.Uint64, buff: pt.abi.DynamicBytes):
+        return self.data.write(start.get(), buff.get())
+
+    @bkr.external
+    def write_const(self, buff: pt.abi.StaticBytes[Literal[1024]]):
+        return self.data.write(pt.Int(5), buff.get(), size=1024)
+
+
+def test_global_blob_read_write_cost():
+    costs = {}
+    for version in [6, 7]:
+        local = LocalApp(CostApp(version=version))
+        local.call(CostApp.init, budget=16 * 700)
+
+        kb = bytes(1024)
+        local.call(CostApp.read, start=5, stop=1029, budget=16 * 700)
+        costs[("read", version)] = local.cost
+        local.call(CostApp.read_const, budget=16 * 700)
+        costs[("read_const", version)] = local.cost
+        local.call(CostApp.write, start=5, buff=kb, budget=16 * 700)
+        costs[("write", version)] = local.cost
+        local.call(CostApp.write_const, buff=kb, budget=16 * 700)
+        costs[("write_const", version)] = local.cost
+
+    # Constant ranges skip the loop, replace patches the edge pages in place
+    assert costs[("read_const", 7)] < costs[("read", 7)]
+    assert costs[("write_const", 7)] < costs[("write", 7)]
+    assert costs[("write", 7)] < costs[("write", 6)]
@@ -3,51 +3,81 @@ from pyteal import (
     Txn,
     App,
     Bytes,
-    Concat,
     Expr,
-    Extract,
-    For,
     GetByte,
     If,
     Int,
-    Len,
-    Or,
     ScratchVar,
     Seq,
     SetByte,
     Subroutine,
-    Substring,
     TealType,
 )
-from beaker.lib.storage.blob import BLOB_PAGE_SIZE, EMPTY_PAGE, Blob
+from beaker.lib.storage.blob import EMPTY_PAGE, Blob
+from beaker.lib.storage.blob_session import BlobSession
 
 
 class LocalBlob(Blob):
     """
     Blob is a class holding static methods to work with the local storage of an account as a binary large object
 
-    The `zero` method must be called on an account on opt in and the schema of the local storage should be 16 bytes
+    The `zero` method must be called on an account on opt in and the schema of the local storage should be 16 bytes,
+    unless the blob is ``lazy``
     """
 
-    def __init__(self, /, *, keys: Optional[int | list[int]] = None):
-        super().__init__(16, keys=keys)
+    def __init__(
+        self, /, *, keys: Optional[int | list[int]] = None, lazy: bool = False
+    ):
+        super().__init__(16, keys=keys, lazy=lazy)
 
     def zero(self, acct: Expr = Txn.sender()) -> Expr:
         """
-        initializes local state of an account to all zero bytes
-
-        This allows us to be lazy later and _assume_ all the strings are the same size
+        initializes the keys of the blob in local state of an account to all zero bytes
 
+        This allows us to be lazy later and _assume_ all the strings are the same size.
+        A lazy blob is left as it is, its pages are created as they are written.
         """
+        if self.lazy:
+            return Seq()
 
         @Subroutine(TealType.none)
         def _impl(acct):
+            # One zero page put under every key
+            page = ScratchVar(TealType.bytes)
             return Seq(
-                *[App.localPut(acct, Bytes(bk), EMPTY_PAGE) for bk in self.byte_keys]
+                page.store(EMPTY_PAGE),
+                *[App.localPut(acct, Bytes(bk), page.load()) for bk in self.byte_keys],
             )
 
         return _impl(acct)
 
+    def get_page(self, page: int | Expr, acct: Expr = Txn.sender()) -> Expr:
+        """
+        Get a whole page from local storage of an account by its position in the keys
+        """
+        if self.lazy:
+            return Seq(
+                v := App.localGetEx(acct, Int(0), self._page_key(page)),
+                If(v.hasValue(), v.value(), EMPTY_PAGE),
+            )
+        return App.localGet(acct, self._page_key(page))
+
+    def put_page(self, page: int | Expr, val: Expr, acct: Expr = Txn.sender()) -> Expr:
+        """
+        Set a whole page in local storage of an account by its position in the keys
+        """
+        return App.localPut(acct, self._page_key(page), val)
+
+    def session(self, acct: Expr = Txn.sender()) -> BlobSession:
+        """
+        Returns a session holding a copy of the account's blob in scratch, see ``BlobSession``
+        """
+        return BlobSession(
+            self,
+            lambda page: self.get_page(page, acct=acct),
+            lambda page, val: self.put_page(page, val, acct=acct),
+        )
+
     def get_byte(self, idx, acct: Expr = Txn.sender()):
         """
         Get a single byte from local storage of an account by index
@@ -56,7 +86,7 @@ class LocalBlob(Blob):
         @Subroutine(TealType.uint64)
         def _impl(acct, idx):
             return GetByte(
-                App.localGet(acct, self._key(self._key_idx(idx))),
+                self.get_page(self._key_idx(idx), acct=acct),
                 self._offset_for_idx(idx),
             )
 
@@ -70,13 +100,15 @@ class LocalBlob(Blob):
         @Subroutine(TealType.none)
         def _impl(acct, idx, byte):
             return Seq(
-                (key := ScratchVar()).store(self._key(self._key_idx(idx))),
-                App.localPut(
-                    acct,
-                    key.load(),
+                (page := ScratchVar()).store(self._key_idx(idx)),
+                self.put_page(
+                    page.load(),
                     SetByte(
-                        App.localGet(acct, key.load()), self._offset_for_idx(idx), byte
+                        self.get_page(page.load(), acct=acct),
+                        self._offset_for_idx(idx),
+                        byte,
                     ),
+                    acct=acct,
                 ),
             )
 
@@ -85,137 +117,51 @@ class LocalBlob(Blob):
     def read(self, bstart, bend, acct: Expr = Txn.sender()) -> Expr:
         """
         read bytes between bstart and bend from local storage of an account by index
+
+        A range of ``Int`` constants is read inline, each page by its key.
         """
+        if isinstance(bstart, Int) and isinstance(bend, Int):
+            return self._read_pages(
+                lambda page: self.get_page(page, acct=acct), bstart, bend
+            )
 
         @Subroutine(TealType.bytes)
         def _impl(acct, bstart, bend):
-            start_key_idx = self._key_idx(bstart)
-            start_offset = self._offset_for_idx(bstart)
-
-            stop_key_idx = self._key_idx(bend)
-            stop_offset = self._offset_for_idx(bend)
-
-            key_idx = ScratchVar()
-            buff = ScratchVar()
-
-            start = ScratchVar()
-            stop = ScratchVar()
-
-            init = key_idx.store(start_key_idx)
-            cond = key_idx.load() <= stop_key_idx
-            incr = key_idx.store(key_idx.load() + Int(1))
-
-            return Seq(
-                buff.store(Bytes("")),
-                For(init, cond, incr).Do(
-                    Seq(
-                        start.store(
-                            If(key_idx.load() == start_key_idx, start_offset, Int(0))
-                        ),
-                        stop.store(
-                            If(
-                                key_idx.load() == stop_key_idx,
-                                stop_offset,
-                                BLOB_PAGE_SIZE,
-                            )
-                        ),
-                        buff.store(
-                            Concat(
-                                buff.load(),
-                                Substring(
-                                    App.localGet(acct, self._key(key_idx.load())),
-                                    start.load(),
-                                    stop.load(),
-                                ),
-                            )
-                        ),
-                    )
-                ),
-                buff.load(),
+            return self._read_pages(
+                lambda page: self.get_page(page, acct=acct), bstart, bend
             )
 
         return _impl(acct, bstart, bend)
 
-    def write(self, bstart, buff, acct: Expr = Txn.sender()) -> Expr:
+    def write(
+        self,
+        bstart,
+        buff,
+        acct: Expr = Txn.sender(),
+        size: Optional[int] = None,
+    ) -> Expr:
         """
         write bytes between bstart and len(buff) to local storage of an account
+
+        A write from an ``Int`` start is made inline, each page by its key, if the ``size`` of
+        buff is passed too.
         """
+        if isinstance(bstart, Int) and size is not None:
+            return self._write_pages(
+                lambda page: self.get_page(page, acct=acct),
+                lambda page, val: self.put_page(page, val, acct=acct),
+                bstart,
+                buff,
+                size,
+            )
 
         @Subroutine(TealType.none)
         def _impl(acct, bstart, buff):
-
-            start_key_idx = self._key_idx(bstart)
-            start_offset = self._offset_for_idx(bstart)
-
-            stop_key_idx = self._key_idx(bstart + Len(buff))
-            stop_offset = self._offset_for_idx(bstart + Len(buff))
-
-            key_idx = ScratchVar()
-            start = ScratchVar()
-            stop = ScratchVar()
-            written = ScratchVar()
-
-            init = key_idx.store(start_key_idx)
-            cond = key_idx.load() <= stop_key_idx
-            incr = key_idx.store(key_idx.load() + Int(1))
-
-            delta = ScratchVar()
-
-            return Seq(
-                written.store(Int(0)),
-                For(init, cond, incr).Do(
-                    Seq(
-                        start.store(
-                            If(key_idx.load() == start_key_idx, start_offset, Int(0))
-                        ),
-                        stop.store(
-                            If(
-                                key_idx.load() == stop_key_idx,
-                                stop_offset,
-                                BLOB_PAGE_SIZE,
-                            )
-                        ),
-                        App.localPut(
-                            acct,
-                            self._key(key_idx.load()),
-                            If(
-                                Or(
-                                    stop.load() != BLOB_PAGE_SIZE,
-                                    start.load() != Int(0),
-                                )
-                            )  # Its a partial write
-                            .Then(
-                                Seq(
-                                    delta.store(stop.load() - start.load()),
-                                    Concat(
-                                        Substring(
-                                            App.localGet(
-                                                acct, self._key(key_idx.load())
-                                            ),
-                                            Int(0),
-                                            start.load(),
-                                        ),
-                                        Extract(buff, written.load(), delta.load()),
-                                        Substring(
-                                            App.localGet(
-                                                acct, self._key(key_idx.load())
-                                            ),
-                                            stop.load(),
-                                            BLOB_PAGE_SIZE,
-                                        ),
-                                    ),
-                                )
-                            )
-                            .Else(
-                                Seq(
-                                    delta.store(BLOB_PAGE_SIZE),
-                                    Extract(buff, written.load(), BLOB_PAGE_SIZE),
-                                )
-                            ),
-                        ),
-                        written.store(written.load() + delta.load()),
-                    )
-                ),
+            return self._write_pages(
+                lambda page: self.get_page(page, acct=acct),
+                lambda page, val: self.put_page(page, val, acct=acct),
+                bstart,
+                buff,
             )
 
         return _impl(acct, bstart, buff)
@@ -2,10 +2,10 @@ import pytest
 import pyteal as pt
 import beaker as bkr
 
-from beaker.testing import UnitTestingApp, assert_output
+from beaker.testing import LocalApp, UnitTestingApp, assert_output
 
 from beaker.lib.storage.local_blob import LocalBlob
-from beaker.lib.storage.blob import blob_page_size
+from beaker.lib.storage.blob import EMPTY_PAGE, blob_page_size
 
 
 class LocalBlobTest(UnitTestingApp):
@@ -108,3 +108,65 @@ def test_local_blob_set_past_end():
 
     with pytest.raises(bkr.client.LogicException):
         assert_output(LB(), [], expected)
+
+
+class OptInApp(bkr.Application):
+    data: bkr.AccountStateBlob
+
+    @bkr.external
+    def opt_in(self):
+        return self.initialize_account_state()
+
+    @bkr.external
+    def opt_in_unrolled(self):
+        """zeroes the blob the way it used to be, a zero page made for each key"""
+
+        @pt.Subroutine(pt.TealType.none)
+        def zero(acct: pt.Expr) -> pt.Expr:
+            return pt.Seq(
+                *[
+                    pt.App.localPut(acct, pt.Bytes(bk), EMPTY_PAGE)
+                    for bk in self.data.blob.byte_keys
+                ]
+            )
+
+        return zero(pt.Txn.sender())
+
+    @bkr.external
+    def flip(self, idx: pt.abi.Uint64):
+        return self.data.write_byte(
+            idx.get(), pt.Int(255) - self.data.read_byte(idx.get())
+        )
+
+
+class EagerOptIn(OptInApp):
+    data = bkr.AccountStateBlob(keys=16)
+
+
+class LazyOptIn(OptInApp):
+    data = bkr.AccountStateBlob(keys=16, lazy=True)
+
+
+def test_local_blob_opt_in_cost():
+    eager, lazy = LocalApp(EagerOptIn()), LocalApp(LazyOptIn())
+
+    eager.call(EagerOptIn.opt_in_unrolled)
+    unrolled = eager.cost
+    unrolled_state = eager.snapshot.local_state[eager.sender]
+
+    eager.call(EagerOptIn.opt_in)
+    assert eager.snapshot.local_state[eager.sender] == unrolled_state
+    lazy.call(LazyOptIn.opt_in)
+    assert not lazy.snapshot.local_state.get(lazy.sender)
+
+    assert lazy.cost < eager.cost < unrolled
+
+    # Reads and writes see the same blob either way
+    for idx in [0, 126, 127, 2000]:
+        eager.call(EagerOptIn.flip, idx=idx)
+        lazy.call(LazyOptIn.flip, idx=idx)
+
+    lazy_state = lazy.snapshot.local_state[lazy.sender]
+    assert set(lazy_state) == {b"\x00", b"\x01", b"\x0f"}
+    for key, page in eager.snapshot.local_state[eager.sender].items():
+        assert lazy_state.get(key, bytes(blob_page_size)) == page
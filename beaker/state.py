@@ -1,6 +1,8 @@
 from abc import abstractmethod, ABC
+from contextvars import ContextVar
 from copy import copy
 from typing import Mapping, cast, Any, Optional
+from algosdk import abi as sdk_abi
 from algosdk.future.transaction import StateSchema
 from pyteal import (
     abi,
@@ -19,8 +21,22 @@ from pyteal import (
     Txn,
     Seq,
     If,
+    ScratchVar,
+    Extract,
+    ExtractUint16,
+    ExtractUint32,
+    ExtractUint64,
+    GetBit,
+    GetByte,
+    Itob,
+    Len,
+    Replace,
+    SetBit,
+    SetByte,
+    Op,
+    TealBlock,
 )
-from beaker.lib.storage import LocalBlob
+from beaker.lib.storage import BlobSession, BoxBlob, LocalBlob
 from beaker.consts import MAX_GLOBAL_STATE, MAX_LOCAL_STATE
 from beaker.lib.storage.global_blob import GlobalBlob
 
@@ -169,6 +185,9 @@ class ApplicationStateValue(StateValue):
         if self.key is None:
             raise TealInputError(f"ApplicationStateValue {self} has no key defined")
 
+        if (cache := StateCache.active(self)) is not None:
+            return cache.set(self, val)
+
         if self.static:
             return Seq(
                 v := App.globalGetEx(Int(0), self.key),
@@ -182,12 +201,18 @@ class ApplicationStateValue(StateValue):
         if self.key is None:
             raise TealInputError(f"ApplicationStateValue {self} has no key defined")
 
+        if (cache := StateCache.active(self)) is not None:
+            return cache.get(self)
+
         return App.globalGet(self.key)
 
     def get_maybe(self) -> MaybeValue:
         if self.key is None:
             raise TealInputError(f"ApplicationStateValue {self} has no key defined")
 
+        if (cache := StateCache.active(self)) is not None:
+            cache.read_direct(self)
+
         return App.globalGetEx(Int(0), self.key)
 
     def get_must(self) -> Expr:
@@ -202,6 +227,9 @@ class ApplicationStateValue(StateValue):
         if self.key is None:
             raise TealInputError(f"ApplicationStateValue {self} has no key defined")
 
+        if (cache := StateCache.active(self)) is not None:
+            cache.read_direct(self)
+
         return If((v := App.globalGetEx(Int(0), self.key)).hasValue(), v.value(), val)
 
     def exists(self) -> Expr:
@@ -213,9 +241,184 @@ class ApplicationStateValue(StateValue):
         if self.key is None:
             raise TealInputError(f"ApplicationStateValue {self} has no key defined")
 
+        if (cache := StateCache.active(self)) is not None:
+            cache.delete_direct(self)
+
         return App.globalDel(self.key)
 
 
+class StateCache:
+    """
+    StateCache caches the application state values a method uses in scratch while its body is built
+
+    Each value the body gets is loaded into a scratch slot once when the method starts, every
+    get and set uses the slot, and values that were set are written back once when it ends.
+    Only values with a constant key are cached, dynamic ones are untouched.
+
+    A global get costs 2 opcodes and a scratch load 1, so a value has to be read a few times
+    for the load at the start to pay for itself, values read in loops gain the most.
+
+    Used through ``external(cache_state=True)``, or directly::
+
+        with StateCache() as cache:
+            body = ...
+        return cache.wrap(body)
+
+    The body must run to its end for values to be written back, so one that can exit early
+    with ``Approve()``, ``Reject()`` or ``Return()`` on any branch raises a ``TealInputError``
+    when it is built. Subroutines it calls read and write state directly, so they don't see
+    values set by the body before it ends.
+
+    The cache being built is tracked per context, so programs can be built concurrently.
+    """
+
+    def __init__(self):
+        self.slots: dict[str, tuple[ApplicationStateValue, ScratchVar]] = {}
+        self.reads: set[str] = set()
+        self.dirty: dict[str, ScratchVar] = {}
+        self.direct_reads: set[str] = set()
+        self.direct_deletes: set[str] = set()
+        self._tokens: list = []
+
+    def __enter__(self) -> "StateCache":
+        self._tokens.append(_active_caches.set(_active_caches.get() + (self,)))
+        return self
+
+    def __exit__(self, *args):
+        _active_caches.reset(self._tokens.pop())
+
+    @staticmethod
+    def active(sv: ApplicationStateValue) -> Optional["StateCache"]:
+        """returns the cache being built if there is one and the state value can be cached"""
+        caches = _active_caches.get()
+        if not caches or not isinstance(sv.key, Bytes):
+            return None
+        return caches[-1]
+
+    @staticmethod
+    def _name(sv: ApplicationStateValue) -> str:
+        return cast(Bytes, sv.key).byte_str
+
+    def _slot(self, sv: ApplicationStateValue) -> ScratchVar:
+        name = self._name(sv)
+        if name not in self.slots:
+            self.slots[name] = (sv, ScratchVar(sv.stack_type))
+        return self.slots[name][1]
+
+    def get(self, sv: ApplicationStateValue) -> Expr:
+        self.reads.add(self._name(sv))
+        return self._slot(sv).load()
+
+    def set(self, sv: ApplicationStateValue, val: Expr) -> Expr:
+        slot = self._slot(sv)
+        if sv.static:
+            # Written through so the check for a previous value still applies
+            return Seq(
+                slot.store(val),
+                v := App.globalGetEx(Int(0), cast(Expr, sv.key)),
+                Assert(Not(v.hasValue())),
+                App.globalPut(cast(Expr, sv.key), slot.load()),
+            )
+
+        # Flagged when the set runs, a branch not taken mustn't write the value back
+        name = self._name(sv)
+        if name not in self.dirty:
+            self.dirty[name] = ScratchVar(TealType.uint64)
+        return Seq(slot.store(val), self.dirty[name].store(Int(1)))
+
+    def read_direct(self, sv: ApplicationStateValue):
+        self.direct_reads.add(self._name(sv))
+
+    def delete_direct(self, sv: ApplicationStateValue):
+        self.direct_deletes.add(self._name(sv))
+
+    def wrap(self, body: Expr) -> Expr:
+        """returns the body with the cached values loaded before it and the ones set written after"""
+        return _CachedBody(self, body)
+
+    def _check(self):
+        stale_reads = set(self.dirty) & self.direct_reads
+        stale_deletes = self.direct_deletes & set(self.slots)
+        if stale_reads or stale_deletes:
+            raise TealInputError(
+                f"State values {sorted(stale_reads | stale_deletes)} are set or read from "
+                "the cache and also read with get_maybe/get_else/get_must/exists or deleted "
+                "in the same method, which would see stale values"
+            )
+
+    def _prologue(self) -> list[Expr]:
+        # Values that are only set don't need loading
+        return [
+            slot.store(App.globalGet(cast(Expr, sv.key)))
+            for name, (sv, slot) in self.slots.items()
+            if name in self.reads
+        ] + [flag.store(Int(0)) for flag in self.dirty.values()]
+
+    def _epilogue(self) -> list[Expr]:
+        return [
+            If(flag.load()).Then(
+                App.globalPut(
+                    cast(Expr, self.slots[name][0].key), self.slots[name][1].load()
+                )
+            )
+            for name, flag in self.dirty.items()
+        ]
+
+
+# The caches whose bodies are being built, per context so programs built concurrently
+# in different threads don't see each other's
+_active_caches: ContextVar[tuple[StateCache, ...]] = ContextVar(
+    "_active_caches", default=()
+)
+
+
+class _CachedBody(Expr):
+    # State values used as expressions are only read when the body is compiled, so the
+    # cache is active again while it is and the loads and writes around it are built after
+    def __init__(self, cache: StateCache, body: Expr):
+        super().__init__()
+        self.cache = cache
+        self.body = body
+
+    def __teal__(self, options: "CompileOptions"):
+        if self.body.has_return():
+            raise _early_exit()
+        with self.cache:
+            start, end = self.body.__teal__(options)
+        self.cache._check()
+
+        # A return on any branch skips the write back, not only one that ends the body
+        for block in TealBlock.Iterate(start):
+            if any(op.getOp() in (Op.return_, Op.retsub) for op in block.ops):
+                raise _early_exit()
+
+        if prologue := self.cache._prologue():
+            pro_start, pro_end = Seq(*prologue).__teal__(options)
+            pro_end.setNextBlock(start)
+            start = pro_start
+        if epilogue := self.cache._epilogue():
+            epi_start, epi_end = Seq(*epilogue).__teal__(options)
+            end.setNextBlock(epi_start)
+            end = epi_end
+        return start, end
+
+    def __str__(self) -> str:
+        return f"(CachedState {self.body})"
+
+    def type_of(self) -> TealType:
+        return self.body.type_of()
+
+    def has_return(self) -> bool:
+        return self.body.has_return()
+
+
+def _early_exit() -> TealInputError:
+    return TealInputError(
+        "Methods built with cache_state can't exit early with Approve(), Reject() or "
+        "Return(), the values they set would not be written back"
+    )
+
+
 class DynamicApplicationStateValue(DynamicStateValue):
     def __init__(
         self,
@@ -246,6 +449,173 @@ class DynamicApplicationStateValue(DynamicStateValue):
         )
 
 
+class PackedField:
+    """a single field of a ``PackedStateValue``, read and written in place in the packed bytes"""
+
+    def __init__(
+        self,
+        packed: "PackedStateValue",
+        name: str,
+        type_spec: abi.TypeSpec,
+        offset: int,
+    ):
+        self.packed = packed
+        self.name = name
+        self.type_spec = type_spec
+        # In bits for bools, in bytes for everything else
+        self.offset = offset
+
+    def __str__(self) -> str:
+        return f"PackedField {self.name} of {self.packed}"
+
+    def get(self) -> Expr:
+        """gets the value of the field, a uint64 for uints and bools, bytes otherwise"""
+        value = self.packed.get()
+        at = Int(self.offset)
+        match self.type_spec:
+            case abi.BoolTypeSpec():
+                return GetBit(value, at)
+            case abi.UintTypeSpec():
+                match self.type_spec.bit_size():
+                    case 8:
+                        return GetByte(value, at)
+                    case 16:
+                        return ExtractUint16(value, at)
+                    case 32:
+                        return ExtractUint32(value, at)
+                    case _:
+                        return ExtractUint64(value, at)
+        return Extract(value, at, Int(self.type_spec.byte_length_static()))
+
+    def set(self, val: Expr) -> Expr:
+        """sets the field leaving the others as they are, failing if the value doesn't fit"""
+        at = Int(self.offset)
+        match self.type_spec:
+            case abi.BoolTypeSpec():
+                return self.packed.set(SetBit(self.packed.get(), at, val))
+            case abi.UintTypeSpec():
+                bits = self.type_spec.bit_size()
+                if bits == 8:
+                    # setbyte fails on values over 255
+                    return self.packed.set(SetByte(self.packed.get(), at, val))
+                if bits == 64:
+                    return self.packed.set(Replace(self.packed.get(), at, Itob(val)))
+
+                tmp = ScratchVar(TealType.uint64)
+                size = Int(bits // 8)
+                return Seq(
+                    tmp.store(val),
+                    Assert(tmp.load() < Int(1 << bits)),
+                    self.packed.set(
+                        Replace(
+                            self.packed.get(),
+                            at,
+                            Extract(Itob(tmp.load()), Int(8) - size, size),
+                        )
+                    ),
+                )
+
+        size = Int(self.type_spec.byte_length_static())
+        tmp = ScratchVar(TealType.bytes)
+        return Seq(
+            tmp.store(val),
+            Assert(Len(tmp.load()) == size),
+            self.packed.set(Replace(self.packed.get(), at, tmp.load())),
+        )
+
+    def increment(self, cnt: Expr = Int(1)) -> Expr:
+        """helper to increment a uint field, failing if it overflows"""
+        check_is_uint_field(self)
+        return self.set(self.get() + cnt)
+
+    def decrement(self, cnt: Expr = Int(1)) -> Expr:
+        """helper to decrement a uint field"""
+        check_is_uint_field(self)
+        return self.set(self.get() - cnt)
+
+
+class PackedStateValue(ApplicationStateValue):
+    """
+    PackedStateValue packs several small fields into a single bytes key of application state
+
+    Fields are uints, bools and static bytes, given in order as ABI type specs::
+
+        config = PackedStateValue(
+            fields={
+                "paused": abi.BoolTypeSpec(),
+                "fee_bps": abi.Uint16TypeSpec(),
+                "round": abi.Uint64TypeSpec(),
+                "admin": abi.AddressTypeSpec(),
+            }
+        )
+
+        self.config["fee_bps"].set(Int(30))
+
+    The value is the ABI encoding of a static tuple of the fields, consecutive bools share a
+    byte, so the whole value decodes with the tuple type and each field sits at an offset known
+    when the program is built. A field is read with ``extract_uint`` or ``getbit`` and written
+    with ``replace`` or ``setbit``, which needs AVM 7. Each field set gets and puts the whole
+    value, in a method built with ``cache_state`` several field sets cost one put.
+
+    The value starts out with every field zero.
+    """
+
+    def __init__(
+        self,
+        fields: Mapping[str, abi.TypeSpec],
+        key: Expr = None,
+        descr: str = None,
+    ):
+        if not fields:
+            raise TealInputError("PackedStateValue needs at least one field")
+
+        self.fields: dict[str, PackedField] = {}
+        offset = 0
+        bools = 0
+        for name, type_spec in fields.items():
+            if isinstance(type_spec, abi.BoolTypeSpec):
+                # Consecutive bools are packed into the bits of a byte, from the high bit
+                if bools % 8 == 0:
+                    offset += 1
+                bit = (offset - 1) * 8 + bools % 8
+                self.fields[name] = PackedField(self, name, type_spec, bit)
+                bools += 1
+                continue
+
+            bools = 0
+            if not is_packable(type_spec):
+                raise TealInputError(
+                    f"Field {name} of {type_spec} can't be packed, "
+                    "use uints, bools or static bytes"
+                )
+            self.fields[name] = PackedField(self, name, type_spec, offset)
+            offset += type_spec.byte_length_static()
+
+        self.size = offset
+        self.type_spec = abi.TupleTypeSpec(*fields.values())
+        self._codec = sdk_abi.ABIType.from_string(str(self.type_spec))
+
+        super().__init__(
+            TealType.bytes,
+            key=key,
+            default=Bytes(bytes(self.size)),
+            descr=descr,
+        )
+
+    def __str__(self) -> str:
+        return f"PackedStateValue {self.key}"
+
+    def __getitem__(self, name: str) -> PackedField:
+        """the field called ``name``"""
+        if name not in self.fields:
+            raise TealInputError(f"{self} has no field {name}")
+        return self.fields[name]
+
+    def decode(self, value: bytes) -> dict[str, Any]:
+        """returns the python values of the fields of an encoded value, by name"""
+        return dict(zip(self.fields, self._codec.decode(value)))
+
+
 class AccountStateValue(StateValue):
     def __init__(
         self,
@@ -423,8 +793,8 @@ class StateBlob(ABC):
 
 
 class AccountStateBlob(StateBlob):
-    def __init__(self, keys: Optional[int | list[int]] = None):
-        self.blob = LocalBlob(keys=keys)
+    def __init__(self, keys: Optional[int | list[int]] = None, lazy: bool = False):
+        self.blob = LocalBlob(keys=keys, lazy=lazy)
         self.acct: Expr = Txn.sender()
 
         super().__init__(self.blob._max_keys)
@@ -437,8 +807,9 @@ class AccountStateBlob(StateBlob):
     def initialize(self) -> Expr:
         return self.blob.zero(acct=self.acct)
 
-    def write(self, start: Expr, buff: Expr) -> Expr:
-        return self.blob.write(start, buff, acct=self.acct)
+    def write(self, start: Expr, buff: Expr, size: Optional[int] = None) -> Expr:
+        """writes buff from start, a ``size`` known for buff unrolls a write from an ``Int`` start"""
+        return self.blob.write(start, buff, acct=self.acct, size=size)
 
     def read(self, start: Expr, stop: Expr) -> Expr:
         return self.blob.read(start, stop, acct=self.acct)
@@ -449,17 +820,30 @@ class AccountStateBlob(StateBlob):
     def write_byte(self, idx: Expr, byte: Expr) -> Expr:
         return self.blob.set_byte(idx, byte, acct=self.acct)
 
+    def get_page(self, page: int | Expr) -> Expr:
+        """gets a whole page of the account's blob by its position in the keys"""
+        return self.blob.get_page(page, acct=self.acct)
+
+    def put_page(self, page: int | Expr, val: Expr) -> Expr:
+        """sets a whole page of the account's blob by its position in the keys"""
+        return self.blob.put_page(page, val, acct=self.acct)
+
+    def session(self) -> BlobSession:
+        """returns a session holding a copy of the account's blob in scratch, see ``BlobSession``"""
+        return self.blob.session(acct=self.acct)
+
 
 class ApplicationStateBlob(StateBlob):
-    def __init__(self, keys: Optional[int | list[int]] = None):
-        self.blob = GlobalBlob(keys=keys)
+    def __init__(self, keys: Optional[int | list[int]] = None, lazy: bool = False):
+        self.blob = GlobalBlob(keys=keys, lazy=lazy)
         super().__init__(self.blob._max_keys)
 
     def initialize(self) -> Expr:
         return self.blob.zero()
 
-    def write(self, start: Expr, buff: Expr) -> Expr:
-        return self.blob.write(start, buff)
+    def write(self, start: Expr, buff: Expr, size: Optional[int] = None) -> Expr:
+        """writes buff from start, a ``size`` known for buff unrolls a write from an ``Int`` start"""
+        return self.blob.write(start, buff, size=size)
 
     def read(self, start: Expr, stop: Expr) -> Expr:
         return self.blob.read(start, stop)
@@ -470,6 +854,75 @@ class ApplicationStateBlob(StateBlob):
     def write_byte(self, idx: Expr, byte: Expr) -> Expr:
         return self.blob.set_byte(idx, byte)
 
+    def get_page(self, page: int | Expr) -> Expr:
+        """gets a whole page of the blob by its position in the keys"""
+        return self.blob.get_page(page)
+
+    def put_page(self, page: int | Expr, val: Expr) -> Expr:
+        """sets a whole page of the blob by its position in the keys"""
+        return self.blob.put_page(page, val)
+
+    def session(self) -> BlobSession:
+        """returns a session holding a copy of the blob in scratch, see ``BlobSession``"""
+        return self.blob.session()
+
+
+class BoxStateBlob(StateBlob):
+    """
+    BoxStateBlob is a blob of ``size`` bytes stored in a box of the application
+
+    The box is named after the attribute unless ``name`` is passed. It uses no state schema
+    so it is not created with the rest of the application state, call ``initialize`` once the
+    app account is funded for ``min_balance``.
+    """
+
+    def __init__(self, size: int, name: Optional[str | bytes] = None):
+        self.size = size
+        self.blob: BoxBlob | None = BoxBlob(name, size) if name is not None else None
+        self._attr: str | None = None
+        super().__init__(0)
+
+    def __set_name__(self, owner: type, name: str):
+        # Named once when the class is declared, instances of the app share the name
+        # without writing to the declaration
+        if self._attr is not None and self._attr != name:
+            raise TealInputError(
+                f"BoxStateBlob is already declared as {self._attr}, pass a name to share a box"
+            )
+        if self.blob is None:
+            self._attr = name
+            self.blob = BoxBlob(name, self.size)
+
+    def _blob(self) -> BoxBlob:
+        if self.blob is None:
+            raise TealInputError(
+                "BoxStateBlob has no name, declare it on an Application"
+            )
+        return self.blob
+
+    @property
+    def name(self) -> bytes:
+        return self._blob().name_bytes
+
+    @property
+    def min_balance(self) -> int:
+        return self._blob().min_balance
+
+    def initialize(self) -> Expr:
+        return self._blob().zero()
+
+    def write(self, start: Expr, buff: Expr) -> Expr:
+        return self._blob().write(start, buff)
+
+    def read(self, start: Expr, stop: Expr) -> Expr:
+        return self._blob().read(start, stop)
+
+    def read_byte(self, idx: Expr) -> Expr:
+        return self._blob().get_byte(idx)
+
+    def write_byte(self, idx: Expr, byte: Expr) -> Expr:
+        return self._blob().set_byte(idx, byte)
+
 
 def check_not_static(sv: StateValue):
     if sv.static:
@@ -481,6 +934,20 @@ def check_is_int(sv: StateValue):
         raise TealInputError(f"StateValue {sv} is not integer type")
 
 
+def is_packable(type_spec: abi.TypeSpec) -> bool:
+    match type_spec:
+        case abi.BoolTypeSpec() | abi.UintTypeSpec():
+            return True
+        case abi.StaticArrayTypeSpec():
+            return isinstance(type_spec.value_type_spec(), abi.ByteTypeSpec)
+    return False
+
+
+def check_is_uint_field(field: PackedField):
+    if not isinstance(field.type_spec, abi.UintTypeSpec):
+        raise TealInputError(f"{field} is not a uint field")
+
+
 def check_match_type(sv: StateValue, val: Expr):
     in_type = val.type_of()
     if in_type != sv.stack_type and in_type != TealType.anytype:
@@ -544,6 +1011,16 @@ class State:
                     "type": stack_type_to_string(v.stack_type),
                     "key": v.str_key(),
                     "descr": v.descr if v.descr is not None else "",
+                    **(
+                        {
+                            "fields": {
+                                name: str(field.type_spec)
+                                for name, field in v.fields.items()
+                            }
+                        }
+                        if isinstance(v, PackedStateValue)
+                        else {}
+                    ),
                 }
                 for k, v in self.declared_vals.items()
             },
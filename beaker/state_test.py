@@ -1,5 +1,12 @@
+import threading
+from typing import Literal as L
+
 import pytest
 import pyteal as pt
+from beaker.application import Application
+from beaker.client.avm import AVMError
+from beaker.decorators import external
+from beaker.testing import LocalApp
 from beaker.state import (
     ApplicationState,
     AccountState,
@@ -7,6 +14,8 @@ from beaker.state import (
     DynamicApplicationStateValue,
     ApplicationStateValue,
     AccountStateValue,
+    PackedStateValue,
+    StateCache,
     get_default_for_type,
 )
 
@@ -513,3 +522,259 @@ def test_account_state():
     statevals["c"] = DynamicAccountStateValue(pt.TealType.uint64, max_keys=16)
     with pytest.raises(Exception):
         AccountState(statevals)
+
+
+def counter_app(cache_state: bool) -> Application:
+    class Counter(Application):
+        count = ApplicationStateValue(pt.TealType.uint64)
+        step = ApplicationStateValue(pt.TealType.uint64, default=pt.Int(2))
+        last = ApplicationStateValue(pt.TealType.bytes)
+        owner = ApplicationStateValue(pt.TealType.bytes, static=True)
+
+        @external(cache_state=cache_state)
+        def bump(self, times: pt.abi.Uint64, *, output: pt.abi.Uint64):
+            i = pt.ScratchVar()
+            return pt.Seq(
+                pt.For(
+                    i.store(pt.Int(0)),
+                    i.load() < times.get(),
+                    i.store(i.load() + pt.Int(1)),
+                ).Do(self.count.increment(self.step)),
+                pt.If(self.count > pt.Int(10)).Then(
+                    self.last.set(pt.Concat(self.last, pt.Bytes("!"))),
+                    self.step.decrement(),
+                ),
+                output.set(self.count + self.step),
+            )
+
+        @external(cache_state=cache_state)
+        def total(self, times: pt.abi.Uint64, *, output: pt.abi.Uint64):
+            i = pt.ScratchVar()
+            acc = pt.ScratchVar()
+            return pt.Seq(
+                acc.store(pt.Int(0)),
+                pt.For(
+                    i.store(pt.Int(0)),
+                    i.load() < times.get(),
+                    i.store(i.load() + pt.Int(1)),
+                ).Do(acc.store(acc.load() + self.count * self.step)),
+                output.set(acc.load()),
+            )
+
+        @external(cache_state=cache_state)
+        def claim(self, *, output: pt.abi.Address):
+            return pt.Seq(
+                self.owner.set(pt.Txn.sender()),
+                output.decode(self.owner),
+            )
+
+    return Counter()
+
+
+def test_cached_state_equivalent():
+    plain, cached = LocalApp(counter_app(False)), LocalApp(counter_app(True))
+    for local in [plain, cached]:
+        local.snapshot.global_state.update({b"step": 2, b"last": b"x"})
+
+    for times in [0, 1, 3, 5, 2]:
+        assert plain.call(plain.app.bump, times=times) == cached.call(
+            cached.app.bump, times=times
+        )
+        assert plain.snapshot.global_state == cached.snapshot.global_state
+        assert plain.last_result.global_delta == cached.last_result.global_delta
+
+    # Repeated reads are where the cache pays off
+    assert plain.call(plain.app.total, times=10) == cached.call(
+        cached.app.total, times=10
+    )
+    assert cached.cost < plain.cost
+
+    assert plain.call(plain.app.claim) == cached.call(cached.app.claim) == plain.sender
+    assert plain.snapshot.global_state == cached.snapshot.global_state
+
+    # Static values still can't be set twice
+    for local in [plain, cached]:
+        with pytest.raises(AVMError):
+            local.call(local.app.claim)
+
+
+def test_cached_state_loads_once():
+    teal = counter_app(True).approval_program
+
+    def subroutine(name: str) -> str:
+        start = teal.index(f"// {name}\n")
+        return teal[start : teal.find("\n// ", start + 1)]
+
+    bump = subroutine("bump")
+    assert bump.count("app_global_get") == 3
+    assert bump.count("app_global_put") == 3
+
+    total = subroutine("total")
+    assert total.count("app_global_get") == 2
+    assert "app_global_put" not in total
+
+
+def test_cached_state_stale_reads():
+    class Stale(Application):
+        count = ApplicationStateValue(pt.TealType.uint64)
+
+        @external(cache_state=True)
+        def bump(self, *, output: pt.abi.Bool):
+            return pt.Seq(self.count.increment(), output.set(self.count.exists()))
+
+    with pytest.raises(pt.TealInputError):
+        Stale()
+
+    # Reads only are fine
+    class Reads(Application):
+        count = ApplicationStateValue(pt.TealType.uint64)
+
+        @external(cache_state=True)
+        def read(self, *, output: pt.abi.Uint64):
+            return output.set(self.count.exists() + self.count)
+
+    Reads()
+
+
+def test_cached_state_early_exit():
+    # Returning early would skip the write back, on every branch or only one
+    for body in [
+        lambda count: pt.Seq(count.increment(), pt.Approve()),
+        lambda count: pt.Seq(
+            count.increment(),
+            pt.If(count > pt.Int(3)).Then(pt.Reject()),
+            count.increment(),
+        ),
+        lambda count: pt.Seq(
+            count.increment(),
+            pt.If(count > pt.Int(3)).Then(pt.Return()),
+            count.increment(),
+        ),
+    ]:
+
+        class Exits(Application):
+            count = ApplicationStateValue(pt.TealType.uint64)
+
+            @external(cache_state=True)
+            def bump(self):
+                return body(self.count)
+
+        with pytest.raises(pt.TealInputError, match="exit early"):
+            Exits()
+
+
+def test_cached_state_per_thread():
+    sv = ApplicationStateValue(pt.TealType.uint64, key=pt.Bytes("count"))
+    seen = []
+    with StateCache() as cache:
+        assert StateCache.active(sv) is cache
+        # Another thread building a program doesn't pick up this cache
+        thread = threading.Thread(target=lambda: seen.append(StateCache.active(sv)))
+        thread.start()
+        thread.join()
+    assert seen == [None]
+    assert StateCache.active(sv) is None
+
+
+class Packed(Application):
+    config = PackedStateValue(
+        fields={
+            "paused": pt.abi.BoolTypeSpec(),
+            "fee_bps": pt.abi.Uint16TypeSpec(),
+            "open": pt.abi.BoolTypeSpec(),
+            "frozen": pt.abi.BoolTypeSpec(),
+            "level": pt.abi.Uint8TypeSpec(),
+            "cap": pt.abi.Uint32TypeSpec(),
+            "round": pt.abi.Uint64TypeSpec(),
+            "tag": pt.abi.StaticBytesTypeSpec(4),
+        }
+    )
+
+    @external
+    def init(self):
+        return self.initialize_application_state()
+
+    @external(cache_state=True)
+    def configure(
+        self,
+        fee_bps: pt.abi.Uint64,
+        cap: pt.abi.Uint64,
+        tag: pt.abi.StaticBytes[L[4]],
+    ):
+        return pt.Seq(
+            self.config["open"].set(pt.Int(1)),
+            self.config["fee_bps"].set(fee_bps.get()),
+            self.config["level"].increment(pt.Int(3)),
+            self.config["cap"].set(cap.get()),
+            self.config["round"].set(pt.Global.round()),
+            self.config["tag"].set(tag.get()),
+        )
+
+    @external
+    def get_cap(self, *, output: pt.abi.Uint64):
+        return output.set(self.config["cap"].get())
+
+    @external
+    def is_open(self, *, output: pt.abi.Bool):
+        return output.set(self.config["open"].get())
+
+
+def test_packed_state_value():
+    app = Packed()
+    assert app.app_state.schema().num_byte_slices == 1
+    assert app.app_state.schema().num_uints == 0
+    assert app.app_state.dictify()["declared"]["config"] == {
+        "type": "bytes",
+        "key": "config",
+        "descr": "",
+        "fields": {
+            "paused": "bool",
+            "fee_bps": "uint16",
+            "open": "bool",
+            "frozen": "bool",
+            "level": "uint8",
+            "cap": "uint32",
+            "round": "uint64",
+            "tag": "byte[4]",
+        },
+    }
+
+    # Bools share a byte only when they follow each other
+    assert Packed.config.size == 1 + 2 + 1 + 1 + 4 + 8 + 4
+    assert Packed.config["open"].offset == 3 * 8
+    assert Packed.config["frozen"].offset == 3 * 8 + 1
+
+    local = LocalApp(app)
+    local.call(app.init)
+    assert local.snapshot.global_state[b"config"] == bytes(Packed.config.size)
+
+    local.call(app.configure, fee_bps=30, cap=1 << 20, tag=list(b"abcd"))
+    # A get and a put for all six fields
+    assert local.last_result.global_delta.keys() == {b"config"}
+    configure = app.approval_program.split("// configure\n")[1].split("\n// ")[0]
+    assert configure.count("app_global_get") == configure.count("app_global_put") == 1
+    assert local.call(app.get_cap) == 1 << 20
+    assert local.call(app.is_open) is True
+
+    value = local.snapshot.global_state[b"config"]
+    assert isinstance(value, bytes)
+    fields = Packed.config.decode(value)
+    assert fields["paused"] is False and fields["open"] is True
+    assert (fields["fee_bps"], fields["level"], fields["cap"]) == (30, 3, 1 << 20)
+    assert bytes(fields["tag"]) == b"abcd"
+
+    # Values that don't fit their field fail rather than spill into the next one
+    for fee_bps, cap in [(1 << 16, 0), (0, 1 << 32)]:
+        with pytest.raises(AVMError):
+            local.call(app.configure, fee_bps=fee_bps, cap=cap, tag=list(b"abcd"))
+
+
+def test_packed_state_value_fields():
+    with pytest.raises(pt.TealInputError):
+        PackedStateValue(fields={})
+    with pytest.raises(pt.TealInputError):
+        PackedStateValue(fields={"name": pt.abi.StringTypeSpec()})
+    with pytest.raises(pt.TealInputError):
+        Packed.config["missing"]
+    with pytest.raises(pt.TealInputError):
+        Packed.config["tag"].increment()
@@ -4,3 +4,4 @@ from .unit_testing_helpers import (
     assert_output,
     returned_int_as_bytes,
 )
+from .local_app import LocalApp
@@ -0,0 +1,115 @@
+from base64 import b64encode
+from typing import Any, cast
+
+from algosdk import abi
+from algosdk.encoding import encode_address
+from algosdk.future import transaction
+
+from beaker.application import Application, get_method_spec
+from beaker.client.avm import AVMSnapshot, EvalResult, Evaluator, evaluator
+from beaker.client.method_plan import MethodPlan
+from beaker.client.return_decoder import return_decoder
+from beaker.decorators import HandlerFunc
+
+_SP = transaction.SuggestedParams(
+    fee=1000, first=1, last=1000, gh=b64encode(bytes(32)).decode("utf-8"), flat_fee=True
+)
+
+
+class LocalApp:
+    """
+    LocalApp calls the methods of an Application in process with the AVM evaluator, carrying
+    state from one call to the next, so programs can be tested and their opcode cost measured
+    without a node
+
+    The app starts with empty global state, no boxes and the sender opted in with empty local
+    state, pass ``snapshot`` to start from something else.
+    """
+
+    def __init__(
+        self,
+        app: Application,
+        sender: str = None,
+        snapshot: AVMSnapshot = None,
+    ):
+        if app.approval_program is None:
+            raise Exception("Application must be compiled before it can be evaluated")
+
+        self.app: Application = app
+        self.sender: str = sender if sender is not None else encode_address(bytes(32))
+        self.snapshot: AVMSnapshot = (
+            snapshot
+            if snapshot is not None
+            else AVMSnapshot(app_id=1, local_state={self.sender: {}}, boxes={})
+        )
+        #: result of the last call made
+        self.last_result: EvalResult | None = None
+
+        self._evaluator: Evaluator = evaluator(app.approval_program)
+
+    def call(
+        self,
+        method: abi.Method | HandlerFunc,
+        budget: int = None,
+        accounts: list[str] = None,
+        foreign_apps: list[int] = None,
+        foreign_assets: list[int] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        calls the method with the keyword args passed and returns the decoded return value
+
+        Args:
+            method: The method to call
+            budget: The opcode budget, by default the 700 of a single app call
+
+        Raises:
+            AVMError: If the call is rejected
+        """
+        spec = method if isinstance(method, abi.Method) else get_method_spec(method)
+        plan = MethodPlan(spec, self.app.hints[spec.name])
+
+        accounts = accounts[:] if accounts else []
+        foreign_apps = foreign_apps[:] if foreign_apps else []
+        foreign_assets = foreign_assets[:] if foreign_assets else []
+        app_args, _ = plan.encode(
+            self.snapshot.app_id,
+            self.sender,
+            plan.arguments(kwargs, _no_defaults),
+            accounts,
+            foreign_apps,
+            foreign_assets,
+        )
+
+        txn = transaction.ApplicationCallTxn(
+            self.sender,
+            _SP,
+            self.snapshot.app_id,
+            transaction.OnComplete.NoOpOC,
+            app_args=app_args,
+            accounts=accounts,
+            foreign_apps=foreign_apps,
+            foreign_assets=foreign_assets,
+        )
+
+        result = self._evaluator.evaluate([txn], 0, self.snapshot, budget)
+        self.last_result = result
+        if not result.approved:
+            raise cast(Exception, result.error)
+
+        self.snapshot = self.snapshot.apply(result)
+
+        if spec.returns.type == abi.Returns.VOID:
+            return None
+        return return_decoder(cast(abi.ABIType, spec.returns.type))(
+            memoryview(result.logs[-1])[4:]
+        )
+
+    @property
+    def cost(self) -> int:
+        """opcode budget used by the last call"""
+        return self.last_result.cost if self.last_result is not None else 0
+
+
+def _no_defaults(default: Any) -> Any:
+    raise Exception("Default arguments can't be resolved for local calls, pass them")
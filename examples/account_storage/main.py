@@ -5,6 +5,7 @@ import algosdk.future.transaction as txns
 from algosdk.atomic_transaction_composer import *
 from pyteal import *
 from beaker import *
+from beaker.lib.datastructures import Bitmap
 
 # Simple logic sig, will approve _any_ transaction
 # Used to expand our apps available state by
@@ -24,6 +25,10 @@ class KeySig(LogicSignature):
 class DiskHungry(Application):
     # Reserve all 16 keys for the blob in local state
     data = AccountStateBlob(keys=16)
+    # Addressed a bit at a time. Bit i is counted from the high bit of byte i // 8,
+    # earlier versions of this example flipped the low bit first (2 ** (i % 8)), so
+    # bits set by an app deployed from them read back mirrored within each byte
+    bits = Bitmap(data)
 
     # Signal to beaker that this should be compiled
     # prior to compiling the main application
@@ -43,37 +48,13 @@ class DiskHungry(Application):
             self.initialize_account_state(),
         )
 
-    # Inline these
-    def byte_idx(self, bit_idx) -> Int:
-        return bit_idx / Int(8)
-
-    def bit_in_byte_idx(self, bit_idx) -> Int:
-        return bit_idx % Int(8)
-
     @external
     def flip_bit(self, nonce_acct: abi.Account, bit_idx: abi.Uint32):
         """
         Allows caller to flip a bit at a given index for some account that has already opted in
         """
-
-        return Seq(
-            # Read byte
-            (byte := ScratchVar()).store(
-                self.data[nonce_acct.address()].read_byte(self.byte_idx(bit_idx.get()))
-            ),
-            # Flip bit
-            byte.store(
-                SetBit(
-                    byte.load(),
-                    self.bit_in_byte_idx(bit_idx.get()),
-                    Not(GetBit(byte.load(), self.bit_in_byte_idx(bit_idx.get()))),
-                )
-            ),
-            # Write byte
-            self.data[nonce_acct.address()].write_byte(
-                self.byte_idx(bit_idx.get()), byte.load()
-            ),
-        )
+        bits = self.bits[nonce_acct.address()]
+        return bits.set_bit(bit_idx.get(), Not(bits.get_bit(bit_idx.get())))
 
 
 def demo():
@@ -115,16 +96,11 @@ def demo():
             DiskHungry.flip_bit, nonce_acct=lsig_signer.lsig.address(), bit_idx=idx
         )
 
-        # Get the full state for the lsig we used to store this bit
-        acct_state: dict[bytes, bytes] = app_client.get_account_state(
-            lsig_signer.lsig.address(), raw=True
-        )
-
-        # Make sure the blob is in the right order
-        blob: bytes = b"".join([acct_state[x.to_bytes(1, "big")] for x in range(16)])
+        # Read back the bits stored for the lsig we used
+        bits = app_client.get_bitmap(app.bits, lsig_signer.lsig.address())
 
-        # Did the expected byte have the expected integer value?
-        assert int(blob[idx // 8]) == 2 ** (idx % 8)
+        # Is the expected bit the only one set?
+        assert list(bits.set_bits()) == [idx]
         print(f"bit set correctly at index {idx}")
 
 
@@ -10,5 +10,5 @@ setup(
     license="MIT",
     long_description=open("README.md").read(),
     package_data={"beaker": ["py.typed"]},
-    install_requires=["pyteal>=0.18.1", "py-algorand-sdk>=1.16.1"],
+    install_requires=["pyteal>=0.20.1", "py-algorand-sdk>=1.20.0"],
 )